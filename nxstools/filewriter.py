@@ -22,9 +22,18 @@ import weakref
 import time
 import datetime
 import threading
+import functools
+import json
+import copy
+import os
 import numpy
 import sys
 
+if sys.version_info > (3,):
+    import queue
+else:
+    import Queue as queue
+
 
 #: (:mod:`PNIWriter` or :mod:`H5PYWriter`or :mod:`H5CppWriter`)
 #    default writer module
@@ -34,6 +43,460 @@ writer = None
 writerlock = threading.Lock()
 
 
+#: (:obj:`str`) environment variable which enables writer metrics,
+#    i.e. ``1`` or a directory for JSON dumps
+METRICS_ENV = "NXSTOOLS_METRICS"
+
+#: (:obj:`str`) environment variable with a prometheus text file name
+METRICS_PROM_ENV = "NXSTOOLS_METRICS_PROM"
+
+#: (:obj:`tuple` <:obj:`float`>) latency histogram bucket limits in seconds
+LATENCY_BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0)
+
+#: (:obj:`int`) default number of records staged by buffered fields
+BUFFER_RECORDS = 1000
+
+#: (:obj:`int`) default queue size of the write-behind I/O thread
+QUEUE_SIZE = 1000
+
+#: (:obj:`tuple` <:obj:`str`>) methods queued by the write-behind I/O thread
+ASYNC_METHODS = ("__setitem__", "write", "grow")
+
+#: (:obj:`tuple` <:obj:`str`>) file creation and access property options,
+#    i.e. file space strategy: 'page', 'fsm', 'aggregate' or 'none',
+#    its persist flag, threshold and page size, page buffer size,
+#    metadata block size, sieve buffer size, alignment threshold
+#    and interval, initial and maximal metadata cache size in bytes
+FILE_PROPERTIES = (
+    "fs_strategy", "fs_persist", "fs_threshold", "fs_page_size",
+    "page_buf_size", "meta_block_size", "sieve_buf_size",
+    "alignment_threshold", "alignment_interval",
+    "mdc_initial_size", "mdc_max_size")
+
+#: (:obj:`int`) default size limit in bytes of files staged in memory
+STAGING_LIMIT = 128 << 20
+
+#: (:obj:`int`) maximal number of bytes written by fields between
+#    two size checks of a file staged in memory below its limit
+STAGING_MARGIN = 1 << 20
+
+#: (:obj:`dict` <:obj:`str`, :obj:`dict`>) file property presets
+FILE_PRESETS = {
+    "parallel-fs": {
+        "fs_strategy": "page",
+        "fs_page_size": 1 << 20,
+        "page_buf_size": 16 << 20,
+        "meta_block_size": 1 << 20,
+        "sieve_buf_size": 4 << 20,
+        "alignment_threshold": 64 << 10,
+        "alignment_interval": 1 << 20,
+        "mdc_initial_size": 8 << 20,
+        "mdc_max_size": 64 << 20,
+    },
+    "local-ssd": {
+        "fs_strategy": "page",
+        "fs_page_size": 64 << 10,
+        "page_buf_size": 4 << 20,
+        "meta_block_size": 64 << 10,
+        "sieve_buf_size": 1 << 20,
+        "alignment_threshold": 4 << 10,
+        "alignment_interval": 4 << 10,
+        "mdc_initial_size": 2 << 20,
+        "mdc_max_size": 32 << 20,
+    },
+}
+
+
+class FTMetrics(object):
+
+    """ writer operation metrics with counts, bytes and latency histograms
+    per nexus file, operation and nexus path
+    """
+
+    def __init__(self, jsondir=None, promfile=None):
+        """ constructor
+
+        :param jsondir: directory of JSON dumps, the nexus file directory
+                        if None or empty
+        :type jsondir: :obj:`str`
+        :param promfile: prometheus text file name
+        :type promfile: :obj:`str`
+        """
+        #: (:obj:`str`) directory of JSON dumps
+        self.jsondir = jsondir
+        #: (:obj:`str`) prometheus text file name
+        self.promfile = promfile
+        #: (:class:`threading.Lock`) metrics lock
+        self.__lock = threading.Lock()
+        #: (:obj:`dict` <:obj:`str`,
+        #    :obj:`dict` <(:obj:`str`, :obj:`str`), :obj:`list`>>)
+        #    statistics since the last dump by nexus file name
+        self.__stats = {}
+        #: (:obj:`dict` <(:obj:`str`, :obj:`str`), :obj:`list`>)
+        #    statistics since the creation
+        self.__totals = {}
+
+    @classmethod
+    def fromenv(cls):
+        """ creates metrics from environment variables
+
+        :returns: writer metrics or None if disabled
+        :rtype: :class:`FTMetrics`
+        """
+        value = os.environ.get(METRICS_ENV, "")
+        promfile = os.environ.get(METRICS_PROM_ENV, "") or None
+        if value.lower() in ["", "0", "false", "no", "off"]:
+            if not promfile:
+                return None
+            value = ""
+        if value.lower() in ["1", "true", "yes", "on"]:
+            value = ""
+        return cls(value or None, promfile)
+
+    @classmethod
+    def _update(cls, stats, key, nbytes, duration):
+        """ updates statistics
+
+        :param stats: statistics dictionary
+        :type stats: :obj:`dict` <(:obj:`str`, :obj:`str`), :obj:`list`>
+        :param key: (operation, path) key
+        :type key: (:obj:`str`, :obj:`str`)
+        :param nbytes: number of bytes
+        :type nbytes: :obj:`int`
+        :param duration: operation time in seconds
+        :type duration: :obj:`float`
+        """
+        st = stats.get(key)
+        if st is None:
+            # count, bytes, sum of times, max time, histogram
+            st = stats[key] = [0, 0, 0.0, 0.0,
+                               [0] * (len(LATENCY_BUCKETS) + 1)]
+        st[0] += 1
+        st[1] += nbytes
+        st[2] += duration
+        if duration > st[3]:
+            st[3] = duration
+        for i, le in enumerate(LATENCY_BUCKETS):
+            if duration <= le:
+                break
+        else:
+            i = len(LATENCY_BUCKETS)
+        st[4][i] += 1
+
+    def record(self, operation, path, nbytes, duration, filename=None):
+        """ records one operation
+
+        :param operation: operation name, e.g. write, grow, create_field
+        :type operation: :obj:`str`
+        :param path: nexus path
+        :type path: :obj:`str`
+        :param nbytes: number of bytes
+        :type nbytes: :obj:`int`
+        :param duration: operation time in seconds
+        :type duration: :obj:`float`
+        :param filename: nexus file name
+        :type filename: :obj:`str`
+        """
+        key = (operation, path or "")
+        with self.__lock:
+            stats = self.__stats.get(filename or "")
+            if stats is None:
+                stats = self.__stats[filename or ""] = {}
+            self._update(stats, key, nbytes, duration)
+            self._update(self.__totals, key, nbytes, duration)
+
+    @classmethod
+    def _todict(cls, stats):
+        """ converts statistics to a JSON dictionary
+
+        :param stats: statistics dictionary
+        :type stats: :obj:`dict` <(:obj:`str`, :obj:`str`), :obj:`list`>
+        :returns: metrics dictionary by path and operation
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`dict`>
+        """
+        res = {}
+        labels = ["<=%g" % le for le in LATENCY_BUCKETS] + \
+            [">%g" % LATENCY_BUCKETS[-1]]
+        for (operation, path), st in sorted(stats.items()):
+            res.setdefault(path, {})[operation] = {
+                "count": st[0],
+                "bytes": st[1],
+                "time": st[2],
+                "max_time": st[3],
+                "histogram": dict(zip(labels, st[4])),
+            }
+        return res
+
+    def metrics(self, total=False, filename=None):
+        """ provides metrics
+
+        :param total: if metrics since the creation of all files,
+                      otherwise since the last dump
+        :type total: :obj:`bool`
+        :param filename: nexus file name of metrics since the last dump,
+                         all files if None
+        :type filename: :obj:`str`
+        :returns: metrics dictionary by path and operation
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`dict`>
+        """
+        with self.__lock:
+            if total:
+                return self._todict(self.__totals)
+            if filename is not None:
+                return self._todict(self.__stats.get(filename, {}))
+            stats = {}
+            for fstats in self.__stats.values():
+                for key, st in fstats.items():
+                    tst = stats.get(key)
+                    if tst is None:
+                        stats[key] = [st[0], st[1], st[2], st[3],
+                                      list(st[4])]
+                    else:
+                        tst[0] += st[0]
+                        tst[1] += st[1]
+                        tst[2] += st[2]
+                        tst[3] = max(tst[3], st[3])
+                        tst[4] = [a + b for a, b in zip(tst[4], st[4])]
+            return self._todict(stats)
+
+    def prometheus(self):
+        """ provides metrics since the creation in prometheus text format
+
+        :returns: prometheus text
+        :rtype: :obj:`str`
+        """
+        with self.__lock:
+            totals = sorted(
+                (key, [st[0], st[1], st[2], list(st[4])])
+                for key, st in self.__totals.items())
+        lines = [
+            "# TYPE nxstools_writer_operations_total counter",
+            "# TYPE nxstools_writer_bytes_total counter",
+            "# TYPE nxstools_writer_latency_seconds histogram",
+        ]
+        for (operation, path), st in totals:
+            labels = 'operation="%s",path="%s"' % (
+                operation,
+                path.replace("\\", "\\\\").replace('"', '\\"'))
+            lines.append(
+                "nxstools_writer_operations_total{%s} %s" % (labels, st[0]))
+            lines.append(
+                "nxstools_writer_bytes_total{%s} %s" % (labels, st[1]))
+            cumulative = 0
+            for le, count in zip(LATENCY_BUCKETS, st[3]):
+                cumulative += count
+                lines.append(
+                    'nxstools_writer_latency_seconds_bucket{%s,le="%g"} %s'
+                    % (labels, le, cumulative))
+            lines.append(
+                'nxstools_writer_latency_seconds_bucket{%s,le="+Inf"} %s'
+                % (labels, st[0]))
+            lines.append(
+                "nxstools_writer_latency_seconds_sum{%s} %r"
+                % (labels, st[2]))
+            lines.append(
+                "nxstools_writer_latency_seconds_count{%s} %s"
+                % (labels, st[0]))
+        return "\n".join(lines) + "\n"
+
+    def dump(self, filename):
+        """ writes metrics of the nexus file since the last dump
+        into the JSON file next to the nexus file and updates
+        the prometheus text file
+
+        :param filename: nexus file name
+        :type filename: :obj:`str`
+        :returns: JSON file name
+        :rtype: :obj:`str`
+        """
+        with self.__lock:
+            stats = self.__stats.pop(filename or "", {})
+        jsonname = None
+        if stats and filename:
+            jsonname = "%s.metrics.json" % filename
+            if self.jsondir:
+                jsonname = os.path.join(
+                    self.jsondir, os.path.basename(jsonname))
+            try:
+                with open(jsonname, "w") as fl:
+                    json.dump(self._todict(stats), fl, indent=1)
+            except Exception as e:
+                print("Writer metrics cannot be stored: %s" % str(e))
+                jsonname = None
+        if self.promfile:
+            tmpname = "%s.tmp" % self.promfile
+            try:
+                with open(tmpname, "w") as fl:
+                    fl.write(self.prometheus())
+                os.rename(tmpname, self.promfile)
+            except Exception as e:
+                print("Writer metrics cannot be exported: %s" % str(e))
+        return jsonname
+
+
+#: (:class:`FTMetrics`) writer metrics or None if disabled
+metrics = FTMetrics.fromenv()
+
+
+def setmetrics(mtr):
+    """ sets writer metrics
+
+    :param mtr: writer metrics, True for default metrics
+                or None to disable metrics
+    :type mtr: :class:`FTMetrics` or :obj:`bool`
+    """
+    global metrics
+    if mtr is True:
+        mtr = FTMetrics()
+    metrics = mtr or None
+
+
+def _nbytes(value):
+    """ estimates the number of bytes of the value
+
+    :param value: written value
+    :type value: :obj:`any`
+    :returns: number of bytes
+    :rtype: :obj:`int`
+    """
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    try:
+        return int(numpy.asarray(value).nbytes)
+    except Exception:
+        return 0
+
+
+def treefilename(tobject):
+    """ provides the name of the nexus file of the file tree object
+
+    :param tobject: file tree object
+    :type tobject: :class:`FTObject`
+    :returns: nexus file name or None
+    :rtype: :obj:`str`
+    """
+    while tobject is not None and not isinstance(tobject, FTFile):
+        tobject = getattr(tobject, "_tparent", None)
+    return tobject.name if tobject is not None else None
+
+
+def measure(operation, path, value=None, filename=None):
+    """ provides a context manager measuring the operation
+
+    :param operation: operation name
+    :type operation: :obj:`str`
+    :param path: nexus path
+    :type path: :obj:`str`
+    :param value: written value
+    :type value: :obj:`any`
+    :param filename: nexus file name
+    :type filename: :obj:`str`
+    :returns: context manager
+    :rtype: :class:`FTMeasure`
+    """
+    return FTMeasure(metrics, operation, path, value, filename)
+
+
+class FTMeasure(object):
+
+    """ context manager recording the operation time
+    """
+
+    def __init__(self, mtr, operation, path, value=None, filename=None):
+        """ constructor
+
+        :param mtr: writer metrics
+        :type mtr: :class:`FTMetrics`
+        :param operation: operation name
+        :type operation: :obj:`str`
+        :param path: nexus path
+        :type path: :obj:`str`
+        :param value: written value
+        :type value: :obj:`any`
+        :param filename: nexus file name
+        :type filename: :obj:`str`
+        """
+        self.__metrics = mtr
+        self.__operation = operation
+        self.__path = path
+        self.__value = value
+        self.__filename = filename
+        self.__start = None
+
+    def __enter__(self):
+        if self.__metrics is not None:
+            self.__start = time.time()
+        return self
+
+    def __exit__(self, *args):
+        if self.__metrics is not None:
+            self.__metrics.record(
+                self.__operation, self.__path,
+                _nbytes(self.__value), time.time() - self.__start,
+                self.__filename)
+
+
+def instrument(operation, valuearg=None, namearg=None, separator="/"):
+    """ decorator recording writer method calls in metrics
+
+    :param operation: operation name
+    :type operation: :obj:`str`
+    :param valuearg: index of the written value argument
+    :type valuearg: :obj:`int`
+    :param namearg: index of the created child name argument
+    :type namearg: :obj:`int`
+    :param separator: separator of the child name in its path
+    :type separator: :obj:`str`
+    :returns: method decorator
+    :rtype: :obj:`function`
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            mtr = metrics
+            if mtr is None:
+                return method(self, *args, **kwargs)
+            start = time.time()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                duration = time.time() - start
+                path = getattr(self, "path", None) or \
+                    getattr(self.parent, "path", None) or ""
+                if namearg is not None and len(args) > namearg:
+                    path = "%s%s%s" % (
+                        path.rstrip("/"), separator, args[namearg])
+                nbytes = 0
+                if valuearg is not None and len(args) > valuearg:
+                    nbytes = _nbytes(args[valuearg])
+                mtr.record(operation, path, nbytes, duration,
+                           treefilename(self))
+        return wrapper
+    return decorator
+
+
+def staged(valuearg):
+    """ decorator moving the file staged in memory to disk
+    when the bytes written by a field make it exceed the staging limit
+
+    :param valuearg: index of the written value argument
+    :type valuearg: :obj:`int`
+    :returns: method decorator
+    :rtype: :obj:`function`
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            res = method(self, *args, **kwargs)
+            if self._stagingfile is not False and len(args) > valuearg:
+                self._stage(args[valuearg])
+            return res
+        return wrapper
+    return decorator
+
+
 def open_file(filename, readonly=False, **pars):
     """ open the new file
 
@@ -41,17 +504,26 @@ def open_file(filename, readonly=False, **pars):
     :type filename: :obj:`str`
     :param readonly: readonly flag
     :type readonly: :obj:`bool`
-    :param pars: parameters
+    :param pars: parameters, e.g. writebehind=True or a queue size
+                 to execute file operations in a dedicated I/O thread
+                 with queued writes, a file property preset, i.e.
+                 preset='parallel-fs' or preset='local-ssd',
+                 and FILE_PROPERTIES options
     :type pars: :obj:`dict` < :obj:`str`, :obj:`str`>
     :returns: file object
-    :rtype: :class:`FTFile`
+    :rtype: :class:`FTFile` or :class:`FTAsyncFile`
     """
+    writebehind = pars.pop('writebehind', None)
     if 'writer' in pars.keys():
         wr = pars.pop('writer')
     else:
         with writerlock:
             wr = writer
-    fl = wr.open_file(filename, readonly, **pars)
+    if writebehind:
+        fl = _asyncfile(
+            wr.open_file, writebehind, filename, readonly, **pars)
+    else:
+        fl = wr.open_file(filename, readonly, **pars)
     if hasattr(fl, "writer"):
         fl.writer = wr
     return fl
@@ -64,17 +536,28 @@ def create_file(filename, overwrite=False, **pars):
     :type filename: :obj:`str`
     :param overwrite: overwrite flag
     :type overwrite: :obj:`bool`
-    :param pars: parameters
+    :param pars: parameters, e.g. writebehind=True or a queue size
+                 to execute file operations in a dedicated I/O thread
+                 with queued writes, a file property preset, i.e.
+                 preset='parallel-fs' or preset='local-ssd',
+                 FILE_PROPERTIES options, staging='memory' to keep
+                 the file in memory until it is closed or exceeds
+                 staging_limit bytes
     :type pars: :obj:`dict` < :obj:`str`, :obj:`str`>
     :returns: file object
-    :rtype: :class:`FTFile`
+    :rtype: :class:`FTFile` or :class:`FTAsyncFile`
     """
+    writebehind = pars.pop('writebehind', None)
     if 'writer' in pars.keys():
         wr = pars.pop('writer')
     else:
         with writerlock:
             wr = writer
-    fl = wr.create_file(filename, overwrite, **pars)
+    if writebehind:
+        fl = _asyncfile(
+            wr.create_file, writebehind, filename, overwrite, **pars)
+    else:
+        fl = wr.create_file(filename, overwrite, **pars)
     if hasattr(fl, "writer"):
         fl.writer = wr
     return fl
@@ -131,6 +614,8 @@ def link(target, parent, name):
     if not wr:
         with writerlock:
             wr = writer
+    if isinstance(parent, FTAsyncProxy):
+        return parent.execute(wr.link, target, parent, name)
     return wr.link(target, parent, name)
 
 
@@ -156,6 +641,8 @@ def get_links(parent):
     if not wr:
         with writerlock:
             wr = writer
+    if isinstance(parent, FTAsyncProxy):
+        return parent.execute(wr.get_links, parent)
     return wr.get_links(parent)
 
 
@@ -280,15 +767,75 @@ def virtual_field_layout(shape, dtype, maxshape=None, parent=None):
     return wr.virtual_field_layout(shape, dtype, maxshape)
 
 
-def setwriter(wr):
+def setwriter(wr, metrics=None):
     """ sets writer
 
     :param wr: writer module
     :type wr: :mod:`PNIWriter` or :mod:`H5PYWriter` or :mod:`H5CppWriter`
+    :param metrics: writer metrics, True for default metrics,
+                    False to disable them or None to keep the current ones
+    :type metrics: :class:`FTMetrics` or :obj:`bool`
     """
     global writer
     with writerlock:
         writer = wr
+    if metrics is not None:
+        setmetrics(metrics)
+
+
+def file_properties(pars):
+    """ pops file creation and access property options from parameters
+
+    The ``preset`` parameter selects defaults from FILE_PRESETS
+    which are overwritten by explicit FILE_PROPERTIES options.
+    An option set to None removes the preset value.
+
+    :param pars: file parameters
+    :type pars: :obj:`dict` < :obj:`str`, `any`>
+    :returns: file property options
+    :rtype: :obj:`dict` < :obj:`str`, `any`>
+    """
+    preset = pars.pop("preset", None)
+    props = {}
+    if preset:
+        if preset not in FILE_PRESETS:
+            raise Exception("Unknown file preset: %s" % preset)
+        props.update(FILE_PRESETS[preset])
+    for key in FILE_PROPERTIES:
+        if key in pars:
+            value = pars.pop(key)
+            if value is None:
+                props.pop(key, None)
+            else:
+                props[key] = value
+    if props.get("fs_strategy") not in (None, "page"):
+        props.pop("fs_page_size", None)
+    return props
+
+
+def staging_limit(pars):
+    """ pops staging options from file parameters
+
+    The ``staging='memory'`` parameter keeps a new file in memory
+    until it is closed or its size exceeds ``staging_limit`` bytes,
+    i.e. STAGING_LIMIT by default. The size is checked on flush and
+    when the bytes written by fields since the last check exceed the limit.
+    Below the limit the next check comes after at least
+    min(STAGING_MARGIN, limit / 2) written bytes.
+
+    :param pars: file parameters
+    :type pars: :obj:`dict` < :obj:`str`, `any`>
+    :returns: size limit in bytes of the file staged in memory
+              or None if the file is written directly
+    :rtype: :obj:`int`
+    """
+    staging = pars.pop("staging", None)
+    limit = pars.pop("staging_limit", None)
+    if not staging:
+        return None
+    if staging != "memory":
+        raise Exception("Unknown staging mode: %s" % staging)
+    return STAGING_LIMIT if limit is None else int(limit)
 
 
 class FTHyperslab(object):
@@ -400,6 +947,14 @@ class FTObject(object):
             if ch() is not None:
                 ch().close()
 
+    def _flushbuffers(self):
+        """ flushes write-behind buffers of the children
+        """
+        for ch in self.__tchildren:
+            kd = ch()
+            if kd is not None:
+                kd._flushbuffers()
+
     def _reopen(self):
         """ reopen elements and children
         """
@@ -479,6 +1034,13 @@ class FTFile(FTObject):
         #: (:mod:`PNIWriter` or :mod:`H5PYWriter` or :mod:`H5CppWriter`)
         # writer module
         self.writer = None
+        #: (:obj:`int`) size limit in bytes of the file staged in memory
+        #    or None if the file is written directly
+        self.staginglimit = None
+        #: (:obj:`int`) estimated size in bytes of the file staged in memory
+        self.stagedbytes = 0
+        #: (:obj:`list` < :class:`FTShard` >) fields written to shard files
+        self.shards = []
 
     def root(self):
         """ root object
@@ -487,10 +1049,76 @@ class FTFile(FTObject):
         :rtype: :class:`FTGroup`
         """
 
+    def close(self):
+        """ close file objects and its shard files
+        """
+        shards, self.shards = self.shards, []
+        for shard in shards:
+            shard.close()
+        FTObject.close(self)
+
+    def _dumpmetrics(self):
+        """ dumps writer metrics when the file is closed
+        """
+        if metrics is not None:
+            metrics.dump(self.name)
+
+    def _flushbuffers(self):
+        """ flushes write-behind buffers and shard files
+        """
+        for shard in self.shards:
+            shard.flush()
+        FTObject._flushbuffers(self)
+
     def flush(self):
         """ flash the data
         """
 
+    def _stagedsize(self):
+        """ provides size of the file staged in memory
+
+        :returns: file size in bytes
+        :rtype: :obj:`int`
+        """
+        return 0
+
+    def _stagedimage(self):
+        """ provides image of the file staged in memory
+
+        :returns: file image
+        :rtype: :obj:`bytes` or :class:`numpy.ndarray`
+        """
+
+    def _writeimage(self, image):
+        """ writes the file image to the file path in one write
+
+        :param image: file image
+        :type image: :obj:`bytes` or :class:`numpy.ndarray`
+        """
+        with open(self.name, "wb") as fl:
+            fl.write(image)
+
+    def _checkstaging(self):
+        """ moves the file staged in memory to disk
+        when its size exceeds the staging limit
+        """
+        if self.staginglimit is None:
+            return
+        size = self._stagedsize()
+        # keeps the estimate at least a margin below the limit
+        # so the size is not measured again on the next write
+        self.stagedbytes = min(
+            size, self.staginglimit - min(
+                STAGING_MARGIN, self.staginglimit // 2))
+        if size > self.staginglimit:
+            self.staginglimit = None
+            self._flushbuffers()
+            image = self._stagedimage()
+            FTObject.close(self)
+            self._h5object.close()
+            self._writeimage(image)
+            self.reopen()
+
     @property
     def readonly(self):
         """ check if file is readonly
@@ -806,6 +1434,61 @@ class FTVirtualFieldLayout(FTObject):
         """
         self._h5object.add(key, source, sourcekey)
 
+    def add_pattern(self, filename, fieldpath, shape,
+                    offset=None, block=None, stride=None):
+        """ maps blocks repeated along the first layout dimension
+        to source fields of files given by a printf-style pattern,
+        i.e. ``%b`` in the file name is replaced by the block index,
+        so one mapping covers the whole file series
+
+        :param filename: file name pattern, e.g. 'eiger_%b.h5'
+        :type filename: :obj:`str`
+        :param fieldpath: nexus field path
+        :type fieldpath: :obj:`str`
+        :param shape: source field shape
+        :type shape: :obj:`list` < :obj:`int` >
+        :param offset: layout offset of the first block
+        :type offset: :obj:`list` < :obj:`int` >
+        :param block: layout block, default: the source shape
+        :type block: :obj:`list` < :obj:`int` >
+        :param stride: layout stride of the first dimension,
+                       default: the first block dimension
+        :type stride: :obj:`int`
+        """
+
+    def _pattern_hyperslab(self, rank, shape,
+                           offset=None, block=None, stride=None):
+        """ provides layout hyperslab parameters of a block pattern
+
+        :param rank: layout rank
+        :type rank: :obj:`int`
+        :param shape: source field shape
+        :type shape: :obj:`list` < :obj:`int` >
+        :param offset: layout offset of the first block
+        :type offset: :obj:`list` < :obj:`int` >
+        :param block: layout block, default: the source shape
+        :type block: :obj:`list` < :obj:`int` >
+        :param stride: layout stride of the first dimension,
+                       default: the first block dimension
+        :type stride: :obj:`int`
+        :returns: offset, block, stride lists with unlimited count
+                  along the first dimension
+        :rtype: (:obj:`list` < :obj:`int` >, :obj:`list` < :obj:`int` >,
+                 :obj:`list` < :obj:`int` >)
+        """
+        offset = [(dm or 0) for dm in (offset or [])]
+        offset.extend([0] * (rank - len(offset)))
+        block = list(block or shape)
+        block = [1] * (rank - len(block)) + [
+            (dm if dm is not None else 1) for dm in block]
+        if int(numpy.prod(block)) != int(numpy.prod(shape)):
+            raise Exception(
+                "Block %s does not match the source shape %s"
+                % (block, list(shape)))
+        strides = [1] * rank
+        strides[0] = stride or block[0]
+        return offset, block, strides
+
 
 class FTTargetFieldView(FTObject):
 
@@ -820,6 +1503,37 @@ class FTTargetFieldView(FTObject):
         FTObject.__init__(self, h5object)
 
 
+class FTVirtualSource(object):
+
+    """ source mapping of a virtual field """
+
+    def __init__(self, filename, fieldpath, hyperslab, shape,
+                 selection=None):
+        """ constructor
+
+        :param filename: source file name or its '%b' pattern
+        :type filename: :obj:`str`
+        :param fieldpath: source field path
+        :type fieldpath: :obj:`str`
+        :param hyperslab: layout hyperslab of the mapping
+        :type hyperslab: :class:`FTHyperslab`
+        :param shape: source field shape in the mapping
+        :type shape: :obj:`list` < :obj:`int` >
+        :param selection: source hyperslab or None for the whole field
+        :type selection: :class:`FTHyperslab`
+        """
+        #: (:obj:`str`) source file name or its '%b' pattern
+        self.filename = filename
+        #: (:obj:`str`) source field path
+        self.fieldpath = fieldpath
+        #: (:class:`FTHyperslab`) layout hyperslab of the mapping
+        self.hyperslab = hyperslab
+        #: (:obj:`list` < :obj:`int` >) source field shape in the mapping
+        self.shape = shape
+        #: (:class:`FTHyperslab`) source hyperslab or None for the whole field
+        self.selection = selection
+
+
 class FTField(FTObject):
 
     """ file writer field
@@ -834,6 +1548,9 @@ class FTField(FTObject):
         :type tparent: :obj:`FTObject`
         """
         FTObject.__init__(self, h5object, tparent)
+        #: (:class:`FTFile`) file staged in memory which owns the field,
+        #    None if not looked up yet or False if staging is off
+        self._stagingfile = None
 
     @property
     def attributes(self):
@@ -843,6 +1560,27 @@ class FTField(FTObject):
         :rtype: :class:`FTAttributeManager`
         """
 
+    def _stage(self, value):
+        """ adds bytes of the written value to the estimated size
+        of the file staged in memory and checks the file
+        when the estimate exceeds the limit
+
+        :param value: written value
+        :type value: :obj:`any`
+        """
+        h5file = self._stagingfile
+        if h5file is None:
+            h5file = self._tparent
+            while h5file is not None and not isinstance(h5file, FTFile):
+                h5file = h5file._tparent
+        if h5file is None or h5file.staginglimit is None:
+            self._stagingfile = False
+            return
+        self._stagingfile = h5file
+        h5file.stagedbytes += _nbytes(value)
+        if h5file.stagedbytes > h5file.staginglimit:
+            h5file._checkstaging()
+
     def grow(self, dim=0, ext=1):
         """ grow the field
 
@@ -891,6 +1629,68 @@ class FTField(FTObject):
         :rtype: :obj:`any`
         """
 
+    def read_into(self, buffer, selection=Ellipsis):
+        """ read the field selection into the given numpy array
+
+        :param buffer: C-contiguous numpy array of the selection shape
+        :type buffer: :class:`numpy.ndarray`
+        :param selection: slice tuple
+        :type selection: :obj:`tuple`
+        :returns: buffer with read data
+        :rtype: :class:`numpy.ndarray`
+        """
+        buffer[...] = self[selection]
+        return buffer
+
+    def virtual_sources(self):
+        """ provides source mappings of a virtual field
+
+        :returns: source mappings, empty for a non-virtual field
+        :rtype: :obj:`list` < :class:`FTVirtualSource` >
+        """
+        raise Exception(
+            "Virtual field mappings cannot be read with the current writer")
+
+    def iter_chunks(self, axis=0, batch=1):
+        """ iterates over the field in chunks along the given axis
+        reusing one buffer, i.e. the yielded arrays are overwritten
+        by the next iteration
+
+        :param axis: iteration axis
+        :type axis: :obj:`int`
+        :param batch: maximal number of frames in one chunk
+        :type batch: :obj:`int`
+        :returns: generator of chunk offsets and chunk data
+        :rtype: :obj:`generator` <(:obj:`int`, :class:`numpy.ndarray`)>
+        """
+        shape = tuple(self.shape)
+        if not shape:
+            return
+        batch = max(1, int(batch))
+        total = shape[axis]
+        bshape = list(shape)
+        bshape[axis] = min(batch, total)
+        if self.dtype in ['string', b'string']:
+            buffer = None
+        else:
+            buffer = numpy.empty(bshape, dtype=self.dtype)
+        for start in range(0, total, batch):
+            stop = min(start + batch, total)
+            sel = [slice(None)] * len(shape)
+            sel[axis] = slice(start, stop)
+            sel = tuple(sel)
+            if buffer is None:
+                yield start, self[sel]
+                continue
+            chunk = buffer
+            if stop - start != bshape[axis]:
+                csel = [slice(None)] * len(shape)
+                csel[axis] = slice(0, stop - start)
+                chunk = buffer[tuple(csel)]
+                if not chunk.flags.c_contiguous:
+                    chunk = numpy.empty(chunk.shape, dtype=buffer.dtype)
+            yield start, self.read_into(chunk, sel)
+
     @property
     def dtype(self):
         """ field data type
@@ -921,6 +1721,438 @@ class FTField(FTObject):
         FTObject._reopen(self)
 
 
+class FTBufferedField(FTField):
+
+    """ write-behind field proxy which stages records appended
+    along the first dimension and writes them with one grow and one write
+    """
+
+    def __init__(self, field, records=None):
+        """ constructor
+
+        :param field: field with unlimited first dimension
+        :type field: :class:`FTField`
+        :param records: number of staged records
+        :type records: :obj:`int`
+        """
+        FTField.__init__(self, field.h5object, field)
+        #: (:class:`FTField`) buffered field
+        self.__field = field
+        #: (:obj:`int`) number of staged records
+        self.records = int(records or BUFFER_RECORDS)
+        #: (:class:`numpy.ndarray`) staging buffer
+        self.__data = None
+        #: (:obj:`int`) first dimension of the field in the file
+        self.__offset = 0
+        #: (:obj:`int`) number of staged records
+        self.__count = 0
+        #: (:obj:`bool`) if the field is being closed or reopened
+        self.__delegating = False
+        #: (:obj:`bool`) if the field can be staged
+        self.__numeric = field.dtype not in ['string', b'string']
+
+    @property
+    def field(self):
+        """ buffered field
+
+        :returns: buffered field
+        :rtype: :class:`FTField`
+        """
+        return self.__field
+
+    @property
+    def parent(self):
+        """ return the parent object
+
+        :returns: file tree group
+        :rtype: :class:`FTGroup`
+        """
+        return self.__field.parent
+
+    @property
+    def name(self):
+        """ field name
+
+        :returns: field name
+        :rtype: :obj:`str`
+        """
+        return self.__field.name
+
+    @property
+    def path(self):
+        """ field nexus path
+
+        :returns: field nexus path
+        :rtype: :obj:`str`
+        """
+        return self.__field.path
+
+    @property
+    def attributes(self):
+        """ return the attribute manager
+
+        :returns: attribute manager
+        :rtype: :class:`FTAttributeManager`
+        """
+        return self.__field.attributes
+
+    @property
+    def is_valid(self):
+        """ check if field is valid
+
+        :returns: valid flag
+        :rtype: :obj:`bool`
+        """
+        return self.__field.is_valid
+
+    def _index(self, t):
+        """ provides a record index of the first dimension selection
+
+        :param t: slice tuple
+        :type t: :obj:`tuple`
+        :returns: record index or None for other selections
+        :rtype: :obj:`int`
+        """
+        if isinstance(t, tuple) and t and \
+           all(tel is Ellipsis or
+               (isinstance(tel, slice) and tel == slice(None))
+               for tel in t[1:]):
+            t = t[0]
+        if isinstance(t, (int, numpy.integer)) and \
+           not isinstance(t, bool):
+            index = int(t)
+            if index < 0:
+                index += self.__offset + self.__count
+            return index
+
+    def grow(self, dim=0, ext=1):
+        """ grow the field
+
+        :param dim: growing dimension
+        :type dim: :obj:`int`
+        :param dim: size of the grow
+        :type dim: :obj:`int`
+        """
+        if dim != 0 or not self.__numeric or ext > self.records:
+            self.flush()
+            self.__data = None
+            return self.__field.grow(dim, ext)
+        if self.__count + ext > self.records:
+            self.flush()
+        if not self.__count:
+            shape = tuple(self.__field.shape)
+            if not shape:
+                return self.__field.grow(dim, ext)
+            self.__offset = shape[0]
+            if self.__data is None or \
+               self.__data.shape[1:] != shape[1:]:
+                self.__data = numpy.zeros(
+                    (self.records,) + shape[1:],
+                    dtype=self.__field.dtype)
+            else:
+                self.__data[...] = 0
+        self.__count += ext
+
+    def flush(self):
+        """ writes the staged records into the field
+        """
+        if self.__count:
+            count = self.__count
+            self.__count = 0
+            self.__field.grow(0, count)
+            sel = [slice(self.__offset, self.__offset + count)]
+            sel.extend(slice(None) for _ in self.__data.shape[1:])
+            self.__field[tuple(sel)] = self.__data[:count]
+            self.__offset += count
+
+    def _flushbuffers(self):
+        """ flushes write-behind buffers
+        """
+        self.flush()
+
+    def refresh(self):
+        """ refresh the field
+
+        :returns: refreshed
+        :rtype: :obj:`bool`
+        """
+        self.flush()
+        return self.__field.refresh()
+
+    def read(self):
+        """ read the field value
+
+        :returns: h5 object
+        :rtype: :obj:`any`
+        """
+        self.flush()
+        return self.__field.read()
+
+    def write(self, o):
+        """ write the field value
+
+        :param o: h5 object
+        :type o: :obj:`any`
+        """
+        self.flush()
+        self.__field.write(o)
+
+    def read_into(self, buffer, selection=Ellipsis):
+        """ read the field selection into the given numpy array
+
+        :param buffer: C-contiguous numpy array of the selection shape
+        :type buffer: :class:`numpy.ndarray`
+        :param selection: slice tuple
+        :type selection: :obj:`tuple`
+        :returns: buffer with read data
+        :rtype: :class:`numpy.ndarray`
+        """
+        self.flush()
+        return self.__field.read_into(buffer, selection)
+
+    def __setitem__(self, t, o):
+        """ set value
+
+        :param t: slice tuple
+        :type t: :obj:`tuple`
+        :param o: h5 object
+        :type o: :obj:`any`
+        """
+        if self.__count:
+            index = self._index(t)
+            if index is not None and \
+               self.__offset <= index < self.__offset + self.__count:
+                self.__data[index - self.__offset] = o
+                return
+            self.flush()
+        self.__field[t] = o
+
+    def __getitem__(self, t):
+        """ get value
+
+        :param t: slice tuple
+        :type t: :obj:`tuple`
+        :returns: h5 object
+        :rtype: :obj:`any`
+        """
+        if self.__count:
+            index = self._index(t)
+            if index is not None and \
+               self.__offset <= index < self.__offset + self.__count:
+                return self.__data[index - self.__offset].copy()
+            self.flush()
+        return self.__field[t]
+
+    @property
+    def dtype(self):
+        """ field data type
+
+        :returns: field data type
+        :rtype: :obj:`str`
+        """
+        return self.__field.dtype
+
+    @property
+    def shape(self):
+        """ field shape
+
+        :returns: field shape
+        :rtype: :obj:`list` < :obj:`int` >
+        """
+        shape = self.__field.shape
+        if self.__count:
+            shape = (self.__offset + self.__count,) + tuple(shape[1:])
+        return shape
+
+    @property
+    def size(self):
+        """ field size
+
+        :returns: field size
+        :rtype: :obj:`int`
+        """
+        if not self.__count:
+            return self.__field.size
+        return int(numpy.prod(self.shape))
+
+    def close(self):
+        """ writes the staged records and closes the field
+        """
+        self.flush()
+        if not self.__delegating:
+            self.__delegating = True
+            try:
+                self.__field.close()
+            finally:
+                self.__delegating = False
+
+    def reopen(self):
+        """ reopen field
+        """
+        if not self.__delegating:
+            self.__delegating = True
+            try:
+                self.__field.reopen()
+            finally:
+                self.__delegating = False
+        self._h5object = self.__field.h5object
+
+
+def buffered_field(field, records=None):
+    """ creates a write-behind buffered field
+
+    :param field: field with unlimited first dimension
+    :type field: :class:`FTField`
+    :param records: number of staged records
+    :type records: :obj:`int`
+    :returns: buffered field
+    :rtype: :class:`FTBufferedField`
+    """
+    return FTBufferedField(field, records)
+
+
+class FTShard(object):
+
+    """ field written to a separate shard file
+    and linked to the master file
+
+    Shards only split large fields into separate files. HDF5 library
+    calls of all threads are serialized by the library and writer locks,
+    so shards do not increase the write throughput of the process.
+    """
+
+    def __init__(self, parent, name, filename, shardfile, field,
+                 mode="link", writer=None):
+        """ constructor
+
+        :param parent: parent group in the master file
+        :type parent: :class:`FTGroup`
+        :param name: field name
+        :type name: :obj:`str`
+        :param filename: shard file name relative to the master file
+        :type filename: :obj:`str`
+        :param shardfile: shard file
+        :type shardfile: :class:`FTFile` or :class:`FTAsyncFile`
+        :param field: shard field
+        :type field: :class:`FTField` or :class:`FTAsyncProxy`
+        :param mode: master file entry: 'link' or 'vds'
+        :type mode: :obj:`str`
+        :param writer: writer module of the master file
+        :type writer: :mod:`H5PYWriter` or :mod:`H5CppWriter`
+        """
+        #: (:class:`FTGroup`) parent group in the master file
+        self.parent = parent
+        #: (:obj:`str`) field name
+        self.name = name
+        #: (:obj:`str`) shard file name relative to the master file
+        self.filename = filename
+        #: (:class:`FTFile` or :class:`FTAsyncFile`) shard file
+        self.file = shardfile
+        #: (:class:`FTField` or :class:`FTAsyncProxy`) shard field
+        self.field = field
+        #: (:obj:`str`) master file entry: 'link' or 'vds'
+        self.mode = mode
+        #: (:mod:`H5PYWriter` or :mod:`H5CppWriter`) writer module
+        #    of the master file
+        self.writer = writer
+
+    def flush(self):
+        """ flushes the shard file
+        """
+        if self.file is not None:
+            self.file.flush()
+
+    def close(self):
+        """ closes the shard file and creates the virtual field
+        in the master file in the 'vds' mode
+        """
+        if self.file is None:
+            return
+        shape = list(self.field.shape)
+        dtype = self.field.dtype
+        shardfile, self.file = self.file, None
+        shardfile.close()
+        if self.mode == "vds":
+            layout = self.writer.virtual_field_layout(shape, dtype)
+            view = self.writer.target_field_view(
+                self.filename, "/" + self.name, shape, dtype)
+            layout.add(FTHyperslab(), view)
+            self.parent.create_virtual_field(self.name, layout).close()
+
+
+def shard_field(parent, name, type_code, shape=None, chunk=None,
+                dfilter=None, filename=None, mode="link",
+                writebehind=True):
+    """ creates a field in a separate shard file
+    and links it into the parent group
+
+    In the 'link' mode an external link to the shard field is created
+    immediately. In the 'vds' mode a virtual field with the final shape
+    of the shard field is created when the master file is closed.
+    The shard file is created with the backend of the master file.
+    Sharding is file splitting only, e.g. to keep large detector data
+    in separate files. All shard files are written by the same process
+    and their HDF5 calls are serialized, so it does not scale the write
+    throughput across cores or disks.
+
+    :param parent: parent group in the master file
+    :type parent: :class:`FTGroup`
+    :param name: field name
+    :type name: :obj:`str`
+    :param type_code: nexus field type
+    :type type_code: :obj:`str`
+    :param shape: shape
+    :type shape: :obj:`list` < :obj:`int` >
+    :param chunk: chunk
+    :type chunk: :obj:`list` < :obj:`int` >
+    :param dfilter: filter deflater
+    :type dfilter: :class:`FTDataFilter`
+    :param filename: shard file name, by default the master file name
+                     with the field path suffix
+    :type filename: :obj:`str`
+    :param mode: master file entry: 'link' or 'vds'
+    :type mode: :obj:`str`
+    :param writebehind: True or queue size of a write-behind I/O thread
+                        which takes writes off the caller thread,
+                        False to write the shard file directly
+    :type writebehind: :obj:`bool` or :obj:`int`
+    :returns: shard field
+    :rtype: :class:`FTField` or :class:`FTAsyncProxy`
+    """
+    if mode not in ("link", "vds"):
+        raise Exception("Unknown shard mode: %s" % mode)
+    group = _unwrap(parent)
+    master = group
+    while master.parent is not None:
+        master = master.parent
+    if not filename:
+        names = [nm.split(":")[0] for nm in
+                 (getattr(group, "path", None) or "").split("/") if nm]
+        filename = "%s_%s.h5" % (
+            os.path.splitext(master.name)[0], "_".join(names + [name]))
+    relname = os.path.relpath(
+        os.path.abspath(filename),
+        os.path.dirname(os.path.abspath(master.name)))
+    wr = master.writer or sys.modules[type(master).__module__]
+    shardfile = create_file(
+        filename, True, writer=wr, writebehind=writebehind)
+    try:
+        field = shardfile.root().create_field(
+            name, type_code, shape, chunk, dfilter)
+        if mode == "link":
+            target = "%s:/%s" % (relname, name)
+            if isinstance(parent, FTAsyncProxy):
+                parent.execute(wr.link, target, parent, name)
+            else:
+                wr.link(target, parent, name)
+    except Exception:
+        shardfile.close()
+        raise
+    master.shards.append(
+        FTShard(group, name, relname, shardfile, field, mode, wr))
+    return field
+
+
 class FTLink(FTObject):
 
     """ file tree link
@@ -1228,3 +2460,335 @@ class FTAttribute(FTObject):
         """ reopen attribute
         """
         FTObject._reopen(self)
+
+
+class FTIOThread(object):
+
+    """ single I/O thread executing file operations in order
+    """
+
+    def __init__(self, queuesize=None):
+        """ constructor
+
+        :param queuesize: maximal number of queued operations
+        :type queuesize: :obj:`int`
+        """
+        #: (:class:`queue.Queue`) bounded operation queue
+        self.__queue = queue.Queue(maxsize=int(queuesize or QUEUE_SIZE))
+        #: (:class:`Exception`) error of a queued operation
+        self.__error = None
+        #: (:class:`threading.Lock`) error lock
+        self.__lock = threading.Lock()
+        #: (:class:`threading.Thread`) I/O thread
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def __run(self):
+        """ executes queued operations
+        """
+        while True:
+            task = self.__queue.get()
+            if task is None:
+                break
+            func, args, kwargs, result = task
+            try:
+                value = func(*args, **kwargs)
+                if result is not None:
+                    result.append(value)
+            except Exception as e:
+                if result is not None:
+                    result.append(e)
+                else:
+                    with self.__lock:
+                        if self.__error is None:
+                            self.__error = e
+            if result is not None:
+                result[0].set()
+
+    def _raise(self):
+        """ raises the error of a previous queued operation
+        """
+        if self.__error is not None:
+            with self.__lock:
+                error = self.__error
+                self.__error = None
+            if error is not None:
+                raise error
+
+    @property
+    def in_thread(self):
+        """ if the current thread is the I/O thread
+
+        :returns: I/O thread flag
+        :rtype: :obj:`bool`
+        """
+        return threading.current_thread() is self.__thread
+
+    def submit(self, func, *args, **kwargs):
+        """ queues the operation and returns immediately
+
+        :param func: operation function
+        :type func: :obj:`function`
+        :param args: operation arguments
+        :type args: :obj:`list` <`any`>
+        :param kwargs: operation keyword arguments
+        :type kwargs: :obj:`dict` <:obj:`str`, `any`>
+        """
+        self._raise()
+        if self.in_thread:
+            return func(*args, **kwargs)
+        self.__queue.put((func, args, kwargs, None))
+
+    def call(self, func, *args, **kwargs):
+        """ executes the operation in the I/O thread and waits for its result
+
+        :param func: operation function
+        :type func: :obj:`function`
+        :param args: operation arguments
+        :type args: :obj:`list` <`any`>
+        :param kwargs: operation keyword arguments
+        :type kwargs: :obj:`dict` <:obj:`str`, `any`>
+        :returns: operation result
+        :rtype: `any`
+        """
+        if self.in_thread:
+            return func(*args, **kwargs)
+        self._raise()
+        if not self.__thread.is_alive():
+            raise Exception("FTIOThread: I/O thread is stopped")
+        result = [threading.Event()]
+        self.__queue.put((func, args, kwargs, result))
+        result[0].wait()
+        self._raise()
+        if isinstance(result[1], Exception):
+            raise result[1]
+        return result[1]
+
+    def wait(self):
+        """ waits until all queued operations are executed
+        """
+        self.call(lambda: None)
+
+    def stop(self):
+        """ executes queued operations and stops the I/O thread
+        """
+        if self.__thread.is_alive() and not self.in_thread:
+            self.__queue.put(None)
+            self.__thread.join()
+        self._raise()
+
+
+def _unwrap(value):
+    """ provides the proxied object
+
+    :param value: value or proxy
+    :type value: `any`
+    :returns: proxied object or the value
+    :rtype: `any`
+    """
+    if isinstance(value, FTAsyncProxy):
+        return object.__getattribute__(value, "_FTAsyncProxy__target")
+    return value
+
+
+def _detach(value):
+    """ copies mutable data passed to queued operations
+
+    :param value: written value
+    :type value: `any`
+    :returns: value copy
+    :rtype: `any`
+    """
+    if isinstance(value, numpy.ndarray):
+        return value.copy()
+    if isinstance(value, (list, dict)):
+        return copy.deepcopy(value)
+    return value
+
+
+class FTAsyncProxy(object):
+
+    """ proxy of a file tree object which executes all its operations
+    in the I/O thread, writes are queued without waiting
+    """
+
+    def __init__(self, target, iothread):
+        """ constructor
+
+        :param target: file tree object
+        :type target: :class:`FTObject`
+        :param iothread: I/O thread
+        :type iothread: :class:`FTIOThread`
+        """
+        object.__setattr__(self, "_FTAsyncProxy__target", target)
+        object.__setattr__(self, "_FTAsyncProxy__iothread", iothread)
+
+    def _wrap(self, value):
+        """ wraps file tree objects in proxies
+
+        :param value: operation result
+        :type value: `any`
+        :returns: proxy or the value
+        :rtype: `any`
+        """
+        iothread = object.__getattribute__(self, "_FTAsyncProxy__iothread")
+        if isinstance(value, FTObject) and \
+           not isinstance(value, FTDataFilter):
+            return FTAsyncProxy(value, iothread)
+        if isinstance(value, list):
+            return [self._wrap(vl) for vl in value]
+        return value
+
+    def execute(self, func, *args, **kwargs):
+        """ executes the function in the I/O thread and waits for its result
+
+        :param func: function
+        :type func: :obj:`function`
+        :param args: function arguments
+        :type args: :obj:`list` <`any`>
+        :param kwargs: function keyword arguments
+        :type kwargs: :obj:`dict` <:obj:`str`, `any`>
+        :returns: function result
+        :rtype: `any`
+        """
+        iothread = object.__getattribute__(self, "_FTAsyncProxy__iothread")
+        args = [_unwrap(arg) for arg in args]
+        kwargs = dict((key, _unwrap(vl)) for key, vl in kwargs.items())
+        return self._wrap(iothread.call(func, *args, **kwargs))
+
+    def _method(self, name):
+        """ provides a method of the proxied object
+
+        :param name: method name
+        :type name: :obj:`str`
+        :returns: method executed in the I/O thread
+        :rtype: :obj:`function`
+        """
+        target = object.__getattribute__(self, "_FTAsyncProxy__target")
+        iothread = object.__getattribute__(self, "_FTAsyncProxy__iothread")
+        method = getattr(type(target), name)
+        if name in ASYNC_METHODS:
+            def queued(*args, **kwargs):
+                iothread.submit(
+                    method, target,
+                    *[_detach(_unwrap(arg)) for arg in args],
+                    **dict((key, _detach(_unwrap(vl)))
+                           for key, vl in kwargs.items()))
+            return queued
+
+        def called(*args, **kwargs):
+            return self.execute(method, target, *args, **kwargs)
+        return called
+
+    def __getattr__(self, name):
+        target = object.__getattribute__(self, "_FTAsyncProxy__target")
+        if callable(getattr(type(target), name, None)):
+            return self._method(name)
+        return self.execute(getattr, target, name)
+
+    def __setattr__(self, name, value):
+        target = object.__getattribute__(self, "_FTAsyncProxy__target")
+        self.execute(setattr, target, name, value)
+
+    def __setitem__(self, t, o):
+        self._method("__setitem__")(t, o)
+
+    def __getitem__(self, t):
+        return self._method("__getitem__")(t)
+
+    def __len__(self):
+        return self._method("__len__")()
+
+    def __iter__(self):
+        target = object.__getattribute__(self, "_FTAsyncProxy__target")
+        return iter(self.execute(lambda: list(iter(target))))
+
+    def __bool__(self):
+        target = object.__getattribute__(self, "_FTAsyncProxy__target")
+        if hasattr(type(target), "__bool__") or \
+           hasattr(type(target), "__nonzero__") or \
+           hasattr(type(target), "__len__"):
+            return self.execute(bool, target)
+        return True
+
+    __nonzero__ = __bool__
+
+    def __eq__(self, other):
+        return _unwrap(self) == _unwrap(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(_unwrap(self))
+
+    def iter_chunks(self, *args, **kwargs):
+        """ iterates over the field chunks reading them in the I/O thread
+
+        :param args: iter_chunks arguments
+        :type args: :obj:`list` <`any`>
+        :param kwargs: iter_chunks keyword arguments
+        :type kwargs: :obj:`dict` <:obj:`str`, `any`>
+        :returns: generator of chunk offsets and chunk data
+        :rtype: :obj:`generator` <(:obj:`int`, :class:`numpy.ndarray`)>
+        """
+        target = object.__getattribute__(self, "_FTAsyncProxy__target")
+        chunks = self.execute(
+            type(target).iter_chunks, target, *args, **kwargs)
+        while True:
+            try:
+                chunk = self.execute(next, chunks)
+            except StopIteration:
+                return
+            yield chunk
+
+    def wait(self):
+        """ waits until all queued operations are executed
+        """
+        object.__getattribute__(self, "_FTAsyncProxy__iothread").wait()
+
+
+class FTAsyncFile(FTAsyncProxy):
+
+    """ proxy of a file with a dedicated I/O thread
+    """
+
+    def flush(self):
+        """ executes queued operations and flushes the file
+        """
+        return self._method("flush")()
+
+    def close(self):
+        """ executes queued operations, closes the file
+        and stops its I/O thread
+        """
+        iothread = object.__getattribute__(self, "_FTAsyncProxy__iothread")
+        try:
+            return self._method("close")()
+        finally:
+            iothread.stop()
+
+
+def _asyncfile(opener, writebehind, *args, **pars):
+    """ opens the file in a dedicated I/O thread
+
+    :param opener: writer module file function
+    :type opener: :obj:`function`
+    :param writebehind: True or queue size of the I/O thread
+    :type writebehind: :obj:`bool` or :obj:`int`
+    :param args: file function arguments
+    :type args: :obj:`list` <`any`>
+    :param pars: file function parameters
+    :type pars: :obj:`dict` < :obj:`str`, :obj:`str`>
+    :returns: file proxy
+    :rtype: :class:`FTAsyncFile`
+    """
+    queuesize = None if writebehind is True else writebehind
+    iothread = FTIOThread(queuesize)
+    try:
+        fl = iothread.call(opener, *args, **pars)
+    except Exception:
+        iothread.stop()
+        raise
+    return FTAsyncFile(fl, iothread)
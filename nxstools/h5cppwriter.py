@@ -285,7 +285,69 @@ def unlimited(parent=None):
     return h5cpp.dataspace.UNLIMITED
 
 
-def open_file(filename, readonly=False, libver=None, swmr=False):
+def _setfileproperties(props, fapl, fcpl=None, pars=None):
+    """ sets file property options supported by the h5cpp property lists
+
+    Options which the installed h5cpp cannot set raise an exception,
+    file creation options are not used when fcpl is None.
+
+    :param props: file property options
+    :type props: :obj:`dict` < :obj:`str`, `any`>
+    :param fapl: file access property list
+    :type fapl: :class:`h5cpp.property.FileAccessList`
+    :param fcpl: file creation property list
+    :type fcpl: :class:`h5cpp.property.FileCreationList`
+    :param pars: remaining file parameters
+    :type pars: :obj:`dict` < :obj:`str`, `any`>
+    """
+    if pars:
+        raise Exception(
+            "Unknown file parameters: %s" % ", ".join(sorted(pars)))
+    unsupported = []
+    strategies = getattr(h5cpp.property, "FileSpaceStrategy", None)
+    if fcpl is not None and props.get("fs_strategy"):
+        if strategies is None or not hasattr(fcpl, "file_space_strategy"):
+            unsupported.append("fs_strategy")
+        else:
+            fcpl.file_space_strategy(
+                getattr(strategies, {
+                    "fsm": "FSM_AGGR", "page": "PAGE",
+                    "aggregate": "AGGR", "none": "NONE"
+                }[props["fs_strategy"]]),
+                bool(props.get("fs_persist", False)),
+                int(props.get("fs_threshold", 1)))
+        if props.get("fs_page_size"):
+            if hasattr(fcpl, "file_space_page_size"):
+                fcpl.file_space_page_size(int(props["fs_page_size"]))
+            else:
+                unsupported.append("fs_page_size")
+    for name, method in [("page_buf_size", "page_buffer_size"),
+                         ("meta_block_size", "meta_block_size"),
+                         ("sieve_buf_size", "sieve_buffer_size")]:
+        if props.get(name):
+            if hasattr(fapl, method):
+                getattr(fapl, method)(int(props[name]))
+            else:
+                unsupported.append(name)
+    if "alignment_threshold" in props or "alignment_interval" in props:
+        if hasattr(fapl, "alignment"):
+            fapl.alignment(int(props.get("alignment_threshold", 1)),
+                           int(props.get("alignment_interval", 1)))
+        else:
+            unsupported.extend(
+                [name for name in ["alignment_threshold",
+                                   "alignment_interval"]
+                 if name in props])
+    unsupported.extend(
+        [name for name in ["mdc_initial_size", "mdc_max_size"]
+         if props.get(name)])
+    if unsupported:
+        raise Exception(
+            "File properties unsupported on h5cpp: %s"
+            % ", ".join(unsupported))
+
+
+def open_file(filename, readonly=False, libver=None, swmr=False, **pars):
     """ open the new file
 
     :param filename: file name
@@ -294,11 +356,16 @@ def open_file(filename, readonly=False, libver=None, swmr=False):
     :type readonly: :obj:`bool`
     :param libver: library version: 'lastest' or 'earliest'
     :type libver: :obj:`str`
+    :param pars: parameters, e.g. a file property preset
+                 and filewriter.FILE_PROPERTIES options
+    :type pars: :obj:`dict` < :obj:`str`, :obj:`str`>
     :returns: file object
     :rtype: :class:`H5CppFile`
     """
 
+    props = filewriter.file_properties(pars)
     fapl = h5cpp.property.FileAccessList()
+    _setfileproperties(props, fapl, pars=pars)
     # if hasattr(fapl, "set_close_degree"):
     #     fapl.set_close_degree(h5cpp._property.CloseDegree.STRONG)
     if readonly:
@@ -384,7 +451,7 @@ def load_file(membuffer, filename=None, readonly=False, **pars):
     return H5CppFile(h5cpp.file.from_buffer(npdata, flag), filename)
 
 
-def create_file(filename, overwrite=False, libver=None, swmr=None):
+def create_file(filename, overwrite=False, libver=None, swmr=None, **pars):
     """ create a new file
 
     :param filename: file name
@@ -393,11 +460,27 @@ def create_file(filename, overwrite=False, libver=None, swmr=None):
     :type overwrite: :obj:`bool`
     :param libver: library version: 'lastest' or 'earliest'
     :type libver: :obj:`str`
+    :param pars: parameters, e.g. a file property preset
+                 and filewriter.FILE_PROPERTIES options
+    :type pars: :obj:`dict` < :obj:`str`, :obj:`str`>
     :returns: file object
     :rtype: :class:`H5CppFile`
     """
+    staginglimit = filewriter.staging_limit(pars)
+    props = filewriter.file_properties(pars)
     fcpl = h5cpp.property.FileCreationList()
     fapl = h5cpp.property.FileAccessList()
+    _setfileproperties(props, fapl, fcpl, pars)
+    if staginglimit is not None:
+        if not overwrite and os.path.exists(filename):
+            raise Exception("File '%s' already exists" % filename)
+        if swmr:
+            raise Exception("SWMR not supported for files staged in memory")
+        overwrite = True
+        # images of open files with the latest superblock
+        # have invalid checksums
+        libver = 'earliest'
+        h5cpp.file.MemoryDriver()(fapl)
     # if hasattr(fapl, "set_close_degree"):
     #     fapl.set_close_degree(h5cpp._property.CloseDegree.STRONG)
     flag = h5cpp.file.AccessFlags.TRUNCATE if overwrite \
@@ -421,7 +504,9 @@ def create_file(filename, overwrite=False, libver=None, swmr=None):
     attrs.create("file_update_time", pTh["unicode"]).write(
         unicode(H5CppFile.currenttime()))
     rt.close()
-    return H5CppFile(fl, filename)
+    h5file = H5CppFile(fl, filename)
+    h5file.staginglimit = staginglimit
+    return h5file
 
 
 def link(target, parent, name):
@@ -601,14 +686,45 @@ class H5CppFile(filewriter.FTFile):
     def flush(self):
         """ flash the data
         """
-        self._h5object.flush()
+        self._flushbuffers()
+        with filewriter.measure("flush", "/", filename=self.name):
+            self._h5object.flush()
+        self._checkstaging()
 
     def close(self):
         """ close file
         """
         filewriter.FTFile.close(self)
         if self._h5object.is_valid:
-            self._h5object.close()
+            with filewriter.measure("close", "/", filename=self.name):
+                image = None
+                if self.staginglimit is not None:
+                    image = self._stagedimage()
+                    self.staginglimit = None
+                self._h5object.close()
+                if image is not None:
+                    self._writeimage(image)
+        self._dumpmetrics()
+
+    def _stagedsize(self):
+        """ flushes and provides size of the file staged in memory
+
+        :returns: file size in bytes
+        :rtype: :obj:`int`
+        """
+        self._h5object.flush()
+        return self._h5object.size
+
+    def _stagedimage(self):
+        """ provides image of the file staged in memory
+
+        :returns: file image
+        :rtype: :class:`numpy.ndarray`
+        """
+        self._h5object.flush()
+        image = np.zeros(self._h5object.buffer_size, dtype="uint8")
+        self._h5object.to_buffer(image)
+        return image
 
     @property
     def is_valid(self):
@@ -811,6 +927,7 @@ class H5CppGroup(filewriter.FTGroup):
             layout._h5object, dcpl=dcpl)
         return H5CppField(vf, self)
 
+    @filewriter.instrument("create_field", namearg=0)
     def create_field(self, name, type_code,
                      shape=None, chunk=None, dfilter=None):
         """ open a file tree element
@@ -1031,6 +1148,14 @@ class H5CppField(filewriter.FTField):
                     self.path = tparent.path + "/" + self.name
         #: (:obj:`bool`) bool flag
         # self.boolflag = False
+        #: (:obj:`str`) cached field data type
+        self.__dtype = None
+        #: (:class:`h5cpp.dataspace.Hyperslab`) reused one record selection
+        self.__slab = None
+        #: (:obj:`tuple` < :obj:`int` >) block of the reused selection
+        self.__slabblock = None
+        #: (:obj:`bool`) if the reused selection offset can be changed
+        self.__slabmutable = True
 
     @property
     def attributes(self):
@@ -1057,6 +1182,9 @@ class H5CppField(filewriter.FTField):
         except Exception:
             self._h5object = [lk for lk in self._tparent.h5object.links
                               if lk.path.name == self.name][0]
+        self.__dtype = None
+        self.__slab = None
+        self.__slabblock = None
 
         filewriter.FTField.reopen(self)
 
@@ -1069,6 +1197,7 @@ class H5CppField(filewriter.FTField):
         self._h5object.refresh()
         return True
 
+    @filewriter.instrument("grow")
     def grow(self, dim=0, ext=1):
         """ grow the field
 
@@ -1080,6 +1209,51 @@ class H5CppField(filewriter.FTField):
         if self._h5object.dataspace.type != h5cpp.dataspace.Type.SCALAR:
             self._h5object.extent(dim, ext)
 
+    def _recordselection(self, t, shape):
+        """ provides the reused selection of one record along
+        the first dimension, i.e. for ``field[i]`` or ``field[i, ...]``
+
+        :param t: slice tuple
+        :type t: :obj:`tuple`
+        :param shape: field shape
+        :type shape: :obj:`tuple` < :obj:`int` >
+        :returns: hyperslab selection or None for other selections
+        :rtype: :class:`h5cpp.dataspace.Hyperslab`
+        """
+        if not shape:
+            return None
+        if isinstance(t, (int, long, np.integer)) and \
+           not isinstance(t, bool):
+            if len(shape) != 1:
+                return None
+            index = int(t)
+        elif isinstance(t, tuple) and t and \
+                isinstance(t[0], (int, long, np.integer)) and \
+                not isinstance(t[0], bool) and \
+                (t[1:] == (Ellipsis,) or (
+                    len(t) == len(shape) and
+                    all(isinstance(tel, slice) and tel == slice(None)
+                        for tel in t[1:]))):
+            index = int(t[0])
+        else:
+            return None
+        if index < 0:
+            index += shape[0]
+        block = (1,) + tuple(shape[1:])
+        if self.__slab is not None and self.__slabmutable and \
+           self.__slabblock == block:
+            try:
+                self.__slab.offset(0, index)
+                return self.__slab
+            except Exception:
+                self.__slabmutable = False
+        rank = len(block)
+        self.__slab = h5cpp.dataspace.Hyperslab(
+            offset=[index] + [0] * (rank - 1), block=list(block),
+            count=[1] * rank, stride=[1] * rank)
+        self.__slabblock = block
+        return self.__slab
+
     def read(self):
         """ read the field value
 
@@ -1104,6 +1278,8 @@ class H5CppField(filewriter.FTField):
             v = self._h5object.read()
         return v
 
+    @filewriter.staged(valuearg=0)
+    @filewriter.instrument("write", valuearg=0)
     def write(self, o):
         """ write the field value
 
@@ -1112,6 +1288,8 @@ class H5CppField(filewriter.FTField):
         """
         self._h5object.write(o)
 
+    @filewriter.staged(valuearg=1)
+    @filewriter.instrument("write", valuearg=1)
     def __setitem__(self, t, o):
         """ set value
 
@@ -1120,9 +1298,12 @@ class H5CppField(filewriter.FTField):
         :param o: h5 object
         :type o: :obj:`any`
         """
-        if self.shape == (1,) and t == 0:
+        shape = self.shape
+        if shape == (1,) and t == 0:
             return self._h5object.write(o)
-        selection = _slice2selection(t, self.shape)
+        selection = self._recordselection(t, shape)
+        if selection is None:
+            selection = _slice2selection(t, shape)
         if selection is None:
             self._h5object.write(o)
         else:
@@ -1204,6 +1385,35 @@ class H5CppField(filewriter.FTField):
                 pass
         return v
 
+    def read_into(self, buffer, selection=Ellipsis):
+        """ read the field selection into the given numpy array
+
+        :param buffer: C-contiguous numpy array of the selection shape
+        :type buffer: :class:`numpy.ndarray`
+        :param selection: slice tuple
+        :type selection: :obj:`tuple`
+        :returns: buffer with read data
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.dtype in ['string', b'string']:
+            return filewriter.FTField.read_into(self, buffer, selection)
+        shape = self.shape
+        if selection is not Ellipsis and \
+           not isinstance(selection, filewriter.FTHyperslab):
+            if not isinstance(selection, (list, tuple)):
+                selection = (selection, )
+            selection = list(selection)
+            if Ellipsis in selection:
+                ie = selection.index(Ellipsis)
+                selection[ie:ie + 1] = [slice(None)] * \
+                    (len(shape) - len(selection) + 1)
+            selection.extend(
+                [slice(None)] * (len(shape) - len(selection)))
+        sel = _slice2selection(selection, shape)
+        if sel is None:
+            return self._h5object.read(data=buffer)
+        return self._h5object.read(data=buffer, selection=sel)
+
     @property
     def is_valid(self):
         """ check if field is valid
@@ -1222,6 +1432,16 @@ class H5CppField(filewriter.FTField):
         """
         # if self.boolflag:
         #     return "bool"
+        if self.__dtype is None:
+            self.__dtype = self._dtype()
+        return self.__dtype
+
+    def _dtype(self):
+        """ reads field data type from its h5 datatype
+
+        :returns: field data type
+        :rtype: :obj:`str`
+        """
         if str(self._h5object.datatype.type) == "FLOAT":
             if self._h5object.datatype.size == 8:
                 return "float64"
@@ -1475,6 +1695,43 @@ class H5CppVirtualFieldLayout(filewriter.FTVirtualFieldLayout):
         self._h5object.add(h5cpp.property.VirtualDataMap(
             lview, str(fname), path, eview))
 
+    def add_pattern(self, filename, fieldpath, shape,
+                    offset=None, block=None, stride=None):
+        """ maps blocks repeated along the first layout dimension
+        to source fields of files given by a printf-style pattern,
+        i.e. ``%b`` in the file name is replaced by the block index
+
+        :param filename: file name pattern, e.g. 'eiger_%b.h5'
+        :type filename: :obj:`str`
+        :param fieldpath: nexus field path
+        :type fieldpath: :obj:`str`
+        :param shape: source field shape
+        :type shape: :obj:`list` < :obj:`int` >
+        :param offset: layout offset of the first block
+        :type offset: :obj:`list` < :obj:`int` >
+        :param block: layout block, default: the source shape
+        :type block: :obj:`list` < :obj:`int` >
+        :param stride: layout stride of the first dimension,
+                       default: the first block dimension
+        :type stride: :obj:`int`
+        """
+        rank = len(self.shape)
+        offset, block, strides = self._pattern_hyperslab(
+            rank, shape, offset, block, stride)
+        count = [1] * rank
+        count[0] = h5cpp.dataspace.UNLIMITED
+        lds = h5cpp.dataspace.Simple(
+            tuple(self.shape),
+            tuple([h5cpp.dataspace.UNLIMITED] * rank))
+        lview = h5cpp.dataspace.View(
+            lds, h5cpp.dataspace.Hyperslab(
+                offset=tuple(offset), block=tuple(block),
+                count=tuple(count), stride=tuple(strides)))
+        eview = h5cpp.dataspace.View(
+            h5cpp.dataspace.Simple(tuple(shape)))
+        self._h5object.add(h5cpp.property.VirtualDataMap(
+            lview, str(filename), h5cpp.Path(fieldpath), eview))
+
 
 class H5CppTargetFieldView(filewriter.FTTargetFieldView):
 
@@ -1531,6 +1788,7 @@ class H5CppAttributeManager(filewriter.FTAttributeManager):
         #: (:obj:`str`) object name
         self.name = None
 
+    @filewriter.instrument("create_attribute", namearg=0, separator="@")
     def create(self, name, dtype, shape=None, overwrite=False):
         """ create a new attribute
 
@@ -1675,6 +1933,7 @@ class H5CppAttribute(filewriter.FTAttribute):
                 pass
         return vl
 
+    @filewriter.instrument("write_attribute", valuearg=0)
     def write(self, o):
         """ write attribute value
 
@@ -1683,6 +1942,7 @@ class H5CppAttribute(filewriter.FTAttribute):
         """
         self._h5object.write(o)
 
+    @filewriter.instrument("write_attribute", valuearg=1)
     def __setitem__(self, t, o):
         """ write attribute value
 
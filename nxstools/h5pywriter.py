@@ -286,6 +286,32 @@ def unlimited(parent=None):
         return h5py.UNLIMITED
 
 
+def _selection_hyperslab(space, allnone=False):
+    """ converts a dataspace selection to a hyperslab
+
+    :param space: dataspace with a selection
+    :type space: :class:`h5py.h5s.SpaceID`
+    :param allnone: return None for the whole dataspace selection
+    :type allnone: :obj:`bool`
+    :returns: hyperslab of the selection
+    :rtype: :class:`filewriter.FTHyperslab`
+    """
+    shape = list(space.shape)
+    if space.get_select_type() == h5py.h5s.SEL_HYPERSLABS:
+        if space.is_regular_hyperslab():
+            offset, stride, count, block = space.get_regular_hyperslab()
+            return filewriter.FTHyperslab(
+                list(offset), list(block), list(count), list(stride))
+        start, end = space.get_select_bounds()
+        return filewriter.FTHyperslab(
+            list(start), [(e - b + 1) for b, e in zip(start, end)],
+            [1] * len(shape), [1] * len(shape))
+    if allnone:
+        return None
+    return filewriter.FTHyperslab(
+        [0] * len(shape), shape, [1] * len(shape), [1] * len(shape))
+
+
 def load_file(membuffer, filename=None, readonly=False, **pars):
     """ load a file from memory byte buffer
 
@@ -313,6 +339,94 @@ def load_file(membuffer, filename=None, readonly=False, **pars):
     return H5PYFile(fobj, filename)
 
 
+#: (:obj:`dict` <:obj:`str`, :obj:`str`>) file space strategy constants
+FSPACE_STRATEGIES = {
+    "fsm": "FSPACE_STRATEGY_FSM_AGGR",
+    "page": "FSPACE_STRATEGY_PAGE",
+    "aggregate": "FSPACE_STRATEGY_AGGR",
+    "none": "FSPACE_STRATEGY_NONE",
+}
+
+
+#: (:obj:`tuple` <:obj:`str`>) file property options passed to h5py.File
+H5PY_FILE_PROPERTIES = (
+    "fs_strategy", "fs_persist", "fs_threshold", "fs_page_size",
+    "page_buf_size", "meta_block_size",
+    "alignment_threshold", "alignment_interval")
+
+#: (:obj:`str`) h5py driver which sets the sieve buffer size
+#    of the sec2 or in-memory core driver
+SIEVE_DRIVER = "nxstools_sieve"
+
+
+def _setsievefapl(plist, core=False, sieve_buf_size=None):
+    """ sets the sec2 or in-memory core driver with the sieve buffer size
+
+    :param plist: file access property list
+    :type plist: :class:`h5py.h5p.PropFAID`
+    :param core: in-memory core driver flag without a backing store
+    :type core: :obj:`bool`
+    :param sieve_buf_size: sieve buffer size in bytes
+    :type sieve_buf_size: :obj:`int`
+    """
+    if core:
+        plist.set_fapl_core(64 << 10, False)
+    else:
+        plist.set_fapl_sec2()
+    if sieve_buf_size:
+        plist.set_sieve_buf_size(int(sieve_buf_size))
+
+
+def _file(filename, mode, props, core=False, **pars):
+    """ opens or creates a file with the given property options
+
+    :param filename: file name
+    :type filename: :obj:`str`
+    :param mode: file mode, i.e. 'r', 'r+', 'w' or 'w-'
+    :type mode: :obj:`str`
+    :param props: file property options
+    :type props: :obj:`dict` < :obj:`str`, `any`>
+    :param core: in-memory core driver flag without a backing store
+    :type core: :obj:`bool`
+    :param pars: h5py.File parameters, e.g. libver or swmr
+    :type pars: :obj:`dict` < :obj:`str`, `any`>
+    :returns: h5py file
+    :rtype: :class:`h5py.File`
+    """
+    if props.get("fs_strategy") and \
+       props["fs_strategy"] not in FSPACE_STRATEGIES:
+        raise Exception(
+            "Unknown file space strategy: %s" % props["fs_strategy"])
+    if pars.get("libver") == "lastest":
+        pars["libver"] = "latest"
+    for key in H5PY_FILE_PROPERTIES:
+        # file space options are only set for new files
+        if props.get(key) is not None and \
+           (mode not in ("r", "r+") or not key.startswith("fs_")):
+            pars[key] = props[key]
+    if core or props.get("sieve_buf_size"):
+        if pars.get("driver"):
+            raise Exception(
+                "Staging and sieve_buf_size not supported with "
+                "the %s driver" % pars["driver"])
+        if SIEVE_DRIVER not in h5py.registered_drivers():
+            h5py.register_driver(SIEVE_DRIVER, _setsievefapl)
+        pars.update(driver=SIEVE_DRIVER, core=core,
+                    sieve_buf_size=props.get("sieve_buf_size"))
+    fl = h5py.File(filename, mode, **pars)
+    if props.get("mdc_initial_size") or props.get("mdc_max_size"):
+        config = fl.id.get_mdc_config()
+        if props.get("mdc_max_size"):
+            config.max_size = int(props["mdc_max_size"])
+        if props.get("mdc_initial_size"):
+            config.set_initial_size = True
+            config.initial_size = int(props["mdc_initial_size"])
+        config.max_size = max(config.max_size, config.initial_size)
+        config.min_size = min(config.min_size, config.initial_size)
+        fl.id.set_mdc_config(config)
+    return fl
+
+
 def open_file(filename, readonly=False, **pars):
     """ open the new file
 
@@ -320,15 +434,17 @@ def open_file(filename, readonly=False, **pars):
     :type filename: :obj:`str`
     :param readonly: readonly flag
     :type readonly: :obj:`bool`
-    :param pars: parameters
+    :param pars: parameters, e.g. a file property preset
+                 and filewriter.FILE_PROPERTIES options
     :type pars: :obj:`dict` < :obj:`str`, :obj:`str`>
     :returns: file object
     :rtype: :class:`H5PYFile`
     """
-    if readonly:
-        return H5PYFile(h5py.File(filename, "r", **pars), filename)
-    else:
-        return H5PYFile(h5py.File(filename, "r+", **pars), filename)
+    props = filewriter.file_properties(pars)
+    mode = "r" if readonly else "r+"
+    if props:
+        return H5PYFile(_file(filename, mode, props, **pars), filename)
+    return H5PYFile(h5py.File(filename, mode, **pars), filename)
 
 
 def create_file(filename, overwrite=False, **pars):
@@ -338,19 +454,32 @@ def create_file(filename, overwrite=False, **pars):
     :type filename: :obj:`str`
     :param overwrite: overwrite flag
     :type overwrite: :obj:`bool`
-    :param pars: parameters
+    :param pars: parameters, e.g. a file property preset
+                 and filewriter.FILE_PROPERTIES options
     :type pars: :obj:`dict` < :obj:`str`, :obj:`str`>
     :returns: file object
     :rtype: :class:`H5PYFile`
     """
-    fl = h5py.File(filename, "w" if overwrite else "w-", **pars)
+    staginglimit = filewriter.staging_limit(pars)
+    props = filewriter.file_properties(pars)
+    mode = "w" if overwrite else "w-"
+    if staginglimit is not None:
+        if not overwrite and os.path.exists(filename):
+            raise Exception("File '%s' already exists" % filename)
+        fl = _file(filename, "w", props, core=True, **pars)
+    elif props:
+        fl = _file(filename, mode, props, **pars)
+    else:
+        fl = h5py.File(filename, mode, **pars)
     fl.attrs["file_time"] = unicode(H5PYFile.currenttime())
     fl.attrs["HDF5_Version"] = str(h5py.version.hdf5_version)
     fl.attrs["NX_class"] = u"NXroot"
     # fl.attrs["NeXus_version"] = u"4.3.0"
     fl.attrs["file_name"] = unicode(filename)
     fl.attrs["file_update_time"] = unicode(H5PYFile.currenttime())
-    return H5PYFile(fl, filename)
+    h5file = H5PYFile(fl, filename)
+    h5file.staginglimit = staginglimit
+    return h5file
 
 
 def link(target, parent, name):
@@ -530,19 +659,50 @@ class H5PYFile(filewriter.FTFile):
     def flush(self):
         """ flash the data
         """
-        if self._h5object.mode in ["r+"]:
-            self._h5object.attrs["file_update_time"] = \
-                unicode(self.currenttime())
-        return self._h5object.flush()
+        self._flushbuffers()
+        with filewriter.measure("flush", "/", filename=self.name):
+            if self._h5object.mode in ["r+"]:
+                self._h5object.attrs["file_update_time"] = \
+                    unicode(self.currenttime())
+            res = self._h5object.flush()
+        self._checkstaging()
+        return res
 
     def close(self):
         """ close file
         """
         filewriter.FTFile.close(self)
-        if self._h5object.mode in ["r+"]:
-            self._h5object.attrs["file_update_time"] = \
-                unicode(self.currenttime())
-        return self._h5object.close()
+        with filewriter.measure("close", "/", filename=self.name):
+            if self._h5object.mode in ["r+"]:
+                self._h5object.attrs["file_update_time"] = \
+                    unicode(self.currenttime())
+            image = None
+            if self.staginglimit is not None:
+                image = self._stagedimage()
+                self.staginglimit = None
+            res = self._h5object.close()
+            if image is not None:
+                self._writeimage(image)
+        self._dumpmetrics()
+        return res
+
+    def _stagedsize(self):
+        """ flushes and provides size of the file staged in memory
+
+        :returns: file size in bytes
+        :rtype: :obj:`int`
+        """
+        self._h5object.flush()
+        return self._h5object.id.get_filesize()
+
+    def _stagedimage(self):
+        """ provides image of the file staged in memory
+
+        :returns: file image
+        :rtype: :obj:`bytes`
+        """
+        self._h5object.flush()
+        return self._h5object.id.get_file_image()
 
     @property
     def is_valid(self):
@@ -744,6 +904,7 @@ class H5PYGroup(filewriter.FTGroup):
                 name, layout._h5object, fillvalue),
             self)
 
+    @filewriter.instrument("create_field", namearg=0)
     def create_field(self, name, type_code,
                      shape=None, chunk=None, dfilter=None):
         """ creates a field tree element
@@ -934,6 +1095,7 @@ class H5PYField(filewriter.FTField):
                 return True
         return False
 
+    @filewriter.instrument("grow")
     def grow(self, dim=0, ext=1):
         """ grow the field
 
@@ -967,6 +1129,8 @@ class H5PYField(filewriter.FTField):
                 pass
         return fl
 
+    @filewriter.staged(valuearg=0)
+    @filewriter.instrument("write", valuearg=0)
     def write(self, o):
         """ write the field value
 
@@ -975,6 +1139,8 @@ class H5PYField(filewriter.FTField):
         """
         self._h5object[...] = o
 
+    @filewriter.staged(valuearg=1)
+    @filewriter.instrument("write", valuearg=1)
     def __setitem__(self, t, o):
         """ set value
 
@@ -1017,6 +1183,40 @@ class H5PYField(filewriter.FTField):
                 pass
         return fl
 
+    def read_into(self, buffer, selection=Ellipsis):
+        """ read the field selection into the given numpy array
+
+        :param buffer: C-contiguous numpy array of the selection shape
+        :type buffer: :class:`numpy.ndarray`
+        :param selection: slice tuple
+        :type selection: :obj:`tuple`
+        :returns: buffer with read data
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.dtype in ['string', b'string']:
+            return filewriter.FTField.read_into(self, buffer, selection)
+        if selection is Ellipsis:
+            self._h5object.read_direct(buffer)
+        else:
+            self._h5object.read_direct(buffer, source_sel=selection)
+        return buffer
+
+    def virtual_sources(self):
+        """ provides source mappings of a virtual field
+
+        :returns: source mappings, empty for a non-virtual field
+        :rtype: :obj:`list` < :class:`filewriter.FTVirtualSource` >
+        """
+        if not getattr(self._h5object, "is_virtual", False):
+            return []
+        return [
+            filewriter.FTVirtualSource(
+                vs.file_name, vs.dset_name,
+                _selection_hyperslab(vs.vspace),
+                list(vs.src_space.shape),
+                _selection_hyperslab(vs.src_space, True))
+            for vs in self._h5object.virtual_sources()]
+
     @property
     def is_valid(self):
         """ check if group is valid
@@ -1256,6 +1456,42 @@ class H5PYVirtualFieldLayout(filewriter.FTVirtualFieldLayout):
         else:
             self._h5object.__setitem__(key, source._h5object)
 
+    def add_pattern(self, filename, fieldpath, shape,
+                    offset=None, block=None, stride=None):
+        """ maps blocks repeated along the first layout dimension
+        to source fields of files given by a printf-style pattern,
+        i.e. ``%b`` in the file name is replaced by the block index
+
+        :param filename: file name pattern, e.g. 'eiger_%b.h5'
+        :type filename: :obj:`str`
+        :param fieldpath: nexus field path
+        :type fieldpath: :obj:`str`
+        :param shape: source field shape
+        :type shape: :obj:`list` < :obj:`int` >
+        :param offset: layout offset of the first block
+        :type offset: :obj:`list` < :obj:`int` >
+        :param block: layout block, default: the source shape
+        :type block: :obj:`list` < :obj:`int` >
+        :param stride: layout stride of the first dimension,
+                       default: the first block dimension
+        :type stride: :obj:`int`
+        """
+        rank = len(self.shape)
+        offset, block, strides = self._pattern_hyperslab(
+            rank, shape, offset, block, stride)
+        count = [1] * rank
+        count[0] = h5py.h5s.UNLIMITED
+        maxshape = self._h5object.maxshape or [None] * rank
+        vspace = h5py.h5s.create_simple(
+            tuple(self.shape),
+            tuple(h5py.h5s.UNLIMITED if dm is None else dm
+                  for dm in maxshape))
+        vspace.select_hyperslab(
+            tuple(offset), tuple(count), tuple(strides), tuple(block))
+        self._h5object.dcpl.set_virtual(
+            vspace, filename.encode("utf-8"), fieldpath.encode("utf-8"),
+            h5py.h5s.create_simple(tuple(shape)))
+
 
 class H5PYTargetFieldView(filewriter.FTTargetFieldView):
 
@@ -1300,6 +1536,7 @@ class H5PYAttributeManager(filewriter.FTAttributeManager):
             self.path = h5object.name
             self.name = self.path.split("/")[-1]
 
+    @filewriter.instrument("create_attribute", namearg=0, separator="@")
     def create(self, name, dtype, shape=None, overwrite=False):
         """ create a new attribute
 
@@ -1467,6 +1704,7 @@ class H5PYAttribute(filewriter.FTAttribute):
         else:
             return at
 
+    @filewriter.instrument("write_attribute", valuearg=0)
     def write(self, o):
         """ write attribute value
 
@@ -1482,6 +1720,7 @@ class H5PYAttribute(filewriter.FTAttribute):
         else:
             self._h5object[0][self.name] = np.array(o, dtype=self.dtype)
 
+    @filewriter.instrument("write_attribute", valuearg=1)
     def __setitem__(self, t, o):
         """ write attribute value
 
@@ -23,13 +23,16 @@ import os
 import sys
 import time
 # import numpy as np
+import numpy
 # from pninexus import h5cpp
 import threading
+import itertools
+import collections
 import getpass
 import datetime
 
 from . import filewriter
-from .redisutils import REDIS, getDataStore
+from .redisutils import REDIS, getDataStore, readStream
 from .nxsfileparser import (getdsname, getdssource,
                             # getdstype
                             )
@@ -82,6 +85,10 @@ except Exception:
     ChannelDict = None
 
 
+#: (:obj:`int`) maximal number of records materialized at once
+MATERIALIZE_BATCH = 10000
+
+
 attrdesc = {
     "nexus_type": ["type", str],
     "unit": ["units", str],
@@ -189,7 +196,7 @@ def unlimited(parent=None):
 
 
 def open_file(filename, readonly=False, redisurl=None, session=None,
-              **pars):
+              redisonly=False, materialize=True, **pars):
     """ open the new file
 
     :param filename: file name
@@ -200,13 +207,19 @@ def open_file(filename, readonly=False, redisurl=None, session=None,
     :type redisurl: :obj:`str`
     :param session: redis session
     :type session: :obj:`str`
+    :param redisonly: write STEP channel data only to redis streams
+    :type redisonly: :obj:`bool`
+    :param materialize: write redis-only data to the file in a thread
+                        started at scan finish and joined at file close
+    :type materialize: :obj:`bool`
     :param libver: library version: 'lastest' or 'earliest'
     :type libver: :obj:`str`
     :returns: file object
     :rtype: :class:`H5RedisFile`
     """
     return H5RedisFile(h5imp=h5writer.open_file(filename, readonly, **pars),
-                       redisurl=redisurl, session=session)
+                       redisurl=redisurl, session=session,
+                       redisonly=redisonly, materialize=materialize)
 
 
 def is_image_file_supported():
@@ -255,7 +268,7 @@ def load_file(membuffer, filename=None, readonly=False, **pars):
 
 
 def create_file(filename, overwrite=False, redisurl=None, session=None,
-                **pars):
+                redisonly=False, materialize=True, **pars):
     """ create a new file
 
     :param filename: file name
@@ -268,12 +281,18 @@ def create_file(filename, overwrite=False, redisurl=None, session=None,
     :type redisurl: :obj:`str`
     :param session: redis session
     :type session: :obj:`str`
+    :param redisonly: write STEP channel data only to redis streams
+    :type redisonly: :obj:`bool`
+    :param materialize: write redis-only data to the file in a thread
+                        started at scan finish and joined at file close
+    :type materialize: :obj:`bool`
     :returns: file object
     :rtype: :class:`H5RedisFile`
     """
     return H5RedisFile(
         h5imp=h5writer.create_file(filename, overwrite, **pars),
-        redisurl=redisurl, session=session)
+        redisurl=redisurl, session=session,
+        redisonly=redisonly, materialize=materialize)
 
 
 def link(target, parent, name):
@@ -380,13 +399,241 @@ def virtual_field_layout(shape, dtype, maxshape=None):
             shape, dtype, maxshape))
 
 
+class ScanInfoBuilder(object):
+
+    """ scan info accumulator with path-indexed flat storage
+
+    Values are stored in a flat dictionary indexed by key-path tuples.
+    Appended values are staged in per-thread buffers and merged into
+    the flat storage on demand, i.e. at scan start and finish.
+    Setting and appending do not take any lock, only merging of
+    the staging buffers is serialized.
+    """
+
+    def __init__(self, value=None):
+        """ constructor
+
+        :param value: initial scan info
+        :type value: :obj:`dict` <:obj:`str`, `any`>
+        """
+        #: (:obj:`dict` <:obj:`tuple`, `any`>) flat path-indexed values
+        self.__flat = {}
+        #: (:obj:`dict` <:obj:`tuple`, :obj:`bool`>) inner node paths
+        self.__inner = {}
+        #: (:obj:`dict` <:obj:`tuple`, :obj:`int`>) sequence of last set
+        self.__cleared = {}
+        #: (:obj:`dict` <:obj:`tuple`, :obj:`bool`>) paths with staged items
+        self.__pending = {}
+        #: (:obj:`dict` <:obj:`tuple`, :obj:`object`>) reserved keys
+        self.__reserved = {}
+        #: (:obj:`list` <:class:`collections.deque`>) staging buffers
+        self.__buffers = []
+        #: (:class:`threading.local`) thread local data
+        self.__local = threading.local()
+        #: (:class:`itertools.count`) operation sequence counter
+        self.__counter = itertools.count()
+        #: (:class:`threading.Lock`) merge lock
+        self.__merge_lock = threading.Lock()
+        if value is not None:
+            self.set(value)
+
+    def __buffer(self):
+        """ provides the staging buffer of the current thread
+
+        :returns: staging buffer
+        :rtype: :class:`collections.deque`
+        """
+        buf = getattr(self.__local, "buffer", None)
+        if buf is None:
+            buf = collections.deque()
+            self.__local.buffer = buf
+            self.__buffers.append(buf)
+        return buf
+
+    def __store(self, path, value):
+        """ stores value in the flat storage
+
+        :param path: key path
+        :type path: :obj:`tuple` <:obj:`str`>
+        :param value: parameter value
+        :type value: :obj:`any`
+        """
+        for i in range(1, len(path)):
+            self.__inner[path[:i]] = True
+        self.__flat[path] = value
+
+    def __lookup(self, path):
+        """ looks up the value of the path inside its longest stored ancestor
+
+        :param path: key path
+        :type path: :obj:`tuple` <:obj:`str`>
+        :returns: found flag and the value
+        :rtype: (:obj:`bool`, `any`)
+        """
+        for i in range(len(path) - 1, 0, -1):
+            if path[:i] in self.__flat:
+                value = self.__flat[path[:i]]
+                for ky in path[i:]:
+                    if not isinstance(value, dict) or ky not in value:
+                        return False, None
+                    value = value[ky]
+                return True, value
+        return False, None
+
+    def __drop(self, path):
+        """ removes values stored below the given path
+
+        :param path: key path
+        :type path: :obj:`tuple` <:obj:`str`>
+        """
+        if self.__inner.pop(path, None) is None:
+            return
+        ln = len(path)
+        for pth in list(self.__flat.keys()):
+            if len(pth) > ln and pth[:ln] == path:
+                self.__flat.pop(pth, None)
+                self.__inner.pop(pth, None)
+
+    def set(self, value, keys=None):
+        """ set scan info parameter
+
+        :param value: parameter value
+        :type value: :obj:`any`
+        :param keys: parameter key path
+        :type keys: :obj:`list` <:obj:`str`>
+        """
+        seq = next(self.__counter)
+        if keys is None:
+            self.__cleared = {(): seq}
+            self.__inner = {}
+            self.__reserved = {}
+            self.__flat = dict(((ky,), vl) for ky, vl in dict(value).items())
+            return
+        path = tuple(keys)
+        self.__cleared[path] = seq
+        self.__drop(path)
+        self.__store(path, value)
+
+    def append(self, value, keys=None):
+        """ append scan info parameter to the list of the given path
+
+        :param value: parameter value
+        :type value: :obj:`any`
+        :param keys: parameter key path
+        :type keys: :obj:`list` <:obj:`str`>
+        """
+        if not keys:
+            return
+        path = tuple(keys)
+        self.__buffer().append((next(self.__counter), path, value))
+        for i in range(len(path) + 1):
+            self.__pending[path[:i]] = True
+
+    def reserve(self, name, keys=None):
+        """ reserve a unique key name in the given path
+
+        :param name: proposed key name
+        :type name: :obj:`str`
+        :param keys: parent key path
+        :type keys: :obj:`list` <:obj:`str`>
+        :returns: unique key name
+        :rtype: :obj:`str`
+        """
+        path = tuple(keys or [])
+        parent = self.__flat.get(path)
+        if not isinstance(parent, dict):
+            parent = {}
+        token = object()
+        while name in parent or (path + (name,)) in self.__flat or \
+                self.__reserved.setdefault(path + (name,), token) \
+                is not token:
+            name = name + "_"
+        return name
+
+    def merge(self):
+        """ merge staged values into the flat storage
+        """
+        with self.__merge_lock:
+            self.__pending.clear()
+            for buf in list(self.__buffers):
+                while buf:
+                    seq, path, value = buf.popleft()
+                    if any(self.__cleared.get(path[:i], -1) > seq
+                           for i in range(len(path) + 1)):
+                        continue
+                    lst = self.__flat.get(path)
+                    if not isinstance(lst, list):
+                        found, lst = (False, None) \
+                            if path in self.__flat else self.__lookup(path)
+                        lst = list(lst) \
+                            if found and isinstance(lst, list) else []
+                        self.__store(path, lst)
+                    lst.append(value)
+
+    def get(self, keys=None):
+        """ get scan info parameter
+
+        :param keys: parameter key path
+        :type keys: :obj:`list` <:obj:`str`>
+        :returns: parameter value
+        :rtype: :obj:`any`
+        """
+        path = tuple(keys or [])
+        if path in self.__pending:
+            self.merge()
+        if path and path not in self.__inner:
+            try:
+                return self.__flat[path]
+            except KeyError:
+                pass
+        ln = len(path)
+        items = sorted(
+            [(pth, vl) for pth, vl in list(self.__flat.items())
+             if len(pth) > ln and pth[:ln] == path],
+            key=lambda it: len(it[0]))
+        if path in self.__flat:
+            found, tree = True, self.__flat[path]
+        else:
+            found, tree = self.__lookup(path)
+        if not items:
+            if found:
+                return tree
+            if path:
+                raise KeyError(path[-1])
+            return {}
+        if not found:
+            tree = {}
+        elif not isinstance(tree, dict):
+            return tree
+        else:
+            tree = dict(tree)
+        owned = set([id(tree)])
+        for pth, vl in items:
+            node = tree
+            for ky in pth[ln:-1]:
+                child = node.get(ky)
+                if not isinstance(child, dict):
+                    child = {}
+                elif id(child) not in owned:
+                    child = dict(child)
+                else:
+                    node = child
+                    continue
+                owned.add(id(child))
+                node[ky] = child
+                node = child
+            node[pth[-1]] = vl
+        return tree
+
+
 class H5RedisFile(H5File):
 
     """ file tree file
     """
 
     def __init__(self, h5object=None, filename=None, h5imp=None,
-                 redisurl=None, session=None):
+                 redisurl=None, session=None, redisonly=False,
+                 materialize=True):
         """ constructor
 
         :param h5object: h5 object
@@ -399,6 +646,11 @@ class H5RedisFile(H5File):
         :type redisurl: :obj:`str`
         :param session: redis session
         :type session: :obj:`str`
+        :param redisonly: write STEP channel data only to redis streams
+        :type redisonly: :obj:`bool`
+        :param materialize: write redis-only data to the file in a thread
+                        started at scan finish and joined at file close
+        :type materialize: :obj:`bool`
         """
         if h5imp is not None:
             H5File.__init__(self, h5imp.h5object, h5imp.name)
@@ -412,14 +664,25 @@ class H5RedisFile(H5File):
         self.__datastore = None
         self.__scan = None
         self.__scan_lock = threading.Lock()
-        self.__scaninfo = {}
-        self.__devices = {}
-        self.__channels = {}
+        self.__scaninfo = ScanInfoBuilder()
+        self.__devices = ScanInfoBuilder()
+        self.__channels = ScanInfoBuilder()
         self.__streams = {}
         self.__mgchannels = []
         self.__datastore = None
         self.__entryname = ''
         self.__insname = ''
+        #: (:obj:`bool`) write STEP channel data only to redis streams
+        self.__redisonly = bool(redisonly)
+        #: (:obj:`bool`) write redis-only data to the file at scan finish
+        self.__materialize = bool(materialize)
+        #: (:obj:`dict` <:obj:`str`, (:obj:`str`, :obj:`list` <:obj:`int`>)>)
+        #    redis-only field paths and grow extents by stream names
+        self.__deferred = {}
+        #: (:class:`threading.Thread`) background materialization thread
+        self.__materializer = None
+        #: (:obj:`Exception`) error of the background materialization
+        self.__materror = None
         if REDIS and self.__redisurl:
             # print("FILENAME", self.name)
             self.__datastore = getDataStore(self.__redisurl)
@@ -453,6 +716,104 @@ class H5RedisFile(H5File):
         with self.__scan_lock:
             self.__scan = scan
 
+    def is_redisonly(self):
+        """ provides if STEP channel data is written only to redis
+
+        :returns: redis-only flag
+        :rtype: :obj:`bool`
+        """
+        return self.__redisonly
+
+    def append_deferred(self, name, path, extents=None):
+        """ register field written only to redis stream
+
+        :param name: stream name
+        :type name: :obj:`str`
+        :param path: field path in the file
+        :type path: :obj:`str`
+        :param extents: deferred grow extents of field dimensions
+                        updated by the field
+        :type extents: :obj:`list` <:obj:`int`>
+        """
+        self.__deferred[name] = (path, extents)
+
+    def materialize(self, batch=None):
+        """ write data of redis-only fields from sealed redis streams
+
+        Each field is resized once by its deferred grow extents
+        and filled with large blocks of records read from its stream
+        along its growing dimension, i.e. the first grown one.
+
+        :param batch: maximal number of records written at once
+        :type batch: :obj:`int`
+        """
+        if not self.__deferred or self.__datastore is None:
+            return
+        batch = batch or MATERIALIZE_BATCH
+        rscan = self.__datastore.load_scan(self.__scan.key)
+        root = H5File.root(self)
+        errors = []
+        for name, (path, extents) in sorted(self.__deferred.items()):
+            try:
+                stream = rscan.streams[name]
+                field = root
+                for nm in path.split("/"):
+                    if nm:
+                        field = field.open(nm)
+                shape = list(field.shape)
+                extents = list(extents or [])
+                extents.extend([0] * (len(shape) - len(extents)))
+                grown = [dm for dm, ext in enumerate(extents) if ext]
+                gdim = grown[0] if grown else 0
+                total = len(stream)
+                if shape and shape[gdim] + extents[gdim] < total:
+                    extents[gdim] = total - shape[gdim]
+                for dm, ext in enumerate(extents):
+                    if ext > 0:
+                        H5Field.grow(field, dm, ext)
+                for offset, block in readStream(stream, batch):
+                    sel = [slice(None)] * len(shape)
+                    if sel:
+                        sel[gdim] = slice(offset, offset + len(block))
+                    if gdim:
+                        block = numpy.ascontiguousarray(
+                            numpy.moveaxis(numpy.array(block), 0, gdim))
+                    H5Field.__setitem__(field, tuple(sel), block)
+            except Exception as e:
+                errors.append("%s: %s" % (name, str(e)))
+        self.__deferred = {}
+        if errors:
+            raise Exception(
+                "Redis streams cannot be materialized: %s"
+                % "; ".join(errors))
+
+    def __materialize_background(self):
+        """ materializes redis-only fields and keeps the raised error
+        """
+        try:
+            self.materialize()
+        except Exception as e:
+            self.__materror = e
+
+    def wait_materialized(self):
+        """ waits for the background materialization started by
+        :meth:`finish` and raises its error
+        """
+        thread, self.__materializer = self.__materializer, None
+        if thread is not None:
+            thread.join()
+        error, self.__materror = self.__materror, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        """ close file after the background materialization
+        """
+        try:
+            self.wait_materialized()
+        finally:
+            H5File.close(self)
+
     def set_entryname(self, entryname):
         """ set entry name
 
@@ -479,17 +840,7 @@ class H5RedisFile(H5File):
         :param keys: device parameter value
         :type key: :obj:`list` <:obj:`str`>
         """
-        with self.__scan_lock:
-            if keys is None:
-                return
-            dinfo = self.__devices
-            rkeys = list(reversed(keys or []))
-            while rkeys:
-                ky = rkeys.pop()
-                if len(rkeys) > 0:
-                    dinfo = dinfo[ky]
-                else:
-                    dinfo[ky].append(value)
+        self.__devices.append(value, keys)
 
     def set_devices(self, value, keys=None):
         """ set device info parameters
@@ -499,19 +850,7 @@ class H5RedisFile(H5File):
         :param keys: device parameter keys
         :type key: :obj:`list` <:obj:`str`>
         """
-        with self.__scan_lock:
-            if keys is None:
-                self.__devices = dict(value)
-                return
-            dinfo = self.__devices
-
-            rkeys = list(reversed(keys or []))
-            while rkeys:
-                ky = rkeys.pop()
-                if len(rkeys) > 0:
-                    dinfo = dinfo[ky]
-                else:
-                    dinfo[ky] = value
+        self.__devices.set(value, keys)
 
     def get_devices(self, keys=None):
         """ get devices info parameters
@@ -521,16 +860,7 @@ class H5RedisFile(H5File):
         :returns value: device parameter value
         :rtype value: :obj:`any`
         """
-        with self.__scan_lock:
-            dinfo = self.__devices
-            if keys is None:
-                return dict(dinfo)
-
-            rkeys = list(reversed(keys or []))
-            while rkeys:
-                ky = rkeys.pop()
-                dinfo = dinfo[ky]
-            return dinfo
+        return self.__devices.get(keys)
 
     def set_channels(self, value, keys=None):
         """ set channel info parameters
@@ -540,19 +870,7 @@ class H5RedisFile(H5File):
         :param keys: channel parameter keys
         :type key: :obj:`list` <:obj:`str`>
         """
-        with self.__scan_lock:
-            if keys is None:
-                self.__channels = dict(value)
-                return
-            dinfo = self.__channels
-
-            rkeys = list(reversed(keys or []))
-            while rkeys:
-                ky = rkeys.pop()
-                if len(rkeys) > 0:
-                    dinfo = dinfo[ky]
-                else:
-                    dinfo[ky] = value
+        self.__channels.set(value, keys)
 
     def get_channels(self, keys=None):
         """ get channel info parameters
@@ -562,16 +880,7 @@ class H5RedisFile(H5File):
         :returns value: channel parameter value
         :rtype value: :obj:`any`
         """
-        with self.__scan_lock:
-            dinfo = self.__channels
-            if keys is None:
-                return dict(dinfo)
-
-            rkeys = list(reversed(keys or []))
-            while rkeys:
-                ky = rkeys.pop()
-                dinfo = dinfo[ky]
-            return dinfo
+        return self.__channels.get(keys)
 
     def reset_scaninfo(self, entryname):
         """ reset scan info
@@ -679,25 +988,16 @@ class H5RedisFile(H5File):
         :param direct: scan info direct flag
         :type direct: :obj:`any`
         """
-        with self.__scan_lock:
-            if keys is None:
-                if direct is False:
-                    self.__scaninfo = dict(value)
-                else:
-                    self.__scan.info = ScanInfoDict(value)
-                return
-            if direct is False:
-                sinfo = self.__scaninfo
-            else:
-                sinfo = self.__scan.info
-
-            rkeys = list(reversed(keys or []))
-            while rkeys:
-                ky = rkeys.pop()
-                if len(rkeys) > 0:
-                    sinfo = sinfo[ky]
-                else:
-                    sinfo[ky] = value
+        if direct is False:
+            self.__scaninfo.set(value, keys)
+            return
+        if keys is None:
+            self.__scan.info = ScanInfoDict(value)
+            return
+        sinfo = self.__scan.info
+        for ky in keys[:-1]:
+            sinfo = sinfo[ky]
+        sinfo[keys[-1]] = value
 
     def get_scaninfo(self, keys=None, direct=False):
         """ get scan info parameters
@@ -709,19 +1009,14 @@ class H5RedisFile(H5File):
         :param direct: scan info direct flag
         :type direct: :obj:`any`
         """
-        with self.__scan_lock:
-            if direct is False:
-                sinfo = self.__scaninfo
-            else:
-                sinfo = self.__scan.info
-            if keys is None:
-                return dict(sinfo)
-            # print("KEYS", keys)
-            rkeys = list(reversed(keys or []))
-            while rkeys:
-                ky = rkeys.pop()
-                sinfo = sinfo[ky]
-            return sinfo
+        if direct is False:
+            return self.__scaninfo.get(keys)
+        sinfo = self.__scan.info
+        if keys is None:
+            return dict(sinfo)
+        for ky in keys:
+            sinfo = sinfo[ky]
+        return sinfo
 
     def append_scaninfo(self, value, keys=None, direct=False):
         """ append scan info parameters
@@ -733,24 +1028,31 @@ class H5RedisFile(H5File):
         :param direct: scan info direct flag
         :type direct: :obj:`any`
         """
-        with self.__scan_lock:
-            if keys is None:
-                return
-            if direct is False:
-                sinfo = self.__scaninfo
-            else:
-                sinfo = self.__scan.info
-            rkeys = list(reversed(keys or []))
-            while rkeys:
-                ky = rkeys.pop()
-                if len(rkeys) > 0:
-                    if ky not in sinfo:
-                        sinfo[ky] = {}
-                    sinfo = sinfo[ky]
-                else:
-                    if ky not in sinfo:
-                        sinfo[ky] = []
-                    sinfo[ky].append(value)
+        if keys is None:
+            return
+        if direct is False:
+            self.__scaninfo.append(value, keys)
+            return
+        sinfo = self.__scan.info
+        for ky in keys[:-1]:
+            if ky not in sinfo:
+                sinfo[ky] = {}
+            sinfo = sinfo[ky]
+        if keys[-1] not in sinfo:
+            sinfo[keys[-1]] = []
+        sinfo[keys[-1]].append(value)
+
+    def reserve_scaninfo_key(self, name, keys=None):
+        """ reserve a unique scan info key name
+
+        :param name: proposed key name
+        :type name: :obj:`str`
+        :param keys: parent scan parameter keys
+        :type key: :obj:`list` <:obj:`str`>
+        :returns: unique key name
+        :rtype: :obj:`str`
+        """
+        return self.__scaninfo.reserve(name, keys)
 
     def scan_command(self, command, *args, **kwargs):
         """ set scan attribute
@@ -920,6 +1222,13 @@ class H5RedisFile(H5File):
             self.set_scaninfo('SUCCESS', ['end_reason'], direct=True)
             # print("stop SCAN")
             self.scan_command("close")
+            if self.__redisonly and self.__materialize and \
+               self.__deferred:
+                # the file is closed or wait_materialized() is called
+                # before it is accessed again
+                self.__materializer = threading.Thread(
+                    target=self.__materialize_background)
+                self.__materializer.start()
             # print("close SCAN")
             # self.set_scan(None)
             #    print("SCAN None")
@@ -994,6 +1303,29 @@ class H5RedisGroup(H5Group):
         if hasattr(self._tparent, "set_scan"):
             return self._tparent.set_scan(scan)
 
+    def is_redisonly(self):
+        """ provides if STEP channel data is written only to redis
+
+        :returns: redis-only flag
+        :rtype: :obj:`bool`
+        """
+        if hasattr(self._tparent, "is_redisonly"):
+            return self._tparent.is_redisonly()
+        return False
+
+    def append_deferred(self, name, path, extents=None):
+        """ register field written only to redis stream
+
+        :param name: stream name
+        :type name: :obj:`str`
+        :param path: field path in the file
+        :type path: :obj:`str`
+        :param extents: deferred grow extents of field dimensions
+        :type extents: :obj:`list` <:obj:`int`>
+        """
+        if hasattr(self._tparent, "append_deferred"):
+            return self._tparent.append_deferred(name, path, extents)
+
     def append_stream(self, name, stream):
         """ scan object
 
@@ -1126,6 +1458,20 @@ class H5RedisGroup(H5Group):
         if hasattr(self._tparent, "append_scaninfo"):
             return self._tparent.append_scaninfo(value, keys, direct)
 
+    def reserve_scaninfo_key(self, name, keys=None):
+        """ reserve a unique scan info key name
+
+        :param name: proposed key name
+        :type name: :obj:`str`
+        :param keys: parent scan parameter keys
+        :type key: :obj:`list` <:obj:`str`>
+        :returns: unique key name
+        :rtype: :obj:`str`
+        """
+        if hasattr(self._tparent, "reserve_scaninfo_key"):
+            return self._tparent.reserve_scaninfo_key(name, keys)
+        return name
+
     def scan_command(self, command, *args, **kwargs):
         """ set scan attribute
 
@@ -1294,6 +1640,10 @@ class H5RedisField(H5Field):
         self.__dsname = None
         self.__stream = None
         self.__jstream = None
+        #: (:obj:`bool`) data written only to redis stream
+        self.__deferred = False
+        #: (:obj:`list` <:obj:`int`>) deferred grow extents of dimensions
+        self.__extents = []
 
     def append_stream(self, name, stream):
         """ scan object
@@ -1315,6 +1665,29 @@ class H5RedisField(H5Field):
         if hasattr(self._tparent, "set_scan"):
             return self._tparent.set_scan(scan)
 
+    def is_redisonly(self):
+        """ provides if STEP channel data is written only to redis
+
+        :returns: redis-only flag
+        :rtype: :obj:`bool`
+        """
+        if hasattr(self._tparent, "is_redisonly"):
+            return self._tparent.is_redisonly()
+        return False
+
+    def append_deferred(self, name, path, extents=None):
+        """ register field written only to redis stream
+
+        :param name: stream name
+        :type name: :obj:`str`
+        :param path: field path in the file
+        :type path: :obj:`str`
+        :param extents: deferred grow extents of field dimensions
+        :type extents: :obj:`list` <:obj:`int`>
+        """
+        if hasattr(self._tparent, "append_deferred"):
+            return self._tparent.append_deferred(name, path, extents)
+
     def append_devices(self, value, keys=None):
         """ append device parameters
 
@@ -1381,6 +1754,20 @@ class H5RedisField(H5Field):
         if hasattr(self._tparent, "append_scaninfo"):
             return self._tparent.append_scaninfo(value, keys, direct)
 
+    def reserve_scaninfo_key(self, name, keys=None):
+        """ reserve a unique scan info key name
+
+        :param name: proposed key name
+        :type name: :obj:`str`
+        :param keys: parent scan parameter keys
+        :type key: :obj:`list` <:obj:`str`>
+        :returns: unique key name
+        :rtype: :obj:`str`
+        """
+        if hasattr(self._tparent, "reserve_scaninfo_key"):
+            return self._tparent.reserve_scaninfo_key(name, keys)
+        return name
+
     def get_scaninfo(self, keys=None, direct=False):
         """ get scan info parameters
 
@@ -1474,6 +1861,7 @@ class H5RedisField(H5Field):
             if vl[0] in anames:
                 sds[key] = vl[1](
                     filewriter.first(attrs[vl[0]].read()))
+        sds["nexus_path"] = self.path
         self.append_scaninfo(sds, ["datadesc", dsname])
         if self.dtype not in ['string', b'string']:
             mgchannels = self.get_scaninfo(
@@ -1528,6 +1916,14 @@ class H5RedisField(H5Field):
                      ]},
                     ["plots"])
             self.append_stream(dsname, self.__stream)
+            if self.is_redisonly():
+                self.__deferred = True
+                self.__extents = [0] * len(self.shape)
+                self.append_deferred(
+                    dsname,
+                    "/".join([gr.split(":")[0]
+                              for gr in self.path.split("/")]),
+                    self.__extents)
         else:
             self.__jstream = self.scan_command(
                 "create_stream",
@@ -1563,10 +1959,7 @@ class H5RedisField(H5Field):
                 ids[key] = vl[1](
                     filewriter.first(attrs[vl[0]].read()))
         ids["nexus_path"] = self.path
-        pars = (self.get_scaninfo(["snapshot"]) or {}).keys()
-        dsn = dsname
-        while dsn in pars:
-            dsn = dsn + "_"
+        dsn = self.reserve_scaninfo_key(dsname, ["snapshot"])
         self.append_scaninfo(ids, ["snapshot", dsn])
         if self.name in ["program_name"]:
             for key, vl in progattrdesc.items():
@@ -1626,13 +2019,46 @@ class H5RedisField(H5Field):
                 self.__set_channel_info(o)
         if REDIS and self.__dsname is not None:
             if hasattr(self.__stream, "send"):
-                self.__stream.send(o)
+                self.__send(self.__stream, o, o)
             jo = o
             if hasattr(self.__jstream, "send"):
                 if not isinstance(o, dict):
                     jo = {"value": o}
-                self.__jstream.send(jo)
-        H5Field.__setitem__(self, t, o)
+                self.__send(self.__jstream, jo, o)
+        if not self.__deferred:
+            H5Field.__setitem__(self, t, o)
+
+    def __send(self, stream, data, o):
+        """ sends data to the redis stream and records it in writer metrics
+        if they are enabled
+
+        :param stream: redis stream
+        :type stream: :obj:`any`
+        :param data: sent data
+        :type data: :obj:`any`
+        :param o: written value
+        :type o: :obj:`any`
+        """
+        if filewriter.metrics is None:
+            stream.send(data)
+            return
+        with filewriter.measure("redis_send", self.path, o,
+                                filewriter.treefilename(self)):
+            stream.send(data)
+
+    def grow(self, dim=0, ext=1):
+        """ grow the field
+
+        :param dim: growing dimension
+        :type dim: :obj:`int`
+        :param dim: size of the grow
+        :type dim: :obj:`int`
+        """
+        if not self.__deferred:
+            return H5Field.grow(self, dim, ext)
+        while len(self.__extents) <= dim:
+            self.__extents.append(0)
+        self.__extents[dim] += ext
 
 
 class H5RedisLink(H5Link):
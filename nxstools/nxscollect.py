@@ -29,6 +29,8 @@ import signal
 import argparse
 import numpy
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from .filenamegenerator import FilenameGenerator
 from .nxsargparser import (Runner, NXSArgParser, ErrorException)
@@ -36,9 +38,11 @@ from . import filewriter
 
 
 if sys.version_info > (3,):
+    import queue
     unicode = str
     long = int
 else:
+    import Queue as queue
     bytes = str
 
 
@@ -158,6 +162,29 @@ def crdtoint(crd):
     return crd
 
 
+def coordrows(coords):
+    """ converts coordinates to a list of coordinate tuples
+
+    :param coords: coordinate string or an array of coordinates
+                   with rows for the corresponding fields
+                   where negative coordinates mean None
+    :type coords: :obj:`str` or :class:`numpy.ndarray`
+    :returns: a list ofr coordinates in tuples
+    :rtype: :obj:`list` <:obj:`tuple` < :obj:`int` >>
+    """
+    if coords is None:
+        return []
+    if isinstance(coords, (str, unicode)):
+        return splitcoords(coords)
+    coords = numpy.asarray(coords, dtype=numpy.int64)
+    if coords.ndim == 1:
+        coords = coords.reshape(-1, 1)
+    if not (coords < 0).any():
+        return [tuple(row) for row in coords.tolist()]
+    return [tuple(None if cd < 0 else cd for cd in row)
+            for row in coords.tolist()]
+
+
 def splitslices(crdstr):
     """ splits coordinate string
 
@@ -403,16 +430,19 @@ class TargetFieldsLayout(list):
         """ constructor
 
         :param exfieldpaths: target field paths
-        :type exfieldpaths: :obj:`str`
+        :type exfieldpaths: :obj:`str` or :obj:`list` <:obj:`str`>
         :param exfieldshapes: target field shapes
-        :type exfieldshapes: :obj:`str`
+        :type exfieldshapes: :obj:`str` or :class:`numpy.ndarray`
         :param shapes: target field shapes
         :type shapes: :obj:`list`<:obj:`tuple`<:obj:`int`> >
+                      or :class:`numpy.ndarray`
         :param exfieldpaths: separator of field path strings
         :type exfieldpaths: :obj:`str`
         """
 
-        if separator:
+        if isinstance(exfieldpaths, (list, tuple)):
+            files = list(exfieldpaths)
+        elif separator:
             files = exfieldpaths.split(separator)
         else:
             files = [exfieldpaths]
@@ -429,7 +459,9 @@ class TargetFieldsLayout(list):
                     efd = TargetFieldView(fn, ph)
                     lfd = LayoutField(efd)
                     self.append(lfd)
-        efshapes = splitcoords(exfieldshapes)
+        efshapes = coordrows(exfieldshapes)
+        shapes = coordrows(shapes) \
+            if isinstance(shapes, numpy.ndarray) else (shapes or [])
 
         for i, lfd in enumerate(self):
             if i < len(efshapes):
@@ -442,62 +474,53 @@ class TargetFieldsLayout(list):
         """ add target hyperslabs
 
         :param offsets: target offsets
-        :type offsets: :obj:`str`
+        :type offsets: :obj:`str` or :class:`numpy.ndarray`
         :param blocks: target blocks
-        :type blocks: :obj:`str`
+        :type blocks: :obj:`str` or :class:`numpy.ndarray`
         :param counts: target counts
-        :type counts: :obj:`str`
+        :type counts: :obj:`str` or :class:`numpy.ndarray`
         :param strides: target strides
-        :type strides: :obj:`str`
+        :type strides: :obj:`str` or :class:`numpy.ndarray`
         """
-
-        offs = splitcoords(offsets)
-        blks = splitcoords(blocks)
-        cnts = splitcoords(counts)
-        stds = splitcoords(strides)
-
-        for i, lfd in enumerate(self):
-            if i < len(offs):
-                lfd.target.hyperslab.offset = offs[i]
-        for i, lfd in enumerate(self):
-            if i < len(blks):
-                lfd.target.hyperslab.block = blks[i]
-        for i, lfd in enumerate(self):
-            if i < len(cnts):
-                lfd.target.hyperslab.count = cnts[i]
-        for i, lfd in enumerate(self):
-            if i < len(stds):
-                lfd.target.hyperslab.stride = stds[i]
+        self._set_hyperslabs(
+            [lfd.target.hyperslab for lfd in self],
+            offsets, blocks, counts, strides)
 
     def add_layout_hyperslabs(self, offsets, blocks, counts, strides):
         """ add layout hyperslabs
 
         :param offsets: layout offsets
-        :type offsets: :obj:`str`
+        :type offsets: :obj:`str` or :class:`numpy.ndarray`
         :param blocks: layout blocks
-        :type blocks: :obj:`str`
+        :type blocks: :obj:`str` or :class:`numpy.ndarray`
         :param counts: layout counts
-        :type counts: :obj:`str`
+        :type counts: :obj:`str` or :class:`numpy.ndarray`
         :param strides: layout strides
-        :type strides: :obj:`str`
+        :type strides: :obj:`str` or :class:`numpy.ndarray`
         """
-        offs = splitcoords(offsets)
-        blks = splitcoords(blocks)
-        cnts = splitcoords(counts)
-        stds = splitcoords(strides)
+        self._set_hyperslabs(
+            [lfd.hyperslab for lfd in self],
+            offsets, blocks, counts, strides)
 
-        for i, lfd in enumerate(self):
-            if i < len(offs):
-                lfd.hyperslab.offset = offs[i]
-        for i, lfd in enumerate(self):
-            if i < len(blks):
-                lfd.hyperslab.block = blks[i]
-        for i, lfd in enumerate(self):
-            if i < len(cnts):
-                lfd.hyperslab.count = cnts[i]
-        for i, lfd in enumerate(self):
-            if i < len(stds):
-                lfd.hyperslab.stride = stds[i]
+    @classmethod
+    def _set_hyperslabs(cls, hyperslabs, offsets, blocks, counts, strides):
+        """ sets hyperslab parameters of the corresponding fields
+
+        :param hyperslabs: field hyperslabs
+        :type hyperslabs: :obj:`list` <:class:`filewriter.FTHyperslab`>
+        :param offsets: offsets
+        :type offsets: :obj:`str` or :class:`numpy.ndarray`
+        :param blocks: blocks
+        :type blocks: :obj:`str` or :class:`numpy.ndarray`
+        :param counts: counts
+        :type counts: :obj:`str` or :class:`numpy.ndarray`
+        :param strides: strides
+        :type strides: :obj:`str` or :class:`numpy.ndarray`
+        """
+        for name, coords in (("offset", offsets), ("block", blocks),
+                             ("count", counts), ("stride", strides)):
+            for hslab, crd in zip(hyperslabs, coordrows(coords)):
+                setattr(hslab, name, crd)
 
     def add_layout_slices(self, slices):
         """ add layout slices
@@ -625,6 +648,7 @@ class VirtualDataset(object):
         """
         self._createtmpfile()
         path = self.__nexuspath
+        self.__nxsfile = None
         try:
             self.__nxsfile = filewriter.open_file(
                 self.__tempfilename, readonly=False,
@@ -648,9 +672,26 @@ class VirtualDataset(object):
                         else:
                             parent = None
             filewriter.module = self.__wrmodule
+            unlimited = filewriter.unlimited(parent)
+            shape = [(0 if dm == unlimited else dm) for dm in self.__shape]
             layout = filewriter.virtual_field_layout(
-                self.__shape, self.__dtype, self.__maxshape, parent)
+                shape, self.__dtype, self.__maxshape, parent)
             for flm in self.__ltfields:
+                if "%b" in flm.target.filename:
+                    if not flm.target.shape:
+                        raise Exception(
+                            "Target shape of %s is not defined"
+                            % flm.target.filename)
+                    layout.add_pattern(
+                        flm.target.filename, flm.target.path,
+                        flm.target.shape, flm.hyperslab.offset,
+                        flm.hyperslab.block,
+                        (flm.hyperslab.stride or [None])[0])
+                    print("vds: target pattern %s://%s %s at %s/%s" %
+                          (flm.target.filename, flm.target.path,
+                           flm.target.shape,
+                           parent.path if parent else path, fieldname))
+                    continue
                 efield = filewriter.target_field_view(
                     flm.target.filename, flm.target.path,
                     flm.target.shape or flm.shape,
@@ -669,15 +710,349 @@ class VirtualDataset(object):
                 fillvalue = pTc[_tostr(self.__dtype)](self.__fillvalue or 0)
                 fd = parent.create_virtual_field(fieldname, layout, fillvalue)
                 fd.close()
+            self.__nxsfile.close()
 
             if self.__storeold:
                 self._storeoldfile()
             shutil.move(self.__tempfilename, self.__nexusfilename)
         except Exception as e:
             print(str(e))
+            if self.__nxsfile is not None:
+                self.__nxsfile.close()
             os.remove(self.__tempfilename)
 
 
+class VirtualDatasetChecker(object):
+
+    """ Checks sources of a virtual field and reports its fill value ranges
+    """
+
+    def __init__(self, nexusfilepath, jobs=16, writer=None):
+        """ The constructor creates the checker object
+
+        :param nexusfilepath: the nexus file name and nexus path
+        :type nexusfilepath: :obj:`str`
+        :param jobs: number of probing threads, only the source file
+                     stats run in parallel while the HDF5 metadata reads
+                     are serialized
+        :type jobs: :obj:`int`
+        :param writer: the writer module
+        :type writer: :obj:`str`
+        """
+        #: (:obj:`str`) the nexus file name
+        self.__nexusfilename, self.__nexuspath = \
+            nexusfilepath.split(":/")
+        #: (:obj:`int`) number of probing threads
+        self.__jobs = max(1, int(jobs or 1))
+        #: (:obj:`module`) writer module
+        self.__wrmodule = None
+        if writer and writer.lower() in WRITERS.keys():
+            self.__wrmodule = WRITERS[writer.lower()]
+        #: (:class:`threading.Lock`) lock of the HDF5 metadata access
+        self.__h5lock = threading.Lock()
+
+    def _sourcepath(self, filename):
+        """ resolves a source file name as HDF5 does for VDS
+
+        :param filename: source file name
+        :type filename: :obj:`str`
+        :returns: source file path
+        :rtype: :obj:`str`
+        """
+        if filename == ".":
+            return self.__nexusfilename
+        if os.path.isabs(filename):
+            return filename
+        mfpath = os.path.join(
+            os.path.dirname(os.path.abspath(self.__nexusfilename)), filename)
+        if not os.path.exists(mfpath) and os.path.exists(filename):
+            return filename
+        return mfpath
+
+    def _patternfiles(self, pattern):
+        """ finds source files matching the '%b' pattern with one listing
+        of the pattern directory
+
+        :param pattern: source file name pattern
+        :type pattern: :obj:`str`
+        :returns: file indices found in the pattern directory
+        :rtype: :obj:`list` < :obj:`int` >
+        """
+        dirname, basename = os.path.split(self._sourcepath(pattern))
+        if "%b" in dirname:
+            return []
+        regex = re.compile(
+            "^" + "(\\d+)".join(
+                re.escape(part.replace("%%", "%"))
+                for part in basename.split("%b")) + "$")
+        indices = set()
+        try:
+            for entry in os.scandir(dirname or "."):
+                mt = regex.match(entry.name)
+                if mt and len(set(mt.groups())) == 1 and \
+                   str(int(mt.group(1))) == mt.group(1):
+                    indices.add(int(mt.group(1)))
+        except OSError:
+            pass
+        return sorted(indices)
+
+    @classmethod
+    def _blockcount(cls, offset, count, stride, size):
+        """ provides a number of blocks starting within the field size
+
+        :param offset: hyperslab offset
+        :type offset: :obj:`int`
+        :param count: hyperslab count
+        :type count: :obj:`int`
+        :param stride: hyperslab stride
+        :type stride: :obj:`int`
+        :param size: field size along the dimension
+        :type size: :obj:`int`
+        :returns: number of blocks
+        :rtype: :obj:`int`
+        """
+        if offset >= size:
+            return 0
+        return min(count, (size - offset - 1) // (stride or 1) + 1)
+
+    def _mappings(self, field):
+        """ expands the virtual field sources into mappings of single files
+
+        :param field: virtual field
+        :type field: :class:`filewriter.FTField`
+        :returns: source mappings with a file name, a field path,
+                  layout hyperslab, required source shape, whole source
+                  and pattern flags and selected layout shape
+        :rtype: :obj:`list` < :obj:`dict` <:obj:`str`, `any`> >
+        """
+        shape = list(field.shape)
+        unlimited = filewriter.unlimited(field)
+        mappings = []
+        for vs in field.virtual_sources():
+            hs = vs.hyperslab
+            required = list(vs.shape)
+            if vs.selection is not None:
+                sel = vs.selection
+                required = [
+                    (of + (ct - 1) * (st or 1) + bk)
+                    if ct != unlimited else None
+                    for of, bk, ct, st in zip(
+                        sel.offset, sel.block, sel.count, sel.stride)]
+            elif len(required) != len(hs.block):
+                # source extent is not stored, e.g. as a scalar dataspace
+                required = [
+                    (bk * ct) if ct != unlimited else None
+                    for bk, ct in zip(
+                        hs.block,
+                        [1] + list(hs.count[1:]) if "%b" in vs.filename
+                        else hs.count)]
+            counts = [
+                self._blockcount(of, ct, st, sz)
+                for of, ct, st, sz in zip(
+                    hs.offset, hs.count, hs.stride, shape)]
+            if "%b" in vs.filename:
+                found = self._patternfiles(vs.filename)
+                nfiles = max(
+                    counts[0] if shape else 0,
+                    (found[-1] + 1) if found else 0)
+                if hs.count[0] != unlimited:
+                    nfiles = min(nfiles, hs.count[0])
+                for ib in range(nfiles):
+                    offset = list(hs.offset)
+                    offset[0] += ib * (hs.stride[0] or 1)
+                    mappings.append({
+                        "file": vs.filename.replace("%b", str(ib)),
+                        "path": vs.fieldpath,
+                        "offset": offset,
+                        "block": list(hs.block),
+                        "count": [1] + counts[1:],
+                        "stride": list(hs.stride),
+                        "required": required,
+                        "whole": vs.selection is None,
+                        "pattern": True,
+                        "selected": [
+                            (bk * ct) for bk, ct in zip(
+                                hs.block, [1] + counts[1:])],
+                    })
+            else:
+                mappings.append({
+                    "file": vs.filename,
+                    "path": vs.fieldpath,
+                    "offset": list(hs.offset),
+                    "block": list(hs.block),
+                    "count": counts,
+                    "stride": list(hs.stride),
+                    "required": required,
+                    "whole": vs.selection is None,
+                    "pattern": False,
+                    "selected": [
+                        (bk * ct) for bk, ct in zip(hs.block, counts)],
+                })
+        return mappings
+
+    def _probe(self, filename, fieldpath):
+        """ reads the source field metadata
+
+        :param filename: source file name
+        :type filename: :obj:`str`
+        :param fieldpath: source field path
+        :type fieldpath: :obj:`str`
+        :returns: shape, dtype and error of the source field
+        :rtype: :obj:`tuple` <:obj:`list`, :obj:`str`, :obj:`str`>
+        """
+        fpath = self._sourcepath(filename)
+        if not os.path.isfile(fpath):
+            return None, None, "missing"
+        with self.__h5lock:
+            try:
+                fl = filewriter.open_file(
+                    fpath, readonly=True, writer=self.__wrmodule)
+                try:
+                    node = fl.root()
+                    for name in fieldpath.split("/"):
+                        if name:
+                            node = node.open(name.split(":")[0])
+                    shape = [int(dm) for dm in node.shape]
+                    dtype = node.dtype
+                    node.close()
+                finally:
+                    fl.close()
+                return shape, dtype, None
+            except Exception as e:
+                return None, None, str(e) or "unreadable"
+
+    @classmethod
+    def _frames(cls, mapping, size):
+        """ provides layout frames of the mapping along the first dimension
+
+        :param mapping: source mapping
+        :type mapping: :obj:`dict` <:obj:`str`, `any`>
+        :param size: field size along the first dimension
+        :type size: :obj:`int`
+        :returns: sorted frame indices
+        :rtype: :class:`numpy.ndarray`
+        """
+        offset = mapping["offset"][0]
+        block = mapping["block"][0]
+        count = mapping["count"][0]
+        stride = mapping["stride"][0] or 1
+        frames = (offset + numpy.arange(count)[:, None] * stride
+                  + numpy.arange(block)[None, :]).ravel()
+        return numpy.unique(frames[frames < size])
+
+    @classmethod
+    def _ranges(cls, frames):
+        """ compresses frame indices into [start, stop) ranges
+
+        :param frames: sorted frame indices
+        :type frames: :class:`numpy.ndarray`
+        :returns: frame ranges
+        :rtype: :obj:`list` < [:obj:`int`, :obj:`int`] >
+        """
+        if not len(frames):
+            return []
+        breaks = numpy.nonzero(numpy.diff(frames) != 1)[0] + 1
+        starts = numpy.concatenate(([0], breaks))
+        stops = numpy.concatenate((breaks, [len(frames)]))
+        return [[int(frames[b]), int(frames[e - 1]) + 1]
+                for b, e in zip(starts, stops)]
+
+    def check(self):
+        """ checks the virtual field sources
+
+        :returns: check report
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        nxsfile = filewriter.open_file(
+            self.__nexusfilename, readonly=True, writer=self.__wrmodule)
+        try:
+            node = nxsfile.root()
+            for name in self.__nexuspath.split("/"):
+                if name:
+                    node = node.open(name.split(":")[0])
+            shape = [int(dm) for dm in node.shape]
+            dtype = node.dtype
+            mappings = self._mappings(node)
+            node.close()
+        finally:
+            nxsfile.close()
+
+        keys = list(set((mp["file"], mp["path"]) for mp in mappings))
+        with ThreadPoolExecutor(max_workers=self.__jobs) as pool:
+            probes = dict(zip(keys, pool.map(
+                lambda key: self._probe(*key), keys)))
+
+        size = shape[0] if shape else 0
+        for mp in mappings:
+            if mp["pattern"]:
+                size = max(size, mp["offset"][0] + mp["block"][0])
+        tsize = int(numpy.prod(shape[1:])) if shape else 1
+        coverage = numpy.zeros(size + 1, dtype="int64")
+        sources = []
+        fills = []
+        for mp in mappings:
+            srcshape, srcdtype, error = probes[(mp["file"], mp["path"])]
+            frames = self._frames(mp, size)
+            tselected = int(numpy.prod(mp["selected"][1:]))
+            ranges = self._ranges(frames)
+            for start, stop in ranges:
+                coverage[start] += tselected
+                coverage[stop] -= tselected
+            status = "ok"
+            fill = []
+            if error == "missing":
+                status = "missing"
+                fill = frames
+            elif error:
+                status = "error"
+                fill = frames
+            else:
+                required = mp["required"]
+                if len(srcshape) != len(required):
+                    status = "error"
+                    error = "rank mismatch"
+                    fill = frames
+                elif any(rq is not None and sz < rq
+                         for sz, rq in zip(srcshape, required)):
+                    status = "truncated"
+                    fill = frames
+                    if mp["whole"] and tselected and \
+                       srcshape[1:] == required[1:] and \
+                       len(frames) * tselected == int(
+                           numpy.prod(required)):
+                        available = srcshape[0] * int(
+                            numpy.prod(required[1:]))
+                        fill = frames[available // tselected:]
+            if len(fill):
+                fills.append(fill)
+            sources.append({
+                "file": mp["file"],
+                "path": mp["path"],
+                "status": status,
+                "required_shape": mp["required"],
+                "shape": srcshape,
+                "dtype": srcdtype,
+                "error": error if status == "error" else None,
+                "fill": self._ranges(fill),
+            })
+        covered = numpy.cumsum(coverage)[:size]
+        gaps = numpy.nonzero(covered < tsize)[0]
+        if len(gaps):
+            fills.append(gaps)
+        allfill = numpy.unique(numpy.concatenate(fills)) \
+            if fills else numpy.array([], dtype="int64")
+        return {
+            "file": self.__nexusfilename,
+            "path": self.__nexuspath,
+            "shape": shape,
+            "extent": size,
+            "dtype": dtype,
+            "sources": sources,
+            "gaps": self._ranges(gaps),
+            "fill": self._ranges(allfill),
+        }
+
+
 class Collector(object):
 
     """ Collector merge images of external file-formats
@@ -712,6 +1087,9 @@ class Collector(object):
         self.__nxsfile = None
         self.__break = False
         self.__fullfilename = None
+        #: (:obj:`dict` <:obj:`str`, (:obj:`bool`, :obj:`set`)>)
+        #    directory existence flags and entry names by directory
+        self.__direntries = {}
         self.__wrmodule = None
         if writer and writer.lower() in WRITERS.keys():
             self.__wrmodule = WRITERS[writer.lower()]
@@ -765,9 +1143,36 @@ class Collector(object):
             filename = os.path.abspath(os.path.join(nexusfilepath, filename))
         return filename
 
+    def _direntries(self, dirname):
+        """ provides cached entry names of the directory listed once
+
+        :param dirname: directory name
+        :type dirname: :obj:`str`
+        :returns: directory existence flag and its entry names
+                  or None if the directory cannot be listed
+        :rtype: (:obj:`bool`, :obj:`set` <:obj:`str`>)
+        """
+        if dirname not in self.__direntries:
+            try:
+                entries = os.scandir(dirname or ".")
+                try:
+                    names = set(entry.name for entry in entries)
+                finally:
+                    if hasattr(entries, "close"):
+                        entries.close()
+                self.__direntries[dirname] = (True, names)
+            except (FileNotFoundError, NotADirectoryError):
+                self.__direntries[dirname] = (False, set())
+            except OSError:
+                self.__direntries[dirname] = (True, None)
+        return self.__direntries[dirname]
+
     def _findfile(self, filename, nname=None):
         """ searches for absolute image file name
 
+        The candidate directories are listed once and looked up
+        in memory, single files are checked only on misses.
+
         :param filename: image file name
         :type: filename: :obj:`str`
         :param nname: hdf5 node name
@@ -777,38 +1182,33 @@ class Collector(object):
         :rtype: :obj:`str`
         """
         filelist = []
-
+        basename = filename.split("/")[-1]
         if nname is not None:
-            tmpfname = '%s/%s/%s' % (
+            filelist.append('%s/%s/%s' % (
                 os.path.splitext(self.__nexusfilename)[0],
-                nname,
-                filename.split("/")[-1])
-            if os.path.exists(tmpfname):
-                return tmpfname
-            else:
-                filelist.append(tmpfname)
-            tmpfname = '%s/%s/%s' % (
+                nname, basename))
+            filelist.append('%s/%s/%s' % (
                 os.path.splitext(self.__fullfilename)[0],
-                nname,
-                filename.split("/")[-1])
+                nname, basename))
+        filelist.append(
+            self._absolutefilename(filename, self.__nexusfilename))
+        filelist.append(
+            self._absolutefilename(filename, self.__fullfilename))
+        filelist.append(filename)
+
+        checklist = []
+        for tmpfname in filelist:
+            dirname, name = os.path.split(tmpfname)
+            exists, names = self._direntries(dirname)
+            if names is not None and name in names:
+                return tmpfname
+            if exists:
+                checklist.append((tmpfname, names))
+        for tmpfname, names in checklist:
             if os.path.exists(tmpfname):
+                if names is not None:
+                    names.add(os.path.split(tmpfname)[1])
                 return tmpfname
-            else:
-                filelist.append(tmpfname)
-        tmpfname = self._absolutefilename(filename, self.__nexusfilename)
-        if os.path.exists(tmpfname):
-            return tmpfname
-        else:
-            filelist.append(tmpfname)
-        tmpfname = self._absolutefilename(filename, self.__fullfilename)
-        if os.path.exists(tmpfname):
-            return tmpfname
-        else:
-            filelist.append(tmpfname)
-        if os.path.exists(filename):
-            return filename
-        else:
-            filelist.append(filename)
         if not self.__skipmissing:
             raise Exception(
                 "Cannot open any of %s files" % sorted(set(filelist)))
@@ -921,11 +1321,12 @@ class Collector(object):
             if image is None:
                 root = nxsfile.root()
                 image = root.open("data")
-            idata = image.read()
-            if image is not None:
+            dtype = image.dtype
+            shape = image.shape
+            if shape and dtype not in ['string', b'string']:
+                idata = image.read_into(numpy.empty(shape, dtype=dtype))
+            else:
                 idata = image[...]
-                dtype = image.dtype
-                shape = image.shape
             nxsfile.close()
             return idata, dtype, shape
         except Exception as e:
@@ -1223,6 +1624,375 @@ class Collector(object):
             os.remove(self.__tempfilename)
 
 
+class RedisExporter(object):
+
+    """ RedisExporter rebuilds a NeXus file from scan streams
+    and scan info stored in Redis
+    """
+
+    #: (:obj:`dict` <:obj:`str`, :obj:`str`>) datadesc keys
+    #    of the nexus field attributes
+    attrnames = {
+        "unit": "units",
+        "nexus_type": "type",
+        "depends_on": "depends_on",
+        "trans_type": "transformation_type",
+        "trans_vector": "vector",
+        "trans_offset": "offset",
+    }
+
+    def __init__(self, nexusfilename, scankey, redisurl=None,
+                 compression=2, batch=10000, jobs=4, overwrite=False,
+                 testmode=False, writer=None, datastore=None):
+        """ The constructor creates the exporter object
+
+        :param nexusfilename: the nexus file name
+        :type nexusfilename: :obj:`str`
+        :param scankey: redis scan key
+        :type scankey: :obj:`str`
+        :param redisurl: redis URL
+        :type redisurl: :obj:`str`
+        :param compression: compression rate
+        :type compression: :obj:`int`
+        :param batch: maximal number of stream records in one read
+        :type batch: :obj:`int`
+        :param jobs: number of streams read in parallel
+        :type jobs: :obj:`int`
+        :param overwrite: if overwrite the existing nexus file
+        :type overwrite: :obj:`bool`
+        :param testmode: if run in a test mode
+        :type testmode: :obj:`bool`
+        :param writer: the writer module
+        :type writer: :obj:`str`
+        :param datastore: redis datastore
+        :type datastore: :class:`DataStore`
+        """
+        self.__nexusfilename = nexusfilename
+        self.__scankey = scankey
+        self.__redisurl = redisurl or "redis://localhost:6380"
+        self.__compression = compression
+        self.__batch = max(1, int(batch or 1))
+        self.__jobs = max(1, int(jobs or 1))
+        self.__overwrite = overwrite
+        self.__testmode = testmode
+        self.__datastore = datastore
+        self.__wrmodule = None
+        self.__stop = threading.Event()
+        if writer and writer.lower() in WRITERS.keys():
+            self.__wrmodule = WRITERS[writer.lower()]
+
+    def _loadscan(self):
+        """ loads the scan from redis
+
+        :returns: redis scan
+        :rtype: :class:`Scan`
+        """
+        if self.__datastore is None:
+            from . import redisutils
+            if not redisutils.REDIS:
+                raise Exception(
+                    "Redis or blissdata cannot be imported")
+            self.__datastore = redisutils.getDataStore(self.__redisurl)
+        if self.__datastore is None:
+            raise Exception(
+                "Redis DataStore %s cannot be opened" % self.__redisurl)
+        return self.__datastore.load_scan(self.__scankey)
+
+    @classmethod
+    def _descriptors(cls, items):
+        """ provides channel descriptions of datadesc or snapshot scan info
+
+        The writer appends descriptions of a channel to a list,
+        so the list items are merged into one description.
+
+        :param items: datadesc or snapshot scan info
+        :type items: :obj:`dict` <:obj:`str`, :obj:`list` or :obj:`dict`>
+        :returns: channel descriptions
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`, `any`>>
+        """
+        descs = {}
+        for name, desc in (items or {}).items():
+            if isinstance(desc, (list, tuple)):
+                merged = {}
+                for item in desc:
+                    if isinstance(item, dict):
+                        merged.update(item)
+                desc = merged
+            if isinstance(desc, dict):
+                descs[name] = desc
+        return descs
+
+    def _getparent(self, root, path):
+        """ provides the parent group of the nexus path
+        and creates missing groups
+
+        :param root: nexus root group
+        :type root: :class:`filewriter.FTGroup`
+        :param path: nexus path of the field with group types,
+                     e.g. /entry:NXentry/data:NXdata/counter
+        :type path: :obj:`str`
+        :returns: (parent group, field name)
+        :rtype: (:class:`filewriter.FTGroup`, :obj:`str`)
+        """
+        groups = [gr for gr in path.split("/") if gr]
+        parent = root
+        for gr in groups[:-1]:
+            tgr = ""
+            if ":" in gr:
+                gr, tgr = gr.split(":", 1)
+            if gr in parent.names():
+                parent = parent.open(gr)
+            else:
+                parent = parent.create_group(gr, tgr or ("NX" + gr))
+        return parent, groups[-1].split(":")[0]
+
+    def _addattrs(self, field, desc):
+        """ adds field attributes described in scan info
+
+        :param field: nexus field
+        :type field: :class:`filewriter.FTField`
+        :param desc: datadesc or snapshot channel description
+        :type desc: :obj:`dict` <:obj:`str`, `any`>
+        """
+        for key, name in self.attrnames.items():
+            if key in desc and desc[key] is not None:
+                field.attributes.create(
+                    name, "string", overwrite=True)[...] = \
+                    str(desc[key])
+        if desc.get("strategy"):
+            field.attributes.create(
+                "nexdatas_strategy", "string", overwrite=True)[...] = \
+                str(desc["strategy"])
+
+    def _filter(self, node):
+        """ creates a data filter
+
+        :param node: parent hdf5 node
+        :type node: :class:`filewriter.FTGroup`
+        :returns: data filter
+        :rtype: :class:`filewriter.FTDataFilter`
+        """
+        cfilter = None
+        if self.__compression:
+            opts = getcompression(self.__compression)
+            if isinstance(opts, int):
+                cfilter = filewriter.data_filter(node)
+                cfilter.rate = opts
+            elif isinstance(opts, list) and opts:
+                cfilter = filewriter.data_filter(node)
+                cfilter.filterid = opts[0]
+                cfilter.options = tuple(opts[1:])
+        return cfilter
+
+    def _writesnapshot(self, root, snapshot):
+        """ writes INIT and FINAL fields stored in the scan snapshot
+
+        :param root: nexus root group
+        :type root: :class:`filewriter.FTGroup`
+        :param snapshot: scan info snapshot
+        :type snapshot: :obj:`dict` <:obj:`str`, :obj:`list`>
+        """
+        for desc in self._descriptors(snapshot).values():
+            if not desc.get("nexus_path") or "value" not in desc:
+                continue
+            parent, name = self._getparent(root, desc["nexus_path"])
+            if name in parent.names():
+                continue
+            dtype = desc.get("dtype") or "string"
+            value = desc["value"]
+            if dtype in ["string", b"string"]:
+                if isinstance(value, (list, tuple)):
+                    value = numpy.array(
+                        [_tostr(vl) for vl in value], dtype=object)
+                    field = parent.create_field(
+                        name, "string", shape=list(value.shape))
+                else:
+                    value = _tostr(value) \
+                        if isinstance(value, (bytes, unicode)) \
+                        else json.dumps(value)
+                    field = parent.create_field(name, "string")
+            else:
+                value = numpy.array(value, dtype=dtype)
+                field = parent.create_field(
+                    name, dtype, shape=list(value.shape) or None)
+            field.write(value)
+            self._addattrs(field, desc)
+            print(" + write %s" % desc["nexus_path"])
+
+    def _readstream(self, name, stream, blocks):
+        """ reads the stream in batches and puts them into the queue
+
+        :param name: stream name
+        :type name: :obj:`str`
+        :param stream: redis stream
+        :type stream: :class:`Stream`
+        :param blocks: queue with (name, offset, total, block, error) items
+        :type blocks: :class:`queue.Queue`
+        """
+        from . import redisutils
+        error = None
+        total = 0
+        try:
+            total = len(stream)
+            for offset, block in redisutils.readStream(
+                    stream, self.__batch):
+                if self.__stop.is_set():
+                    break
+                self._put(blocks, (name, offset, total, block, None))
+        except Exception as e:
+            error = e
+        self._put(blocks, (name, None, total, None, error))
+
+    def _put(self, blocks, item):
+        """ puts the item into the queue unless the export is stopped
+
+        :param blocks: bounded block queue
+        :type blocks: :class:`queue.Queue`
+        :param item: queue item
+        :type item: :obj:`tuple`
+        """
+        while not self.__stop.is_set():
+            try:
+                blocks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def _createstepfield(self, parent, name, desc, total, block):
+        """ creates a STEP field for the whole stream
+
+        :param parent: parent group
+        :type parent: :class:`filewriter.FTGroup`
+        :param name: field name
+        :type name: :obj:`str`
+        :param desc: datadesc channel description
+        :type desc: :obj:`dict` <:obj:`str`, `any`>
+        :param total: number of stream records
+        :type total: :obj:`int`
+        :param block: first block of records
+        :type block: :class:`numpy.ndarray`
+        :returns: nexus field
+        :rtype: :class:`filewriter.FTField`
+        """
+        shape = list(block.shape[1:])
+        dtype = desc.get("dtype") or str(block.dtype)
+        if dtype in ["string", b"string"]:
+            itemsize = 64
+        else:
+            itemsize = numpy.dtype(dtype).itemsize
+        rows = (1 << 20) // max(1, itemsize * int(numpy.prod(shape)))
+        chunk = [max(1, min(self.__batch, total, rows))] + shape
+        field = parent.create_field(
+            name, dtype, shape=[total] + shape, chunk=chunk,
+            dfilter=None if dtype in ["string", b"string"]
+            else self._filter(parent))
+        self._addattrs(field, desc)
+        return field
+
+    def _writesteps(self, root, scan, datadesc):
+        """ writes STEP fields from scan streams read in parallel
+
+        :param root: nexus root group
+        :type root: :class:`filewriter.FTGroup`
+        :param scan: redis scan
+        :type scan: :class:`Scan`
+        :param datadesc: scan info datadesc
+        :type datadesc: :obj:`dict` <:obj:`str`, :obj:`list`>
+        """
+        streams = {}
+        datadesc = self._descriptors(datadesc)
+        for name, desc in datadesc.items():
+            if not desc.get("nexus_path"):
+                print("Cannot find nexus_path of %s" % name)
+            elif name not in scan.streams:
+                print("Cannot find the stream %s" % name)
+            else:
+                streams[name] = scan.streams[name]
+        if not streams:
+            return
+        blocks = queue.Queue(maxsize=2 * self.__jobs)
+        threads = []
+        names = sorted(streams.keys())
+        self.__stop.clear()
+
+        def worker():
+            while names and not self.__stop.is_set():
+                try:
+                    name = names.pop()
+                except IndexError:
+                    break
+                self._readstream(name, streams[name], blocks)
+
+        for _ in range(min(self.__jobs, len(names))):
+            th = threading.Thread(target=worker)
+            th.daemon = True
+            th.start()
+            threads.append(th)
+
+        fields = {}
+        running = len(streams)
+        try:
+            while running:
+                name, offset, total, block, error = blocks.get()
+                if offset is None:
+                    running -= 1
+                    if error is not None:
+                        print("Cannot read the stream %s: %s"
+                              % (name, str(error)))
+                    elif name not in fields:
+                        print("The stream %s is empty" % name)
+                    else:
+                        print(" * write %s (%s records)"
+                              % (datadesc[name]["nexus_path"], total))
+                    continue
+                desc = datadesc[name]
+                if desc.get("dtype") in ["string", b"string"]:
+                    block = numpy.array(
+                        [vl if isinstance(vl, (bytes, unicode))
+                         else json.dumps(vl) for vl in block],
+                        dtype=object)
+                else:
+                    block = numpy.asarray(block)
+                if not len(block):
+                    continue
+                if name not in fields:
+                    parent, fname = self._getparent(
+                        root, desc["nexus_path"])
+                    fields[name] = self._createstepfield(
+                        parent, fname, desc, total, block)
+                field = fields[name]
+                sel = [slice(offset, offset + len(block))]
+                sel.extend(slice(None) for _ in block.shape[1:])
+                field[tuple(sel)] = block
+        finally:
+            self.__stop.set()
+            for th in threads:
+                th.join()
+
+    def export(self):
+        """ reads the scan from redis and writes it into the nexus file
+        """
+        scan = self._loadscan()
+        info = dict(scan.info or {})
+        print("export: %s into %s" % (self.__scankey, self.__nexusfilename))
+        if self.__testmode:
+            for name, desc in sorted(
+                    self._descriptors(info.get("datadesc")).items()):
+                print(" * %s -> %s" % (name, desc.get("nexus_path")))
+            for desc in self._descriptors(info.get("snapshot")).values():
+                print(" + %s" % desc.get("nexus_path"))
+            return
+        nxsfile = filewriter.create_file(
+            self.__nexusfilename, overwrite=self.__overwrite,
+            writer=self.__wrmodule)
+        try:
+            root = nxsfile.root()
+            self._writesnapshot(root, info.get("snapshot") or {})
+            self._writesteps(root, scan, info.get("datadesc") or {})
+        finally:
+            nxsfile.close()
+
+
 class VDS(Runner):
 
     """ Execute runner
@@ -1272,6 +2042,18 @@ class VDS(Runner):
         + "                merged in their the first dimension " \
         + "with interlaying frames\n" \
         + "                and unlimited first dimension\n" \
+        + "\n\n\n" \
+        + "       nxscollect vds " \
+        + "scan_234.nxs://entry/instrument/eiger/data " \
+        + " --shape 'U,2048,1024' --dtype uint32 " \
+        + " --target-fields 'eiger_%b.nxs://entry/data/data'" \
+        + "  --target-shapes '100,2048,1024' \n\n" \
+        + "\n" \
+        + "           - creates VDS (unlimited first dimension) of" \
+        " all eiger_0.nxs, eiger_1.nxs, ... files" \
+        + " (shape [100,2048,1024])\n" \
+        + "                merged in their first dimension " \
+        + "with one pattern mapping\n" \
         + "\n\n" \
         + "\n"
 
@@ -1297,7 +2079,10 @@ class VDS(Runner):
             action="store", type=str, default=None,
             help="external fields with their NeXus file paths "
             "defined with a pattern or separated by ',' e.g."
-            "'scan_123/lambda_%%05d.nxs://entry/data/data:0:3'")
+            "'scan_123/lambda_%%05d.nxs://entry/data/data:0:3' "
+            "or with a '%%b' source index pattern mapping "
+            "all matching files in one entry e.g. "
+            "'scan_123/eiger_%%b.nxs://entry/data/data'")
         parser.add_argument(
             "--separator", dest="separator",
             action="store", type=str, default=",",
@@ -1455,7 +2240,7 @@ class VDS(Runner):
             print("")
             sys.exit(0)
 
-        if options.shapes is None:
+        if options.shapes is None and options.targetshapes is None:
             sys.stderr.write("nxscollect: shapes is missing\n")
             parser.print_help()
             print("")
@@ -1484,6 +2269,138 @@ class VDS(Runner):
         vds.create()
 
 
+class VDSCheck(Runner):
+
+    """ VDS check runner
+    """
+
+    #: (:obj:`str`) command description
+    description = "check sources of a virtual dataset in the master file"
+    #: (:obj:`str`) command epilog
+    epilog = "" \
+        + " examples:\n" \
+        + "       nxscollect vdscheck " \
+        + "scan_234.nxs://entry/instrument/eiger/data \n\n" \
+        + "           - reports missing and truncated source files" \
+        + " and the frame ranges read as fill values\n\n" \
+        + "       nxscollect vdscheck " \
+        + "scan_234.nxs://entry/instrument/eiger/data " \
+        + " -j 64 --json scan_234_vds.json \n\n" \
+        + "           - stats the sources in 64 threads" \
+        + " and writes the source map into a JSON file\n" \
+        + "\n"
+
+    def create(self):
+        """ creates parser
+        """
+        parser = self._parser
+        parser.add_argument(
+            "-j", "--jobs", dest="jobs",
+            action="store", type=int, default=16,
+            help="number of source files checked in parallel, "
+            "only their stats run in parallel while HDF5 metadata "
+            "reads are serialized (default: 16)")
+        parser.add_argument(
+            "--json", dest="json",
+            action="store", type=str, default=None,
+            help="JSON file for the source map, '-' for the standard output")
+        parser.add_argument(
+            "--h5cpp", action="store_true",
+            default=False, dest="h5cpp",
+            help="use h5cpp module as a nexus reader")
+        parser.add_argument(
+            "--h5py", action="store_true",
+            default=False, dest="h5py",
+            help="use h5py module as a nexus reader")
+
+    def postauto(self):
+        """ creates parser
+        """
+        parser = self._parser
+        parser.add_argument(
+            'args', metavar='nexus_file_path_field',
+            type=str, nargs='?',
+            help='nexus files with the nexus directory and a name '
+            'of the VDS field')
+
+    def run(self, options):
+        """ the main program function
+
+        :param options: parser options
+        :type options: :class:`argparse.Namespace`
+        """
+        parser = self._parser
+        nexusfilepath = options.args
+
+        if not nexusfilepath or ":/" not in nexusfilepath:
+            parser.print_help()
+            print("")
+            sys.exit(0)
+
+        if options.h5cpp:
+            writer = "h5cpp"
+        elif options.h5py:
+            writer = "h5py"
+        elif "h5py" in WRITERS.keys():
+            writer = "h5py"
+        else:
+            writer = "h5cpp"
+
+        if (options.h5py and options.h5cpp) or \
+           writer not in WRITERS.keys():
+            sys.stderr.write("nxscollect: Writer '%s' cannot be opened\n"
+                             % writer)
+            sys.stderr.flush()
+            parser.print_help()
+            sys.exit(255)
+
+        checker = VirtualDatasetChecker(
+            nexusfilepath, options.jobs, writer=writer)
+        try:
+            report = checker.check()
+        except Exception as e:
+            sys.stderr.write("nxscollect: %s\n" % str(e))
+            sys.stderr.flush()
+            sys.exit(255)
+
+        if options.json == "-":
+            print(json.dumps(report, indent=2))
+            return
+        if options.json:
+            with open(options.json, "w") as fl:
+                json.dump(report, fl, indent=2)
+
+        def _ranges(ranges):
+            return " ".join("[%s:%s]" % tuple(rg) for rg in ranges)
+
+        counts = {}
+        for src in report["sources"]:
+            counts[src["status"]] = counts.get(src["status"], 0) + 1
+            if src["status"] == "missing":
+                print("vdscheck: missing %s:/%s fill %s" % (
+                    src["file"], src["path"], _ranges(src["fill"])))
+            elif src["status"] == "truncated":
+                print("vdscheck: truncated %s:/%s %s < %s fill %s" % (
+                    src["file"], src["path"], src["shape"],
+                    src["required_shape"], _ranges(src["fill"])))
+            elif src["status"] == "error":
+                print("vdscheck: error %s:/%s %s fill %s" % (
+                    src["file"], src["path"], src["error"],
+                    _ranges(src["fill"])))
+            elif src["dtype"] != report["dtype"]:
+                print("vdscheck: dtype %s:/%s %s != %s" % (
+                    src["file"], src["path"], src["dtype"],
+                    report["dtype"]))
+        if report["gaps"]:
+            print("vdscheck: unmapped fill %s" % _ranges(report["gaps"]))
+        print("vdscheck: %s sources, %s missing, %s truncated, %s errors, "
+              "%s fill frames of %s" % (
+                  len(report["sources"]), counts.get("missing", 0),
+                  counts.get("truncated", 0), counts.get("error", 0),
+                  sum(stop - start for start, stop in report["fill"]),
+                  report["extent"]))
+
+
 class Link(Runner):
 
     """ Execute runner
@@ -1578,6 +2495,133 @@ class Link(Runner):
         linker.link()
 
 
+class FromRedis(Runner):
+
+    """ FromRedis runner
+    """
+
+    #: (:obj:`str`) command description
+    description = "create the master file from scan data stored in redis"
+    #: (:obj:`str`) command epilog
+    epilog = "" \
+        + " examples:\n" \
+        + "       nxscollect fromredis scan_234.nxs " \
+        + "--scan-key esrf:scan:01HXYZ \n\n" \
+        + "       nxscollect fromredis scan_234.nxs " \
+        + "--scan-key esrf:scan:01HXYZ --redis-url redis://haso:6380 " \
+        + "-j 8 -b 50000 --overwrite \n\n" \
+        + "\n"
+
+    def create(self):
+        """ creates parser
+        """
+        parser = self._parser
+        parser.add_argument(
+            "-k", "--scan-key", dest="scankey",
+            action="store", type=str, default=None,
+            help="redis key of the scan, e.g. esrf:scan:01HXYZ")
+        parser.add_argument(
+            "-u", "--redis-url", dest="redisurl",
+            action="store", type=str, default="redis://localhost:6380",
+            help="redis URL (default: 'redis://localhost:6380')")
+        parser.add_argument(
+            "-c", "--compression", dest="compression",
+            action="store", type=str, default="2",
+            help="deflate compression rate from 0 to 9 (default: 2)"
+            " or <filterid>:opt1,opt2,..."
+            " e.g.  -c 32008:0,2  for bitshuffle with lz4")
+        parser.add_argument(
+            "-b", "--batch", dest="batch",
+            action="store", type=int, default=10000,
+            help="maximal number of stream records read at once "
+            "(default: 10000)")
+        parser.add_argument(
+            "-j", "--jobs", dest="jobs",
+            action="store", type=int, default=4,
+            help="number of streams read in parallel (default: 4)")
+        parser.add_argument(
+            "--overwrite", action="store_true",
+            default=False, dest="overwrite",
+            help="overwrite the existing nexus file")
+        parser.add_argument(
+            "--test", action="store_true",
+            default=False, dest="testmode",
+            help="execute in the test mode")
+        parser.add_argument(
+            "--h5cpp", action="store_true",
+            default=False, dest="h5cpp",
+            help="use h5cpp module as a nexus writer")
+        parser.add_argument(
+            "--h5py", action="store_true",
+            default=False, dest="h5py",
+            help="use h5py module as a nexus reader/writer")
+
+    def postauto(self):
+        """ creates parser
+        """
+        parser = self._parser
+        parser.add_argument(
+            'args', metavar='nexus_file',
+            type=str, nargs='?',
+            help='nexus file to be created')
+
+    def run(self, options):
+        """ the main program function
+
+        :param options: parser options
+        :type options: :class:`argparse.Namespace`
+        """
+        parser = self._parser
+        nexusfile = options.args
+
+        if not nexusfile:
+            parser.print_help()
+            print("")
+            sys.exit(0)
+
+        if options.scankey is None:
+            sys.stderr.write("nxscollect: scan key is missing\n")
+            parser.print_help()
+            print("")
+            sys.exit(0)
+
+        try:
+            getcompression(options.compression)
+        except Exception as e:
+            print(str(e))
+            parser.print_help()
+            print("")
+            sys.exit(0)
+
+        if options.h5cpp:
+            writer = "h5cpp"
+        elif options.h5py:
+            writer = "h5py"
+        elif "h5cpp" in WRITERS.keys():
+            writer = "h5cpp"
+        else:
+            writer = "h5py"
+
+        if (options.h5py and options.h5cpp) or \
+           writer not in WRITERS.keys():
+            sys.stderr.write("nxscollect: Writer '%s' cannot be opened\n"
+                             % writer)
+            sys.stderr.flush()
+            parser.print_help()
+            sys.exit(255)
+
+        exporter = RedisExporter(
+            nexusfile, options.scankey, options.redisurl,
+            options.compression, options.batch, options.jobs,
+            options.overwrite, options.testmode, writer=writer)
+        try:
+            exporter.export()
+        except Exception as e:
+            sys.stderr.write("nxscollect: %s\n" % str(e))
+            sys.stderr.flush()
+            sys.exit(255)
+
+
 class Execute(Runner):
 
     """ Execute runner
@@ -1772,7 +2816,9 @@ def main():
     parser.cmdrunners = [
         ('append', Execute),
         ('link', Link),
-        ('vds', VDS)
+        ('vds', VDS),
+        ('vdscheck', VDSCheck),
+        ('fromredis', FromRedis)
     ]
     runners = parser.createSubParsers()
 
@@ -22,9 +22,14 @@ import sys
 import os
 import argparse
 import json
+import copy
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from lxml import etree
 from .nxsparser import ParserTools, TableTools, TableDictTools, ESRFConverter
 from .nxsargparser import (Runner, NXSArgParser, ErrorException)
-from .nxsdevicetools import (checkServer, listServers, openServer)
+from .nxsdevicetools import (checkServer, listServers, openServer,
+                             ComponentGraph)
 #: (:obj:`bool`) True if tango available
 
 PYTANGO = False
@@ -41,12 +46,220 @@ if sys.version_info > (3,):
     raw_input = input
 
 
+#: (:obj:`str`) environment variable with the nxsconfig cache directory
+CACHE_ENV = "NXSCONFIG_CACHE"
+
+
+class ConfigServerCache(object):
+
+    """ on-disk cache of configuration server items and their descriptions
+    valid for one DB revision of the configuration server
+    """
+
+    #: (:obj:`list` <:obj:`str`>) cached read-only commands
+    commands = [
+        "AvailableComponents", "AvailableDataSources",
+        "ComponentDataSources", "ComponentsDataSources",
+        "ComponentVariables", "ComponentsVariables",
+        "DependentComponents",
+    ]
+
+    #: (:obj:`dict` <:obj:`str`, :obj:`str`>) cached commands
+    #    returning xml items
+    itemcommands = {
+        "Components": "components",
+        "DataSources": "datasources",
+    }
+
+    def __init__(self, server, device, directory):
+        """ constructor
+
+        :param server: configuration server proxy
+        :type server: :class:`tango.DeviceProxy`
+        :param device: device name of the configuration server
+        :type device: :obj:`str`
+        :param directory: cache directory
+        :type directory: :obj:`str`
+        """
+        #: (:class:`tango.DeviceProxy`) configuration server proxy
+        self._server = server
+        #: (:obj:`str`) cache file name
+        self._filename = os.path.join(
+            os.path.expanduser(directory),
+            "%s.json" % "".join(
+                (ch if ch.isalnum() or ch in "-_." else "_")
+                for ch in str(device)))
+        #: (:obj:`dict` <:obj:`str`, `any`>) cached content
+        self._content = None
+        #: (:obj:`bool`) if the cached content has to be stored
+        self._dirty = False
+        revision = self.revision()
+        if revision is not None:
+            self._content = self._load()
+            if self._content.get("revision") != revision:
+                self._content = {"revision": revision}
+
+    def revision(self):
+        """ provides DB revision of the configuration server,
+        i.e. its version which ends with the DB revision number
+
+        :returns: revision or None if it cannot be read
+        :rtype: :obj:`str`
+        """
+        try:
+            return str(self._server.Version)
+        except Exception:
+            return None
+
+    def _load(self):
+        """ loads the cache file
+
+        :returns: cached content
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        try:
+            with open(self._filename) as fl:
+                content = json.load(fl)
+            if isinstance(content, dict):
+                return content
+        except Exception:
+            pass
+        return {}
+
+    def _store(self):
+        """ stores the cache file atomically
+        """
+        try:
+            dirname = os.path.dirname(self._filename)
+            if not os.path.isdir(dirname):
+                os.makedirs(dirname)
+            tmpname = "%s.%s.tmp" % (self._filename, os.getpid())
+            with open(tmpname, "w") as fl:
+                json.dump(self._content, fl)
+            os.rename(tmpname, self._filename)
+        except Exception as e:
+            sys.stderr.write("Warning: nxsconfig cache cannot be stored: %s\n"
+                             % str(e))
+            sys.stderr.flush()
+
+    def _command(self, name, *args):
+        """ executes a read-only command with cached results
+
+        :param name: command name
+        :type name: :obj:`str`
+        :param args: command arguments
+        :type args: :obj:`list` <`any`>
+        :returns: command result
+        :rtype: `any`
+        """
+        key = "%s%s" % (name, json.dumps(args))
+        results = self._content.setdefault("commands", {})
+        if key not in results:
+            result = getattr(self._server, name)(*args)
+            results[key] = list(result) if result is not None else None
+            self._dirty = True
+        return results[key]
+
+    def _items(self, name, names):
+        """ provides xml items fetching only the missing ones
+
+        :param name: command name
+        :type name: :obj:`str`
+        :param names: item names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: xml items
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        items = self._content.setdefault(self.itemcommands[name], {})
+        missing = [nm for nm in dict.fromkeys(names) if nm not in items]
+        if missing:
+            xmls = getattr(self._server, name)(missing)
+            items.update(zip(missing, xmls))
+            self._dirty = True
+        return [items[nm] for nm in names]
+
+    def parseComponent(self, xmlc, attributes=True):
+        """ provides cached descriptions of the xml string
+
+        :param xmlc: xml string
+        :type xmlc: :obj:`str`
+        :param attributes: flag set True for parsing attributes
+        :type attributes: :obj:`bool`
+        :returns: description lists with 'fields', 'attributes'
+                  and 'links' keys
+        :rtype: :obj:`dict` <:obj:`str`,
+                 :obj:`list` < :obj:`dict` <:obj:`str`, `any`> > >
+        """
+        if self._content is None:
+            return ParserTools.parseComponent(xmlc, attributes)
+        key = hashlib.sha1(xmlc.encode("utf-8")).hexdigest()
+        descriptions = self._content.setdefault("descriptions", {})
+        if key not in descriptions:
+            descriptions[key] = ParserTools.parseComponent(xmlc, True)
+            self._dirty = True
+        result = copy.deepcopy(descriptions[key])
+        if not attributes:
+            result["attributes"] = []
+        return result
+
+    def __getattr__(self, name):
+        """ provides cached commands or attributes of the server proxy
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :returns: attribute value
+        :rtype: `any`
+        """
+        if name.startswith("_"):
+            raise AttributeError(name)
+        attr = getattr(self._server, name)
+        if self._content is None:
+            return attr
+        if name in self.commands:
+            return lambda *args: self._command(name, *args)
+        if name in self.itemcommands:
+            return lambda names: self._items(name, names)
+        if name.startswith(("Store", "Delete", "Set", "Unset")):
+            # the server content changes so the cache is dropped
+            self.invalidate()
+        return attr
+
+    def invalidate(self):
+        """ drops the cached content
+        """
+        if self._content is not None:
+            self._content = {"revision": None}
+            self._dirty = False
+            self._store()
+
+    def store(self):
+        """ stores the cache file if its content has changed,
+        i.e. once when the nxsconfig command ends
+        """
+        if self._dirty:
+            self._dirty = False
+            self._store()
+
+    def __setattr__(self, name, value):
+        """ sets attributes of the server proxy
+
+        :param name: attribute name
+        :type name: :obj:`str`
+        :param value: attribute value
+        :type value: `any`
+        """
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._server, name, value)
+
+
 class ConfigServer(object):
 
     """ configuration server adapter
     """
 
-    def __init__(self, device, nonewline=False):
+    def __init__(self, device, nonewline=False, cachedir=None):
         """ constructor
 
         :param device: device name of the configuration server
@@ -54,12 +267,71 @@ class ConfigServer(object):
         :param nonewline: if the output should not be separated
                           by the new line character
         :type nonewline: :obj:`bool`
+        :param cachedir: cache directory, default: $NXSCONFIG_CACHE
+        :type cachedir: :obj:`str`
         """
         #: (:obj:`str`) spliting character
         self.char = " " if nonewline else "\n"
         #: (:class:`tango.DeviceProxy`) configuration server proxy
         self._cnfServer = openServer(device)
         self._cnfServer.Open()
+        if cachedir is None:
+            cachedir = os.environ.get(CACHE_ENV)
+        if cachedir:
+            self._cnfServer = ConfigServerCache(
+                self._cnfServer, device, cachedir)
+        #: (:class:`nxstools.nxsdevicetools.ComponentGraph`)
+        #:     component dependency graph
+        self.__graph = None
+
+    def storeCache(self):
+        """ stores the cache of the configuration server if it is used
+        """
+        if isinstance(self._cnfServer, ConfigServerCache):
+            self._cnfServer.store()
+
+    def graph(self):
+        """ provides the component dependency graph built once per server
+
+        :returns: component dependency graph
+        :rtype: :class:`nxstools.nxsdevicetools.ComponentGraph`
+        """
+        if self.__graph is None:
+            self.__graph = ComponentGraph(self._cnfServer)
+        return self.__graph
+
+    def __checkComponents(self, components):
+        """ checks if the components are stored in the server
+
+        :param components: given components
+        :type components: :obj:`list` <:obj:`str`>
+        :returns: True if all components are stored
+        :rtype: :obj:`bool`
+        """
+        graph = self.graph()
+        for component in components:
+            if not graph.hasComponent(component):
+                sys.stderr.write("Error: Component '%s' not stored in "
+                                 "the configuration server\n" % component)
+                sys.stderr.flush()
+                return False
+        return True
+
+    def _parseComponent(self, xmlc, attributes=True):
+        """ provides descriptions of the xml string
+
+        :param xmlc: xml string
+        :type xmlc: :obj:`str`
+        :param attributes: flag set True for parsing attributes
+        :type attributes: :obj:`bool`
+        :returns: description lists with 'fields', 'attributes'
+                  and 'links' keys
+        :rtype: :obj:`dict` <:obj:`str`,
+                 :obj:`list` < :obj:`dict` <:obj:`str`, `any`> > >
+        """
+        if isinstance(self._cnfServer, ConfigServerCache):
+            return self._cnfServer.parseComponent(xmlc, attributes)
+        return ParserTools.parseComponent(xmlc, attributes)
 
     def listCmd(self, ds, mandatory=False, private=False, profiles=False):
         """ lists the DB item names
@@ -100,14 +372,9 @@ class ConfigServer(object):
         :returns: list of datasource names
         :rtype: :obj:`list` <:obj:`str`>
         """
-        cmps = self._cnfServer.AvailableComponents()
         result = []
-        for component in components:
-            if component not in cmps:
-                sys.stderr.write("Error: Component '%s' not stored in "
-                                 "the configuration server\n" % component)
-                sys.stderr.flush()
-                return []
+        if not self.__checkComponents(components):
+            return []
         if not mandatory:
             for component in components:
                 result.extend(self._cnfServer.ComponentDataSources(component))
@@ -124,18 +391,53 @@ class ConfigServer(object):
         :returns: list of component names
         :rtype: :obj:`list` <:obj:`str`>
         """
-        cmps = self._cnfServer.AvailableComponents()
         result = []
-        for component in components:
-            if component not in cmps:
-                sys.stderr.write("Error: Component '%s' not stored in "
-                                 "the configuration server\n" % component)
-                sys.stderr.flush()
-                return []
-        result = self._cnfServer.DependentComponents(components)
+        if not self.__checkComponents(components):
+            return []
+        result = self.graph().dependentComponents(components)
 
         return result
 
+    def depsCmd(self, names, reverse=False, kind="datasources",
+                direct=False):
+        """ lists component dependencies or components using given items
+
+        :param names: given components, datasources or variables
+        :type names: :obj:`list` <:obj:`str`>
+        :param reverse: flag set True for components using given items
+        :type reverse: :obj:`bool`
+        :param kind: kind of reverse items, i.e. 'datasources',
+                     'components' or 'variables'
+        :type kind: :obj:`str`
+        :param direct: flag set True for direct dependencies only
+        :type direct: :obj:`bool`
+        :returns: list of component names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        graph = self.graph()
+        if not reverse:
+            if not self.__checkComponents(names):
+                return []
+            if direct:
+                result = []
+                for name in names:
+                    result.extend(dp for dp in graph.dependencies(name)
+                                  if dp not in result)
+                return result
+            return [cp for cp in graph.dependentComponents(names)
+                    if cp not in names]
+        if kind == "components":
+            if not self.__checkComponents(names):
+                return []
+        elif kind == "datasources":
+            for name in names:
+                if not graph.hasDataSource(name):
+                    sys.stderr.write("Error: Datasource '%s' not stored in "
+                                     "the configuration server\n" % name)
+                    sys.stderr.flush()
+                    return []
+        return graph.reverseComponents(names, kind, not direct)
+
     def variablesCmd(self, components, mandatory=False):
         """ lists variable of the components
 
@@ -144,14 +446,9 @@ class ConfigServer(object):
         :returns: list of datasource names
         :rtype: :obj:`list` <:obj:`str`>
         """
-        cmps = self._cnfServer.AvailableComponents()
         result = []
-        for component in components:
-            if component not in cmps:
-                sys.stderr.write("Error: Component '%s' not stored in "
-                                 "the configuration server\n" % component)
-                sys.stderr.flush()
-                return []
+        if not self.__checkComponents(components):
+            return []
         if not mandatory:
             for component in components:
                 result.extend(self._cnfServer.ComponentVariables(component))
@@ -200,11 +497,7 @@ class ConfigServer(object):
             return []
         name = name[0]
         if not ds:
-            cmps = self._cnfServer.AvailableComponents()
-            if name not in cmps:
-                sys.stderr.write("Error: Component '%s' not stored in "
-                                 "the configuration server\n" % name)
-                sys.stderr.flush()
+            if not self.__checkComponents([name]):
                 return []
             names, records = self.__getDataSources(name)
         else:
@@ -235,8 +528,30 @@ class ConfigServer(object):
                     return []
         return records
 
+    def __writeFiles(self, directory, ext, names, elems, jobs=1):
+        """ writes the DB items into files concurrently
+
+        :param directory: output file directory
+        :type directory: :obj:`str`
+        :param ext: file name extension
+        :type ext: :obj:`str`
+        :param names: list of item names
+        :type names: :obj:`list` <:obj:`str`>
+        :param elems: list of item contents
+        :type elems: :obj:`list` <:obj:`str`>
+        :param jobs: number of parallel jobs
+        :type jobs: :obj:`int`
+        """
+        def write(item):
+            name = os.path.join(directory, "%s.%s" % (item[0], ext))
+            with open(name, "w") as text_file:
+                text_file.write(item[1])
+
+        with ThreadPoolExecutor(max_workers=max(1, int(jobs or 1))) as pool:
+            list(pool.map(write, zip(names, elems)))
+
     def showCmd(self, ds, args, mandatory=False, profiles=False,
-                directory=None):
+                directory=None, jobs=8):
         """ shows the DB items
 
         :param ds: flag set True for datasources
@@ -249,6 +564,8 @@ class ConfigServer(object):
         :type profiles: :obj:`bool`
         :param directory: output file directory
         :type directory: :obj:`str`
+        :param jobs: number of files written in parallel
+        :type jobs: :obj:`int`
         :returns: list of XML items
         :rtype: :obj:`list` <:obj:`str`>
         """
@@ -264,10 +581,7 @@ class ConfigServer(object):
             if not directory:
                 return elems
             else:
-                for i, ar in enumerate(args):
-                    name = os.path.join(directory, "%s.ds.xml" % ar)
-                    with open(name, "w") as text_file:
-                        text_file.write(elems[i])
+                self.__writeFiles(directory, "ds.xml", args, elems, jobs)
 
         elif profiles:
             dsrc = self._cnfServer.AvailableSelections()
@@ -281,10 +595,7 @@ class ConfigServer(object):
             if not directory:
                 return elems
             else:
-                for i, ar in enumerate(args):
-                    name = os.path.join(directory, "%s.json" % ar)
-                    with open(name, "w") as text_file:
-                        text_file.write(elems[i])
+                self.__writeFiles(directory, "json", args, elems, jobs)
         else:
             cmps = self._cnfServer.AvailableComponents()
             for ar in args:
@@ -303,10 +614,7 @@ class ConfigServer(object):
             if not directory:
                 return elems
             else:
-                for i, ar in enumerate(mand):
-                    name = os.path.join(directory, "%s.xml" % ar)
-                    with open(name, "w") as text_file:
-                        text_file.write(elems[i])
+                self.__writeFiles(directory, "xml", mand, elems, jobs)
         return []
 
     def deleteCmd(self, ds, args, ask=True, profiles=False):
@@ -360,10 +668,13 @@ class ConfigServer(object):
             if valid[choice]:
                 if ds:
                     self._cnfServer.DeleteDataSource(ar)
+                    self.__graph = None
                 elif profiles:
                     self._cnfServer.DeleteSelection(ar)
+                    self.__graph = None
                 else:
                     self._cnfServer.DeleteComponent(ar)
+                    self.__graph = None
         return []
 
     def uploadCmd(self, ds, args, force=False, profiles=False, directory='.',
@@ -404,30 +715,66 @@ class ConfigServer(object):
                         "the configuration server\n" % (label, ar))
                     sys.stderr.flush()
                     return []
-        for ar in args:
-            if ds:
-                name = os.path.join(directory, "%s.ds.xml" % ar)
-                with open(name, 'r') as fl:
-                    txt = fl.read()
-                self._cnfServer.XMLString = txt
-                self._cnfServer.StoreDataSource(ar)
-            elif profiles:
-                name = os.path.join(directory, "%s.json" % ar)
-                with open(name, 'r') as fl:
-                    txt = fl.read()
-                self._cnfServer.Selection = txt
-                self._cnfServer.StoreSelection(ar)
+        if ds:
+            ext = "ds.xml"
+        elif profiles:
+            ext = "json"
+        else:
+            ext = "xml"
+
+        def read(ar):
+            name = os.path.join(directory, "%s.%s" % (ar, ext))
+            with open(name, 'r') as fl:
+                txt = fl.read()
+            if profiles:
+                json.loads(txt)
             else:
-                name = os.path.join(directory, "%s.xml" % ar)
-                with open(name, 'r') as fl:
-                    txt = fl.read()
-                if external and external.lower() == "esrf":
+                if not ds and external and external.lower() == "esrf":
                     txt = ESRFConverter().convert(txt)
-                self._cnfServer.XMLString = txt
-                self._cnfServer.StoreComponent(ar)
-                if mandatory:
-                    self._cnfServer.SetMandatoryComponents([ar])
+                etree.fromstring(bytes(txt, "utf-8"))
+            return txt
+
+        def store(item):
+            if profiles:
+                self._cnfServer.Selection = item[1]
+                self._cnfServer.StoreSelection(item[0])
+            else:
+                self._cnfServer.XMLString = item[1]
+                if ds:
+                    self._cnfServer.StoreDataSource(item[0])
+                else:
+                    self._cnfServer.StoreComponent(item[0])
 
+        stored = []
+        errors = 0
+        items = []
+        for ar in args:
+            try:
+                items.append((ar, read(ar)))
+            except Exception as e:
+                errors += 1
+                sys.stderr.write(
+                    "Error: %s '%s' cannot be read: %s\n"
+                    % (label, ar, str(e)))
+        # XMLString and Selection are server state set before each store
+        # so the items are stored one by one
+        for item in items:
+            try:
+                store(item)
+                stored.append(item[0])
+            except Exception as e:
+                errors += 1
+                sys.stderr.write(
+                    devFailedMessage(e) or
+                    "Error: %s '%s' cannot be stored: %s\n"
+                    % (label, item[0], str(e)))
+        self.__graph = None
+        if mandatory and stored and not ds and not profiles:
+            self._cnfServer.SetMandatoryComponents(stored)
+        sys.stderr.flush()
+        if errors:
+            raise Exception(
+                "%s of %s items not uploaded" % (errors, len(args)))
         return []
 
     def getCmd(self, args):
@@ -438,14 +785,8 @@ class ConfigServer(object):
         :returns: XML configuration string
         :rtype: :obj:`str`
         """
-        cmps = self._cnfServer.AvailableComponents()
-        for ar in args:
-            if ar not in cmps:
-                sys.stderr.write(
-                    "Error: Component '%s' not stored in "
-                    "the configuration server\n" % ar)
-                sys.stderr.flush()
-                return ""
+        if not self.__checkComponents(args):
+            return ""
         self._cnfServer.CreateConfiguration(args)
         return self._cnfServer.XMLString
 
@@ -487,7 +828,7 @@ class ConfigServer(object):
                                     headers=headers,
                                     filters=filters)
                 ttools.title = "DataSource: '%s'" % args[i]
-                description.extend(ttools.generateList())
+                description.extend(ttools.generateLines())
         else:
             dsxmls = self._cnfServer.DataSources(dss)
             xmls = ParserTools.mergeDefinitions(dsxmls).strip()
@@ -497,7 +838,7 @@ class ConfigServer(object):
             ttools = TableTools(parameters,
                                 headers=headers,
                                 filters=filters)
-            description.extend(ttools.generateList())
+            description.extend(ttools.generateLines())
 
         if not description:
             sys.stderr.write(
@@ -542,7 +883,7 @@ class ConfigServer(object):
             ttools.title = "Profile: '%s'" % args[i]
             if headers:
                 ttools.headers = headers
-            description.extend(ttools.generateList())
+            description.extend(ttools.generateLines())
 
         if not description:
             sys.stderr.write(
@@ -574,7 +915,8 @@ class ConfigServer(object):
         xmls = ""
         parameters = []
         description = []
-        cmps = self._cnfServer.AvailableComponents()
+        graph = self.graph()
+        cmps = graph.components
         if not cmps:
             sys.stderr.write(
                 "\n'%s' does not have any components\n\n"
@@ -585,14 +927,10 @@ class ConfigServer(object):
         deps = {}
         for ar in args:
             dargs.append(ar)
-            if ar not in cmps:
-                sys.stderr.write(
-                    "Error: Component '%s' not stored in "
-                    "the configuration server\n" % ar)
-                sys.stderr.flush()
+            if not self.__checkComponents([ar]):
                 return ""
             else:
-                dars = self._cnfServer.dependentComponents([ar])
+                dars = graph.dependentComponents([ar])
                 dars = list(set(dars) - set([ar]))
                 if dars:
                     dargs.extend(dars)
@@ -621,10 +959,10 @@ class ConfigServer(object):
                         sys.stderr.flush()
 
             for i, xmls in enumerate(cpxmls):
-                parameters = ParserTools.parseFields(xmls)
-                if attrs:
-                    parameters.extend(ParserTools.parseAttributes(xmls))
-                parameters.extend(ParserTools.parseLinks(xmls))
+                cpdesc = self._parseComponent(xmls, attrs)
+                parameters = cpdesc["fields"]
+                parameters.extend(cpdesc["attributes"])
+                parameters.extend(cpdesc["links"])
                 ttools = TableTools(parameters, nonone,
                                     headers,
                                     filters)
@@ -633,7 +971,7 @@ class ConfigServer(object):
                         dargs[i], deps[dargs[i]])
                 else:
                     ttools.title = "Component: '%s'" % dargs[i]
-                description.extend(ttools.generateList())
+                description.extend(ttools.generateLines())
         if not description:
             sys.stderr.write(
                 "\nHint: add component names as command arguments "
@@ -661,28 +999,22 @@ class ConfigServer(object):
         """
         xmls = ""
         description = []
-        cmps = self._cnfServer.AvailableComponents()
-        if not cmps:
+        if not self.graph().components:
             sys.stderr.write(
                 "\n'%s' does not have any components\n\n"
                 % self._cnfServer.name())
             sys.stderr.flush()
             return ""
-        for ar in args:
-            if ar not in cmps:
-                sys.stderr.write(
-                    "Error: Component '%s' not stored in "
-                    "the configuration server\n" % ar)
-                sys.stderr.flush()
-                return ""
+        if not self.__checkComponents(args):
+            return ""
 
         self._cnfServer.CreateConfiguration(args)
         xmls = str(self._cnfServer.XMLString).strip()
         if xmls:
-            description.extend(ParserTools.parseFields(xmls))
-            if attrs:
-                description.extend(ParserTools.parseAttributes(xmls))
-            description.extend(ParserTools.parseLinks(xmls))
+            cpdesc = self._parseComponent(xmls, attrs)
+            description.extend(cpdesc["fields"])
+            description.extend(cpdesc["attributes"])
+            description.extend(cpdesc["links"])
         if not description:
             sys.stderr.write(
                 "\nHint: add components as command arguments "
@@ -815,14 +1147,8 @@ class ConfigServer(object):
         :returns: XML configuration string with merged components
         :rtype: :obj:`str`
         """
-        cmps = self._cnfServer.AvailableComponents()
-        for ar in args:
-            if ar not in cmps:
-                sys.stderr.write(
-                    "Error: Component '%s' not stored "
-                    "in the configuration server\n" % ar)
-                sys.stderr.flush()
-                return ""
+        if not self.__checkComponents(args):
+            return ""
         return self._cnfServer.Merge(args)
 
 
@@ -875,6 +1201,7 @@ class List(Runner):
             options.datasources, options.mandatory, options.private,
             options.profiles
         ))
+        cnfserver.storeCache()
         return string
 
 
@@ -906,6 +1233,10 @@ class Show(Runner):
                             help="perform operation for profiles")
         parser.add_argument("-o", "--directory", dest="directory",
                             help=("output file directory"))
+        parser.add_argument("-j", "--jobs", dest="jobs", type=int,
+                            default=8,
+                            help="number of files written in parallel "
+                            "(default: 8)")
         parser.add_argument('args', metavar='name', type=str, nargs='*',
                             help='names of components, datasources '
                             'or profiles')
@@ -921,8 +1252,9 @@ class Show(Runner):
         cnfserver = ConfigServer(options.server, False)
         string = cnfserver.char.join(cnfserver.showCmd(
             options.datasources, options.args, False,
-            options.profiles, options.directory
+            options.profiles, options.directory, options.jobs
         ))
+        cnfserver.storeCache()
         return string
 
 
@@ -972,6 +1304,7 @@ class Delete(Runner):
             options.datasources, options.args, not options.force,
             options.profiles
         ))
+        cnfserver.storeCache()
         return string
 
 
@@ -1031,6 +1364,7 @@ class Upload(Runner):
             options.profiles, options.directory, options.mandatory,
             options.external
         ))
+        cnfserver.storeCache()
         return string
 
 
@@ -1066,6 +1400,7 @@ class Get(Runner):
         """
         cnfserver = ConfigServer(options.server)
         string = str(cnfserver.getCmd(options.args))
+        cnfserver.storeCache()
         return string
 
 
@@ -1101,6 +1436,7 @@ class Merge(Runner):
         """
         cnfserver = ConfigServer(options.server)
         string = str(cnfserver.getCmd(options.args))
+        cnfserver.storeCache()
         return string
 
 
@@ -1143,6 +1479,7 @@ class Sources(Runner):
         cnfserver = ConfigServer(options.server, options.nonewlines)
         string = cnfserver.char.join(cnfserver.sourcesCmd(
             options.args, options.mandatory))
+        cnfserver.storeCache()
         return string
 
 
@@ -1182,6 +1519,68 @@ class Components(Runner):
         cnfserver = ConfigServer(options.server, options.nonewlines)
         string = cnfserver.char.join(cnfserver.componentsCmd(
             options.args))
+        cnfserver.storeCache()
+        return string
+
+
+class Deps(Runner):
+
+    """ Deps runner"""
+
+    #: (:obj:`str`) command description
+    description = "get component dependencies or components " \
+        "using given datasources"
+    #: (:obj:`str`) command epilog
+    epilog = "" \
+        + " examples:\n" \
+        + "       nxsconfig deps dcm\n" \
+        + "       nxsconfig deps --reverse exp_c01\n" \
+        + "       nxsconfig deps --reverse -c slit1\n" \
+        + "       nxsconfig deps --reverse -v entryname\n" \
+        + "\n"
+
+    def create(self):
+        """ creates parser
+
+        """
+        parser = self._parser
+        parser.add_argument("-s", "--server", dest="server",
+                            help=("configuration server device name"))
+        parser.add_argument("-r", "--reverse", action="store_true",
+                            default=False, dest="reverse",
+                            help="list components using given datasources")
+        parser.add_argument("-c", "--components", action="store_true",
+                            default=False, dest="components",
+                            help="reverse names are components")
+        parser.add_argument("-v", "--variables", action="store_true",
+                            default=False, dest="variables",
+                            help="reverse names are component variables")
+        parser.add_argument("-d", "--direct", action="store_true",
+                            default=False, dest="direct",
+                            help="list only direct dependencies")
+        parser.add_argument("-n", "--no-newlines", action="store_true",
+                            default=False, dest="nonewlines",
+                            help="split result with space characters")
+        parser.add_argument('args', metavar='name', type=str, nargs='*',
+                            help='names of components or datasources')
+
+    def run(self, options):
+        """ the main program function
+
+        :param options: parser options
+        :type options: :class:`argparse.Namespace`
+        :returns: output information
+        :rtype: :obj:`str`
+        """
+        kind = "datasources"
+        if options.components:
+            kind = "components"
+        elif options.variables:
+            kind = "variables"
+        cnfserver = ConfigServer(options.server, options.nonewlines)
+        string = cnfserver.char.join(cnfserver.depsCmd(
+            options.args, options.reverse, kind, options.direct))
+        cnfserver.storeCache()
         return string
 
 
@@ -1224,6 +1623,7 @@ class Variables(Runner):
         cnfserver = ConfigServer(options.server, options.nonewlines)
         string = cnfserver.char.join(cnfserver.variablesCmd(
             options.args, options.mandatory))
+        cnfserver.storeCache()
         return string
 
 
@@ -1261,6 +1661,7 @@ class Data(Runner):
         cnfserver = ConfigServer(options.server)
         string = cnfserver.char.join(cnfserver.dataCmd(
             options.args))
+        cnfserver.storeCache()
         return string
 
 
@@ -1305,6 +1706,7 @@ class Record(Runner):
         cnfserver = ConfigServer(options.server, options.nonewlines)
         string = cnfserver.char.join(cnfserver.recordCmd(
             options.datasources, options.args))
+        cnfserver.storeCache()
         return string
 
 
@@ -1407,6 +1809,7 @@ class Describe(Runner):
         string = cnfserver.char.join(cnfserver.describeCmd(
             options.datasources, options.args, options.mandatory,
             options.private, options.headers, options.filters))
+        cnfserver.storeCache()
         return string
 
 
@@ -1459,6 +1862,7 @@ class Info(Runner):
         string = cnfserver.char.join(cnfserver.infoCmd(
             options.datasources, options.args, options.mandatory,
             options.private, options.profiles))
+        cnfserver.storeCache()
         return string
 
 
@@ -1503,9 +1907,60 @@ class Geometry(Runner):
         string = cnfserver.char.join(cnfserver.geometryCmd(
             options.args, options.mandatory,
             options.private))
+        cnfserver.storeCache()
         return string
 
 
+def devFailedMessage(e):
+    """ provides the error message of a configuration server error
+
+    :param e: raised exception
+    :type e: :obj:`Exception`
+    :returns: error message or None if the exception is not DevFailed
+    :rtype: :obj:`str`
+    """
+    if not PYTANGO or not isinstance(e, tango.DevFailed):
+        return None
+    desc = str((e.args[0]).desc)
+    if desc.startswith("NonregisteredDBRecordError: The datasource "):
+        mydss = desc[43:].split()
+        if not mydss or not mydss[0]:
+            mydss = ["UKNOWN"]
+        return "Error: Datasource %s not stored in Configuration Server\n" \
+            % mydss[0]
+    elif desc.startswith(
+            "nxsconfigserver.Errors.NonregisteredDBRecordError:"
+            " The datasource "):
+        mydss = desc[66:].split()
+        if not mydss or not mydss[0]:
+            mydss = ["UKNOWN"]
+        return "Error: Datasource %s not stored in Configuration Server\n" \
+            % mydss[0]
+    elif desc.startswith("NonregisteredDBRecordError: Component "):
+        mydss = desc[38:].split()
+        if not mydss or not mydss[0]:
+            mydss = ["UKNOWN"]
+        return "Error: Component %s not stored in Configuration Server\n" \
+            % mydss[0]
+    elif desc.startswith(
+            "nxsconfigserver.Errors.NonregisteredDBRecordError:"
+            " Component "):
+        mydss = desc[61:].split()
+        if not mydss or not mydss[0]:
+            mydss = ["UKNOWN"]
+        return "Error: Component %s not stored in Configuration Server\n" \
+            % mydss[0]
+    elif desc.startswith('IncompatibleNodeError: '):
+        return "Error:%s\n" % desc[22:]
+    elif desc.startswith('nxsconfigserver.Errors.IncompatibleNodeError: '):
+        return "Error:%s\n" % desc[45:]
+    elif desc.startswith('ExpatError: '):
+        return "Error from XML parser: %s\n" % desc[12:]
+    elif desc.startswith('nxsconfigserver.Errors.ExpatError: '):
+        return "Error from XML parser: %s\n" % desc[35:]
+    return "Error: %s\n" % str(e)
+
+
 def main():
     """ the main program function
     """
@@ -1533,6 +1988,7 @@ def main():
                          ('record', Record),
                          ('merge', Merge),
                          ('components', Components),
+                         ('deps', Deps),
                          ('data', Data),
                          ('describe', Describe),
                          ('info', Info),
@@ -1601,72 +2057,9 @@ def main():
             sys.stderr.flush()
             sys.exit(255)
 
-        if PYTANGO and isinstance(e, tango.DevFailed):
-            # print(str((e.args[0]).desc))
-            if str((e.args[0]).desc).startswith(
-                    "NonregisteredDBRecordError: The datasource "):
-                mydss = str((e.args[0]).desc)[43:].split()
-                if not mydss or not mydss[0]:
-                    mydss = ["UKNOWN"]
-                sys.stderr.write(
-                    "Error: Datasource %s not stored in Configuration Server\n"
-                    % mydss[0])
-                sys.stderr.flush()
-            elif str((e.args[0]).desc).startswith(
-                    "nxsconfigserver.Errors.NonregisteredDBRecordError:"
-                    " The datasource "):
-                mydss = str((e.args[0]).desc)[66:].split()
-                if not mydss or not mydss[0]:
-                    mydss = ["UKNOWN"]
-                sys.stderr.write(
-                    "Error: Datasource %s not stored in Configuration Server\n"
-                    % mydss[0])
-                sys.stderr.flush()
-            elif str((e.args[0]).desc).startswith(
-                    "NonregisteredDBRecordError: Component "):
-                mydss = str((e.args[0]).desc)[38:].split()
-                if not mydss or not mydss[0]:
-                    mydss = ["UKNOWN"]
-                sys.stderr.write(
-                    "Error: Component %s not stored in Configuration Server\n"
-                    % mydss[0])
-                sys.stderr.flush()
-            elif str((e.args[0]).desc).startswith(
-                    "nxsconfigserver.Errors.NonregisteredDBRecordError:"
-                    " Component "):
-                mydss = str((e.args[0]).desc)[61:].split()
-                if not mydss or not mydss[0]:
-                    mydss = ["UKNOWN"]
-                sys.stderr.write(
-                    "Error: Component %s not stored in Configuration Server\n"
-                    % mydss[0])
-                sys.stderr.flush()
-            elif str((e.args[0]).desc).startswith(
-                    'IncompatibleNodeError: '):
-                sys.stderr.write("Error:%s\n" % (e.args[0]).desc[22:])
-                sys.stderr.flush()
-            elif str((e.args[0]).desc).startswith(
-                    'nxsconfigserver.Errors.IncompatibleNodeError: '):
-                sys.stderr.write("Error:%s\n" % (e.args[0]).desc[45:])
-                sys.stderr.flush()
-            elif str((e.args[0]).desc).startswith(
-                    'ExpatError: '):
-                sys.stderr.write("Error from XML parser: %s\n"
-                                 % (e.args[0]).desc[12:])
-                sys.stderr.flush()
-            elif str((e.args[0]).desc).startswith(
-                    'nxsconfigserver.Errors.ExpatError: '):
-                sys.stderr.write("Error from XML parser: %s\n"
-                                 % (e.args[0]).desc[35:])
-                sys.stderr.flush()
-            else:
-                sys.stderr.write("Error: %s\n" % str(e))
-                sys.stderr.flush()
-            sys.exit(255)
-        else:
-            sys.stderr.write("Error: %s\n" % str(e))
-            sys.stderr.flush()
-            sys.exit(255)
+        sys.stderr.write(devFailedMessage(e) or "Error: %s\n" % str(e))
+        sys.stderr.flush()
+        sys.exit(255)
 #        raise
     if result and str(result).strip():
         print(result)
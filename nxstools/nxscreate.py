@@ -440,6 +440,10 @@ class OnlineDS(Runner):
                             dest="external", default="")
         parser.add_argument("-p", "--xml-package", dest="xmlpackage",
                             help="xml template package")
+        parser.add_argument("-j", "--jobs", dest="jobs", type=int,
+                            default=16,
+                            help="number of devices queried in parallel "
+                            "(default: 16)")
         parser.add_argument("-c", "--clientlike", action="store_true",
                             default=False, dest="oldclientlike",
                             help="set motor tango datasources to "
@@ -642,7 +646,11 @@ class Compare(Runner):
         + "       nxscreate compare /online_dir/online_040.xml online.xml \n" \
         + "\n" \
         + "           - compare '/online_dir/online_040.xml' to 'online.xml'" \
-        + "\n"
+        + "\n" \
+        + "       nxscreate compare --json online_040.xml online.xml \n" \
+        + "\n" \
+        + "           - print differences as JSON with 'removed', " \
+        + "'added' and 'changed' devices\n"
 
     def create(self):
         """ creates parser
@@ -651,6 +659,9 @@ class Compare(Runner):
         parser.add_argument("-n", "--nolower", action="store_false",
                             default=True, dest="lower",
                             help="do not change aliases into lower case")
+        parser.add_argument("--json", action="store_true",
+                            default=False, dest="json",
+                            help="print differences in the JSON format")
 
     def postauto(self):
         """ creates parser
@@ -758,6 +769,12 @@ class OnlineCP(Runner):
         parser.add_argument("-o", "--overwrite", action="store_true",
                             default=False, dest="overwrite",
                             help="overwrite existing component")
+        parser.add_argument("--incremental", action="store_true",
+                            default=False, dest="incremental",
+                            help="regenerate the component only when "
+                            "its templates, variables or online.xml "
+                            "device entries changed since the last "
+                            "incremental run")
         parser.add_argument("-d", "--directory",
                             help="output datasource directory",
                             dest="directory", default=".")
@@ -906,6 +923,12 @@ class StdComp(Runner):
         parser.add_argument("-o", "--overwrite", action="store_true",
                             default=False, dest="overwrite",
                             help="overwrite existing component")
+        parser.add_argument("--incremental", action="store_true",
+                            default=False, dest="incremental",
+                            help="regenerate the component only when "
+                            "its templates, variables or online.xml "
+                            "device entries changed since the last "
+                            "incremental run")
         parser.add_argument("-b", "--database", action="store_true",
                             default=False, dest="database",
                             help="store components in"
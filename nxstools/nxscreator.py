@@ -22,8 +22,12 @@ import copy
 import os.path
 import json
 import sys
+import hashlib
+import io
+from concurrent.futures import ThreadPoolExecutor
 
 from operator import itemgetter
+from collections import deque
 
 import lxml.etree as etree
 import xml.etree.ElementTree as et
@@ -33,23 +37,12 @@ from nxstools.nxsdevicetools import (
     storeDataSource, getDataSourceComponents, storeComponent,
     moduleAttributes, moduleAttributeMap, motorModules,
     generateDeviceNames, getServerTangoHost,
-    openServer, findClassName,
-    xmlPackageHandler)
+    openServer, findClassName, getDeviceProxy,
+    xmlPackageHandler, PYTANGO)
 from nxstools.nxsxml import (XMLFile, NDSource, NGroup, NField, NLink,
                              NAttr, NDimensions)
 from nxstools.pyeval.secop import secop_cmd
 
-#: (:obj:`bool`) True if PyTango available
-PYTANGO = False
-try:
-    try:
-        import tango
-    except Exception:
-        import PyTango as tango
-    PYTANGO = True
-except Exception:
-    pass
-
 if sys.version_info > (3,):
     basestring = str
     unicode = str
@@ -147,6 +140,30 @@ def _simpletoxml(node):
         return _tostr(et.tostring(node, encoding='utf8', method='xml'))
 
 
+#: (:obj:`dict` <:obj:`str`, :obj:`tuple`>) template file contents
+#:     with their modification times, sizes and checksums
+templateCache = {}
+
+
+def _readTemplate(filename):
+    """ reads the template file content once per its modification
+
+    :param filename: template file name
+    :type filename: :obj:`str`
+    :returns: template content and its checksum
+    :rtype: (:obj:`str`, :obj:`str`)
+    """
+    st = os.stat(filename)
+    cached = templateCache.get(filename)
+    if cached is None or cached[0] != st.st_mtime or cached[1] != st.st_size:
+        with open(filename, "r") as content_file:
+            xmlcontent = content_file.read()
+        cached = (st.st_mtime, st.st_size, xmlcontent,
+                  hashlib.sha1(xmlcontent.encode("utf-8")).hexdigest())
+        templateCache[filename] = cached
+    return cached[2], cached[3]
+
+
 class Device(object):
 
     """ device from online.xml
@@ -191,12 +208,22 @@ class Device(object):
         #: (:obj:`str`) attribute name
         self.attribute = None
 
+    #: (:obj:`list` <:obj:`str`>) attributes compared between online.xml files
+    compared = [
+        "name", "dtype", "module", "tdevice", "hostname",
+        "sardananame", "sardanahostname"]
+
+    def signature(self):
+        """ provides values of compared attributes
+
+        :returns: tuple with values of compared attributes
+        :rtype: :obj:`tuple`
+        """
+        return tuple(getattr(self, at) for at in self.compared)
+
     def compare(self, dv):
         dct = {}
-        tocompare = [
-            "name", "dtype", "module", "tdevice", "hostname",
-            "sardananame", "sardanahostname"]
-        for at in tocompare:
+        for at in self.compared:
             v1 = getattr(self, at)
             v2 = getattr(dv, at)
             if v1 != v2:
@@ -241,7 +268,7 @@ class Device(object):
         self.sport = None
         if PYTANGO:
             try:
-                dp = tango.DeviceProxy(str("%s/%s" % (mhost, self.name)))
+                dp = getDeviceProxy(str("%s/%s" % (mhost, self.name)))
                 mdevice = str(dp.name())
 
                 #  self.hostname = mhost
@@ -281,10 +308,10 @@ class Device(object):
         elif PYTANGO and self.module in moduleAttributes:
             try:
                 try:
-                    dp = tango.DeviceProxy(
+                    dp = getDeviceProxy(
                         str("%s/%s" % (mhost, self.sardananame)))
                 except Exception:
-                    dp = tango.DeviceProxy(str("%s/%s" % (mhost, self.name)))
+                    dp = getDeviceProxy(str("%s/%s" % (mhost, self.name)))
                 mdevice = str(dp.name())
 
                 sarattr = moduleAttributes[self.module][0]
@@ -673,11 +700,14 @@ class Creator(object):
         children = parent.findall(childname)
         return cls._getText(children[0]) if len(children) else None
 
-    def _getModuleName(self, device):
+    def _getModuleName(self, device, messages=None):
         """ provides module name
 
         :param device: device name
         :type device: :obj:`str`
+        :param messages: list to collect info messages instead of
+                         writing them to stderr
+        :type messages: :obj:`list` <:obj:`str`>
         :returns: module name
         :rtype: :obj:`str`
         """
@@ -686,7 +716,8 @@ class Creator(object):
             return device.module.lower()
         elif len(device.tdevice.split('/')) == 3:
             try:
-                classname = findClassName(device.hostname, device.tdevice)
+                classname = findClassName(
+                    device.hostname, device.tdevice, messages)
                 if classname.lower() \
                    in self.xmlpackage.moduleMultiAttributes.keys():
                     return classname.lower()
@@ -1213,6 +1244,7 @@ class OnlineDSCreator(Creator):
             except Exception:
                 dscps = {}
 
+        devices = []
         for device in hw:
             if device.tag == 'device':
                 dv = Device()
@@ -1228,76 +1260,100 @@ class OnlineDSCreator(Creator):
                     dv.tolower()
                 try:
                     dv.splitHostPort()
+                    devices.append((dv, True))
                 except Exception:
-                    if self._printouts:
-                        print("ERROR %s: host for module %s of %s "
-                              "type not defined"
-                              % (dv.name, dv.module, dv.dtype))
-                    continue
-                dv.findAttribute(tangohost, self.options.clientlike)
-                created = False
-                if dv.attribute:
-                    dv.setSardanaName(self.options.lower)
+                    devices.append((dv, False))
+
+        def introspect(dv):
+            # tango queries of the device run in parallel
+            messages = []
+            dv.findAttribute(tangohost, self.options.clientlike)
+            try:
+                return self._getModuleName(dv, messages), None, messages
+            except Exception as e:
+                return None, e, messages
+
+        jobs = max(1, int(getattr(self.options, "jobs", None) or 16))
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(introspect, dv) if valid else None
+                       for dv, valid in devices]
+
+        # xmls are generated in the online.xml order
+        for (dv, valid), future in zip(devices, futures):
+            if not valid:
+                if self._printouts:
+                    print("ERROR %s: host for module %s of %s "
+                          "type not defined"
+                          % (dv.name, dv.module, dv.dtype))
+                continue
+            module, error, messages = future.result()
+            for message in messages:
+                sys.stderr.write(message)
+                sys.stderr.flush()
+            created = False
+            if dv.attribute:
+                dv.setSardanaName(self.options.lower)
+                mdv = copy.copy(dv)
+                mdv.tdevice = dv.sdevice or dv.tdevice
+                self._printAction(mdv, dscps)
+                xml = self._createTangoDataSource(
+                    mdv.name, None, None, None,
+                    mdv.tdevice, mdv.attribute, mdv.host,
+                    mdv.port, mdv.group)
+                self.datasources[mdv.name] = xml
+                created = True
+            if error is not None:
+                raise error
+            smodule = "%s@pool" % module.lower() if module else None
+            if module and module.lower() in \
+               self.xmlpackage.moduleMultiAttributes.keys():
+                multattr = self.xmlpackage.moduleMultiAttributes[
+                    module.lower()]
+                for at in multattr:
+                    dsname = "%s_%s" % (dv.name.lower(), at.lower())
+                    xml = self._createTangoDataSource(
+                        dsname, None, None, None,
+                        dv.tdevice, at, dv.thost, dv.tport,
+                        "%s_" % (dv.name))
+                    self.datasources[dsname] = xml
                     mdv = copy.copy(dv)
-                    mdv.tdevice = dv.sdevice or dv.tdevice
+                    mdv.name = dsname
+                    mdv.hostname = "%s:%s" % (dv.thost, dv.tport)
+                    mdv.attribute = at
                     self._printAction(mdv, dscps)
-                    xml = self._createTangoDataSource(
-                        mdv.name, None, None, None,
-                        mdv.tdevice, mdv.attribute, mdv.host,
-                        mdv.port, mdv.group)
-                    self.datasources[mdv.name] = xml
-                    created = True
-                module = self._getModuleName(dv)
-                smodule = "%s@pool" % module.lower() if module else None
-                if module and module.lower() in \
-                   self.xmlpackage.moduleMultiAttributes.keys():
-                    multattr = self.xmlpackage.moduleMultiAttributes[
-                        module.lower()]
-                    for at in multattr:
-                        dsname = "%s_%s" % (dv.name.lower(), at.lower())
+                created = True
+            if smodule in \
+               self.xmlpackage.moduleMultiAttributes.keys():
+                smultattr = self.xmlpackage.moduleMultiAttributes[
+                    smodule]
+                if smultattr and not dv.sdevice:
+                    if self._printouts:
+                        print(
+                            "SKIPPING %s: Device cannot be found" %
+                            dv.name)
+                else:
+                    for at in smultattr:
+                        dsname = "%s_%s" % (
+                            dv.name, at.lower())
                         xml = self._createTangoDataSource(
                             dsname, None, None, None,
-                            dv.tdevice, at, dv.thost, dv.tport,
+                            dv.sdevice, at, dv.shost, dv.sport,
                             "%s_" % (dv.name))
+                        #   "__CLIENT__")
                         self.datasources[dsname] = xml
                         mdv = copy.copy(dv)
                         mdv.name = dsname
-                        mdv.hostname = "%s:%s" % (dv.thost, dv.tport)
+                        mdv.tdevice = dv.sdevice
+                        mdv.hostname = "%s:%s" % (dv.shost, dv.sport)
                         mdv.attribute = at
                         self._printAction(mdv, dscps)
                     created = True
-                if smodule in \
-                   self.xmlpackage.moduleMultiAttributes.keys():
-                    smultattr = self.xmlpackage.moduleMultiAttributes[
-                        smodule]
-                    if smultattr and not dv.sdevice:
-                        if self._printouts:
-                            print(
-                                "SKIPPING %s: Device cannot be found" %
-                                dv.name)
-                    else:
-                        for at in smultattr:
-                            dsname = "%s_%s" % (
-                                dv.name, at.lower())
-                            xml = self._createTangoDataSource(
-                                dsname, None, None, None,
-                                dv.sdevice, at, dv.shost, dv.sport,
-                                "%s_" % (dv.name))
-                            #   "__CLIENT__")
-                            self.datasources[dsname] = xml
-                            mdv = copy.copy(dv)
-                            mdv.name = dsname
-                            mdv.tdevice = dv.sdevice
-                            mdv.hostname = "%s:%s" % (dv.shost, dv.sport)
-                            mdv.attribute = at
-                            self._printAction(mdv, dscps)
-                        created = True
-                if not created:
-                    if self._printouts:
-                        print(
-                            "SKIPPING %s:    module '%s' of '%s' "
-                            "type not defined"
-                            % (dv.name, dv.module, dv.dtype))
+            if not created:
+                if self._printouts:
+                    print(
+                        "SKIPPING %s:    module '%s' of '%s' "
+                        "type not defined"
+                        % (dv.name, dv.module, dv.dtype))
 
 
 class CPCreator(Creator):
@@ -1329,11 +1385,152 @@ class CPCreator(Creator):
         self.xmltemplatepath = xmlPackageHandler.packagepath
         #: (:obj:`str`) xml template component package
         self.xmlpackage = xmlPackageHandler.package
+        #: (:obj:`dict` <:obj:`str`, :obj:`str` >) checksums
+        #:    of the used template files
+        self._templates = {}
+
+    def _readTemplate(self, xmlfile):
+        """ reads the xml template file of the package
+
+        :param xmlfile: template file name
+        :type xmlfile: :obj:`str`
+        :returns: template content
+        :rtype: :obj:`str`
+        """
+        filename = '%s/%s' % (self.xmltemplatepath, xmlfile)
+        xmlcontent, checksum = _readTemplate(filename)
+        self._templates[filename] = checksum
+        return xmlcontent
+
+    def _openTemplate(self, xmlfile):
+        """ opens the xml template file of the package
+
+        :param xmlfile: template file name
+        :type xmlfile: :obj:`str`
+        :returns: file-like object with the template content
+        :rtype: :class:`io.StringIO`
+        """
+        return io.StringIO(self._readTemplate(xmlfile))
+
+    def _onlineFile(self):
+        """ provides the online.xml file name
+
+        :returns: online.xml file name
+        :rtype: :obj:`str`
+        """
+        return None
+
+    def _inputChecksum(self, cpname):
+        """ provides checksum of the creator options, arguments
+        and the online.xml device entries of the component
+
+        :param cpname: component name
+        :type cpname: :obj:`str`
+        :returns: input checksum
+        :rtype: :obj:`str`
+        """
+        options = dict(
+            (key, value) for key, value in vars(self.options).items()
+            if key not in ["overwrite", "incremental"])
+        entries = []
+        if cpname and self.options.lower:
+            cpname = cpname.lower()
+        onlinefile = self._onlineFile()
+        if onlinefile:
+            hw = etree.parse(
+                onlinefile, parser=XMLParser(collect_ids=False)).getroot()
+            if hw.tag != 'hw':
+                hw = hw.find('hw')
+            for device in (hw if hw is not None else []):
+                if device.tag == 'device':
+                    name = self._getChildText(device, "sardananame") or \
+                        self._getChildText(device, "name")
+                    if name and self.options.lower:
+                        name = name.lower()
+                    if name == cpname:
+                        entries.append(_tostr(etree.tostring(device)))
+        inputs = json.dumps(
+            [self.__class__.__name__, options, self.args, entries],
+            sort_keys=True, default=str)
+        return hashlib.sha1(inputs.encode("utf-8")).hexdigest()
+
+    def __manifestFile(self):
+        """ provides the incremental mode manifest file name
+
+        :returns: manifest file name
+        :rtype: :obj:`str`
+        """
+        return os.path.join(
+            self.options.directory or ".",
+            ".%snxscreate.json" % (self.options.file or ""))
+
+    def __loadManifest(self):
+        """ loads the incremental mode manifest
+
+        :returns: manifest with component input checksums
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`dict`>
+        """
+        try:
+            with open(self.__manifestFile()) as fl:
+                return json.load(fl)
+        except Exception:
+            return {}
+
+    def __isUpToDate(self, cpname, entry):
+        """ checks if the component inputs did not change
+        since the last run
+
+        :param cpname: component name
+        :type cpname: :obj:`str`
+        :param entry: manifest entry of the component
+        :type entry: :obj:`dict` <:obj:`str`, `any`>
+        :returns: True if the component does not need to be regenerated
+        :rtype: :obj:`bool`
+        """
+        if not entry or entry.get("inputs") != self._inputChecksum(cpname):
+            return False
+        for filename, checksum in entry.get("templates", {}).items():
+            try:
+                if _readTemplate(filename)[1] != checksum:
+                    return False
+            except Exception:
+                return False
+        if hasattr(self.options, "database") and self.options.database:
+            return self._areComponentsAvailable(
+                entry.get("components", []), self.options.server,
+                self.options.lower) and self._areDataSourcesAvailable(
+                    entry.get("datasources", []), self.options.server,
+                    self.options.lower)
+        return not self._missingFiles(
+            entry.get("components", []), ".xml") and \
+            not self._missingFiles(entry.get("datasources", []), ".ds.xml")
+
+    def _missingFiles(self, names, ext):
+        """ provides names of the output files which do not exist
+
+        :param names: item names
+        :type names: :obj:`list` <:obj:`str`>
+        :param ext: file extension
+        :type ext: :obj:`str`
+        :returns: missing item names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return [name for name in names
+                if not os.path.isfile("%s/%s%s%s" % (
+                    self.options.directory, self.options.file, name, ext))]
 
     def create(self):
         """ creates components of all online.xml complex devices
         """
         cpname = self.options.component
+        incremental = getattr(self.options, "incremental", False)
+        if incremental:
+            manifest = self.__loadManifest()
+            if self.__isUpToDate(cpname, manifest.get(cpname)):
+                if self._printouts:
+                    print("UNCHANGED '%s'" % cpname)
+                return
+            self.options.overwrite = True
         if hasattr(self.options, "database") and \
            self.options.database:
             server = self.options.server
@@ -1375,6 +1572,16 @@ class CPCreator(Creator):
                         self.options.directory,
                         self.options.file, cpname), "w") as myfile:
                     myfile.write(cpxml)
+        if incremental:
+            manifest = self.__loadManifest()
+            manifest[self.options.component] = {
+                "inputs": self._inputChecksum(self.options.component),
+                "templates": self._templates,
+                "components": sorted(self.components.keys()),
+                "datasources": sorted(self.datasources.keys()),
+            }
+            with open(self.__manifestFile(), "w") as fl:
+                json.dump(manifest, fl, indent=1, sort_keys=True)
 
     @classmethod
     def _replaceName(cls, filename, cpname, module=None):
@@ -1458,8 +1665,13 @@ class CompareOnlineDS(object):
         :rtype: :obj:`str`
         """
 
-        children = parent.findall(childname)
-        return cls._getText(children[0]) if len(children) else None
+        child = parent.find(childname)
+        if child is None:
+            return None
+        text = child.text or ""
+        if not len(child) and ">" not in text:
+            return text
+        return cls._getText(child)
 
     def _load(self, fname):
         """ loads device data from online.xml file
@@ -1495,8 +1707,44 @@ class CompareOnlineDS(object):
                 dct[sname].append(dv)
         return dct
 
+    @classmethod
+    def _match(cls, devices1, devices2):
+        """ matches equal devices of two lists in linear time
+
+        Every device of the first list is paired with the first
+        not yet paired equal device of the second list.
+
+        :param devices1: devices of the first file
+        :type devices1: :obj:`list` <:class:`Device`>
+        :param devices2: devices of the second file
+        :type devices2: :obj:`list` <:class:`Device`>
+        :returns: indices of not paired devices of both lists
+        :rtype: (:obj:`list` <:obj:`int`>, :obj:`list` <:obj:`int`>)
+        """
+        free = {}
+        for i2, dv in enumerate(devices2):
+            free.setdefault(dv.signature(), deque()).append(i2)
+        left1 = []
+        paired2 = set()
+        for i1, dv in enumerate(devices1):
+            queue = free.get(dv.signature())
+            if queue:
+                paired2.add(queue.popleft())
+            else:
+                left1.append(i1)
+        left2 = [i2 for i2 in range(len(devices2)) if i2 not in paired2]
+        return left1, left2
+
     def compare(self):
-        if self._printouts:
+        """ compares two online.xml files
+
+        :returns: dictionary with devices only in the first file,
+                  devices only in the second file and differences
+                  in the common part
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`dict`>
+        """
+        asjson = getattr(self.options, "json", False)
+        if self._printouts and not asjson:
             print("Comparing: %s\n" % " ".join(self.args))
         dct1 = self._load(self.args[0])
         dct2 = self._load(self.args[1])
@@ -1513,48 +1761,43 @@ class CompareOnlineDS(object):
                      for k in d2md1)
         diff = {}
         for name in common:
-            ndiff = {}
-            l1 = [True] * len(dct1[name])
-            l2 = [True] * len(dct2[name])
-            for i1, dv1 in enumerate(dct1[name]):
-                for i2, dv2 in enumerate(dct2[name]):
-                    if l1[i1] and l2[i2]:
-                        res = dv1.compare(dv2)
-                        if not res:
-                            l1[i1] = False
-                            l2[i2] = False
-                            break
-                        else:
-                            ndiff["%s:%s" % (i1, i2)] = res
-            if True in l1 and True not in l2:
-                addd1[str(name)] = []
-                for i1, dv in enumerate(dct1[name]):
-                    if l1[i1]:
-                        addd1[str(name)].append(
-                            (str(dv.name) if dv.name else dv.name))
-            elif True not in l1 and True in l2:
-                addd2[str(name)] = []
-                for i2, dv in enumerate(dct2[name]):
-                    if l2[i2]:
-                        addd2[str(name)].append(
-                            (str(dv.name) if dv.name else dv.name))
-            if True in l1 or True in l2:
-                diff[str(name)] = []
-                for i1, dv1 in enumerate(dct1[name]):
-                    for i2, dv2 in enumerate(dct2[name]):
-                        if l1[i1] and l2[i2]:
-                            diff[str(name)].append(ndiff["%s:%s" % (i1, i2)])
+            devices1 = dct1[name]
+            devices2 = dct2[name]
+            l1, l2 = self._match(devices1, devices2)
+            if l1 and not l2:
+                addd1[str(name)] = [
+                    (str(devices1[i1].name)
+                     if devices1[i1].name else devices1[i1].name)
+                    for i1 in l1]
+            elif not l1 and l2:
+                addd2[str(name)] = [
+                    (str(devices2[i2].name)
+                     if devices2[i2].name else devices2[i2].name)
+                    for i2 in l2]
+            if l1 or l2:
+                diff[str(name)] = [
+                    devices1[i1].compare(devices2[i2])
+                    for i1 in l1 for i2 in l2]
 
         if self._printouts:
-            import pprint
-            print("Additional devices in '%s' {alias: [name]} :\n"
-                  % self.args[0])
-            pprint.pprint(addd1)
-            print("\nAdditional devices in '%s' {alias: [name]} :\n"
-                  % self.args[1])
-            pprint.pprint(addd2)
-            print("\nDiffrences in the common part:\n")
-            pprint.pprint(diff)
+            if asjson:
+                print(json.dumps(
+                    {"files": list(self.args[:2]),
+                     "removed": addd1,
+                     "added": addd2,
+                     "changed": diff},
+                    indent=2, sort_keys=True))
+            else:
+                import pprint
+                print("Additional devices in '%s' {alias: [name]} :\n"
+                      % self.args[0])
+                pprint.pprint(addd1)
+                print("\nAdditional devices in '%s' {alias: [name]} :\n"
+                      % self.args[1])
+                pprint.pprint(addd2)
+                print("\nDiffrences in the common part:\n")
+                pprint.pprint(diff)
+        return {"removed": addd1, "added": addd2, "changed": diff}
 
 
 class OnlineCPCreator(CPCreator):
@@ -1598,6 +1841,17 @@ class OnlineCPCreator(CPCreator):
                     dv.tdevice, self.options.directory, self.options.file,
                     dv.name))
 
+    def _onlineFile(self):
+        """ provides the online.xml file name
+
+        :returns: online.xml file name
+        :rtype: :obj:`str`
+        """
+        if self.options.component and self.options.cptype and \
+           self.options.device:
+            return None
+        return self.args[0] if self.args else None
+
     def listcomponents(self):
         """ provides a list of components with xml templates
 
@@ -1757,11 +2011,7 @@ class OnlineCPCreator(CPCreator):
                                 module.lower()]
                             for xmlfile in xmlfiles:
                                 newname = self._replaceName(xmlfile, cpname)
-                                with open(
-                                        '%s/%s' % (
-                                            self.xmltemplatepath, xmlfile), "r"
-                                ) as content_file:
-                                    xmlcontent = content_file.read()
+                                xmlcontent = self._readTemplate(xmlfile)
                                 xml = xmlcontent.replace("$(name)", cpname)\
                                     .replace("$(device)", dv.tdevice)\
                                     .replace("$(__entryname__)",
@@ -2418,10 +2668,7 @@ class SECoPCPCreator(CPCreator):
         for xmlfile in xmlfiles:
             # print(xmlfile)
             newname = self._replaceName(xmlfile, dsname, module)
-            with open(
-                    '%s/%s' % (
-                        self.xmltemplatepath, xmlfile), "r"
-            ) as content_file:
+            with self._openTemplate(xmlfile) as content_file:
                 xmlcontent = content_file.read()
                 xml = xmlcontent.replace("$(name)", dsname)
                 missing = []
@@ -2523,10 +2770,7 @@ class SECoPCPCreator(CPCreator):
         for xmlfile in xmlfiles:
             # print(xmlfile)
             newname = self._replaceName(xmlfile, dsname, module)
-            with open(
-                    '%s/%s' % (
-                        self.xmltemplatepath, xmlfile), "r"
-            ) as content_file:
+            with self._openTemplate(xmlfile) as content_file:
                 xmlcontent = content_file.read()
                 xml = xmlcontent.replace("$(name)", dsname).replace(
                     "$(__entryname__)",
@@ -2698,6 +2942,14 @@ class StandardCPCreator(CPCreator):
         """
         return list(sorted(self.xmlpackage.standardComponentVariables.keys()))
 
+    def _onlineFile(self):
+        """ provides the online.xml file name
+
+        :returns: online.xml file name
+        :rtype: :obj:`str`
+        """
+        return self.options.onlinexmlfile or None
+
     def listcomponentvariables(self):
         """ provides a list of standard component types
 
@@ -2795,10 +3047,7 @@ class StandardCPCreator(CPCreator):
         for xmlfile in xmlfiles:
             # print(xmlfile)
             newname = self._replaceName(xmlfile, cpname, module)
-            with open(
-                    '%s/%s' % (
-                        self.xmltemplatepath, xmlfile), "r"
-            ) as content_file:
+            with self._openTemplate(xmlfile) as content_file:
                 xmlcontent = content_file.read()
                 xml = xmlcontent.replace("$(name)", cpname).replace(
                     "$(__entryname__)",
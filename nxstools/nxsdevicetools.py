@@ -20,8 +20,13 @@
 
 import sys
 import os
+import re
 import time
 import socket
+import threading
+
+from lxml import etree
+from lxml.etree import XMLParser
 
 #: (:obj:`dict` <:obj:`str` , :obj:`dict` <:obj:`str` , :obj:`str` > >)
 #:     standard component template variables
@@ -60,6 +65,8 @@ class PackageHandler(object):
         :param packagename: full package name
         :type packagename: :obj:`str`
         """
+        if self.package is not None and self.packagename == packagename:
+            return
         self.packagename = packagename
         global standardComponentVariables
         global standardComponentTemplateFiles
@@ -287,6 +294,7 @@ def storeDataSource(name, xml, server):
     proxy.Open()
     proxy.XMLString = str(xml)
     proxy.StoreDataSource(str(name))
+    dataSourceComponentsCache.pop(server, None)
 
 
 def getServerTangoHost(server):
@@ -311,9 +319,310 @@ def getServerTangoHost(server):
     return "%s:%s" % (host, port)
 
 
+#: (:obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`, :obj:`list`>>)
+#:     datasource components memoized by configuration server
+dataSourceComponentsCache = {}
+
+
+def _findReferences(text, label):
+    """ finds $<label>.<name> references in the text
+
+    :param text: xml text
+    :type text: :obj:`str`
+    :param label: reference label, e.g. 'components' or 'datasources'
+    :type label: :obj:`str`
+    :returns: referenced names
+    :rtype: :obj:`list` <:obj:`str`>
+    """
+    return re.findall(r"\$%s\.(\w+)" % label, text or "")
+
+
+def _elementDataSources(text):
+    """ finds names of datasource elements in the xml text
+
+    :param text: xml text
+    :type text: :obj:`str`
+    :returns: datasource names
+    :rtype: :obj:`list` <:obj:`str`>
+    """
+    names = []
+    counter = 0
+    root = etree.fromstring(
+        bytes(text, "utf-8") if sys.version_info > (3,) else text,
+        parser=XMLParser(collect_ids=False))
+    for node in root.iter("datasource"):
+        if "name" in node.attrib:
+            names.append(node.attrib["name"])
+        else:
+            names.append("__unnamed__%s" % counter)
+            counter += 1
+    return names
+
+
+class ComponentGraph(object):
+
+    """ component dependency graph of the configuration server
+    with datasource and variable reverse indexes
+
+    Component xmls are fetched in batches only when needed,
+    the reverse indexes fetch all remaining xmls at once.
+    """
+
+    def __init__(self, proxy):
+        """ constructor
+
+        :param proxy: configuration server proxy
+        :type proxy: :class:`tango.DeviceProxy`
+        """
+        #: (:class:`tango.DeviceProxy`) configuration server proxy
+        self._proxy = proxy
+        #: (:obj:`list` <:obj:`str`>) available components
+        self.components = list(proxy.AvailableComponents())
+        #: (:obj:`set` <:obj:`str`>) available component set
+        self.__components = set(self.components)
+        #: (:obj:`set` <:obj:`str`>) available datasource set
+        self.__datasources = None
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) component xmls
+        self.__xmls = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) datasource xmls
+        self.__dsxmls = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>)
+        #:     direct component dependencies
+        self.__dependencies = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>)
+        #:     direct component datasources
+        self.__cpdatasources = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`dict`>) reverse indexes
+        #:     with 'components', 'datasources' and 'variables' keys
+        self.__reverse = None
+
+    def hasComponent(self, name):
+        """ checks if the component is available
+
+        :param name: component name
+        :type name: :obj:`str`
+        :returns: True if the component is stored in the server
+        :rtype: :obj:`bool`
+        """
+        return name in self.__components
+
+    def hasDataSource(self, name):
+        """ checks if the datasource is available
+
+        :param name: datasource name
+        :type name: :obj:`str`
+        :returns: True if the datasource is stored in the server
+        :rtype: :obj:`bool`
+        """
+        return name in self.__availableDataSources()
+
+    def __availableDataSources(self):
+        """ provides available datasources
+
+        :returns: available datasource set
+        :rtype: :obj:`set` <:obj:`str`>
+        """
+        if self.__datasources is None:
+            self.__datasources = set(self._proxy.AvailableDataSources())
+        return self.__datasources
+
+    def __fetch(self, names):
+        """ fetches missing xmls of the available components in one call
+
+        :param names: component names
+        :type names: :obj:`list` <:obj:`str`>
+        """
+        missing = [nm for nm in dict.fromkeys(names)
+                   if nm in self.__components and nm not in self.__xmls]
+        if missing:
+            self.__xmls.update(zip(missing, self._proxy.Components(missing)))
+
+    def __fetchDataSources(self, names):
+        """ fetches missing xmls of the given datasources and
+        of the datasources they refer to
+
+        :param names: datasource names
+        :type names: :obj:`list` <:obj:`str`>
+        """
+        adss = self.__availableDataSources()
+        names = set(names)
+        while names:
+            missing = sorted(
+                nm for nm in names if nm in adss and nm not in self.__dsxmls)
+            if not missing:
+                break
+            self.__dsxmls.update(
+                zip(missing, self._proxy.DataSources(missing)))
+            names = set()
+            for nm in missing:
+                names.update(self.__dsxmls[nm] and _elementDataSources(
+                    self.__dsxmls[nm]) or [])
+                names.update(_findReferences(
+                    self.__dsxmls[nm], "datasources"))
+
+    def load(self):
+        """ fetches xmls of all components and of their datasources
+        """
+        self.__fetch(self.components)
+        names = set()
+        for xml in self.__xmls.values():
+            names.update(_findReferences(xml, "datasources"))
+            try:
+                names.update(_elementDataSources(xml))
+            except Exception:
+                pass
+        self.__fetchDataSources(names)
+
+    def dependencies(self, name):
+        """ provides direct dependencies of the component
+
+        :param name: component name
+        :type name: :obj:`str`
+        :returns: referred component names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        if name not in self.__dependencies:
+            if name not in self.__components:
+                raise Exception(
+                    "Component %s not stored in the NeXus database" % name)
+            self.__fetch([name])
+            self.__dependencies[name] = _findReferences(
+                self.__xmls[name], "components")
+        return self.__dependencies[name]
+
+    def dependentComponents(self, names):
+        """ provides the given components with all their dependencies
+        in the configuration server order
+
+        :param names: component names
+        :type names: :obj:`list` <:obj:`str`>
+        :returns: component names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        level = list(names)
+        found = set()
+        while level:
+            self.__fetch(level)
+            found.update(level)
+            level = [dp for nm in level for dp in self.dependencies(nm)
+                     if dp not in found]
+        result = []
+        visited = set()
+        tocheck = list(reversed(names))
+        while tocheck:
+            nm = tocheck.pop()
+            if nm not in visited:
+                visited.add(nm)
+                result.append(nm)
+                tocheck.extend(reversed(self.dependencies(nm)))
+        return result
+
+    def componentDataSources(self, name):
+        """ provides datasources of the component without its dependencies
+        including datasources nested in datasources
+
+        :param name: component name
+        :type name: :obj:`str`
+        :returns: datasource names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        if name not in self.__cpdatasources:
+            self.dependencies(name)
+            xml = self.__xmls[name]
+            direct = _elementDataSources(xml) + \
+                _findReferences(xml, "datasources")
+            self.__fetchDataSources(direct)
+            dss = []
+            tocheck = list(reversed(direct))
+            while tocheck:
+                ds = tocheck.pop()
+                if ds not in dss:
+                    dss.append(ds)
+                    dsxml = self.__dsxmls.get(ds)
+                    if dsxml:
+                        nested = [nm for nm in _elementDataSources(dsxml)
+                                  if nm != ds]
+                        nested.extend(_findReferences(dsxml, "datasources"))
+                        tocheck.extend(reversed(nested))
+            self.__cpdatasources[name] = dss
+        return self.__cpdatasources[name]
+
+    def componentVariables(self, name):
+        """ provides variables of the component without its dependencies
+
+        :param name: component name
+        :type name: :obj:`str`
+        :returns: variable names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        self.dependencies(name)
+        return list(dict.fromkeys(_findReferences(self.__xmls[name], "var")))
+
+    def __reverseIndexes(self):
+        """ builds reverse indexes of all components
+
+        :returns: reverse indexes with 'components', 'datasources'
+                  and 'variables' keys
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`,
+                :obj:`list` <:obj:`str`>>>
+        """
+        if self.__reverse is None:
+            self.load()
+            reverse = {"components": {}, "datasources": {}, "variables": {}}
+            for cp in self.components:
+                try:
+                    items = {
+                        "components": self.dependencies(cp),
+                        "datasources": self.componentDataSources(cp),
+                        "variables": self.componentVariables(cp),
+                    }
+                except Exception:
+                    continue
+                for kind, names in items.items():
+                    for nm in names:
+                        users = reverse[kind].setdefault(nm, [])
+                        if cp not in users:
+                            users.append(cp)
+            self.__reverse = reverse
+        return self.__reverse
+
+    def reverseComponents(self, names, kind="datasources",
+                          transitive=True):
+        """ provides components which use the given items
+
+        :param names: datasource, component or variable names
+        :type names: :obj:`list` <:obj:`str`>
+        :param kind: item kind, i.e. 'datasources', 'components'
+                     or 'variables'
+        :type kind: :obj:`str`
+        :param transitive: add components which depend on the found ones
+        :type transitive: :obj:`bool`
+        :returns: component names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        reverse = self.__reverseIndexes()
+        result = []
+        found = set()
+        level = [cp for nm in names for cp in reverse[kind].get(nm, [])]
+        while level:
+            nextlevel = []
+            for cp in level:
+                if cp not in found:
+                    found.add(cp)
+                    result.append(cp)
+                    if transitive:
+                        nextlevel.extend(
+                            reverse["components"].get(cp, []))
+            level = nextlevel
+        return result
+
+
 def getDataSourceComponents(server, verbose=False):
     """ gets datasource components
 
+    The result is built from the component graph of the server
+    and memoized per configuration server.
+
     :param server: configuration server
     :type server: :obj:`str`
     :param verbose: additional printouts
@@ -321,16 +630,20 @@ def getDataSourceComponents(server, verbose=False):
     :returns: dictionary with datasource components
     :rtype: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
     """
+    if server in dataSourceComponentsCache:
+        return dataSourceComponentsCache[server]
     dscps = {}
     proxy = openServer(server)
     proxy.Open()
-    acps = proxy.availableComponents()
+    graph = ComponentGraph(proxy)
+    graph.load()
+    acps = graph.components
     errcps = []
     for cp in acps:
         try:
-            depcps = proxy.dependentComponents([cp])
+            depcps = graph.dependentComponents([cp])
             for dcp in depcps:
-                dss = proxy.componentDataSources(dcp)
+                dss = graph.componentDataSources(dcp)
                 for ds in dss:
                     if ds not in dscps:
                         dscps[ds] = []
@@ -349,6 +662,7 @@ def getDataSourceComponents(server, verbose=False):
             % ", ".join(errcps))
         sys.stderr.flush()
 
+    dataSourceComponentsCache[server] = dscps
     return dscps
 
 
@@ -368,6 +682,7 @@ def storeComponent(name, xml, server, mandatory=False):
     proxy.Open()
     proxy.XMLString = str(xml)
     proxy.StoreComponent(str(name))
+    dataSourceComponentsCache.pop(server, None)
     if mandatory:
         proxy.SetMandatoryComponents([str(name)])
 
@@ -460,15 +775,95 @@ def listServers(server, name='NXSConfigServer'):
     return _remoteCall(server, getServers, name)
 
 
-def findClassName(server, name):
+#: (:obj:`int`) timeout in milliseconds of device introspection proxies
+DEVICE_TIMEOUT = 3000
+
+#: (:obj:`dict` <:obj:`str`, :class:`tango.DeviceProxy`>)
+#:     device introspection proxies by device name
+deviceProxies = {}
+
+#: (:obj:`dict` <:obj:`str`, :class:`tango.Database`>)
+#:     tango databases by tango host
+tangoDatabases = {}
+
+#: (:class:`threading.Lock`) introspection proxy cache lock
+proxylock = threading.Lock()
+
+
+def getDeviceProxy(name):
+    """ provides a shared device proxy with the introspection timeout
+
+    :param name: device name with optional tango host
+    :type name: :obj:`str`
+    :returns: device proxy
+    :rtype: :class:`tango.DeviceProxy`
+    """
+    with proxylock:
+        proxy = deviceProxies.get(name)
+    if proxy is None:
+        proxy = tango.DeviceProxy(name)
+        try:
+            proxy.set_timeout_millis(DEVICE_TIMEOUT)
+        except Exception:
+            pass
+        with proxylock:
+            proxy = deviceProxies.setdefault(name, proxy)
+    return proxy
+
+
+def getDatabase(tangohost):
+    """ provides a shared tango database of the tango host
+
+    :param tangohost: tango host with port, i.e. <host>:<port>
+    :type tangohost: :obj:`str`
+    :returns: tango database
+    :rtype: :class:`tango.Database`
+    """
+    with proxylock:
+        db = tangoDatabases.get(tangohost)
+    if db is None:
+        host, port = tangohost.split(":")
+        db = tango.Database(host, int(port))
+        with proxylock:
+            db = tangoDatabases.setdefault(tangohost, db)
+    return db
+
+
+def findClassName(server, name, messages=None):
     """ finds class name
 
+    The tango database of the server host is reused
+    and the process TANGO_HOST is not changed so it can be called
+    from many threads.
+
+    :param server: tango host or device name with tango host
+    :type server: :obj:`str`
     :param name: device name
     :type name: :obj:`str`
+    :param messages: list to collect info messages instead of
+                     writing them to stderr
+    :type messages: :obj:`list` <:obj:`str`>
     :returns: class name
     :rtype: :obj:`str`
     """
-    return _remoteCall(server, getClassName, name)
+    lserver = None
+    if server and ":" in server and server.strip():
+        lserver = server.split("/")[0].strip()
+    if not lserver:
+        return getClassName(name)
+    if ":" not in lserver:
+        lserver = lserver + ":10000"
+    try:
+        db = getDatabase(lserver)
+    except Exception:
+        message = "Info: Cannot connect to %s on host %s\n" % (name, lserver)
+        if messages is not None:
+            messages.append(message)
+        else:
+            sys.stderr.write(message)
+            sys.stderr.flush()
+        return ""
+    return db.get_class_for_device(name)
 
 
 def checkServer(name='NXSConfigServer'):
@@ -19,6 +19,7 @@
 """ Command-line tool for ascess to the nexdatas configuration server """
 
 import sys
+import re
 import json
 import fnmatch
 import xml.etree.ElementTree as et
@@ -240,9 +241,9 @@ class ParserTools(object):
                 if len(cresult.text) and cresult.text.strip():
                     teres = cresult.text.strip() or ""
                     lres = teres.split("\n")
-                    for re in lres:
-                        if re.strip().startswith(tres):
-                            res = re.strip()[len(tres):]
+                    for lre in lres:
+                        if lre.strip().startswith(tres):
+                            res = lre.strip()[len(tres):]
         return res
 
     @classmethod
@@ -313,98 +314,25 @@ class ParserTools(object):
         return dslist
 
     @classmethod
-    def __getPath(cls, node):
-        """ provides node path
-
-        :param node: etree node
-        :type node: :class:`lxml.etree.Element`
-        :returns: node path
-        :rtype: :obj:`str`
-        """
-        name = cls.__getAttr(node, "name")
-        if not name:
-            return ""
-        attr = False
-        while node.getparent() is not None:
-            onode = node
-            node = node.getparent()
-            if onode.tag == "attribute":
-                attr = True
-            else:
-                attr = False
-            if node.tag not in ["group", "field"]:
-                return name
-            else:
-                gname = cls.__getAttr(node, "name")
-                if not gname:
-                    gname = cls.__getAttr(node, "type")
-                    if len(gname) > 2:
-                        gname = gname[2:]
-                if attr:
-                    name = gname + "@" + name
-                else:
-                    name = gname + "/" + name
-                attr = False
-        return name
-
-    @classmethod
-    def __getFullPath(cls, node):
-        """ provides node path
-
-        :param node: etree node
-        :type node: :class:`lxml.etree.Element`
-        :returns: node path
-        :rtype: :obj:`str`
-        """
-        name = cls.__getAttr(node, "name")
-        if not name:
-            return ""
-        attr = False
-        while node.getparent() is not None:
-            onode = node
-            node = node.getparent()
-            if onode.tag == "attribute":
-                attr = True
-            else:
-                attr = False
-            if node.tag not in ["group", "field"]:
-                return name
-            else:
-                gname = cls.__getAttr(node, "name")
-                nxtype = cls.__getAttr(node, "type")
-                if not gname:
-                    if len(nxtype) > 2:
-                        gname = nxtype[2:]
-                if attr:
-                    name = gname + "@" + name
-                elif nxtype:
-                    name = "%s:%s/%s" % (gname, nxtype, name)
-                else:
-                    name = gname + "/" + name
-
-                attr = False
-        return name
-
-    @classmethod
-    def __getAttr(cls, node, name, tag=False):
+    def __getAttr(cls, node, name, tag=False, atnodes=None):
         """ provides value of attirbute
 
         :param node: etree node
         :type node: :class:`lxml.etree.Element`
+        :param atnodes: attribute nodes to search if already collected
+        :type atnodes: :obj:`list` <:class:`lxml.etree.Element`>
         :returns: attribute value
         :rtype: :obj:`str`
         """
         if name in node.attrib:
             return node.attrib[name]
         elif tag:
-            if node.tag == "attribute":
-                atnodes = [node]
-            else:
-                atnodes = []
-            atnodes.extend(node.findall("attribute"))
+            if atnodes is None:
+                atnodes = [node] if node.tag == "attribute" else []
+                atnodes.extend(node.findall("attribute"))
             text = None
             for at in atnodes:
-                if cls.__getAttr(at, "name") == name:
+                if at.attrib.get("name") == name:
                     text = str(cls._getPureText(at)).strip()
                     if not text:
                         dss = cls.__getDataSources(at)
@@ -485,6 +413,268 @@ class ParserTools(object):
         """
         return [ch for ch in parent.findall(name) if ch.tag == name]
 
+    @classmethod
+    def __getGroupName(cls, node, full=False):
+        """ provides name of the parent group or field in the node path
+
+        :param node: etree node
+        :type node: :class:`lxml.etree.Element`
+        :param full: flag for the full nexus path
+        :type full: :obj:`bool`
+        :returns: group name
+        :rtype: :obj:`str`
+        """
+        gname = cls.__getAttr(node, "name")
+        if not gname:
+            nxtype = cls.__getAttr(node, "type")
+            if len(nxtype or "") > 2:
+                gname = nxtype[2:]
+            elif not full:
+                gname = nxtype
+        return gname
+
+    @classmethod
+    def __joinPath(cls, prefix, name, separator="/"):
+        """ joins path prefix with a name
+
+        :param prefix: path prefix or None
+        :type prefix: :obj:`str`
+        :param name: name
+        :type name: :obj:`str`
+        :param separator: path separator
+        :type separator: :obj:`str`
+        :returns: joined path
+        :rtype: :obj:`str`
+        """
+        if prefix is None:
+            return name
+        return "%s%s%s" % (prefix, separator, name)
+
+    @classmethod
+    def __analyze(cls, indom, tags):
+        """ collects descriptions of the given tags in one depth-first
+        traversal computing nexus paths incrementally
+
+        :param indom: root node
+        :type indom: :class:`lxml.etree.Element`
+        :param tags: tag names to describe
+        :type tags: :obj:`list` <:obj:`str`>
+        :returns: description lists by tag names
+        :rtype: :obj:`dict` <:obj:`str`,
+                 :obj:`list` < :obj:`dict` <:obj:`str`, `any`> > >
+        """
+        result = dict((tag, []) for tag in tags)
+        # the parent info contains the nexus path and the full nexus path
+        # prefixes of the parent group or field and its names
+        stack = [(indom, None)]
+        while stack:
+            node, pinfo = stack.pop()
+            tag = node.tag
+            if not isinstance(tag, (str, unicode)):
+                continue
+            if tag in result:
+                name = cls.__getAttr(node, "name")
+                if not name:
+                    nxpath = fullnxpath = ""
+                elif pinfo is None:
+                    nxpath = fullnxpath = name
+                elif tag == "attribute":
+                    nxpath = cls.__joinPath(pinfo[0], name, "@")
+                    fullnxpath = cls.__joinPath(
+                        cls.__joinPath(pinfo[1], pinfo[2]), name, "@")
+                else:
+                    nxpath = cls.__joinPath(pinfo[0], name)
+                    fullnxpath = cls.__joinPath(
+                        cls.__joinPath(pinfo[1], pinfo[3]), name)
+                if tag == "datasource":
+                    # nested datasources are collected with their parent
+                    result[tag].extend(cls.__getDataSources(node))
+                    continue
+                elif tag == "link":
+                    result[tag].extend(cls.__getLinkInfo(node, nxpath))
+                else:
+                    result[tag].extend(
+                        cls.__getTagInfo(node, nxpath, fullnxpath))
+            cinfo = None
+            if tag in ["group", "field"]:
+                gname = cls.__getGroupName(node, True)
+                nxtype = cls.__getAttr(node, "type")
+                cinfo = (
+                    cls.__joinPath(
+                        pinfo[0] if pinfo else None,
+                        cls.__getGroupName(node)),
+                    cls.__joinPath(pinfo[1], pinfo[3]) if pinfo else None,
+                    gname,
+                    "%s:%s" % (gname, nxtype) if nxtype else gname
+                )
+            stack.extend((child, cinfo) for child in reversed(node))
+        return result
+
+    @classmethod
+    def __getTagInfo(cls, nd, nxpath, fullnxpath):
+        """ provides descriptions of a field or an attribute node
+
+        :param nd: field or attribute node
+        :type nd: :class:`lxml.etree.Element`
+        :param nxpath: nexus path
+        :type nxpath: :obj:`str`
+        :param fullnxpath: full nexus path
+        :type fullnxpath: :obj:`str`
+        :returns: list of descriptions
+        :rtype: :obj:`list` < :obj:`dict` <:obj:`str`, `any`> >
+        """
+        taglist = []
+        children = cls.__getChildrenByTagNames(nd)
+        atnodes = [nd] if nd.tag == "attribute" else []
+        atnodes.extend(children.get("attribute", []))
+        nxtype = cls.__getAttr(nd, "type")
+        units = cls.__getAttr(nd, "units")
+        value = cls._getPureText(nd) or None
+        trtype = cls.__getAttr(nd, "transformation_type", True, atnodes)
+        trvector = cls.__getAttr(nd, "vector", True, atnodes)
+        troffset = cls.__getAttr(nd, "offset", True, atnodes)
+        trdependson = cls.__getAttr(nd, "depends_on", True, atnodes)
+        dnodes = children.get("dimensions")
+        shape = cls.__getShape(dnodes[0]) if dnodes else None
+        stnodes = children.get("strategy")
+        strategy = cls.__getAttr(stnodes[0], "mode") \
+            if stnodes else None
+
+        sfdinfo = {
+            "strategy": strategy,
+            "nexus_path": nxpath,
+            "full_nexus_path": fullnxpath,
+        }
+        fdinfo = {
+            "nexus_type": nxtype,
+            "units": units,
+            "shape": shape,
+            "trans_type": trtype,
+            "trans_vector": trvector,
+            "trans_offset": troffset,
+            "depends_on": trdependson,
+            "value": value
+        }
+        if nd.tag == "field":
+            docnodes = children.get("doc")
+            fdinfo["doc"] = cls._getPureText((docnodes[0])) \
+                if docnodes else None
+        fdinfo.update(sfdinfo)
+        if nd.tag == "field":
+            otherinfo = cls.__getAllAttr(nd, list(fdinfo.keys()))
+            fdinfo.update(otherinfo)
+        dss = cls.__getDataSources(nd, direct=True)
+        if dss:
+            for ds in dss:
+                ds.update(fdinfo)
+                taglist.append(ds)
+                nddss = cls.__getChildrenByTagName(nd, "datasource")
+                for ndds in nddss:
+                    sdss = cls.__getDataSources(ndds, direct=True)
+                    if sdss:
+                        for sds in sdss:
+                            sds.update(sfdinfo)
+                            sds["source_name"] \
+                                = "\\" + sds["source_name"]
+                            taglist.append(sds)
+        else:
+            taglist.append(fdinfo)
+        return taglist
+
+    @classmethod
+    def __getLinkInfo(cls, nd, nxpath):
+        """ provides descriptions of a link node
+
+        :param nd: link node
+        :type nd: :class:`lxml.etree.Element`
+        :param nxpath: nexus path
+        :type nxpath: :obj:`str`
+        :returns: list of descriptions
+        :rtype: :obj:`list` < :obj:`dict` <:obj:`str`, `any`> >
+        """
+        taglist = []
+        target = cls.__getAttr(nd, "target")
+        value = cls._getPureText(nd) or None
+        stnodes = cls.__getChildrenByTagName(nd, "strategy")
+        strategy = cls.__getAttr(stnodes[0], "mode") \
+            if stnodes else None
+
+        sfdinfo = {
+            "strategy": strategy,
+            "nexus_path": "[%s]" % nxpath,
+        }
+        fdinfo = {
+            "value": value
+        }
+        fdinfo.update(sfdinfo)
+        dss = cls.__getDataSources(nd, direct=True)
+        if dss:
+            for ds in dss:
+                ds.update(fdinfo)
+                taglist.append(ds)
+                nddss = cls.__getChildrenByTagName(nd, "datasource")
+                for ndds in nddss:
+                    sdss = cls.__getDataSources(ndds, direct=True)
+                    if sdss:
+                        for sds in sdss:
+                            sds.update(sfdinfo)
+                            sds["source_name"] \
+                                = "\\" + sds["source_name"]
+                            taglist.append(sds)
+        else:
+            taglist.append(fdinfo)
+            if target and target.strip():
+                fdinfo2 = dict(fdinfo)
+                fdinfo2["nexus_path"] = "\\-> %s" % target
+                taglist.append(fdinfo2)
+        return taglist
+
+    @classmethod
+    def parseComponent(cls, xmlc, attributes=True, datasources=False):
+        """ provides descriptions of fields, attributes and links
+        from xml string parsed once
+
+        :param xmlc: xml string
+        :type xmlc: :obj:`str`
+        :param attributes: flag set True for parsing attributes
+        :type attributes: :obj:`bool`
+        :param datasources: flag set True for parsing datasources
+        :type datasources: :obj:`bool`
+        :returns: description lists with 'fields', 'attributes',
+                  'links' and if requested 'datasources' keys
+        :rtype: :obj:`dict` <:obj:`str`,
+                 :obj:`list` < :obj:`dict` <:obj:`str`, `any`> > >
+        """
+        tags = ["field", "link"]
+        if attributes:
+            tags.append("attribute")
+        if datasources:
+            tags.append("datasource")
+        result = cls.__analyze(_parseString(xmlc), tags)
+        description = {
+            "fields": result["field"],
+            "attributes": result.get("attribute", []),
+            "links": result["link"],
+        }
+        if datasources:
+            description["datasources"] = result["datasource"]
+        return description
+
+    @classmethod
+    def __getChildrenByTagNames(cls, parent):
+        """ provides direct children grouped by their tag names
+
+        :param parent: parent node
+        :type parent: :class:`lxml.etree.Element`
+        :returns: lists of children by tag names
+        :rtype: :obj:`dict` <:obj:`str`,
+                 :obj:`list` <:class:`lxml.etree.Element`> >
+        """
+        children = {}
+        for ch in parent:
+            children.setdefault(ch.tag, []).append(ch)
+        return children
+
     @classmethod
     def parseFields(cls, xmlc):
         """ provides datasources and its records from xml string
@@ -494,69 +684,7 @@ class ParserTools(object):
         :returns: list of datasource descriptions
         :rtype: :obj:`list` < :obj:`dict` <:obj:`str`, `any`> >
         """
-        tagname = "field"
-        indom = _parseString(xmlc)
-        nodes = []
-        if indom.tag == tagname:
-            nodes.append(indom)
-        nodes.extend(indom.findall(".//%s" % tagname))
-        taglist = []
-        for nd in nodes:
-            if nd.tag == tagname:
-                nxtype = cls.__getAttr(nd, "type")
-                units = cls.__getAttr(nd, "units")
-                value = cls._getPureText(nd) or None
-                trtype = cls.__getAttr(nd, "transformation_type", True)
-                trvector = cls.__getAttr(nd, "vector", True)
-                troffset = cls.__getAttr(nd, "offset", True)
-                trdependson = cls.__getAttr(nd, "depends_on", True)
-                nxpath = cls.__getPath(nd)
-                fullnxpath = cls.__getFullPath(nd)
-                dnodes = cls.__getChildrenByTagName(nd, "dimensions")
-                shape = cls.__getShape(dnodes[0]) if dnodes else None
-                docnodes = cls.__getChildrenByTagName(nd, "doc")
-                doc = cls._getPureText((docnodes[0])) if docnodes else None
-                stnodes = cls.__getChildrenByTagName(nd, "strategy")
-                strategy = cls.__getAttr(stnodes[0], "mode") \
-                    if stnodes else None
-
-                sfdinfo = {
-                    "strategy": strategy,
-                    "nexus_path": nxpath,
-                    "full_nexus_path": fullnxpath,
-                }
-                fdinfo = {
-                    "nexus_type": nxtype,
-                    "units": units,
-                    "shape": shape,
-                    "trans_type": trtype,
-                    "trans_vector": trvector,
-                    "trans_offset": troffset,
-                    "depends_on": trdependson,
-                    "value": value,
-                    "doc": doc
-                }
-                fdinfo.update(sfdinfo)
-                otherinfo = cls.__getAllAttr(nd, list(fdinfo.keys()))
-                fdinfo.update(otherinfo)
-                dss = cls.__getDataSources(nd, direct=True)
-                if dss:
-                    for ds in dss:
-                        ds.update(fdinfo)
-                        taglist.append(ds)
-                        nddss = cls.__getChildrenByTagName(nd, "datasource")
-                        for ndds in nddss:
-                            sdss = cls.__getDataSources(ndds, direct=True)
-                            if sdss:
-                                for sds in sdss:
-                                    sds.update(sfdinfo)
-                                    sds["source_name"] \
-                                        = "\\" + sds["source_name"]
-                                    taglist.append(sds)
-                else:
-                    taglist.append(fdinfo)
-
-        return taglist
+        return cls.__analyze(_parseString(xmlc), ["field"])["field"]
 
     @classmethod
     def parseAttributes(cls, xmlc):
@@ -567,64 +695,8 @@ class ParserTools(object):
         :returns: list of datasource descriptions
         :rtype: :obj:`list` < :obj:`dict` <:obj:`str`, `any`> >
         """
-        tagname = "attribute"
-        indom = _parseString(xmlc)
-        nodes = []
-        if indom.tag == tagname:
-            nodes.append(indom)
-        nodes.extend(indom.findall(".//%s" % tagname))
-        taglist = []
-        for nd in nodes:
-            if nd.tag == tagname:
-
-                nxtype = cls.__getAttr(nd, "type")
-                units = cls.__getAttr(nd, "units")
-                value = cls._getPureText(nd) or None
-                trtype = cls.__getAttr(nd, "transformation_type", True)
-                trvector = cls.__getAttr(nd, "vector", True)
-                troffset = cls.__getAttr(nd, "offset", True)
-                trdependson = cls.__getAttr(nd, "depends_on", True)
-                nxpath = cls.__getPath(nd)
-                fullnxpath = cls.__getFullPath(nd)
-                dnodes = cls.__getChildrenByTagName(nd, "dimensions")
-                shape = cls.__getShape(dnodes[0]) if dnodes else None
-                stnodes = cls.__getChildrenByTagName(nd, "strategy")
-                strategy = cls.__getAttr(stnodes[0], "mode") \
-                    if stnodes else None
-                sfdinfo = {
-                    "strategy": strategy,
-                    "nexus_path": nxpath,
-                    "full_nexus_path": fullnxpath,
-                }
-                fdinfo = {
-                    "nexus_type": nxtype,
-                    "units": units,
-                    "shape": shape,
-                    "trans_type": trtype,
-                    "trans_vector": trvector,
-                    "trans_offset": troffset,
-                    "depends_on": trdependson,
-                    "value": value
-                }
-                fdinfo.update(sfdinfo)
-                dss = cls.__getDataSources(nd, direct=True)
-                if dss:
-                    for ds in dss:
-                        ds.update(fdinfo)
-                        taglist.append(ds)
-                        nddss = cls.__getChildrenByTagName(nd, "datasource")
-                        for ndds in nddss:
-                            sdss = cls.__getDataSources(ndds, direct=True)
-                            if sdss:
-                                for sds in sdss:
-                                    sds.update(sfdinfo)
-                                    sds["source_name"] \
-                                        = "\\" + sds["source_name"]
-                                    taglist.append(sds)
-                else:
-                    taglist.append(fdinfo)
-
-        return taglist
+        return cls.__analyze(
+            _parseString(xmlc), ["attribute"])["attribute"]
 
     @classmethod
     def parseLinks(cls, xmlc):
@@ -635,53 +707,7 @@ class ParserTools(object):
         :returns: list of datasource descriptions
         :rtype: :obj:`list` < :obj:`dict` <:obj:`str`, `any`> >
         """
-        tagname = "link"
-        indom = _parseString(xmlc)
-        nodes = []
-        if indom.tag == tagname:
-            nodes.append(indom)
-        nodes.extend(indom.findall(".//%s" % tagname))
-        taglist = []
-        for nd in nodes:
-            if nd.tag == tagname:
-
-                target = cls.__getAttr(nd, "target")
-                value = cls._getPureText(nd) or None
-                nxpath = cls.__getPath(nd)
-                stnodes = cls.__getChildrenByTagName(nd, "strategy")
-                strategy = cls.__getAttr(stnodes[0], "mode") \
-                    if stnodes else None
-
-                sfdinfo = {
-                    "strategy": strategy,
-                    "nexus_path": "[%s]" % nxpath,
-                }
-                fdinfo = {
-                    "value": value
-                }
-                fdinfo.update(sfdinfo)
-                dss = cls.__getDataSources(nd, direct=True)
-                if dss:
-                    for ds in dss:
-                        ds.update(fdinfo)
-                        taglist.append(ds)
-                        nddss = cls.__getChildrenByTagName(nd, "datasource")
-                        for ndds in nddss:
-                            sdss = cls.__getDataSources(ndds, direct=True)
-                            if sdss:
-                                for sds in sdss:
-                                    sds.update(sfdinfo)
-                                    sds["source_name"] \
-                                        = "\\" + sds["source_name"]
-                                    taglist.append(sds)
-                else:
-                    taglist.append(fdinfo)
-                    if target and target.strip():
-                        fdinfo2 = dict(fdinfo)
-                        fdinfo2["nexus_path"] = "\\-> %s" % target
-                        taglist.append(fdinfo2)
-
-        return taglist
+        return cls.__analyze(_parseString(xmlc), ["link"])["link"]
 
     @classmethod
     def parseRecord(cls, xmlc):
@@ -751,55 +777,59 @@ class TableTools(object):
     def loadDescription(self, description):
         """ loads description
 
+        Each cell is converted to its string once and the column widths
+        are updated in the same pass.
+
         :param description:  description list
         :type description:  :obj:`list` <:obj:`str`>
         """
         if self.headers:
             hkey = self.headers[0]
+        match = None
+        if self.filters:
+            match = re.compile(
+                "|".join(fnmatch.translate(df) for df in self.filters)).match
+        nonone = self.__nonone
+        hdsizes = self.__hdsizes
+        toString = self.__toString
         for desc in description:
             if desc is None:
-                self.__description.append(desc)
+                self.__description.append(None)
                 continue
-            skip = False
-            found = False
             field = desc.get("nexus_path", "").split('/')[-1]
             value = desc.get("value", "")
             if field == 'depends_on' and value:
                 desc["depends_on"] = "[%s]" % value
-            for hd in self.__nonone:
+            skip = False
+            for hd in nonone:
                 vl = desc.get(hd, "")
                 if isinstance(vl, (list, tuple)):
-                    vl = self.__toString(vl)
+                    vl = toString(vl)
                 if not vl:
                     skip = True
                     break
-            if self.filters and hkey in desc.keys():
-                vl = desc[hkey]
-                found = False
-                for df in self.filters:
-                    found = fnmatch.filter([vl], df)
-                    if found:
-                        break
-                if not found:
-                    skip = True
-                    continue
-            elif not self.filters:
-                found = True
-            if not skip and found:
-                self.__description.append(desc)
-        for desc in self.__description:
-            if desc is None:
+            if match is not None and \
+               (hkey not in desc or match(desc[hkey]) is None):
                 continue
+            if skip:
+                continue
+            row = {}
             for hd, vl in desc.items():
-                if hd not in self.__nonone or vl:
-                    if hd not in self.__hdsizes.keys():
-                        self.__hdsizes[hd] = max(len(hd) + 1, 5)
-                    if isinstance(vl, (list, tuple)):
-                        vl = self.__toString(vl)
-                    if not isinstance(vl, str):
-                        vl = str(vl)
-                    if self.__hdsizes[hd] <= len(vl):
-                        self.__hdsizes[hd] = len(vl) + 1
+                if type(vl) is str:
+                    svl = vl
+                elif vl is None:
+                    svl = "None"
+                elif isinstance(vl, (list, tuple)):
+                    svl = toString(vl)
+                else:
+                    svl = str(vl)
+                row[hd] = svl if vl is not None else ""
+                if vl or hd not in nonone:
+                    size = hdsizes.get(hd) or max(len(hd) + 1, 5)
+                    if size <= len(svl):
+                        size = len(svl) + 1
+                    hdsizes[hd] = size
+            self.__description.append(row)
 
     @classmethod
     def __toString(cls, lst):
@@ -815,62 +845,43 @@ class TableTools(object):
             res.append(it or "*")
         return str(res)
 
-    def generateList(self):
-        """ generate row lists of table
+    def generateLines(self):
+        """ generate rows of table one by one
 
-        :returns:  table rows
-        :rtype: :obj:`list` <:obj:`str`>
+        :returns:  table row generator
+        :rtype: :obj:`generator` <:obj:`str`>
         """
-        lst = [""]
+        yield ""
         if self.title is not None:
-            lst.append(self.title)
-            lst.append("-" * len(self.title))
-            lst.append("")
+            yield self.title
+            yield "-" * len(self.title)
+            yield ""
 
         headers = [hd for hd in self.headers if hd in self.__hdsizes.keys()]
-        line = ""
-        for hd in headers:
-            line += "=" * (self.__hdsizes[hd] - 1) + " "
-        lst.append(line)
-
-        line = ""
-        for hd in headers:
-            line += hd + " " * (self.__hdsizes[hd] - len(hd))
-        lst.append(line)
-
-        line = ""
-        for hd in headers:
-            line += "=" * (self.__hdsizes[hd] - 1) + " "
-        lst.append(line)
-
-        for desc in self.__description:
-            line = ""
-            if desc is None:
-                for hd in headers:
-                    line += "=" * (self.__hdsizes[hd] - 1) + " "
-                lst.append(line.rstrip())
+        sizes = [self.__hdsizes[hd] for hd in headers]
+        border = "".join("=" * (size - 1) + " " for size in sizes)
+        yield border
+        yield "".join(hd + " " * (size - len(hd))
+                      for hd, size in zip(headers, sizes))
+        yield border
+
+        fmt = "".join("%%-%ss" % size for size in sizes)
+        for row in self.__description:
+            if row is None:
+                yield border.rstrip()
                 continue
-            line = ""
-            for hd in headers:
-                vl = desc[hd] if hd in desc else None
-                if isinstance(vl, (list, tuple)):
-                    vl = self.__toString(vl)
-                elif vl is None:
-                    vl = ""
-                elif not isinstance(vl, str):
-                    vl = str(vl)
-                line += vl + " " * (self.__hdsizes[hd] - len(vl))
+            yield (fmt % tuple(row.get(hd, "") for hd in headers)).rstrip()
 
-            lst.append(line.rstrip())
+        yield border
+        yield ""
 
-        line = ""
-        for hd in headers:
-            line += "=" * (self.__hdsizes[hd] - 1) + " "
-        lst.append(line)
-
-        lst.append("")
+    def generateList(self):
+        """ generate row lists of table
 
-        return lst
+        :returns:  table rows
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        return list(self.generateLines())
 
 
 class TableDictTools(object):
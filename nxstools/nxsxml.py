@@ -23,7 +23,12 @@ try:
     import tango
 except Exception:
     import PyTango as tango
+import json
+import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import lxml.etree
 
@@ -519,6 +524,422 @@ class NDSource(NTag):
         self._doc[-1].addText(doc)
 
 
+#: (:obj:`str`) environment variable with the device snapshot file
+SNAPSHOT_ENV = "NXSXML_SNAPSHOTS"
+
+#: (:obj:`str`) device property with the server build version,
+#:    most tango servers do not define it
+VERSION_PROPERTY = "Version"
+
+#: (:obj:`float`) time-to-live in seconds of snapshots of devices
+#:    without the version property
+SNAPSHOT_TTL = 24 * 3600
+
+
+def _propertyItems(names, values):
+    """ provides device property items of a snapshot
+
+    :param names: property names
+    :type names: :obj:`list` <:obj:`str`>
+    :param values: property values by name
+    :type values: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`str`>>
+    :returns: property names with their first values
+    :rtype: :obj:`list` <:obj:`list` <:obj:`str`>>
+    """
+    return [[pr, str(values[pr][0]) if len(values[pr]) else ""]
+            for pr in names]
+
+
+def fetchSnapshot(proxy, blackAttrs=None):
+    """ fetches the interface snapshot of the tango device
+
+    :param proxy: device proxy
+    :type proxy: :class:`tango.DeviceProxy`
+    :param blackAttrs: list of attributes which are not read
+    :type blackAttrs: :obj:`list` <:obj:`str`>
+    :returns: snapshot with 'properties', 'attributes', 'shapes'
+              and 'commands' keys
+    :rtype: :obj:`dict` <:obj:`str`, `any`>
+    """
+    blackAttrs = blackAttrs or []
+    prop = list(proxy.get_property_list('*'))
+    values = proxy.get_property(prop) if prop else {}
+    infos = dict((cf.name.lower(), cf)
+                 for cf in proxy.attribute_list_query())
+    attributes = []
+    for at in proxy.get_attribute_list():
+        cf = infos.get(at.lower()) or proxy.attribute_query(at)
+        attributes.append({
+            "name": at,
+            "data_format": str(cf.data_format).split('.')[-1],
+            "data_type": int(cf.data_type),
+            "unit": cf.unit,
+            "standard_unit": cf.standard_unit,
+            "display_unit": cf.display_unit,
+            "description": cf.description,
+        })
+    # spectrum and image values fetched in a single call
+    toread = [at["name"] for at in attributes
+              if at["name"] not in blackAttrs
+              and at["data_format"] in ["SPECTRUM", "IMAGE"]]
+    shapes = {}
+    if toread:
+        for at, da in zip(toread, proxy.read_attributes(toread)):
+            shapes[at] = [da.dim_x, da.dim_y, str(da.type)]
+    commands = [
+        {"cmd_name": cd.cmd_name,
+         "in_type": str(cd.in_type).split(".")[-1],
+         "out_type": str(cd.out_type).split(".")[-1]}
+        for cd in proxy.command_list_query()]
+    return {
+        "properties": _propertyItems(prop, values),
+        "attributes": attributes,
+        "shapes": shapes,
+        "commands": commands,
+    }
+
+
+class DeviceSnapshots(object):
+
+    """ on-disk cache of tango device interfaces, i.e. device properties,
+    attribute configurations with spectrum and image shapes and commands,
+    valid for one device class, server executable and server version
+
+    The device properties are read again from the tango database
+    whenever a snapshot is served online.
+
+    Warning: most tango servers do not define the version property,
+    so their stamp does not change when the server is updated
+    in place. Snapshots of such devices are fetched again after
+    ``ttl`` seconds, i.e. SNAPSHOT_TTL by default. Call
+    :meth:`invalidate` or :meth:`refresh` after a server update
+    to use its new interface earlier.
+    """
+
+    def __init__(self, filename, offline=False,
+                 versionProperty=VERSION_PROPERTY, ttl=SNAPSHOT_TTL):
+        """ constructor
+
+        :param filename: snapshot file name
+        :type filename: :obj:`str`
+        :param offline: serve snapshots without checking the tango database
+        :type offline: :obj:`bool`
+        :param versionProperty: device property with the server version
+        :type versionProperty: :obj:`str`
+        :param ttl: time-to-live in seconds of snapshots of devices
+                    without the version property, None for no limit
+        :type ttl: :obj:`float`
+        """
+        #: (:obj:`str`) snapshot file name
+        self.filename = os.path.expanduser(filename)
+        #: (:obj:`bool`) serve snapshots without checking the tango database
+        self.offline = offline
+        #: (:obj:`str`) device property with the server version
+        self.versionProperty = versionProperty
+        #: (:obj:`float`) time-to-live in seconds of snapshots of devices
+        #    without the version property, None for no limit
+        self.ttl = ttl
+        #: (:obj:`bool`) snapshots modified since the last store
+        self._dirty = False
+        #: (:obj:`dict` <:obj:`str`, :class:`tango.Database`>) tango
+        #    databases by tango host
+        self._databases = {}
+        #: (:class:`threading.Lock`) content lock
+        self._lock = threading.Lock()
+        #: (:obj:`dict` <:obj:`str`, `any`>) snapshots by device name
+        self._content = self._load(self.filename)
+
+    @classmethod
+    def _load(cls, filename):
+        """ loads snapshots from the file
+
+        :param filename: snapshot file name
+        :type filename: :obj:`str`
+        :returns: snapshots by device name
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+        """
+        try:
+            with open(filename) as fl:
+                content = json.load(fl)
+            if isinstance(content, dict):
+                return content
+        except Exception:
+            pass
+        return {}
+
+    @classmethod
+    def _dump(cls, filename, content):
+        """ stores snapshots in the file atomically
+
+        :param filename: snapshot file name
+        :type filename: :obj:`str`
+        :param content: snapshots by device name
+        :type content: :obj:`dict` <:obj:`str`, `any`>
+        """
+        dirname = os.path.dirname(os.path.abspath(filename))
+        if not os.path.isdir(dirname):
+            os.makedirs(dirname)
+        tmpname = "%s.%s.tmp" % (filename, os.getpid())
+        with open(tmpname, "w") as fl:
+            json.dump(content, fl, indent=1, sort_keys=True)
+        os.rename(tmpname, filename)
+
+    def store(self):
+        """ stores the snapshot file if the snapshots were modified
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            content = dict(self._content)
+            self._dirty = False
+        try:
+            self._dump(self.filename, content)
+        except Exception as e:
+            with self._lock:
+                self._dirty = True
+            sys.stderr.write("Warning: device snapshots cannot be stored: %s\n"
+                             % str(e))
+            sys.stderr.flush()
+
+    def devices(self):
+        """ provides names of devices with snapshots
+
+        :returns: device names
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        with self._lock:
+            return sorted(self._content.keys())
+
+    def invalidate(self, devices=None):
+        """ removes device snapshots, e.g. after a server update
+        which does not change its version property
+
+        :param devices: device names, all cached devices if None
+        :type devices: :obj:`list` <:obj:`str`>
+        """
+        with self._lock:
+            for name in (list(self._content.keys())
+                         if devices is None else devices):
+                if self._content.pop(name, None) is not None:
+                    self._dirty = True
+
+    def stamp(self, deviceName):
+        """ provides the device class, the server name and the server
+        version property from the tango database without contacting
+        the device
+
+        :param deviceName: tango device name
+        :type deviceName: :obj:`str`
+        :returns: device class, server name and server version or None
+                  if the tango database cannot be read
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        state = self._dbstate(deviceName)
+        return state[0] if state else None
+
+    def _dbstate(self, deviceName):
+        """ provides the device stamp and the device properties
+        from the tango database without contacting the device
+
+        :param deviceName: tango device name
+        :type deviceName: :obj:`str`
+        :returns: device stamp and property items or None
+                  if the tango database cannot be read
+        :rtype: :obj:`tuple` <:obj:`list` <:obj:`str`>,
+                :obj:`list` <:obj:`list` <:obj:`str`>>>
+        """
+        name = deviceName.split("://")[-1]
+        items = name.split("/")
+        host = items[0] if len(items) > 3 else ""
+        name = "/".join(items[-3:])
+        try:
+            with self._lock:
+                if host not in self._databases:
+                    if host:
+                        self._databases[host] = tango.Database(
+                            *host.split(":"))
+                    else:
+                        self._databases[host] = tango.Database()
+                db = self._databases[host]
+            info = db.get_device_info(name)
+            prop = list(db.get_device_property_list(name, "*"))
+            values = db.get_device_property(
+                name, list(dict.fromkeys(prop + [self.versionProperty])))
+            version = values[self.versionProperty]
+            return ([str(info.class_name), str(info.ds_full_name),
+                     " ".join(str(vl) for vl in version)],
+                    _propertyItems(prop, values))
+        except Exception:
+            return None
+
+    def _expired(self, entry):
+        """ checks if the snapshot of a device without the version
+        property is older than its time-to-live
+
+        :param entry: device snapshot
+        :type entry: :obj:`dict` <:obj:`str`, `any`>
+        :returns: True if the snapshot has to be fetched again
+        :rtype: :obj:`bool`
+        """
+        stamp = entry.get("stamp")
+        if self.ttl is None or not stamp or stamp[-1]:
+            return False
+        return time.time() - entry.get("time", 0) > self.ttl
+
+    def snapshot(self, deviceName, blackAttrs=None, refresh=False):
+        """ provides the device snapshot, fetches it from the device
+        when it is missing, outdated or incomplete
+
+        :param deviceName: tango device name
+        :type deviceName: :obj:`str`
+        :param blackAttrs: list of attributes which are not read
+        :type blackAttrs: :obj:`list` <:obj:`str`>
+        :param refresh: fetch the snapshot from the device
+        :type refresh: :obj:`bool`
+        :returns: device snapshot
+        :rtype: :obj:`dict` <:obj:`str`, `any`>
+
+        Fetched snapshots are written to the file by :meth:`store`.
+        """
+        blackAttrs = blackAttrs or []
+        with self._lock:
+            entry = self._content.get(deviceName)
+        state = None
+        if entry is not None and not refresh:
+            complete = all(
+                at["name"] in entry["shapes"]
+                for at in entry["attributes"]
+                if at["name"] not in blackAttrs
+                and at["data_format"] in ["SPECTRUM", "IMAGE"])
+            if self.offline and complete:
+                return entry
+            state = self._dbstate(deviceName)
+            if complete and state is None:
+                return entry
+            if complete and state[0] == entry.get("stamp") \
+               and not self._expired(entry):
+                if state[1] != entry["properties"]:
+                    entry = dict(entry, properties=state[1])
+                    with self._lock:
+                        self._content[deviceName] = entry
+                        self._dirty = True
+                return entry
+        elif entry is None and self.offline:
+            raise Exception("Snapshot of '%s' not found" % deviceName)
+        if state is None:
+            state = self._dbstate(deviceName)
+        entry = fetchSnapshot(tango.DeviceProxy(deviceName), blackAttrs)
+        entry["stamp"] = state[0] if state else None
+        entry["time"] = time.time()
+        with self._lock:
+            self._content[deviceName] = entry
+            self._dirty = True
+        return entry
+
+    def refresh(self, devices=None, jobs=8, background=False):
+        """ fetches snapshots of the devices again
+
+        :param devices: device names, all cached devices if None
+        :type devices: :obj:`list` <:obj:`str`>
+        :param jobs: number of devices fetched in parallel
+        :type jobs: :obj:`int`
+        :param background: run the refresh in a background thread
+        :type background: :obj:`bool`
+        :returns: background thread or names of refreshed devices
+        :rtype: :class:`threading.Thread` or :obj:`list` <:obj:`str`>
+        """
+        if background:
+            thread = threading.Thread(
+                target=self.refresh, args=(devices, jobs))
+            thread.start()
+            return thread
+        devices = self.devices() if devices is None else list(devices)
+
+        def fetch(name):
+            with self._lock:
+                old = self._content.get(name) or {}
+            # keep spectrum and image shapes read before
+            black = [at["name"] for at in old.get("attributes", [])
+                     if at["name"] not in old.get("shapes", {})]
+            try:
+                entry = fetchSnapshot(tango.DeviceProxy(name), black)
+                entry["stamp"] = self.stamp(name)
+                entry["time"] = time.time()
+                return name, entry
+            except Exception as e:
+                sys.stderr.write("Error: snapshot of '%s' cannot be "
+                                 "refreshed: %s\n" % (name, str(e)))
+                sys.stderr.flush()
+                return name, None
+
+        refreshed = []
+        if devices:
+            with ThreadPoolExecutor(max(1, jobs or 1)) as executor:
+                for name, entry in executor.map(fetch, devices):
+                    if entry is not None:
+                        with self._lock:
+                            self._content[name] = entry
+                            self._dirty = True
+                        refreshed.append(name)
+            self.store()
+        return refreshed
+
+    def exportSnapshots(self, filename, devices=None):
+        """ exports device snapshots for offline generation
+
+        :param filename: export file name
+        :type filename: :obj:`str`
+        :param devices: device names, all cached devices if None
+        :type devices: :obj:`list` <:obj:`str`>
+        """
+        with self._lock:
+            content = dict(
+                (name, entry) for name, entry in self._content.items()
+                if devices is None or name in devices)
+        self._dump(os.path.expanduser(filename), content)
+
+    def importSnapshots(self, filename):
+        """ imports device snapshots exported by exportSnapshots
+
+        :param filename: import file name
+        :type filename: :obj:`str`
+        :returns: names of imported devices
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        content = self._load(os.path.expanduser(filename))
+        with self._lock:
+            self._content.update(content)
+            self._dirty = self._dirty or bool(content)
+        self.store()
+        return sorted(content.keys())
+
+
+#: (:obj:`dict` <:obj:`str`, :class:`DeviceSnapshots`>) snapshot caches
+#:    of NXSXML_SNAPSHOTS by file name
+snapshotFiles = {}
+
+
+def getDeviceSnapshots(filename):
+    """ provides the snapshot cache of the file shared by device groups
+
+    :param filename: snapshot file name
+    :type filename: :obj:`str`
+    :returns: device snapshot cache
+    :rtype: :class:`DeviceSnapshots`
+    """
+    filename = os.path.expanduser(filename)
+    if filename not in snapshotFiles:
+        snapshotFiles[filename] = DeviceSnapshots(filename)
+    return snapshotFiles[filename]
+
+
+def storeDeviceSnapshots():
+    """ stores the modified snapshot caches of NXSXML_SNAPSHOTS
+    """
+    for snapshots in snapshotFiles.values():
+        snapshots.store()
+
+
 class NDeviceGroup(NGroup):
 
     """ Tango device tag creator
@@ -587,7 +1008,7 @@ class NDeviceGroup(NGroup):
               "NX_CHAR"]
 
     def __init__(self, parent, deviceName, nameAttr, typeAttr="",
-                 commands=True, blackAttrs=None):
+                 commands=True, blackAttrs=None, snapshots=None):
         """ constructor
 
         :param parent: parent tag element
@@ -602,16 +1023,29 @@ class NDeviceGroup(NGroup):
         :type commands: :obj:`bool`
         :param blackAttrs: list of excluded attributes
         :type blackAttrs: :obj:`list` <:obj:`str`>
+        :param snapshots: device snapshot cache, if None the cache
+                          file is taken from NXSXML_SNAPSHOTS if it is set
+                          and stored by :meth:`XMLFile.dump`
+        :type snapshots: :class:`DeviceSnapshots`
         """
         NGroup.__init__(self, parent, nameAttr, typeAttr)
-        #: (:class:`tango.DeviceProxy`) device proxy
-        self._proxy = tango.DeviceProxy(deviceName)
         #: (:obj:`dict` <:obj:`str`, :class:`NTag`>) fields of the device
         self._fields = {}
         #: (:obj:`list` <:obj:`str`>) blacklist for Attributes
         self._blackAttrs = blackAttrs if blackAttrs else []
         #: (:obj:`str`) the device name
         self._deviceName = deviceName
+        if snapshots is None and os.environ.get(SNAPSHOT_ENV):
+            snapshots = getDeviceSnapshots(os.environ[SNAPSHOT_ENV])
+        #: (:class:`tango.DeviceProxy`) device proxy, None for snapshots
+        self._proxy = None
+        if snapshots is not None:
+            #: (:obj:`dict` <:obj:`str`, `any`>) device interface snapshot
+            self._snapshot = snapshots.snapshot(
+                deviceName, self._blackAttrs)
+        else:
+            self._proxy = tango.DeviceProxy(deviceName)
+            self._snapshot = fetchSnapshot(self._proxy, self._blackAttrs)
 
         self._fetchProperties()
         self._fetchAttributes()
@@ -623,11 +1057,10 @@ class NDeviceGroup(NGroup):
 
         :brief: It collects the device properties
         """
-        prop = self._proxy.get_property_list('*')
-        print("PROPERIES %s" % prop)
-        for pr in prop:
-            self.addAttr(pr, "NX_CHAR",
-                         str(self._proxy.get_property(pr)[pr][0]))
+        prop = self._snapshot["properties"]
+        print("PROPERIES %s" % [pr for pr, _ in prop])
+        for pr, value in prop:
+            self.addAttr(pr, "NX_CHAR", value)
             if pr not in self._fields:
                 self._fields[pr] = NField(self, pr, "NX_CHAR")
                 self._fields[pr].setStrategy("STEP")
@@ -643,45 +1076,44 @@ class NDeviceGroup(NGroup):
         """
 
         #: device attirbutes
-        attr = self._proxy.get_attribute_list()
-        for at in attr:
+        shapes = self._snapshot["shapes"]
+        for cf in self._snapshot["attributes"]:
+            at = cf["name"]
 
             print(at)
-            cf = self._proxy.attribute_query(at)
             print("QUERY")
             print(cf)
-            print(cf.name)
-            print(cf.data_format)
-            print(cf.standard_unit)
-            print(cf.display_unit)
-            print(cf.unit)
-            print(self.tTypes[cf.data_type])
-            print(self.nTypes[cf.data_type])
-            print(cf.data_type)
+            print(cf["data_format"])
+            print(cf["standard_unit"])
+            print(cf["display_unit"])
+            print(cf["unit"])
+            print(self.tTypes[cf["data_type"]])
+            print(self.nTypes[cf["data_type"]])
+            print(cf["data_type"])
 
             if at not in self._fields and at not in self._blackAttrs:
-                self._fields[at] = NField(self, at, self.nTypes[cf.data_type])
+                self._fields[at] = NField(
+                    self, at, self.nTypes[cf["data_type"]])
                 encoding = None
-                if str(cf.data_format).split('.')[-1] == "SPECTRUM":
-                    da = self._proxy.read_attribute(at)
+                if cf["data_format"] == "SPECTRUM":
+                    dim_x, dim_y, dtype = shapes[at]
                     d = NDimensions(self._fields[at], "1")
-                    d.dim("1", str(da.dim_x))
-                    if str(da.type) == 'DevEncoded':
+                    d.dim("1", str(dim_x))
+                    if dtype == 'DevEncoded':
                         encoding = 'VDEO'
-                if str(cf.data_format).split('.')[-1] == "IMAGE":
-                    da = self._proxy.read_attribute(at)
+                if cf["data_format"] == "IMAGE":
+                    dim_x, dim_y, dtype = shapes[at]
                     d = NDimensions(self._fields[at], "2")
-                    d.dim("1", str(da.dim_x))
-                    d.dim("2", str(da.dim_y))
-                    if str(da.type) == 'DevEncoded':
+                    d.dim("1", str(dim_x))
+                    d.dim("2", str(dim_y))
+                    if dtype == 'DevEncoded':
                         encoding = 'VDEO'
 
-                if cf.unit != 'No unit':
-                    self._fields[at].setUnits(cf.unit)
-                    self._fields[at].setUnits(cf.unit)
+                if cf["unit"] != 'No unit':
+                    self._fields[at].setUnits(cf["unit"])
 
-                if cf.description != 'No description':
-                    self._fields[at].addDoc(cf.description)
+                if cf["description"] != 'No description':
+                    self._fields[at].addDoc(cf["description"])
                 self.addAttr('URL', "NX_CHAR", "tango://" + self._deviceName)
 
                 self._fields[at].setStrategy("STEP")
@@ -696,22 +1128,21 @@ class NDeviceGroup(NGroup):
         :brief: It collects results of the device commands
         """
         #: list of the device commands
-        cmd = self._proxy.command_list_query()
-        print("COMMANDS %s" % cmd)
+        cmd = self._snapshot["commands"]
+        print("COMMANDS %s" % [cd["cmd_name"] for cd in cmd])
         for cd in cmd:
-            if str(cd.in_type).split(".")[-1] == "DevVoid" \
-                    and str(cd.out_type).split(".")[-1] != "DevVoid" \
-                    and str(cd.out_type).split(".")[-1] in self.tTypes \
-                    and cd.cmd_name not in self._fields:
-                self._fields[cd.cmd_name] = \
+            if cd["in_type"] == "DevVoid" \
+                    and cd["out_type"] != "DevVoid" \
+                    and cd["out_type"] in self.tTypes \
+                    and cd["cmd_name"] not in self._fields:
+                self._fields[cd["cmd_name"]] = \
                     NField(
-                        self, cd.cmd_name,
-                        self.nTypes[self.tTypes.index(
-                            str(cd.out_type).split(".")[-1])])
-                self._fields[cd.cmd_name].setStrategy("STEP")
-                sr = NDSource(self._fields[cd.cmd_name])
+                        self, cd["cmd_name"],
+                        self.nTypes[self.tTypes.index(cd["out_type"])])
+                self._fields[cd["cmd_name"]].setStrategy("STEP")
+                sr = NDSource(self._fields[cd["cmd_name"]])
                 sr.initTango(self._deviceName, self._deviceName,
-                             "command", cd.cmd_name,
+                             "command", cd["cmd_name"],
                              host="haso228k.desy.de", port="10000")
 
 
@@ -781,6 +1212,7 @@ class XMLFile(object):
         """
         with open(self.fname, "w") as myfile:
             myfile.write(self.prettyPrint(self.elem))
+        storeDeviceSnapshots()
 
 
 def main():
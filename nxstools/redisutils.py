@@ -18,9 +18,12 @@
 
 """ Provides redis utils """
 
+import threading
+import time
 
 REDIS = True
 try:
+    import redis
     from redis_om import HashModel, Field
     from typing import Optional
     from blissdata.redis_engine.identities import _UninitializedRedis
@@ -60,18 +63,137 @@ else:
     DESYIdentityModel = None
 
 
-def getDataStore(redisURL):
+#: (:obj:`float`) minimal time in seconds between datastore health checks
+HEALTH_CHECK_INTERVAL = 30.0
+
+#: (:obj:`float`) timeout in seconds of the datastore health check
+HEALTH_CHECK_TIMEOUT = 2.0
+
+#: (:obj:`dict` <:obj:`str`, :obj:`tuple`>) cached datastores and
+#    their last health check times by redis url
+DATASTORES = {}
+
+#: (:obj:`set` <:obj:`str`>) redis urls with initialized database indices
+INITIALIZED_URLS = set()
+
+#: (:class:`threading.Lock`) datastore cache lock
+datastorelock = threading.Lock()
+
 
-    datastore = None
+def _isAlive(redisURL):
+    """ checks if the redis server of the given URL responds
+
+    :param redisURL: redis URL
+    :type redisURL: :obj:`str`
+    :returns: alive flag
+    :rtype: :obj:`bool`
+    """
+    client = None
     try:
-        datastore = DataStore(redisURL, init_db=True,
-                              identity_model_cls=DESYIdentityModel)
+        client = redis.Redis.from_url(
+            redisURL, socket_connect_timeout=HEALTH_CHECK_TIMEOUT,
+            socket_timeout=HEALTH_CHECK_TIMEOUT)
+        return bool(client.ping())
     except Exception:
-        print("Redis DataStore already initialized")
+        return False
+    finally:
+        if client is not None:
+            try:
+                client.close()
+            except Exception:
+                pass
+
+
+def _createDataStore(redisURL, init=True):
+    """ creates a new datastore
+
+    :param redisURL: redis URL
+    :type redisURL: :obj:`str`
+    :param init: initialize database indices
+    :type init: :obj:`bool`
+    :returns: redis datastore
+    :rtype: :class:`DataStore`
+    """
+    if init:
         try:
-            datastore = DataStore(redisURL,
-                                  identity_model_cls=DESYIdentityModel)
-        except Exception as e:
-            print("Redis DataStore cannot be instantiated: %s" % str(e))
+            return DataStore(redisURL, init_db=True,
+                             identity_model_cls=DESYIdentityModel)
+        except Exception:
+            print("Redis DataStore already initialized")
+    try:
+        return DataStore(redisURL,
+                         identity_model_cls=DESYIdentityModel)
+    except Exception as e:
+        print("Redis DataStore cannot be instantiated: %s" % str(e))
+
+
+def getDataStore(redisURL):
+    """ provides a process-wide datastore for the given redis URL
+
+    The datastore with its connection pool is created once per URL and
+    reused, its redis server is checked at most every
+    HEALTH_CHECK_INTERVAL seconds and the datastore is recreated
+    when the check fails. The lock guards only the cache, the health
+    check and the datastore creation run without it.
+
+    :param redisURL: redis URL
+    :type redisURL: :obj:`str`
+    :returns: redis datastore
+    :rtype: :class:`DataStore`
+    """
+    with datastorelock:
+        now = time.time()
+        datastore, checked = DATASTORES.get(redisURL, (None, 0.0))
+        if datastore is not None:
+            if now - checked <= HEALTH_CHECK_INTERVAL:
+                return datastore
+            # other callers use the datastore during the check
+            DATASTORES[redisURL] = (datastore, now)
+        init = redisURL not in INITIALIZED_URLS
+        INITIALIZED_URLS.add(redisURL)
+
+    if datastore is not None:
+        if _isAlive(redisURL):
+            return datastore
+        print("Redis DataStore reconnecting to %s" % redisURL)
+        init = True
+    newstore = _createDataStore(redisURL, init)
+
+    with datastorelock:
+        current = DATASTORES.get(redisURL, (None, 0.0))[0]
+        if current is not None and current is not datastore:
+            # replaced by another caller in the meantime
+            return current
+        if newstore is not None:
+            DATASTORES[redisURL] = (newstore, time.time())
+        else:
+            DATASTORES.pop(redisURL, None)
+    return newstore
+
+
+def resetDataStores():
+    """ removes all cached datastores
+    """
+    with datastorelock:
+        DATASTORES.clear()
+        INITIALIZED_URLS.clear()
+
+
+def readStream(stream, batch=10000, start=0):
+    """ reads a sealed stream in large batches
 
-    return datastore
+    :param stream: redis stream
+    :type stream: :class:`Stream`
+    :param batch: maximal number of records in one read
+    :type batch: :obj:`int`
+    :param start: index of the first record to read
+    :type start: :obj:`int`
+    :returns: generator of record offsets and record blocks
+    :rtype: :obj:`generator` <(:obj:`int`, `any`)>
+    """
+    total = len(stream)
+    offset = start
+    while offset < total:
+        stop = min(offset + batch, total)
+        yield offset, stream[offset:stop]
+        offset = stop
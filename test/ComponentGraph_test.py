@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2018 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file ComponentGraph_test.py
+# unittests for the component dependency graph
+#
+import unittest
+import os
+import sys
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from nxstools import nxsconfig
+from nxstools import nxsdevicetools
+from nxstools.nxsdevicetools import ComponentGraph
+
+
+#: (:obj:`dict` <:obj:`str`, :obj:`str`>) stored components
+COMPONENTS = {
+    "scan": '<definition><group type="NXentry" name="$var.entryname">'
+    '$components.slit $components.absent $components.mono'
+    '</group></definition>',
+    "slit": '<definition><group type="NXslit" name="slit">'
+    '<field name="gap"><datasource type="CLIENT" name="gap">'
+    '<record name="gap"/></datasource></field>$components.mono'
+    '</group></definition>',
+    "mono": '<definition><group type="NXmonochromator" name="mono">'
+    '<field name="energy">$datasources.energy</field>'
+    '</group></definition>',
+    "default": '<definition><group type="NXentry" name="entry">'
+    '$components.lost</group></definition>',
+}
+
+#: (:obj:`dict` <:obj:`str`, :obj:`str`>) stored datasources
+DATASOURCES = {
+    "energy": '<definition><datasource type="TANGO" name="energy">'
+    '<device name="p09/dcm/1" member="attribute"/>'
+    '<record name="Energy"/></datasource></definition>',
+    "gap": '<definition><datasource type="CLIENT" name="gap">'
+    '<record name="gap"/></datasource></definition>',
+}
+
+
+class FakeServer(object):
+
+    """ configuration server proxy which records its calls """
+
+    def __init__(self):
+        #: (:obj:`list` <:obj:`tuple`>) called commands
+        self.calls = []
+
+    def Open(self):
+        pass
+
+    def AvailableComponents(self):
+        self.calls.append(("AvailableComponents",))
+        return sorted(COMPONENTS.keys())
+
+    def AvailableDataSources(self):
+        self.calls.append(("AvailableDataSources",))
+        return sorted(DATASOURCES.keys())
+
+    def Components(self, names):
+        self.calls.append(("Components", list(names)))
+        return [COMPONENTS[nm] for nm in names]
+
+    def DataSources(self, names):
+        self.calls.append(("DataSources", list(names)))
+        return [DATASOURCES[nm] for nm in names]
+
+
+# test fixture
+class ComponentGraphTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        self.__openServer = nxsconfig.openServer
+        self.__cache = os.environ.pop(nxsconfig.CACHE_ENV, None)
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        nxsconfig.openServer = self.__openServer
+        if self.__cache is not None:
+            os.environ[nxsconfig.CACHE_ENV] = self.__cache
+
+    # dependencies test
+    # \brief It tests dependencies with missing components
+    def test_dependencies(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        server = FakeServer()
+        graph = ComponentGraph(server)
+        self.assertTrue(graph.hasComponent("scan"))
+        self.assertTrue(not graph.hasComponent("absent"))
+        self.assertEqual(
+            graph.dependencies("scan"), ["slit", "absent", "mono"])
+        self.assertEqual(graph.dependencies("default"), ["lost"])
+        self.assertRaises(Exception, graph.dependencies, "absent")
+        self.assertRaises(Exception, graph.dependentComponents, ["scan"])
+        self.assertRaises(Exception, graph.dependentComponents, ["default"])
+        self.assertRaises(Exception, graph.componentDataSources, "absent")
+        self.assertRaises(Exception, graph.componentVariables, "absent")
+        self.assertEqual(
+            graph.dependentComponents(["slit"]), ["slit", "mono"])
+        self.assertEqual(
+            graph.dependentComponents(["mono", "slit"]), ["mono", "slit"])
+        self.assertEqual(graph.componentVariables("scan"), ["entryname"])
+        self.assertEqual(graph.componentDataSources("slit"), ["gap"])
+        self.assertEqual(graph.componentDataSources("mono"), ["energy"])
+        fetched = [nm for call in server.calls if call[0] == "Components"
+                   for nm in call[1]]
+        self.assertEqual(sorted(fetched), sorted(COMPONENTS.keys()))
+
+    # datasource components test
+    # \brief It tests inconsistent components in datasource components
+    def test_datasourcecomponents(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        server = FakeServer()
+        openServer = nxsdevicetools.openServer
+        nxsdevicetools.openServer = lambda device: server
+        nxsdevicetools.dataSourceComponentsCache.pop("fake/nxs/cnf", None)
+        old_stderr = sys.stderr
+        sys.stderr = mystderr = StringIO()
+        try:
+            dscps = nxsdevicetools.getDataSourceComponents("fake/nxs/cnf")
+        finally:
+            sys.stderr = old_stderr
+            nxsdevicetools.openServer = openServer
+            nxsdevicetools.dataSourceComponentsCache.pop(
+                "fake/nxs/cnf", None)
+        self.assertEqual(
+            mystderr.getvalue(),
+            "Info: Inconsistent components is the NeXus database - "
+            "default, scan\n")
+        self.assertEqual(dscps, {"energy": ["mono", "slit"],
+                                 "gap": ["slit"]})
+
+    # reverse components test
+    # \brief It tests components using missing components
+    def test_reverse(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        graph = ComponentGraph(FakeServer())
+        self.assertEqual(
+            graph.reverseComponents(["absent"], "components"), ["scan"])
+        self.assertEqual(
+            graph.reverseComponents(["lost"], "components"), ["default"])
+        self.assertEqual(
+            graph.reverseComponents(["energy"]), ["mono", "scan", "slit"])
+        self.assertEqual(
+            graph.reverseComponents(["energy"], transitive=False), ["mono"])
+        self.assertEqual(
+            graph.reverseComponents(["entryname"], "variables"), ["scan"])
+
+    # deps command test
+    # \brief It tests nxsconfig deps with missing components
+    def test_depscmd(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        server = FakeServer()
+        nxsconfig.openServer = lambda device: server
+        cnfserver = nxsconfig.ConfigServer("p09/nxs/configserver")
+        self.assertRaises(Exception, cnfserver.depsCmd, ["scan"])
+        self.assertRaises(Exception, cnfserver.depsCmd, ["default"])
+        self.assertEqual(cnfserver.depsCmd(["slit"]), ["mono"])
+        self.assertEqual(
+            cnfserver.depsCmd(["scan"], direct=True),
+            ["slit", "absent", "mono"])
+        old_stderr = sys.stderr
+        sys.stderr = mystderr = StringIO()
+        try:
+            self.assertEqual(
+                cnfserver.depsCmd(["absent"], True, "components"), [])
+        finally:
+            sys.stderr = old_stderr
+        self.assertEqual(
+            mystderr.getvalue(),
+            "Error: Component 'absent' not stored in "
+            "the configuration server\n")
+        self.assertEqual(
+            cnfserver.depsCmd(["mono"], True, "components", True),
+            ["scan", "slit"])
+
+
+if __name__ == '__main__':
+    unittest.main()
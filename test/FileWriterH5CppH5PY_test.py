@@ -457,6 +457,47 @@ class FileWriterH5CppH5PYTest(unittest.TestCase):
         finally:
             os.remove(self._fname)
 
+    # shard field backend test
+    # \brief It tests shard files created with the master file backend
+    def test_shardfield_backend(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        shard = '%s/%s%s_entry_counts.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        writers = [
+            (H5PYWriter, H5CppWriter, H5PYWriter.H5PYFile,
+             H5PYWriter.H5PYField),
+            (H5CppWriter, H5PYWriter, H5CppWriter.H5CppFile,
+             H5CppWriter.H5CppField),
+        ]
+        try:
+            for wr, default, ftype, fdtype in writers:
+                FileWriter.writer = default
+                fl = wr.create_file(fname, True)
+                self.assertEqual(fl.writer, None)
+                entry = fl.root().create_group("entry", "NXentry")
+                counts = FileWriter.shard_field(
+                    entry, "counts", "int32", [0], [10],
+                    writebehind=False)
+                self.assertTrue(isinstance(counts, fdtype))
+                self.assertTrue(isinstance(fl.shards[0].file, ftype))
+                for i in range(3):
+                    counts.grow()
+                    counts[i] = i
+                fl.close()
+
+                fl = wr.open_file(fname, readonly=True)
+                self.assertEqual(
+                    list(fl.root().open("entry").open("counts").read()),
+                    [0, 1, 2])
+                fl.close()
+        finally:
+            for name in [fname, shard]:
+                if os.path.exists(name):
+                    os.remove(name)
+
     # default createfile test
     # \brief It tests default settings
     def test_ftobject(self):
@@ -27,6 +27,8 @@ import random
 import binascii
 import string
 import time
+import numpy
+import json
 
 import nxstools.filewriter as FileWriter
 import nxstools.h5pywriter as H5PYWriter
@@ -402,6 +404,653 @@ class FileWriterH5PYTest(unittest.TestCase):
         finally:
             os.remove(self._fname)
 
+    # writer metrics test
+    # \brief It tests recording writer metrics
+    def test_metrics_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        promfile = '%s/%s%s.prom' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        jsonfile = "%s.metrics.json" % self._fname
+        mtr = FileWriter.FTMetrics(promfile=promfile)
+        try:
+            FileWriter.setwriter(H5PYWriter, metrics=mtr)
+            self.assertTrue(FileWriter.metrics is mtr)
+            fl = FileWriter.create_file(self._fname, True)
+            rt = fl.root()
+            fd = rt.create_field("data", "float64", [0], [10])
+            for i in range(5):
+                fd.grow()
+                fd[i] = float(i)
+            at = fd.attributes.create("units", "string")
+            at.write("mm")
+            metrics = mtr.metrics()
+            self.assertEqual(sorted(metrics.keys()),
+                             ["/data", "/data@units"])
+            self.assertEqual(metrics["/data"]["grow"]["count"], 5)
+            self.assertEqual(metrics["/data"]["write"]["count"], 5)
+            self.assertEqual(metrics["/data"]["write"]["bytes"], 40)
+            self.assertEqual(metrics["/data"]["create_field"]["count"], 1)
+            self.assertEqual(
+                sum(metrics["/data"]["write"]["histogram"].values()), 5)
+            self.assertEqual(
+                metrics["/data@units"]["create_attribute"]["count"], 1)
+            self.assertEqual(
+                metrics["/data@units"]["write_attribute"]["count"], 1)
+            fl.flush()
+            fl.close()
+
+            with open(jsonfile) as jfl:
+                dumped = json.load(jfl)
+            self.assertEqual(sorted(dumped.keys()),
+                             ["/", "/data", "/data@units"])
+            self.assertEqual(dumped["/"]["flush"]["count"], 1)
+            self.assertEqual(dumped["/"]["close"]["count"], 1)
+            dumped.pop("/")
+            self.assertEqual(dumped, metrics)
+            self.assertEqual(mtr.metrics(), {})
+            self.assertEqual(sorted(mtr.metrics(total=True).keys()),
+                             ["/", "/data", "/data@units"])
+            with open(promfile) as pfl:
+                prom = pfl.read()
+            self.assertTrue(
+                'nxstools_writer_operations_total'
+                '{operation="write",path="/data"} 5' in prom)
+            self.assertTrue(
+                'nxstools_writer_latency_seconds_bucket'
+                '{operation="write",path="/data",le="+Inf"} 5' in prom)
+
+            FileWriter.setwriter(H5PYWriter, metrics=False)
+            self.assertEqual(FileWriter.metrics, None)
+            fl = FileWriter.open_file(self._fname)
+            fd = fl.root().open("data")
+            fd.grow()
+            fd[5] = 5.
+            fl.close()
+            self.assertEqual(mtr.metrics(), {})
+        finally:
+            FileWriter.setmetrics(None)
+            for fn in [self._fname, jsonfile, promfile]:
+                if os.path.exists(fn):
+                    os.remove(fn)
+
+    # writer metrics test
+    # \brief It tests dumping writer metrics of each file separately
+    def test_metrics_files_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        fname1 = '%s/%s%s_1.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        fname2 = '%s/%s%s_2.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        jsonfile1 = "%s.metrics.json" % fname1
+        jsonfile2 = "%s.metrics.json" % fname2
+        mtr = FileWriter.FTMetrics()
+        try:
+            FileWriter.setwriter(H5PYWriter, metrics=mtr)
+            fl1 = FileWriter.create_file(fname1, True)
+            fl2 = FileWriter.create_file(fname2, True)
+            fd1 = fl1.root().create_field("data1", "float64", [0], [10])
+            fd2 = fl2.root().create_field("data2", "float64", [0], [10])
+            for i in range(3):
+                fd1.grow()
+                fd1[i] = float(i)
+            fd2.grow()
+            fd2[0] = 1.
+            self.assertEqual(
+                sorted(mtr.metrics(filename=fname1).keys()), ["/data1"])
+            self.assertEqual(
+                sorted(mtr.metrics(filename=fname2).keys()), ["/data2"])
+            self.assertEqual(
+                sorted(mtr.metrics().keys()), ["/data1", "/data2"])
+
+            fl1.close()
+            with open(jsonfile1) as jfl:
+                dumped = json.load(jfl)
+            self.assertEqual(sorted(dumped.keys()), ["/", "/data1"])
+            self.assertEqual(dumped["/data1"]["write"]["count"], 3)
+            self.assertEqual(mtr.metrics(filename=fname1), {})
+            self.assertEqual(
+                mtr.metrics(filename=fname2)["/data2"]["write"]["count"], 1)
+
+            fl2.close()
+            with open(jsonfile2) as jfl:
+                dumped = json.load(jfl)
+            self.assertEqual(sorted(dumped.keys()), ["/", "/data2"])
+            self.assertEqual(dumped["/data2"]["write"]["count"], 1)
+            self.assertEqual(mtr.metrics(), {})
+        finally:
+            FileWriter.setmetrics(None)
+            for fn in [fname1, fname2, jsonfile1, jsonfile2]:
+                if os.path.exists(fn):
+                    os.remove(fn)
+
+    # buffered field test
+    # \brief It tests staging appended records
+    def test_bufferedfield_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        try:
+            FileWriter.writer = H5PYWriter
+            fl = FileWriter.create_file(self._fname, True)
+            rt = fl.root()
+            entry = rt.create_group("entry", "NXentry")
+            scalar = FileWriter.buffered_field(
+                entry.create_field("scalar", "float64", [0], [100]), 4)
+            spec = FileWriter.buffered_field(
+                entry.create_field("spec", "int32", [0, 3], [1, 3]), 4)
+            self.assertEqual(scalar.name, "scalar")
+            self.assertEqual(scalar.parent.name, "entry")
+            self.assertEqual(scalar.dtype, "float64")
+            for i in range(10):
+                scalar.grow()
+                scalar[i] = i * 0.5
+                spec.grow()
+                spec[-1, ...] = [i, i + 1, i + 2]
+                self.assertEqual(scalar.shape, (i + 1,))
+                self.assertEqual(spec.shape, (i + 1, 3))
+                self.assertEqual(spec.size, (i + 1) * 3)
+                self.assertEqual(scalar[i], i * 0.5)
+                self.assertEqual(list(spec[-1]), [i, i + 1, i + 2])
+            self.assertEqual(scalar.field.shape, (8,))
+            self.assertEqual(spec.field.shape, (8, 3))
+            fl.flush()
+            self.assertEqual(scalar.field.shape, (10,))
+            self.assertEqual(spec.field.shape, (10, 3))
+            scalar.grow()
+            scalar[-1] = 20.
+            spec.grow()
+            spec[10, :] = [7, 8, 9]
+            self.assertEqual(scalar.field.shape, (10,))
+            self.assertEqual(
+                list(scalar.read()), [i * 0.5 for i in range(10)] + [20.])
+            self.assertEqual(scalar.field.shape, (11,))
+            fl.close()
+
+            fl = FileWriter.open_file(self._fname, readonly=True)
+            entry = fl.root().open("entry")
+            self.assertEqual(
+                list(entry.open("scalar").read()),
+                [i * 0.5 for i in range(10)] + [20.])
+            self.assertEqual(
+                [list(row) for row in entry.open("spec").read()],
+                [[i, i + 1, i + 2] for i in range(10)] + [[7, 8, 9]])
+            fl.close()
+        finally:
+            os.remove(self._fname)
+
+    # buffered field test
+    # \brief It tests reopening fields with staged records
+    def test_bufferedfield_reopen_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        try:
+            FileWriter.writer = H5PYWriter
+            fl = FileWriter.create_file(self._fname, True)
+            rt = fl.root()
+            entry = rt.create_group("entry", "NXentry")
+            scalar = FileWriter.buffered_field(
+                entry.create_field("scalar", "int64", [0], [100]), 4)
+            for i in range(3):
+                scalar.grow()
+                scalar[i] = i
+            scalar.reopen()
+            self.assertEqual(scalar.shape, (3,))
+            for i in range(3, 6):
+                scalar.grow()
+                scalar[i] = i
+            scalar.field.reopen()
+            self.assertEqual(scalar.shape, (6,))
+            fl.close()
+
+            fl = FileWriter.open_file(self._fname, readonly=True)
+            entry = fl.root().open("entry")
+            self.assertEqual(
+                list(entry.open("scalar").read()), list(range(6)))
+            fl.close()
+        finally:
+            os.remove(self._fname)
+
+    # write-behind file test
+    # \brief It tests file operations in the I/O thread
+    def test_writebehind_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        try:
+            FileWriter.writer = H5PYWriter
+            fl = FileWriter.create_file(self._fname, True, writebehind=4)
+            self.assertTrue(isinstance(fl, FileWriter.FTAsyncFile))
+            self.assertEqual(fl.writer, H5PYWriter)
+            rt = fl.root()
+            entry = rt.create_group("entry", "NXentry")
+            scalar = entry.create_field("scalar", "float64", [0], [100])
+            image = entry.create_field(
+                "image", "uint16", [0, 2, 2], [1, 2, 2])
+            buf = numpy.zeros((2, 2), dtype="uint16")
+            for i in range(20):
+                scalar.grow()
+                scalar[i] = i * 0.5
+                image.grow()
+                buf[...] = i
+                image[i, ...] = buf
+            scalar.attributes.create("units", "string")[...] = "mm"
+            self.assertEqual(scalar.shape, (20,))
+            self.assertEqual(image.shape, (20, 2, 2))
+            self.assertEqual(scalar.name, "scalar")
+            self.assertEqual(
+                [at.name for at in scalar.attributes], ["units"])
+            FileWriter.link("/entry/scalar", entry, "scalar_link")
+            self.assertEqual(
+                sorted(entry.names()), ["image", "scalar", "scalar_link"])
+            fl.flush()
+            self.assertEqual(scalar[19], 9.5)
+            scalar[100] = 1.
+            self.myAssertRaise(Exception, fl.wait)
+            fl.wait()
+            fl.close()
+
+            fl = FileWriter.open_file(self._fname, readonly=True)
+            entry = fl.root().open("entry")
+            self.assertEqual(
+                list(entry.open("scalar").read()),
+                [i * 0.5 for i in range(20)])
+            self.assertEqual(
+                [image[0, 0] for image in entry.open("image").read()],
+                list(range(20)))
+            fl.close()
+        finally:
+            os.remove(self._fname)
+
+    # read into test
+    # \brief It tests reading fields into preallocated buffers
+    def test_readinto_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        try:
+            FileWriter.writer = H5PYWriter
+            fl = FileWriter.create_file(self._fname, True)
+            rt = fl.root()
+            data = numpy.arange(7 * 3 * 4, dtype="int32").reshape(7, 3, 4)
+            image = rt.create_field("image", "int32", [7, 3, 4], [1, 3, 4])
+            image[...] = data
+
+            buf = numpy.empty((2, 3, 4), dtype="int32")
+            res = image.read_into(buf, (slice(2, 4), slice(None)))
+            self.assertTrue(res is buf)
+            self.assertTrue(numpy.array_equal(buf, data[2:4]))
+            frame = numpy.empty((3, 4), dtype="int32")
+            image.read_into(frame, (5, slice(None), slice(None)))
+            self.assertTrue(numpy.array_equal(frame, data[5]))
+            full = numpy.empty((7, 3, 4), dtype="int32")
+            image.read_into(full)
+            self.assertTrue(numpy.array_equal(full, data))
+
+            chunks = list(image.iter_chunks(batch=3))
+            self.assertEqual([start for start, _ in chunks], [0, 3, 6])
+            self.assertTrue(chunks[0][1] is chunks[1][1])
+            self.assertTrue(numpy.array_equal(chunks[2][1], data[6:]))
+            self.assertTrue(numpy.array_equal(
+                numpy.concatenate(
+                    [ch.copy() for _, ch in image.iter_chunks(axis=2,
+                                                              batch=3)],
+                    axis=2),
+                data))
+
+            scalar = FileWriter.buffered_field(
+                rt.create_field("scalar", "float64", [0], [10]))
+            for i in range(25):
+                scalar.grow()
+                scalar[i] = i
+            self.assertTrue(numpy.array_equal(
+                numpy.concatenate(
+                    [ch.copy() for _, ch in scalar.iter_chunks(batch=10)]),
+                numpy.arange(25)))
+            fl.close()
+        finally:
+            os.remove(self._fname)
+
+    # read into test
+    # \brief It tests that fields read into buffers without the fallback
+    def test_readinto_direct_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        fallback = FileWriter.FTField.read_into
+
+        def nofallback(*args, **kwargs):
+            raise Exception("generic read_into used")
+
+        try:
+            FileWriter.writer = H5PYWriter
+            fl = FileWriter.create_file(self._fname, True)
+            rt = fl.root()
+            data = numpy.arange(5 * 3 * 4, dtype="int32").reshape(5, 3, 4)
+            image = rt.create_field("image", "int32", [5, 3, 4], [1, 3, 4])
+            image[...] = data
+            self.assertTrue(
+                type(image).read_into is not FileWriter.FTField.read_into)
+
+            buf = numpy.zeros((2, 3, 4), dtype="int32")
+            address = buf.ctypes.data
+            calls = []
+            readdirect = h5py.Dataset.read_direct
+
+            def spy(dataset, *args, **kwargs):
+                calls.append(dataset.name)
+                return readdirect(dataset, *args, **kwargs)
+
+            h5py.Dataset.read_direct = spy
+            FileWriter.FTField.read_into = nofallback
+            try:
+                res = image.read_into(buf, (slice(1, 3), slice(None)))
+                self.assertTrue(res is buf)
+                self.assertEqual(buf.ctypes.data, address)
+                self.assertTrue(numpy.array_equal(buf, data[1:3]))
+                full = numpy.zeros((5, 3, 4), dtype="int32")
+                self.assertTrue(image.read_into(full) is full)
+                self.assertTrue(numpy.array_equal(full, data))
+            finally:
+                FileWriter.FTField.read_into = fallback
+                h5py.Dataset.read_direct = readdirect
+            self.assertEqual(calls, ["/image", "/image"])
+            fl.close()
+        finally:
+            FileWriter.FTField.read_into = fallback
+            os.remove(self._fname)
+
+    # file property test
+    # \brief It tests file creation and access property presets
+    def test_fileproperties_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        try:
+            pars = {"preset": "local-ssd", "sieve_buf_size": 1 << 21,
+                    "alignment_threshold": None, "writebehind": 1}
+            props = FileWriter.file_properties(pars)
+            self.assertEqual(pars, {"writebehind": 1})
+            self.assertEqual(props["sieve_buf_size"], 1 << 21)
+            self.assertEqual(props["fs_strategy"], "page")
+            self.assertTrue("alignment_threshold" not in props)
+            self.myAssertRaise(
+                Exception, FileWriter.file_properties, {"preset": "tape"})
+
+            FileWriter.writer = H5PYWriter
+            for preset in ["parallel-fs", "local-ssd"]:
+                values = FileWriter.FILE_PRESETS[preset]
+                fl = FileWriter.create_file(
+                    self._fname, True, preset=preset)
+                rt = fl.root()
+                entry = rt.create_group("entry", "NXentry")
+                entry.create_field("data", "float64", [0], [100])
+                fid = fl.h5object.id
+                self.assertEqual(
+                    fid.get_create_plist().get_file_space_strategy()[0],
+                    h5py.h5f.FSPACE_STRATEGY_PAGE)
+                self.assertEqual(
+                    fid.get_create_plist().get_file_space_page_size(),
+                    values["fs_page_size"])
+                self.assertTrue(
+                    not fid.get_create_plist().get_obj_track_times())
+                fapl = fid.get_access_plist()
+                self.assertEqual(
+                    fapl.get_meta_block_size(), values["meta_block_size"])
+                self.assertEqual(
+                    fapl.get_sieve_buf_size(), values["sieve_buf_size"])
+                self.assertEqual(
+                    fapl.get_alignment(),
+                    (values["alignment_threshold"],
+                     values["alignment_interval"]))
+                self.assertEqual(
+                    fid.get_mdc_config().max_size, values["mdc_max_size"])
+                fl.close()
+
+                fl = FileWriter.open_file(
+                    self._fname, readonly=True, preset=preset)
+                self.assertEqual(
+                    fl.h5object.id.get_access_plist().get_sieve_buf_size(),
+                    values["sieve_buf_size"])
+                self.assertEqual(fl.root().open("entry").names(), ["data"])
+                fl.close()
+        finally:
+            os.remove(self._fname)
+
+    # memory staging test
+    # \brief It tests files staged in memory
+    def test_staging_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        try:
+            FileWriter.writer = H5PYWriter
+            self.myAssertRaise(
+                Exception, FileWriter.create_file, self._fname, True,
+                staging="disk")
+            fl = FileWriter.create_file(self._fname, True, staging="memory")
+            self.assertEqual(fl.staginglimit, FileWriter.STAGING_LIMIT)
+            entry = fl.root().create_group("entry", "NXentry")
+            scalar = entry.create_field("scalar", "float64", [0], [10])
+            for i in range(5):
+                scalar.grow()
+                scalar[i] = i * 0.5
+            fl.flush()
+            self.assertTrue(not os.path.exists(self._fname))
+            fl.close()
+            self.assertTrue(os.path.exists(self._fname))
+            self.myAssertRaise(
+                Exception, FileWriter.create_file, self._fname, False,
+                staging="memory")
+
+            fl = FileWriter.open_file(self._fname, readonly=True)
+            self.assertEqual(
+                list(fl.root().open("entry").open("scalar").read()),
+                [i * 0.5 for i in range(5)])
+            fl.close()
+
+            fl = FileWriter.create_file(
+                self._fname, True, staging="memory", staging_limit=100000)
+            entry = fl.root().create_group("entry", "NXentry")
+            image = entry.create_field(
+                "image", "uint16", [0, 100, 100], [1, 100, 100])
+            scalar = FileWriter.buffered_field(
+                entry.create_field("scalar", "int32", [0], [10]))
+            frame = numpy.zeros((100, 100), dtype="uint16")
+            for i in range(10):
+                image.grow()
+                frame[...] = i
+                image[i, ...] = frame
+                scalar.grow()
+                scalar[i] = i
+                fl.flush()
+            self.assertEqual(fl.staginglimit, None)
+            self.assertTrue(os.path.exists(self._fname))
+            fl.close()
+
+            fl = FileWriter.open_file(self._fname, readonly=True)
+            entry = fl.root().open("entry")
+            self.assertEqual(
+                [im[0, 0] for im in entry.open("image").read()],
+                list(range(10)))
+            self.assertEqual(
+                list(entry.open("scalar").read()), list(range(10)))
+            fl.close()
+        finally:
+            os.remove(self._fname)
+
+    # memory staging write test
+    # \brief It tests the staging limit checked in the write path
+    def test_staging_write_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        try:
+            FileWriter.writer = H5PYWriter
+            fl = FileWriter.create_file(
+                self._fname, True, staging="memory", staging_limit=100000)
+            entry = fl.root().create_group("entry", "NXentry")
+            image = entry.create_field(
+                "image", "uint16", [0, 100, 100], [1, 100, 100])
+            scalar = FileWriter.buffered_field(
+                entry.create_field("scalar", "int32", [0], [10]), 4)
+            frame = numpy.zeros((100, 100), dtype="uint16")
+            fl.flush()
+            self.assertTrue(fl.stagedbytes <= 50000)
+            spilled = None
+            for i in range(10):
+                image.grow()
+                frame[...] = i
+                image[i, ...] = frame
+                scalar.grow()
+                scalar[i] = i
+                if spilled is None and fl.staginglimit is None:
+                    spilled = i
+                    self.assertTrue(os.path.exists(self._fname))
+            self.assertTrue(spilled is not None)
+            self.assertTrue(spilled < 9)
+            self.assertTrue(image._stagingfile is False)
+            self.assertEqual(image.shape, (10, 100, 100))
+            self.assertEqual(scalar.shape, (10,))
+            fl.close()
+
+            fl = FileWriter.open_file(self._fname, readonly=True)
+            entry = fl.root().open("entry")
+            self.assertEqual(
+                [im[0, 0] for im in entry.open("image").read()],
+                list(range(10)))
+            self.assertEqual(
+                list(entry.open("scalar").read()), list(range(10)))
+            fl.close()
+        finally:
+            if os.path.exists(self._fname):
+                os.remove(self._fname)
+
+    # virtual field pattern test
+    # \brief It tests %b source patterns mapped with unlimited hyperslabs
+    def test_vds_pattern_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        if not H5PYWriter.is_unlimited_vds_supported():
+            print("VDS not supported: skipping the test")
+            return
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        patterns = dict(
+            (prefix, '%s/%s%s_%s_%%b.h5' % (
+                os.getcwd(), self.__class__.__name__, fun, prefix))
+            for prefix in ["a", "b"])
+        sources = []
+        try:
+            FileWriter.writer = H5PYWriter
+            blocks = {}
+            for prefix in ["a", "b"]:
+                for i in range(3):
+                    sources.append(patterns[prefix].replace("%b", str(i)))
+                    blocks[(prefix, i)] = numpy.arange(
+                        6, dtype="int32").reshape(2, 3) + 100 * i + \
+                        (10 if prefix == "b" else 0)
+                    fl = FileWriter.create_file(sources[-1], True)
+                    fl.root().create_field(
+                        "data", "int32", [2, 3], [2, 3]).write(
+                            blocks[(prefix, i)])
+                    fl.close()
+
+            fl = FileWriter.create_file(self._fname, True)
+            rt = fl.root()
+            layout = FileWriter.virtual_field_layout(
+                [0, 3], "int32", [FileWriter.unlimited(), 3])
+            self.myAssertRaise(
+                Exception, layout.add_pattern, patterns["a"], "/data",
+                [2, 3], block=[1, 3])
+            layout.add_pattern(patterns["a"], "/data", [2, 3], stride=4)
+            layout.add_pattern(
+                patterns["b"], "/data", [2, 3], offset=[2, 0], stride=4)
+            rt.create_virtual_field("data", layout).close()
+            fl.close()
+
+            fl = FileWriter.open_file(self._fname, readonly=True)
+            data = fl.root().open("data")
+            self.assertEqual(tuple(data.shape), (12, 3))
+            self.assertTrue(numpy.array_equal(
+                data.read(),
+                numpy.concatenate(
+                    [blocks[(prefix, i)]
+                     for i in range(3) for prefix in ["a", "b"]])))
+            fl.close()
+            with h5py.File(self._fname, "r") as h5:
+                self.assertEqual(
+                    h5["data"].id.get_create_plist().get_virtual_count(),
+                    2)
+        finally:
+            for name in [self._fname] + sources:
+                if os.path.exists(name):
+                    os.remove(name)
+
+    # shard field test
+    # \brief It tests fields written to shard files
+    def test_shardfield_h5py(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        shards = ['%s/%s%s_entry_data_%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun, name)
+            for name in ["image", "counts"]]
+        try:
+            FileWriter.writer = H5PYWriter
+            for mode in ["link", "vds"]:
+                fl = FileWriter.create_file(self._fname, True)
+                data = fl.root().create_group(
+                    "entry", "NXentry").create_group("data", "NXdata")
+                self.myAssertRaise(
+                    Exception, FileWriter.shard_field, data, "image",
+                    "uint16", mode="copy")
+                image = FileWriter.shard_field(
+                    data, "image", "uint16", [0, 2, 2], [1, 2, 2],
+                    mode=mode)
+                counts = FileWriter.shard_field(
+                    data, "counts", "int32", [0], [10], mode=mode,
+                    writebehind=False)
+                self.assertEqual(len(fl.shards), 2)
+                frame = numpy.zeros((2, 2), dtype="uint16")
+                for i in range(8):
+                    image.grow()
+                    frame[...] = i
+                    image[i, ...] = frame
+                    counts.grow()
+                    counts[i] = i * 2
+                fl.flush()
+                fl.close()
+                for shard in shards:
+                    self.assertTrue(os.path.exists(shard))
+
+                fl = FileWriter.open_file(self._fname, readonly=True)
+                data = fl.root().open("entry").open("data")
+                self.assertEqual(
+                    [im[0, 0] for im in data.open("image").read()],
+                    list(range(8)))
+                self.assertEqual(
+                    list(data.open("counts").read()),
+                    [i * 2 for i in range(8)])
+                fl.close()
+        finally:
+            for fname in [self._fname] + shards:
+                if os.path.exists(fname):
+                    os.remove(fname)
+
     # default createfile test
     # \brief It tests default settings
     def test_ftobject(self):
@@ -28,6 +28,8 @@ import binascii
 import string
 import time
 import io
+import threading
+import numpy
 
 import nxstools.filewriter as FileWriter
 import nxstools.h5rediswriter as H5RedisWriter
@@ -168,6 +170,197 @@ class H5RedisWriterTest(unittest.TestCase):
 
         self.assertEqual(el.h5object, w)
 
+    # scan info builder test
+    # \brief It tests scan info builder
+    def test_scaninfobuilder(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        sib = H5RedisWriter.ScanInfoBuilder(
+            {"name": "scan1", "snapshot": {}, "plots": [1], "datadesc": {}})
+        self.assertEqual(sib.get(["name"]), "scan1")
+        self.assertEqual(sib.get(["plots"]), [1])
+        self.myAssertRaise(KeyError, sib.get, ["unknown"])
+
+        def fill(tid):
+            for it in range(50):
+                dsn = sib.reserve("ds%s" % (it % 5), ["snapshot"])
+                sib.append({"tid": tid}, ["snapshot", dsn])
+                sib.append(it, ["datadesc", "ch%s" % tid])
+
+        threads = [threading.Thread(target=fill, args=(tid,))
+                   for tid in range(4)]
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+
+        info = sib.get()
+        self.assertEqual(info["name"], "scan1")
+        self.assertEqual(len(info["snapshot"]), 200)
+        for vl in info["snapshot"].values():
+            self.assertEqual(len(vl), 1)
+        self.assertEqual(sorted(info["datadesc"].keys()),
+                         ["ch0", "ch1", "ch2", "ch3"])
+        for vl in info["datadesc"].values():
+            self.assertEqual(vl, list(range(50)))
+
+        sib.append(2, ["plots"])
+        self.assertEqual(sib.get(["plots"]), [1, 2])
+        sib.set({"a": 1}, ["snapshot"])
+        self.assertEqual(sib.get(["snapshot"]), {"a": 1})
+        sib.set(3, ["snapshot", "b"])
+        self.assertEqual(sib.get(["snapshot"]), {"a": 1, "b": 3})
+        self.assertEqual(sib.get()["snapshot"], {"a": 1, "b": 3})
+        self.assertEqual(sib.reserve("a", ["snapshot"]), "a_")
+
+    # scan info builder test
+    # \brief It tests nested paths of values stored as a whole
+    def test_scaninfobuilder_nested(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        sib = H5RedisWriter.ScanInfoBuilder({"a": {"b": [1]}})
+        self.assertEqual(sib.get(["a", "b"]), [1])
+        self.assertEqual(sib.get(["a"]), {"b": [1]})
+        self.myAssertRaise(KeyError, sib.get, ["a", "c"])
+        self.myAssertRaise(KeyError, sib.get, ["a", "b", "c"])
+        sib.append(2, ["a", "b"])
+        self.assertEqual(sib.get(["a", "b"]), [1, 2])
+        self.assertEqual(sib.get(), {"a": {"b": [1, 2]}})
+
+        sib = H5RedisWriter.ScanInfoBuilder()
+        sib.set({"channels": []}, ["dev"])
+        self.assertEqual(sib.get(["dev", "channels"]), [])
+        sib.append("ch1", ["dev", "channels"])
+        self.assertEqual(sib.get(["dev", "channels"]), ["ch1"])
+        self.assertEqual(sib.get(["dev"]), {"channels": ["ch1"]})
+
+        sib.set({"x": {"y": 1}}, ["dev"])
+        sib.set(2, ["dev", "x", "z"])
+        self.assertEqual(sib.get(["dev", "x", "y"]), 1)
+        self.assertEqual(sib.get(["dev", "x"]), {"y": 1, "z": 2})
+        self.assertEqual(sib.get(), {"dev": {"x": {"y": 1, "z": 2}}})
+        self.myAssertRaise(KeyError, sib.get, ["dev", "channels"])
+
+    # materialize test
+    # \brief It tests writing redis-only fields from streams
+    def test_materialize(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+
+        class Scan(object):
+            key = "esrf:scan:test"
+
+            def __init__(self):
+                self.streams = {
+                    "counter": numpy.arange(25, dtype="float64"),
+                    "spectrum": numpy.arange(50, dtype="int64").reshape(
+                        25, 2),
+                    "mca": numpy.arange(75, dtype="int64").reshape(
+                        25, 3)}
+
+        class DataStore(object):
+            def load_scan(self, key):
+                return Scan()
+
+        try:
+            fl = H5RedisWriter.create_file(
+                self._fname, overwrite=True, redisonly=True)
+            self.assertTrue(fl.is_redisonly())
+            rt = fl.root()
+            entry = rt.create_group("entry", "NXentry")
+            dt = entry.create_group("data", "NXdata")
+            ct = dt.create_field("counter", "float64", [1], [1])
+            sp = dt.create_field("spectrum", "int64", [1, 2], [1, 2])
+            mca = dt.create_field("mca", "int64", [3, 1], [3, 1])
+            fl._H5RedisFile__datastore = DataStore()
+            fl._H5RedisFile__scan = Scan()
+            fl.append_deferred("counter", "/entry/data/counter")
+            fl.append_deferred("spectrum", "/entry/data/spectrum")
+            # spectrum records growing along the second dimension
+            mca._H5RedisField__deferred = True
+            extents = mca._H5RedisField__extents = [0, 0]
+            fl.append_deferred("mca", "/entry/data/mca", extents)
+            for _ in range(24):
+                mca.grow(1)
+            self.assertEqual(extents, [0, 24])
+            self.assertEqual(mca.shape, (3, 1))
+            fl.append_deferred("missing", "/entry/data/missing")
+            self.myAssertRaise(Exception, fl.materialize, batch=10)
+
+            self.assertEqual(ct.shape, (25,))
+            self.assertEqual(sp.shape, (25, 2))
+            self.assertEqual(mca.shape, (3, 25))
+            self.assertEqual(list(ct.read()), list(range(25)))
+            self.assertEqual(sp.read().tolist(),
+                             numpy.arange(50).reshape(25, 2).tolist())
+            self.assertEqual(mca.read().tolist(),
+                             numpy.arange(75).reshape(25, 3).T.tolist())
+            fl.close()
+        finally:
+            os.remove(self._fname)
+
+    # background materialization test
+    # \brief It tests redis-only data written after the scan finish
+    def test_materialize_background(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+
+        class Scan(object):
+            key = "esrf:scan:test"
+
+            def __init__(self, streams):
+                self.info = {"snapshot": {}}
+                self.streams = streams
+
+        class DataStore(object):
+            def __init__(self, streams):
+                self.streams = streams
+
+            def load_scan(self, key):
+                return Scan(self.streams)
+
+        names = ["REDIS", "getDataStore", "DeviceDict"]
+        saved = dict((nm, getattr(H5RedisWriter, nm)) for nm in names)
+        H5RedisWriter.REDIS = True
+        H5RedisWriter.DeviceDict = dict
+        try:
+            for streams in [
+                    {"counter": numpy.arange(25, dtype="float64")}, {}]:
+                H5RedisWriter.getDataStore = \
+                    lambda url: DataStore(streams)
+                fl = H5RedisWriter.create_file(
+                    self._fname, overwrite=True, redisonly=True)
+                entry = fl.root().create_group("entry", "NXentry")
+                ct = entry.create_field("counter", "float64", [1], [1])
+                fl.set_scan(Scan(streams))
+                fl.set_scaninfo({}, ["snapshot"])
+                fl.append_deferred("counter", "/entry/counter")
+                fl.finish()
+                thread = fl._H5RedisFile__materializer
+                self.assertTrue(isinstance(thread, threading.Thread))
+                if streams:
+                    fl.close()
+                    self.assertTrue(not thread.is_alive())
+                    fl = H5RedisWriter.open_file(self._fname, readonly=True)
+                    ct = fl.root().open("entry").open("counter")
+                    self.assertEqual(list(ct.read()), list(range(25)))
+                    fl.close()
+                else:
+                    ct.close()
+                    entry.close()
+                    self.myAssertRaise(Exception, fl.close)
+                    self.assertTrue(not thread.is_alive())
+        finally:
+            for nm, vl in saved.items():
+                setattr(H5RedisWriter, nm, vl)
+            os.remove(self._fname)
+
     # default createfile test
     # \brief It tests default settings
     def test_default_createfile(self):
@@ -2280,6 +2280,98 @@ class H5CppWriterTest(unittest.TestCase):
         finally:
             os.remove(self._fname)
 
+    # field append test
+    # \brief It tests appending records along the first dimension
+    def test_h5cppfield_append(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+
+        try:
+            fl = H5CppWriter.create_file(self._fname)
+            rt = fl.root()
+            entry = rt.create_group("entry12345", "NXentry")
+            scalar = entry.create_field("scalar", "float64", [0], [10])
+            spec = entry.create_field("spec", "int32", [0, 3], [1, 3])
+            image = entry.create_field("image", "uint16", [0, 2, 3])
+
+            self.assertEqual(scalar.dtype, "float64")
+            self.assertEqual(spec.dtype, "int32")
+            self.assertEqual(image.dtype, "uint16")
+            for i in range(5):
+                scalar.grow()
+                self.assertEqual(scalar.shape, (i + 1,))
+                self.assertEqual(scalar.size, i + 1)
+                scalar[i] = i * 1.5
+                spec.grow()
+                spec[-1, ...] = [i, i + 1, i + 2]
+                image.grow()
+                image[i, :, :] = [[i] * 3, [i + 1] * 3]
+            self.assertEqual(
+                scalar.shape,
+                tuple(scalar.h5object.dataspace.current_dimensions))
+            self.assertEqual(spec.shape, (5, 3))
+            self.assertEqual(spec.size, 15)
+            self.assertEqual(image.shape, (5, 2, 3))
+            spec.grow(1, 2)
+            self.assertEqual(spec.shape, (5, 5))
+            self.assertEqual(
+                spec.shape,
+                tuple(spec.h5object.dataspace.current_dimensions))
+            scalar[-1] = 10.
+            fl.close()
+
+            fl = H5CppWriter.open_file(self._fname, readonly=True)
+            entry = fl.root().open("entry12345")
+            scalar = entry.open("scalar")
+            spec = entry.open("spec")
+            image = entry.open("image")
+            self.assertEqual(
+                list(scalar.read()), [0., 1.5, 3., 4.5, 10.])
+            self.assertEqual(spec.shape, (5, 5))
+            self.assertEqual(
+                [list(row) for row in spec[:, 0:3]],
+                [[i, i + 1, i + 2] for i in range(5)])
+            self.assertEqual(list(image[3, 1, :]), [4, 4, 4])
+            fl.close()
+        finally:
+            os.remove(self._fname)
+
+    # field append test
+    # \brief It tests appending records through two field handles
+    def test_h5cppfield_append_handles(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, fun)
+
+        try:
+            fl = H5CppWriter.create_file(self._fname)
+            rt = fl.root()
+            first = rt.create_field("x", "int64", [0], [10])
+            second = rt.open("x")
+            self.assertEqual(second.shape, (0,))
+            first.grow()
+            first[0] = 1
+            first.grow()
+            first[1] = 2
+            self.assertEqual(second.shape, (2,))
+            self.assertEqual(second.size, 2)
+            second.grow()
+            second[second.shape[0] - 1] = 3
+            self.assertEqual(first.shape, (3,))
+            first.grow()
+            first[-1] = 4
+            self.assertEqual(list(second.read()), [1, 2, 3, 4])
+            fl.close()
+
+            fl = H5CppWriter.open_file(self._fname, readonly=True)
+            self.assertEqual(list(fl.root().open("x").read()), [1, 2, 3, 4])
+            fl.close()
+        finally:
+            os.remove(self._fname)
+
     # default createfile test
     # \brief It tests default settings
     def test_h5cppdeflate_list(self):
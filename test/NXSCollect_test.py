@@ -92,16 +92,20 @@ class NXSCollectTest(unittest.TestCase):
 
         self.helperror = "Error: too few arguments\n"
 
-        self.helpinfo = """usage: nxscollect [-h] {append,link,vds} ...
+        self.helpinfo = \
+            """usage: nxscollect [-h] {append,link,vds,vdscheck,fromredis} ...
 
   Command-line tool to merge images of external file-formats """ + \
             """into the master NeXus file
 
 positional arguments:
-  {append,link,vds}  sub-command help
-    append           append images to the master file
-    link             create an external or internal link in the master file
-    vds              create a virual dataset in the master file
+  {append,link,vds,vdscheck,fromredis}
+                        sub-command help
+    append              append images to the master file
+    link                create an external or internal link in the master file
+    vds                 create a virual dataset in the master file
+    vdscheck            check sources of a virtual dataset in the master file
+    fromredis           create the master file from scan data stored in redis
 
 optional arguments:
   -h, --help         show this help message and exit
@@ -6725,6 +6729,536 @@ For more help:
                 for fn in filenames:
                     os.remove(fn)
 
+    def test_coordrows(self):
+        """ test coordinate rows from strings and numpy arrays
+        """
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self.assertEqual(nxscollect.coordrows(None), [])
+        self.assertEqual(
+            nxscollect.coordrows("1,2;3,"),
+            nxscollect.splitcoords("1,2;3,"))
+        self.assertEqual(
+            nxscollect.coordrows(np.array([[1, 2], [3, -1]])),
+            [(1, 2), (3, None)])
+        self.assertEqual(
+            nxscollect.coordrows(np.array([5, 6], dtype="int32")),
+            [(5,), (6,)])
+        rows = nxscollect.coordrows(np.array([[7, 8]], dtype="uint16"))
+        self.assertEqual(rows, [(7, 8)])
+        self.assertEqual([type(cd) for cd in rows[0]], [int, int])
+
+    def test_targetfieldslayout_numpy(self):
+        """ test target field layouts defined with numpy arrays
+        """
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        paths = ["eh5_0.nxs://entry/data/data", "eh5_1.nxs://entry/data/data"]
+        strlayout = nxscollect.TargetFieldsLayout(
+            ",".join(paths), "2,3,4;2,3,4", [(1, 3, 4), (1, 3, 4)])
+        strlayout.add_target_hyperslabs(
+            "0,0,0;1,0,0", "1,3,4;1,3,4", None, "1,,;1,,")
+        strlayout.add_layout_hyperslabs(
+            "0,0,0;1,0,0", "1,3,4;1,3,4", "2,1,1;2,1,1", "2,1,1;2,1,1")
+        nplayout = nxscollect.TargetFieldsLayout(
+            paths, np.array([[2, 3, 4], [2, 3, 4]]),
+            np.array([[1, 3, 4], [1, 3, 4]]))
+        nplayout.add_target_hyperslabs(
+            np.array([[0, 0, 0], [1, 0, 0]]),
+            np.array([[1, 3, 4], [1, 3, 4]]), None,
+            np.array([[1, -1, -1], [1, -1, -1]]))
+        nplayout.add_layout_hyperslabs(
+            np.array([[0, 0, 0], [1, 0, 0]]),
+            np.array([[1, 3, 4], [1, 3, 4]]),
+            np.array([[2, 1, 1], [2, 1, 1]]),
+            np.array([[2, 1, 1], [2, 1, 1]]))
+
+        self.assertEqual(len(nplayout), 2)
+        self.assertEqual(len(strlayout), 2)
+        for slfd, nlfd in zip(strlayout, nplayout):
+            self.assertEqual(slfd.target.filename, nlfd.target.filename)
+            self.assertEqual(slfd.target.path, nlfd.target.path)
+            self.assertEqual(slfd.target.shape, nlfd.target.shape)
+            self.assertEqual(slfd.shape, nlfd.shape)
+            for shslab, nhslab in [
+                    (slfd.target.hyperslab, nlfd.target.hyperslab),
+                    (slfd.hyperslab, nlfd.hyperslab)]:
+                for name in ["offset", "block", "count", "stride"]:
+                    self.assertEqual(
+                        getattr(shslab, name), getattr(nhslab, name))
+        self.assertEqual(nplayout[1].target.filename, "eh5_1.nxs")
+        self.assertEqual(nplayout[1].target.shape, (2, 3, 4))
+        self.assertEqual(nplayout[1].shape, (1, 3, 4))
+        self.assertEqual(nplayout[1].target.hyperslab.offset, (1, 0, 0))
+        self.assertEqual(nplayout[1].target.hyperslab.count, None)
+        self.assertEqual(
+            nplayout[1].target.hyperslab.stride, (1, None, None))
+        self.assertEqual(nplayout[1].hyperslab.count, (2, 1, 1))
+
+    def test_vds_pattern(self):
+        """ test nxscollect vds with a %b source pattern
+        """
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        if self.writer == "h5py":
+            import nxstools.h5pywriter as H5PYWriter
+            if not H5PYWriter.is_unlimited_vds_supported():
+                print("VDS not supported: skipping the test")
+                return
+
+        filename = '%s/%s%s.nxs' % (os.getcwd(),
+                                    self.__class__.__name__, fun)
+        wrmodule = WRITERS[self.writer]
+        filewriter.writer = wrmodule
+        mlen = [self.__rnd.randint(2, 5),
+                self.__rnd.randint(2, 5),
+                self.__rnd.randint(2, 5)]
+        nfiles = self.__rnd.randint(3, 6)
+        images = []
+        filenames = []
+        try:
+            for ii in range(nfiles):
+                images.append(np.array(
+                    [[[self.__rnd.randint(0, 30)
+                       for j in range(mlen[2])]
+                      for c in range(mlen[1])]
+                     for i in range(mlen[0])],
+                    dtype="int64"))
+                filenames.append("eh5pattern_%s.nxs" % ii)
+                fl = filewriter.create_file(filenames[-1],
+                                            overwrite=True)
+                rt = fl.root()
+                entry = rt.create_group("entry345", "NXentry")
+                dt = entry.create_group("data", "NXdata")
+                data = dt.create_field("data", "int64", mlen,
+                                       [1, mlen[1], mlen[2]])
+                data.write(images[-1])
+                data.close()
+                dt.close()
+                entry.close()
+                fl.close()
+
+            nxsfile = filewriter.create_file(
+                filename, overwrite=True)
+            rt = nxsfile.root()
+            entry = rt.create_group("entry12345", "NXentry")
+            ins = entry.create_group("instrument", "NXinstrument")
+            ins.close()
+            entry.close()
+            rt.close()
+            nxsfile.close()
+
+            pcmd = ('nxscollect vds -f -1 %s' % self.flags).split()
+            pcmd.extend(
+                ['%s://entry12345/instrument/pilatus300k:NXdetector/'
+                 'data' % filename])
+            pcmd.extend(["--target-fields",
+                         "eh5pattern_%b.nxs://entry345/data/data"])
+            pcmd.extend(["--target-shapes",
+                         "%s,%s,%s" % tuple(mlen)])
+            pcmd.extend(["--shape", "U,%s,%s" % (mlen[1], mlen[2])])
+            pcmd.extend(["--dtype", "int64"])
+
+            old_stdout = sys.stdout
+            old_stderr = sys.stderr
+            sys.stdout = mystdout = StringIO()
+            sys.stderr = mystderr = StringIO()
+            old_argv = sys.argv
+            sys.argv = pcmd
+            nxscollect.main()
+
+            sys.argv = old_argv
+            sys.stdout = old_stdout
+            sys.stderr = old_stderr
+            vl = mystdout.getvalue()
+            er = mystderr.getvalue()
+
+            svl = vl.split("\n")
+            self.assertEqual(len(svl), 2)
+            self.assertEqual('', er)
+            self.assertTrue(svl[0].startswith('vds: target pattern '))
+            self.assertTrue('eh5pattern_%b.nxs' in svl[0])
+
+            os.remove("%s.__nxscollect_old__" % filename)
+            nxsfile = filewriter.open_file(filename, readonly=True)
+            rt = nxsfile.root()
+            dat = rt.open("entry12345").open("instrument").open(
+                "pilatus300k").open("data")
+            self.assertEqual(
+                dat.shape, (nfiles * mlen[0], mlen[1], mlen[2]))
+            image = dat[...]
+            self.assertTrue(
+                np.array_equal(image, np.concatenate(images, 0)))
+            dat.close()
+            rt.close()
+            nxsfile.close()
+        finally:
+            os.remove(filename)
+            for fn in filenames:
+                os.remove(fn)
+
+    def test_vds_reopen(self):
+        """ test nxscollect vds closes the master file
+        """
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        if "h5py" not in WRITERS.keys():
+            print("h5py not installed: skipping the test")
+            return
+        if self.writer == "h5py":
+            import nxstools.h5pywriter as H5PYWriter
+            if not H5PYWriter.is_vds_supported():
+                print("VDS not supported: skipping the test")
+                return
+        import h5py
+
+        filename = '%s/%s%s.nxs' % (os.getcwd(),
+                                    self.__class__.__name__, fun)
+        wrmodule = WRITERS[self.writer]
+        filewriter.writer = wrmodule
+        shp = [self.__rnd.randint(2, 6), self.__rnd.randint(2, 6)]
+        value = np.ones(shp, dtype="int64")
+        try:
+            fl = filewriter.create_file("h5reopen_00001.nxs", overwrite=True)
+            rt = fl.root()
+            entry = rt.create_group("entry345", "NXentry")
+            dt = entry.create_group("data", "NXdata")
+            data = dt.create_field("data", "int64", shp, shp)
+            data.write(value)
+            data.close()
+            dt.close()
+            entry.close()
+            fl.close()
+
+            nxsfile = filewriter.create_file(filename, overwrite=True)
+            rt = nxsfile.root()
+            entry = rt.create_group("entry12345", "NXentry")
+            entry.close()
+            rt.close()
+            nxsfile.close()
+
+            pcmd = ('nxscollect vds -r %s' % self.flags).split()
+            pcmd.append('%s://entry12345/data' % filename)
+            pcmd.extend(["--target-fields",
+                         "h5reopen_00001.nxs://entry345/data/data"])
+            pcmd.extend(["--shape", "%s,%s" % tuple(shp)])
+            pcmd.extend(["--shapes", "%s,%s" % tuple(shp)])
+            pcmd.extend(["--dtype", "int64"])
+
+            old_stdout = sys.stdout
+            old_stderr = sys.stderr
+            sys.stdout = StringIO()
+            sys.stderr = mystderr = StringIO()
+            old_argv = sys.argv
+            sys.argv = pcmd
+            nxscollect.main()
+            sys.argv = old_argv
+            sys.stdout = old_stdout
+            sys.stderr = old_stderr
+            self.assertEqual('', mystderr.getvalue())
+
+            with h5py.File(filename, "r") as h5:
+                self.assertTrue(
+                    (h5["entry12345/data"][...] == value).all())
+        finally:
+            for fn in [filename, "h5reopen_00001.nxs"]:
+                if os.path.exists(fn):
+                    os.remove(fn)
+
+    def test_vdscheck(self):
+        """ test nxscollect vdscheck
+        """
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        if "h5py" not in WRITERS.keys():
+            print("h5py not installed: skipping the test")
+            return
+        if self.writer == "h5py":
+            import nxstools.h5pywriter as H5PYWriter
+            if not H5PYWriter.is_vds_supported():
+                print("VDS not supported: skipping the test")
+                return
+
+        filename = '%s/%s%s.nxs' % (os.getcwd(),
+                                    self.__class__.__name__, fun)
+        wrmodule = WRITERS[self.writer]
+        filewriter.writer = wrmodule
+        mlen = [self.__rnd.randint(2, 6), self.__rnd.randint(2, 6)]
+        # the second source is missing and the third one is truncated
+        frames = [mlen[0], 0, mlen[0] - 1]
+        filenames = ["eh5check_%s.nxs" % ii for ii in range(3)]
+        try:
+            for ii, fn in enumerate(filenames):
+                if not frames[ii]:
+                    continue
+                fl = filewriter.create_file(fn, overwrite=True)
+                rt = fl.root()
+                entry = rt.create_group("entry345", "NXentry")
+                dt = entry.create_group("data", "NXdata")
+                data = dt.create_field(
+                    "data", "int64", [frames[ii], mlen[1]], [1, mlen[1]])
+                data.write(np.ones((frames[ii], mlen[1]), dtype="int64"))
+                data.close()
+                dt.close()
+                entry.close()
+                fl.close()
+
+            nxsfile = filewriter.create_file(filename, overwrite=True)
+            rt = nxsfile.root()
+            entry = rt.create_group("entry12345", "NXentry")
+            entry.close()
+            rt.close()
+            nxsfile.close()
+
+            fpath = '%s://entry12345/instrument:NXinstrument/' \
+                'pilatus300k:NXdetector/data' % filename
+            pcmd = ('nxscollect vds -r %s' % self.flags).split()
+            pcmd.append(fpath)
+            pcmd.extend(["--target-fields", ",".join(
+                "%s://entry345/data/data" % fn for fn in filenames)])
+            pcmd.extend(["--target-shapes", ":".join(
+                ["%s,%s" % tuple(mlen)] * 3)])
+            pcmd.extend(["--shapes", ":".join(
+                ["%s,%s" % tuple(mlen)] * 3)])
+            pcmd.extend(["--offsets", ":".join(
+                "%s,0" % (ii * mlen[0]) for ii in range(3))])
+            pcmd.extend(["--shape", "%s,%s" % (4 * mlen[0], mlen[1])])
+            pcmd.extend(["--dtype", "int64"])
+
+            old_stdout = sys.stdout
+            old_stderr = sys.stderr
+            sys.stdout = StringIO()
+            sys.stderr = StringIO()
+            old_argv = sys.argv
+            sys.argv = pcmd
+            nxscollect.main()
+
+            sys.argv = ['nxscollect', 'vdscheck', fpath]
+            sys.stdout = mystdout = StringIO()
+            sys.stderr = mystderr = StringIO()
+            nxscollect.main()
+            vl = mystdout.getvalue()
+            er = mystderr.getvalue()
+
+            sys.argv = ['nxscollect', 'vdscheck', fpath, '--json', '-']
+            sys.stdout = mystdout = StringIO()
+            nxscollect.main()
+            jvl = mystdout.getvalue()
+
+            sys.argv = old_argv
+            sys.stdout = old_stdout
+            sys.stderr = old_stderr
+
+            self.assertEqual('', er)
+            m = mlen[0]
+            svl = vl.split("\n")
+            self.assertEqual(len(svl), 5)
+            self.assertEqual(
+                svl[0], "vdscheck: missing eh5check_1.nxs://entry345/"
+                "data/data fill [%s:%s]" % (m, 2 * m))
+            self.assertEqual(
+                svl[1], "vdscheck: truncated eh5check_2.nxs://entry345/"
+                "data/data [%s, %s] < [%s, %s] fill [%s:%s]" % (
+                    m - 1, mlen[1], m, mlen[1], 3 * m - 1, 3 * m))
+            self.assertEqual(
+                svl[2], "vdscheck: unmapped fill [%s:%s]" % (3 * m, 4 * m))
+            self.assertEqual(
+                svl[3], "vdscheck: 3 sources, 1 missing, 1 truncated, "
+                "0 errors, %s fill frames of %s" % (2 * m + 1, 4 * m))
+
+            report = json.loads(jvl)
+            self.assertEqual(report["shape"], [4 * m, mlen[1]])
+            self.assertEqual(
+                [src["status"] for src in report["sources"]],
+                ["ok", "missing", "truncated"])
+            self.assertEqual(
+                [src["file"] for src in report["sources"]], filenames)
+            self.assertEqual(report["sources"][0]["shape"], mlen)
+            self.assertEqual(report["sources"][0]["dtype"], "int64")
+            self.assertEqual(report["gaps"], [[3 * m, 4 * m]])
+            self.assertEqual(
+                report["fill"], [[m, 2 * m], [3 * m - 1, 4 * m]])
+        finally:
+            os.remove(filename)
+            for fn in filenames:
+                if os.path.isfile(fn):
+                    os.remove(fn)
+
+    def test_fromredis(self):
+        """ test nxscollect fromredis
+        """
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        from nxstools import h5rediswriter
+
+        class Stream(object):
+
+            def __init__(self, name):
+                self.name = name
+                self.data = []
+
+            def send(self, value):
+                self.data.append(value)
+
+            def seal(self):
+                pass
+
+            def __len__(self):
+                return len(self.data)
+
+            def __getitem__(self, key):
+                return self.data[key]
+
+        class Scan(object):
+
+            def __init__(self, info):
+                self.key = "esrf:scan:123"
+                self.info = dict(info)
+                self.streams = {}
+
+            def create_stream(self, name, encoder, info=None):
+                self.streams[name] = Stream(name)
+                return self.streams[name]
+
+        class DataStore(object):
+
+            def __init__(self):
+                self.scan = None
+
+            def create_scan(self, scandct, info=None):
+                self.scan = Scan(info or {})
+                return self.scan
+
+            def load_scan(self, key):
+                return self.scan
+
+        def create_field(parent, name, dtype, strategy, dsname,
+                         units=None, **pars):
+            field = parent.create_field(name, dtype, **pars)
+            field.attributes.create(
+                "nexdatas_strategy", "string").write(strategy)
+            field.attributes.create("nexdatas_source", "string").write(
+                '<datasource name="%s" type="CLIENT"/>' % dsname)
+            if units:
+                field.attributes.create("units", "string").write(units)
+            return field
+
+        rdfilename = 'testcollect_redis_123.nxs'
+        filename = 'testcollect_fromredis.nxs'
+        datastore = DataStore()
+        names = ["REDIS", "getDataStore", "ChannelDict", "DeviceDict",
+                 "ChainDict", "NumericStreamEncoder", "JsonStreamEncoder"]
+        saved = dict((nm, getattr(h5rediswriter, nm)) for nm in names)
+        wrmodule = WRITERS[self.writer]
+        filewriter.writer = wrmodule
+        try:
+            # the scan info and streams of the redis writer
+            h5rediswriter.REDIS = True
+            h5rediswriter.getDataStore = lambda url: datastore
+            h5rediswriter.ChannelDict = dict
+            h5rediswriter.DeviceDict = dict
+            h5rediswriter.ChainDict = dict
+            h5rediswriter.NumericStreamEncoder = lambda **pars: None
+            h5rediswriter.JsonStreamEncoder = lambda **pars: None
+            old_stdout = sys.stdout
+            sys.stdout = StringIO()
+            try:
+                rdfile = h5rediswriter.create_file(
+                    rdfilename, overwrite=True, redisurl="redis://test")
+                entry = rdfile.root().create_group("entry123", "NXentry")
+                ins = entry.create_group("instrument", "NXinstrument")
+                title = create_field(
+                    entry, "title", "string", "INIT", "title")
+                title[...] = "my scan"
+                energy = create_field(
+                    ins, "energy", "float64", "INIT", "energy", "keV")
+                energy[...] = 12.5
+                rdfile.prepare()
+                counter = create_field(
+                    ins.create_group("exp_c01", "NXdetector"), "data",
+                    "float64", "STEP", "exp_c01", "mm",
+                    shape=[0], chunk=[1024])
+                mca = create_field(
+                    ins.create_group("mca", "NXdetector"), "data",
+                    "int32", "STEP", "spectrum",
+                    shape=[0, 3], chunk=[1, 3])
+                missing = create_field(
+                    entry, "missing", "int32", "STEP", "missing",
+                    shape=[0], chunk=[1024])
+                for i in range(25):
+                    counter.grow()
+                    counter[i] = float(i)
+                    missing.grow()
+                    missing[i] = i
+                    if i < 20:
+                        mca.grow()
+                        mca[i, :] = np.arange(3 * i, 3 * i + 3,
+                                              dtype="int32")
+                    if i == 0:
+                        rdfile.start()
+                rdfile.finish()
+                rdfile.close()
+            finally:
+                sys.stdout = old_stdout
+                for nm, vl in saved.items():
+                    setattr(h5rediswriter, nm, vl)
+            scan = datastore.scan
+            self.assertTrue(isinstance(scan.info["datadesc"]["exp_c01"],
+                                       list))
+            self.assertTrue(isinstance(scan.info["snapshot"]["title"],
+                                       list))
+            scan.streams.pop("missing")
+
+            old_stdout = sys.stdout
+            sys.stdout = StringIO()
+            try:
+                exporter = nxscollect.RedisExporter(
+                    filename, "esrf:scan:123", batch=7, jobs=2,
+                    overwrite=True, writer=self.writer,
+                    datastore=datastore)
+                exporter.export()
+            finally:
+                vl = sys.stdout.getvalue()
+                sys.stdout = old_stdout
+            self.assertTrue("Cannot find the stream missing" in vl)
+            self.assertTrue("Cannot find nexus_path" not in vl)
+
+            nxsfile = filewriter.open_file(filename, readonly=True)
+            rt = nxsfile.root()
+            entry = rt.open("entry123")
+            self.assertEqual(
+                filewriter.first(entry.attributes["NX_class"].read()),
+                "NXentry")
+            self.assertEqual(entry.open("title").read(), "my scan")
+            ins = entry.open("instrument")
+            energy = ins.open("energy")
+            self.assertEqual(filewriter.first(energy.read()), 12.5)
+            self.assertEqual(
+                filewriter.first(energy.attributes["units"].read()),
+                "keV")
+            counter = ins.open("exp_c01").open("data")
+            self.assertEqual(counter.shape, (25,))
+            self.assertTrue(
+                (counter.read() == np.arange(25, dtype="float64")).all())
+            self.assertEqual(
+                filewriter.first(counter.attributes["units"].read()),
+                "mm")
+            self.assertEqual(
+                filewriter.first(
+                    counter.attributes["nexdatas_strategy"].read()),
+                "STEP")
+            mca = ins.open("mca").open("data")
+            self.assertEqual(mca.shape, (20, 3))
+            self.assertTrue(
+                (mca.read() == np.arange(60).reshape(20, 3)).all())
+            self.assertTrue("missing" not in entry.names())
+            nxsfile.close()
+        finally:
+            for fname in [filename, rdfilename]:
+                if os.path.exists(fname):
+                    os.remove(fname)
+
 
 if __name__ == '__main__':
     unittest.main()
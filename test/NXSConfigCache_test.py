@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2018 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file NXSConfigCache_test.py
+# unittests for the nxsconfig cache of configuration server items
+#
+import unittest
+import os
+import sys
+import json
+import shutil
+
+from nxstools import nxsconfig
+
+
+#: (:obj:`str`) component xml
+COMPONENT = '<definition><group type="NXentry" name="entry">' \
+    '<field name="energy" type="NX_FLOAT" units="keV">' \
+    '<attribute name="short_name" type="NX_CHAR">en</attribute>' \
+    '</field></group></definition>'
+
+
+class FakeServer(object):
+
+    """ configuration server proxy which records its calls """
+
+    def __init__(self):
+        #: (:obj:`str`) server version with the DB revision
+        self.Version = "3.0.0.12"
+        #: (:obj:`list` <:obj:`tuple`>) called commands
+        self.calls = []
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) stored components
+        self.components = {"energy": COMPONENT, "slit": "<definition/>"}
+
+    def AvailableComponents(self):
+        self.calls.append(("AvailableComponents",))
+        return sorted(self.components.keys())
+
+    def ComponentDataSources(self, name):
+        self.calls.append(("ComponentDataSources", name))
+        return []
+
+    def Components(self, names):
+        self.calls.append(("Components", list(names)))
+        return [self.components[nm] for nm in names]
+
+    def StoreComponent(self, name):
+        self.calls.append(("StoreComponent", name))
+
+    def DeleteComponent(self, name):
+        self.calls.append(("DeleteComponent", name))
+
+    def SetMandatoryComponents(self, names):
+        self.calls.append(("SetMandatoryComponents", list(names)))
+
+    def UnsetMandatoryComponents(self, names):
+        self.calls.append(("UnsetMandatoryComponents", list(names)))
+
+
+# test fixture
+class NXSConfigCacheTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        self._directory = os.path.join(
+            os.getcwd(), "%s_cache" % self.__class__.__name__)
+        self._filename = os.path.join(
+            self._directory, "p09_nxs_configserver.json")
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        if os.path.isdir(self._directory):
+            shutil.rmtree(self._directory)
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        if os.path.isdir(self._directory):
+            shutil.rmtree(self._directory)
+
+    def cache(self, server):
+        return nxsconfig.ConfigServerCache(
+            server, "p09/nxs/configserver", self._directory)
+
+    # command test
+    # \brief It tests cached commands stored once
+    def test_command(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        server = FakeServer()
+        cache = self.cache(server)
+        for _ in range(3):
+            self.assertEqual(cache.AvailableComponents(), ["energy", "slit"])
+            self.assertEqual(cache.ComponentDataSources("energy"), [])
+            self.assertEqual(cache.ComponentDataSources("slit"), [])
+        self.assertEqual(
+            server.calls,
+            [("AvailableComponents",),
+             ("ComponentDataSources", "energy"),
+             ("ComponentDataSources", "slit")])
+        self.assertTrue(not os.path.exists(self._filename))
+        cache.store()
+        with open(self._filename) as fl:
+            content = json.load(fl)
+        self.assertEqual(content["revision"], "3.0.0.12")
+        self.assertEqual(len(content["commands"]), 3)
+
+        os.remove(self._filename)
+        cache.AvailableComponents()
+        cache.store()
+        self.assertTrue(not os.path.exists(self._filename))
+
+    # items test
+    # \brief It tests fetching only missing items
+    def test_items(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        server = FakeServer()
+        cache = self.cache(server)
+        self.assertEqual(cache.Components(["energy"]), [COMPONENT])
+        self.assertEqual(
+            cache.Components(["slit", "energy", "slit"]),
+            ["<definition/>", COMPONENT, "<definition/>"])
+        self.assertEqual(
+            server.calls,
+            [("Components", ["energy"]), ("Components", ["slit"])])
+        cache.store()
+
+        server2 = FakeServer()
+        cache2 = self.cache(server2)
+        self.assertEqual(
+            cache2.Components(["energy", "slit"]),
+            [COMPONENT, "<definition/>"])
+        self.assertEqual(server2.calls, [])
+
+        server3 = FakeServer()
+        server3.Version = "3.0.0.13"
+        cache3 = self.cache(server3)
+        self.assertEqual(cache3.Components(["energy"]), [COMPONENT])
+        self.assertEqual(server3.calls, [("Components", ["energy"])])
+
+    # parseComponent test
+    # \brief It tests cached component descriptions
+    def test_parsecomponent(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        cache = self.cache(FakeServer())
+        desc = nxsconfig.ParserTools.parseComponent(COMPONENT)
+        self.assertEqual(cache.parseComponent(COMPONENT), desc)
+        result = cache.parseComponent(COMPONENT, False)
+        self.assertEqual(result["fields"], desc["fields"])
+        self.assertEqual(result["attributes"], [])
+        result["fields"].append({})
+        self.assertEqual(cache.parseComponent(COMPONENT), desc)
+        self.assertTrue(not os.path.exists(self._filename))
+        cache.store()
+
+        cache2 = self.cache(FakeServer())
+        with open(self._filename) as fl:
+            self.assertEqual(len(json.load(fl)["descriptions"]), 1)
+        self.assertEqual(cache2.parseComponent(COMPONENT), desc)
+
+    # invalidate test
+    # \brief It tests the cache dropped by modifying commands
+    def test_invalidate(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        server = FakeServer()
+        commands = [
+            ("StoreComponent", ("energy",)),
+            ("DeleteComponent", ("slit",)),
+            ("SetMandatoryComponents", (["energy"],)),
+            ("UnsetMandatoryComponents", (["energy"],)),
+        ]
+        for name, args in commands:
+            server.calls = []
+            cache = self.cache(server)
+            cache.AvailableComponents()
+            cache.AvailableComponents()
+            cache.store()
+            getattr(cache, name)(*args)
+            with open(self._filename) as fl:
+                self.assertEqual(json.load(fl), {"revision": None})
+            cache.AvailableComponents()
+            self.assertEqual(
+                server.calls,
+                [("AvailableComponents",), (name,) + args,
+                 ("AvailableComponents",)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2018 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file NXSConfigUpload_test.py
+# unittests for uploading items with nxsconfig
+#
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import time
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from nxstools import nxsconfig
+
+
+class FakeServer(object):
+
+    """ configuration server proxy which records stored items """
+
+    def __init__(self):
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) stored items
+        self.stored = {}
+        #: (:obj:`list` <:obj:`str`>) names of stored items
+        self.order = []
+        #: (:obj:`str`) current xml string
+        self.__xml = ""
+        #: (:obj:`str`) current selection
+        self.__selection = ""
+
+    def Open(self):
+        pass
+
+    def AvailableComponents(self):
+        return []
+
+    def AvailableDataSources(self):
+        return []
+
+    def AvailableSelections(self):
+        return []
+
+    @property
+    def XMLString(self):
+        return self.__xml
+
+    @XMLString.setter
+    def XMLString(self, value):
+        self.__xml = value
+        # gives other threads a chance to overwrite the server state
+        time.sleep(0.001)
+
+    @property
+    def Selection(self):
+        return self.__selection
+
+    @Selection.setter
+    def Selection(self, value):
+        self.__selection = value
+        time.sleep(0.001)
+
+    def __store(self, name, value):
+        time.sleep(0.001)
+        self.stored[name] = value
+        self.order.append(name)
+
+    def StoreComponent(self, name):
+        self.__store(name, self.__xml)
+
+    def StoreDataSource(self, name):
+        self.__store(name, self.__xml)
+
+    def StoreSelection(self, name):
+        self.__store(name, self.__selection)
+
+
+# test fixture
+class NXSConfigUploadTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        self.__openServer = nxsconfig.openServer
+        self.__cache = os.environ.pop(nxsconfig.CACHE_ENV, None)
+        self.__dir = tempfile.mkdtemp()
+        self.__server = FakeServer()
+        nxsconfig.openServer = lambda device: self.__server
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        nxsconfig.openServer = self.__openServer
+        if self.__cache is not None:
+            os.environ[nxsconfig.CACHE_ENV] = self.__cache
+        shutil.rmtree(self.__dir)
+
+    # writes the input files
+    # \param items dictionary with file names and their content
+    def write(self, items):
+        for name, txt in items.items():
+            with open(os.path.join(self.__dir, name), "w") as fl:
+                fl.write(txt)
+
+    # runs upload command
+    # \returns command output and error
+    def upload(self, ds, names, profiles=False, error=None):
+        old_stdout = sys.stdout
+        old_stderr = sys.stderr
+        sys.stdout = mystdout = StringIO()
+        sys.stderr = mystderr = StringIO()
+        res = None
+        try:
+            cnf = nxsconfig.ConfigServer("p09/nxs/configserver")
+            try:
+                res = cnf.uploadCmd(
+                    ds, names, force=True, profiles=profiles,
+                    directory=self.__dir)
+                self.assertEqual(error, None)
+            except Exception as e:
+                self.assertEqual(str(e), error)
+        finally:
+            sys.stdout = old_stdout
+            sys.stderr = old_stderr
+        return res, mystdout.getvalue(), mystderr.getvalue()
+
+    # components test
+    # \brief It tests if every component gets its own file content
+    def test_components(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        names = ["cp%02d" % i for i in range(20)]
+        xmls = dict(
+            (nm, '<definition><group type="NXentry" name="%s"/>'
+             '</definition>' % nm) for nm in names)
+        self.write(dict(("%s.xml" % nm, xml) for nm, xml in xmls.items()))
+        res, out, err = self.upload(False, names)
+        self.assertEqual(err, "")
+        self.assertEqual(self.__server.stored, xmls)
+        self.assertEqual(self.__server.order, names)
+
+    # datasources test
+    # \brief It tests if every datasource gets its own file content
+    def test_datasources(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        names = ["ds%02d" % i for i in range(20)]
+        xmls = dict(
+            (nm, '<definition><datasource type="CLIENT" name="%s">'
+             '<record name="%s"/></datasource></definition>' % (nm, nm))
+            for nm in names)
+        self.write(dict(("%s.ds.xml" % nm, xml) for nm, xml in xmls.items()))
+        res, out, err = self.upload(True, names)
+        self.assertEqual(err, "")
+        self.assertEqual(self.__server.stored, xmls)
+        self.assertEqual(self.__server.order, names)
+
+    # profiles test
+    # \brief It tests if every profile gets its own file content
+    def test_profiles(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        names = ["pr%02d" % i for i in range(20)]
+        jsons = dict(
+            (nm, json.dumps({"ComponentSelection": '{"%s": true}' % nm}))
+            for nm in names)
+        self.write(dict(("%s.json" % nm, txt) for nm, txt in jsons.items()))
+        res, out, err = self.upload(False, names, profiles=True)
+        self.assertEqual(err, "")
+        self.assertEqual(self.__server.stored, jsons)
+        self.assertEqual(self.__server.order, names)
+
+    # invalid input test
+    # \brief It tests if invalid files are reported and not stored
+    def test_invalid(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        good = '<definition><group type="NXentry" name="good"/></definition>'
+        self.write({"good.xml": good, "bad.xml": "<definition>"})
+        res, out, err = self.upload(
+            False, ["bad", "good", "missing"],
+            error="2 of 3 items not uploaded")
+        self.assertEqual(self.__server.stored, {"good": good})
+        self.assertTrue("Component 'bad' cannot be read" in err)
+        self.assertTrue("Component 'missing' cannot be read" in err)
+
+    # server error test
+    # \brief It tests messages of items rejected by the server
+    def test_rejected(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        class DevError(object):
+
+            def __init__(self, desc):
+                self.desc = desc
+
+        class DevFailed(Exception):
+            pass
+
+        class FakeTango(object):
+            pass
+
+        FakeTango.DevFailed = DevFailed
+
+        def store(name):
+            if name in ["ds01", "ds03"]:
+                raise DevFailed(DevError(
+                    "nxsconfigserver.Errors.NonregisteredDBRecordError: "
+                    "The datasource %s not registered" % name))
+            self.__server.stored[name] = self.__server.XMLString
+
+        names = ["ds%02d" % i for i in range(4)]
+        xmls = dict(
+            (nm, '<definition><datasource type="CLIENT" name="%s">'
+             '<record name="%s"/></datasource></definition>' % (nm, nm))
+            for nm in names)
+        self.write(dict(("%s.ds.xml" % nm, xml) for nm, xml in xmls.items()))
+        self.__server.StoreDataSource = store
+        pytango = nxsconfig.PYTANGO
+        tango = nxsconfig.__dict__.get("tango")
+        nxsconfig.PYTANGO = True
+        nxsconfig.tango = FakeTango
+        try:
+            res, out, err = self.upload(
+                True, names, error="2 of 4 items not uploaded")
+        finally:
+            nxsconfig.PYTANGO = pytango
+            if tango is None:
+                del nxsconfig.tango
+            else:
+                nxsconfig.tango = tango
+        self.assertEqual(
+            self.__server.stored,
+            {"ds00": xmls["ds00"], "ds02": xmls["ds02"]})
+        self.assertEqual(
+            err,
+            "Error: Datasource ds01 not stored in Configuration Server\n"
+            "Error: Datasource ds03 not stored in Configuration Server\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -105,13 +105,13 @@ class NXSConfigTest(unittest.TestCase):
         self.helperror = "Error: too few arguments\n"
 
         self.helpinfo = """usage: nxsconfig [-h]
-                 {list,show,get,delete,upload,variables,sources,record,merge,components,data,describe,info,geometry,servers}
+                 {list,show,get,delete,upload,variables,sources,record,merge,components,deps,data,describe,info,geometry,servers}
                  ...
 
 Command-line tool for reading NeXus configuration from NXSConfigServer
 
 positional arguments:
-  {list,show,get,delete,upload,variables,sources,record,merge,components,data,describe,info,geometry,servers}
+  {list,show,get,delete,upload,variables,sources,record,merge,components,deps,data,describe,info,geometry,servers}
                         sub-command help
     list                list names of available components, datasources or
                         profiles
@@ -128,6 +128,8 @@ positional arguments:
                         or datasources
     merge               get merged configuration of components or datasources
     components          get a list of dependent components
+    deps                get component dependencies or components using given
+                        datasources
     data                get/set values of component variables
     describe            show all parameters of given components or datasources
     info                show general parameters of given components,
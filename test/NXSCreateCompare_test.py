@@ -25,6 +25,7 @@ import sys
 import random
 import struct
 import binascii
+import json
 try:
     import tango
 except Exception:
@@ -801,6 +802,127 @@ class NXSCreateCompareTest(unittest.TestCase):
             os.remove(fname1)
             os.remove(fname2)
 
+    def test_compare_json(self):
+        """ test nxsccreate compare file system with json output
+        """
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        fname1 = '%s/%s%s_1.xml' % (
+            os.getcwd(), self.__class__.__name__, fun)
+        fname2 = '%s/%s%s_2.xml' % (
+            os.getcwd(), self.__class__.__name__, fun)
+
+        xml1 = """<?xml version="1.0"?>
+<hw>
+<device>
+ <name>my_exp_mot01</name>
+ <type>stepping_motor</type>
+ <module>oms58</module>
+ <device>p09/motor/exp.01</device>
+ <control>tango</control>
+ <hostname>haso000:10000</hostname>
+</device>
+<device>
+ <name>my_exp_mot01</name>
+ <type>stepping_motor</type>
+ <module>oms58</module>
+ <device>p09/motor/exp.11</device>
+ <control>tango</control>
+ <hostname>haso000:10000</hostname>
+</device>
+<device>
+ <name>my_exp_mot02</name>
+ <type>stepping_motor</type>
+ <module>oms58</module>
+ <device>p09/motor/exp.02</device>
+ <control>tango</control>
+ <hostname>haso000:10000</hostname>
+</device>
+<device>
+    <name>my_test_vfcadc</name>
+    <type>type_tango</type>
+    <module>vfcadc</module>
+    <device>mytest/vfcadc/ct</device>
+    <control>tango</control>
+    <hostname>haso000:10000</hostname>
+</device>
+</hw>
+"""
+        xml2 = """<?xml version="1.0"?>
+<hw>
+<device>
+ <name>my_exp_mot01</name>
+ <type>stepping_motor</type>
+ <module>oms58</module>
+ <device>p09/motor/exp.11</device>
+ <control>tango</control>
+ <hostname>haso000:10000</hostname>
+</device>
+<device>
+ <name>my_exp_mot01</name>
+ <type>stepping_motor</type>
+ <module>oms58</module>
+ <device>p09/motor/exp.01</device>
+ <control>tango</control>
+ <hostname>haso000:10000</hostname>
+</device>
+<device>
+ <name>my_exp_mot02</name>
+ <type>motor</type>
+ <module>oms58</module>
+ <device>p09/motor/exp.02</device>
+ <control>tango</control>
+ <hostname>haso000:10000</hostname>
+</device>
+<device>
+    <name>my_test_tip830</name>
+    <type>type_tango</type>
+    <module>tip830</module>
+    <device>mytest/tip830/ct</device>
+    <control>tango</control>
+    <hostname>haso000:10000</hostname>
+</device>
+</hw>
+"""
+        commands = [('nxscreate compare --json %s %s %s'
+                     % (fname1, fname2, self.flags)).split()]
+
+        if os.path.isfile(fname1):
+            raise Exception("Test file %s exists" % fname1)
+        elif os.path.isfile(fname2):
+            raise Exception("Test file %s exists" % fname2)
+        with open(fname1, "w") as fl:
+            fl.write(xml1)
+        with open(fname2, "w") as fl:
+            fl.write(xml2)
+        try:
+
+            for cmd in commands:
+                vl, er = self.runtest(cmd)
+                res = json.loads(vl)
+                self.assertEqual(res["files"], [fname1, fname2])
+                self.myAssertDict(
+                    res["removed"],
+                    {'my_test_vfcadc': ['my_test_vfcadc']}
+                )
+                self.myAssertDict(
+                    res["added"],
+                    {'my_test_tip830': ['my_test_tip830']}
+                )
+                self.myAssertDict(
+                    res["changed"],
+                    {
+                        'my_exp_mot02': [
+                            {'dtype': ['stepping_motor', 'motor']}
+                        ],
+                    }
+                )
+
+        finally:
+            os.remove(fname1)
+            os.remove(fname2)
+
 
 if __name__ == '__main__':
     unittest.main()
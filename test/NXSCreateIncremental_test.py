@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2018 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file NXSCreateIncremental_test.py
+# unittests for the incremental mode of nxscreate
+#
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+import argparse
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from nxstools import nxscreator
+from nxstools.nxsdevicetools import xmlPackageHandler
+
+
+#: (:obj:`str`) xml template package
+PACKAGE = """
+standardComponentVariables = {}
+standardComponentTemplateFiles = {}
+moduleTemplateFiles = {'mymodule': ['mymodule.xml']}
+moduleMultiAttributes = {'mymodule': []}
+"""
+
+#: (:obj:`str`) xml template
+TEMPLATE = '<definition><group type="NXentry" name="$(__entryname__)">' \
+    '<field name="$(name)" type="NX_CHAR">$(device)@$(hostname)' \
+    '</field></group></definition>'
+
+#: (:obj:`str`) online.xml file
+ONLINE = """<?xml version="1.0"?>
+<hw>
+<device>
+ <name>MyDev</name>
+ <type>type_tango</type>
+ <module>mymodule</module>
+ <device>%s</device>
+ <control>tango</control>
+ <hostname>haso000:10000</hostname>
+</device>
+<device>
+ <name>other</name>
+ <type>type_tango</type>
+ <module>mymodule</module>
+ <device>p09/other/1</device>
+ <control>tango</control>
+ <hostname>haso000:10000</hostname>
+</device>
+</hw>
+"""
+
+
+# test fixture
+class NXSCreateIncrementalTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        self.__package = "nxsincrementaltemplates"
+        pdir = os.path.join(self.__dir, self.__package)
+        os.mkdir(pdir)
+        with open(os.path.join(pdir, "__init__.py"), "w") as fl:
+            fl.write(PACKAGE)
+        self.__template = os.path.join(pdir, "mymodule.xml")
+        self.__online = os.path.join(self.__dir, "online.xml")
+        self.__output = os.path.join(self.__dir, "output")
+        os.mkdir(self.__output)
+        sys.path.insert(0, self.__dir)
+        self.__getServerTangoHost = nxscreator.getServerTangoHost
+        #: (:obj:`int`) number of tango host lookups
+        self.lookups = 0
+        nxscreator.getServerTangoHost = self.getServerTangoHost
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        nxscreator.getServerTangoHost = self.__getServerTangoHost
+        sys.path.remove(self.__dir)
+        sys.modules.pop(self.__package, None)
+        xmlPackageHandler.loadXMLTemplates('nxstools.xmltemplates')
+        nxscreator.templateCache.pop(self.__template, None)
+        shutil.rmtree(self.__dir)
+
+    # fake tango host lookup
+    # \returns tango host
+    def getServerTangoHost(self, server):
+        self.lookups += 1
+        return "haso000:10000"
+
+    # writes input files
+    # \param template xml template
+    # \param device tango device of the component
+    def write(self, template, device):
+        with open(self.__template, "w") as fl:
+            fl.write(template)
+        with open(self.__online, "w") as fl:
+            fl.write(ONLINE % device)
+
+    # runs onlinecp creator
+    # \returns command output
+    def create(self):
+        options = argparse.Namespace(
+            component="MyDev", cptype=None, device=None, host=None,
+            port=None, server=None, external=None, lower=True,
+            incremental=True, overwrite=False, directory=self.__output,
+            file="tst_", xmlpackage=self.__package, entryname=None,
+            insname=None, database=False)
+        old_stdout = sys.stdout
+        sys.stdout = mystdout = StringIO()
+        try:
+            nxscreator.OnlineCPCreator(
+                options, [self.__online], True).create()
+        finally:
+            sys.stdout = old_stdout
+        return mystdout.getvalue()
+
+    # reads the output component
+    # \returns output component xml
+    def component(self):
+        with open(os.path.join(self.__output, "tst_mydev.xml")) as fl:
+            return fl.read()
+
+    # incremental test
+    # \brief It tests skipping unchanged components
+    def test_unchanged(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self.write(TEMPLATE, "p09/mydev/1")
+        out = self.create()
+        self.assertTrue("UNCHANGED" not in out)
+        self.assertEqual(self.lookups, 1)
+        self.assertTrue("p09/mydev/1@haso000:10000" in self.component())
+        with open(os.path.join(
+                self.__output, ".tst_nxscreate.json")) as fl:
+            manifest = json.load(fl)
+        self.assertEqual(list(manifest.keys()), ["MyDev"])
+        self.assertEqual(manifest["MyDev"]["components"], ["mydev"])
+        self.assertEqual(manifest["MyDev"]["datasources"], [])
+        self.assertEqual(
+            list(manifest["MyDev"]["templates"].keys()), [self.__template])
+
+        out = self.create()
+        self.assertEqual(out.strip(), "UNCHANGED 'MyDev'")
+        self.assertEqual(self.lookups, 1)
+
+        os.remove(os.path.join(self.__output, "tst_mydev.xml"))
+        out = self.create()
+        self.assertTrue("UNCHANGED" not in out)
+        self.assertEqual(self.lookups, 2)
+        self.assertTrue("p09/mydev/1@haso000:10000" in self.component())
+
+    # incremental test
+    # \brief It tests regenerating components with a modified template
+    def test_template(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self.write(TEMPLATE, "p09/mydev/1")
+        self.create()
+        self.assertEqual(self.lookups, 1)
+
+        template = TEMPLATE.replace("NX_CHAR", "NX_FLOAT64")
+        # a different size changes the cache key at the same mtime
+        self.write(template + " ", "p09/mydev/1")
+        out = self.create()
+        self.assertTrue("UNCHANGED" not in out)
+        self.assertEqual(self.lookups, 2)
+        self.assertTrue('type="NX_FLOAT64"' in self.component())
+
+        out = self.create()
+        self.assertEqual(out.strip(), "UNCHANGED 'MyDev'")
+        self.assertEqual(self.lookups, 2)
+
+    # incremental test
+    # \brief It tests regenerating components with a modified device entry
+    def test_device(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self.write(TEMPLATE, "p09/mydev/1")
+        self.create()
+        self.assertEqual(self.lookups, 1)
+
+        with open(self.__online, "w") as fl:
+            fl.write((ONLINE % "p09/mydev/1").replace(
+                "p09/other/1", "p09/other/2"))
+        out = self.create()
+        self.assertEqual(out.strip(), "UNCHANGED 'MyDev'")
+        self.assertEqual(self.lookups, 1)
+
+        with open(self.__online, "w") as fl:
+            fl.write(ONLINE % "p09/mydev/2")
+        out = self.create()
+        self.assertTrue("UNCHANGED" not in out)
+        self.assertEqual(self.lookups, 2)
+        self.assertTrue("p09/mydev/2@haso000:10000" in self.component())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2018 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file NXSCreateOnlineDSJobs_test.py
+# unittests for parallel device queries of nxscreate onlineds
+#
+import unittest
+import os
+import sys
+import random
+import shutil
+import tempfile
+import time
+import argparse
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from nxstools import nxscreator
+from nxstools import nxsdevicetools
+
+
+#: (:obj:`str`) online.xml device
+DEVICE = """<device>
+ <name>%s</name>
+ <type>%s</type>
+ <module>%s</module>
+ <device>%s</device>
+ <control>tango</control>
+ %s
+ <sardananame>%s</sardananame>
+</device>
+"""
+
+
+class FakeProxy(object):
+
+    """ device proxy of a sardana channel """
+
+    def __init__(self, name):
+        #: (:obj:`str`) device name
+        self.__name = name
+
+    def name(self):
+        time.sleep(random.random() * 0.01)
+        return "expchan/%s/1" % self.__name.split("/")[-1]
+
+    def get_attribute_list(self):
+        return ["Value"]
+
+
+class FakeDatabase(object):
+
+    """ tango database with device classes """
+
+    def get_class_for_device(self, name):
+        time.sleep(random.random() * 0.01)
+        return "Class%s" % name.split("/")[1]
+
+
+# test fixture
+class NXSCreateOnlineDSJobsTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        self.__dir = tempfile.mkdtemp()
+        self.__online = os.path.join(self.__dir, "online.xml")
+        self.__old = dict(
+            (name, getattr(nxscreator, name))
+            for name in ["getDeviceProxy", "getServerTangoHost", "PYTANGO"])
+        self.__getDatabase = nxsdevicetools.getDatabase
+        nxscreator.getDeviceProxy = self.getDeviceProxy
+        nxscreator.getServerTangoHost = lambda server: "haso000:10000"
+        nxscreator.PYTANGO = True
+        nxsdevicetools.getDatabase = self.getDatabase
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        for name, value in self.__old.items():
+            setattr(nxscreator, name, value)
+        nxsdevicetools.getDatabase = self.__getDatabase
+        shutil.rmtree(self.__dir)
+
+    # fake device proxy
+    # \returns device proxy
+    def getDeviceProxy(self, name):
+        time.sleep(random.random() * 0.01)
+        if "missing" in name:
+            raise Exception("Device %s not defined" % name)
+        return FakeProxy(name)
+
+    # fake tango database
+    # \returns tango database
+    def getDatabase(self, tangohost):
+        time.sleep(random.random() * 0.01)
+        if tangohost.startswith("offline"):
+            raise Exception("Cannot connect to %s" % tangohost)
+        return FakeDatabase()
+
+    # writes online.xml
+    def write(self):
+        devices = []
+        for i in range(8):
+            devices.append(DEVICE % (
+                "exp_c%02d" % i, "counter", "counter_tango",
+                "p09/counter/%s" % i,
+                "<hostname>haso%s:10000</hostname>" % i,
+                "exp_c%02d" % i if i % 2 else "missing_c%02d" % i))
+            devices.append(DEVICE % (
+                "mot%02d" % i, "stepping_motor", "oms58",
+                "p09/motor/exp.%02d" % i,
+                "<hostname>haso%s:10000</hostname>" % i,
+                "mot%02d" % i))
+            devices.append(DEVICE % (
+                "xia%02d" % i, "type_tango", "module_tango",
+                "p09/mca_xia/%s" % i,
+                "<hostname>%s%s:10000</hostname>" % (
+                    "offline" if i % 3 else "haso", i),
+                "xia%02d" % i))
+            devices.append(DEVICE % (
+                "dev%02d" % i, "type_tango", "module_tango",
+                "p09/dev/%s" % i,
+                "<hostname>offline%s:10000</hostname>" % i
+                if i % 4 else "",
+                "dev%02d" % i))
+        with open(self.__online, "w") as fl:
+            fl.write("<?xml version=\"1.0\"?>\n<hw>\n%s</hw>\n"
+                     % "".join(devices))
+
+    # runs onlineds creator
+    # \param jobs number of parallel jobs
+    # \returns datasources, command output and error
+    def create(self, jobs):
+        options = argparse.Namespace(
+            directory="", database=False, server=None, external=None,
+            lower=True, clientlike=True, file="", xmlpackage=None,
+            verbose=False, jobs=jobs)
+        old_stdout = sys.stdout
+        old_stderr = sys.stderr
+        sys.stdout = mystdout = StringIO()
+        sys.stderr = mystderr = StringIO()
+        try:
+            creator = nxscreator.OnlineDSCreator(
+                options, [self.__online], True)
+            creator.createXMLs()
+        finally:
+            sys.stdout = old_stdout
+            sys.stderr = old_stderr
+        return creator.datasources, mystdout.getvalue(), \
+            mystderr.getvalue()
+
+    # onlineds test
+    # \brief It tests if parallel queries keep the serial output
+    def test_jobs(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self.write()
+        sds, sout, serr = self.create(1)
+        names = [line.split()[1] for line in sout.splitlines()]
+        self.assertEqual(len(names), 48)
+        self.assertEqual(names[:6], [
+            "missing_c00:", "mot00:", "xia00_icr:", "xia00_ocr:",
+            "xia00:", "dev00:"])
+        self.assertEqual(len(sds), 32)
+        self.assertTrue(
+            "ERROR dev00: host for module module_tango of type_tango "
+            "type not defined" in sout)
+        self.assertTrue(
+            "SKIPPING dev01:    module 'module_tango' of 'type_tango' "
+            "type not defined" in sout)
+        self.assertEqual(serr.splitlines()[:2], [
+            "Info: Cannot connect to p09/mca_xia/1 on host offline1:10000",
+            "Info: Cannot connect to p09/dev/1 on host offline1:10000",
+        ])
+        self.assertEqual(len(serr.splitlines()), 11)
+        for _ in range(3):
+            pds, pout, perr = self.create(16)
+            self.assertEqual(pout, sout)
+            self.assertEqual(perr, serr)
+            self.assertEqual(list(pds.keys()), list(sds.keys()))
+            self.assertEqual(pds, sds)
+
+
+if __name__ == '__main__':
+    unittest.main()
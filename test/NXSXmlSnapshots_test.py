@@ -0,0 +1,406 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2018 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file NXSXmlSnapshots_test.py
+# unittests for device interface snapshots of nxsxml
+#
+import unittest
+import os
+import sys
+import json
+import shutil
+import tempfile
+
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+
+from nxstools import nxsxml
+
+
+class Info(object):
+
+    """ tango info object """
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+#: (:obj:`dict` <:obj:`str`, :obj:`dict`>) fake devices
+DEVICES = {}
+
+#: (:obj:`dict` <:obj:`str`, :obj:`list`>) fake device database entries
+#:    with class name, server name, idl version and version property
+DATABASE = {}
+
+
+def device(name):
+    """ creates a fake device """
+    DEVICES[name] = {
+        "properties": {"Host": ["haso000"], "Port": ["10000"]},
+        "attributes": [
+            Info(name="Position", data_format="AttrDataFormat.SCALAR",
+                 data_type=5, unit="mm", standard_unit="1",
+                 display_unit="mm", description="No description"),
+            Info(name="Spectrum", data_format="AttrDataFormat.SPECTRUM",
+                 data_type=3, unit="No unit", standard_unit="No unit",
+                 display_unit="No unit", description="No description"),
+            Info(name="Image", data_format="AttrDataFormat.IMAGE",
+                 data_type=6, unit="No unit", standard_unit="No unit",
+                 display_unit="No unit", description="No description"),
+            Info(name="Black", data_format="AttrDataFormat.SPECTRUM",
+                 data_type=5, unit="No unit", standard_unit="No unit",
+                 display_unit="No unit", description="No description"),
+        ],
+        "values": {
+            "Spectrum": Info(dim_x=12, dim_y=0, type="DevLong"),
+            "Image": Info(dim_x=20, dim_y=10, type="DevUShort"),
+            "Black": Info(dim_x=5, dim_y=0, type="DevDouble"),
+        },
+        "commands": [
+            Info(cmd_name="State", in_type="CmdArgType.DevVoid",
+                 out_type="CmdArgType.DevState"),
+            Info(cmd_name="Move", in_type="CmdArgType.DevDouble",
+                 out_type="CmdArgType.DevVoid"),
+        ],
+    }
+    DATABASE[name] = ["Motor", "Motor/p09", "5", "1.2.0"]
+
+
+class FakeDeviceProxy(object):
+
+    """ device proxy which records its calls """
+
+    #: (:obj:`list` <:obj:`tuple`>) calls of the proxies
+    calls = []
+
+    def __init__(self, name):
+        FakeDeviceProxy.calls.append(("DeviceProxy", name))
+        self.__device = DEVICES[name]
+
+    def get_property_list(self, filter):
+        return list(sorted(self.__device["properties"].keys()))
+
+    def get_property(self, names):
+        return dict((nm, self.__device["properties"][nm]) for nm in names)
+
+    def attribute_list_query(self):
+        # the configuration of the last attribute is not provided
+        return self.__device["attributes"][:-1]
+
+    def attribute_query(self, name):
+        FakeDeviceProxy.calls.append(("attribute_query", name))
+        return [at for at in self.__device["attributes"]
+                if at.name == name][0]
+
+    def get_attribute_list(self):
+        return [at.name for at in self.__device["attributes"]]
+
+    def read_attributes(self, names):
+        FakeDeviceProxy.calls.append(("read_attributes", list(names)))
+        return [self.__device["values"][nm] for nm in names]
+
+    def command_list_query(self):
+        return self.__device["commands"]
+
+
+class FakeDatabase(object):
+
+    """ tango database """
+
+    def __init__(self, *args):
+        pass
+
+    def get_device_info(self, name):
+        cls, server, version, _ = DATABASE[name]
+        return Info(class_name=cls, ds_full_name=server, version=version)
+
+    def get_device_property_list(self, name, filter):
+        return list(sorted(DEVICES[name]["properties"].keys()))
+
+    def get_device_property(self, name, props):
+        values = {}
+        for pr in props:
+            if pr == "Version":
+                values[pr] = [DATABASE[name][3]] if DATABASE[name][3] else []
+            else:
+                values[pr] = DEVICES[name]["properties"].get(pr, [])
+        return values
+
+
+class FakeTango(object):
+
+    """ tango module """
+
+    DeviceProxy = FakeDeviceProxy
+    Database = FakeDatabase
+
+
+# test fixture
+class NXSXmlSnapshotsTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        self.__tango = nxsxml.tango
+        self.__dump = nxsxml.DeviceSnapshots.__dict__["_dump"]
+        self.__env = os.environ.pop(nxsxml.SNAPSHOT_ENV, None)
+        self.__dir = tempfile.mkdtemp()
+        self.__file = os.path.join(self.__dir, "snapshots.json")
+        nxsxml.tango = FakeTango
+        nxsxml.snapshotFiles.clear()
+        dumps = []
+        dump = self.__dump.__func__
+
+        def countdump(cls, filename, content):
+            dumps.append(sorted(content.keys()))
+            dump(cls, filename, content)
+        nxsxml.DeviceSnapshots._dump = classmethod(countdump)
+        #: (:obj:`list` <:obj:`list` <:obj:`str`>>) stored device names
+        self.dumps = dumps
+        FakeDeviceProxy.calls = []
+        DEVICES.clear()
+        DATABASE.clear()
+        for i in range(5):
+            device("p09/motor/exp.%02d" % i)
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        nxsxml.tango = self.__tango
+        nxsxml.DeviceSnapshots._dump = self.__dump
+        nxsxml.snapshotFiles.clear()
+        if self.__env is not None:
+            os.environ[nxsxml.SNAPSHOT_ENV] = self.__env
+        else:
+            os.environ.pop(nxsxml.SNAPSHOT_ENV, None)
+        shutil.rmtree(self.__dir)
+
+    # provides names of created device proxies
+    # \returns device names
+    def proxies(self):
+        return [cl[1] for cl in FakeDeviceProxy.calls
+                if cl[0] == "DeviceProxy"]
+
+    # fetchSnapshot test
+    # \brief It tests fetching the device interface
+    def test_fetchsnapshot(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        snapshot = nxsxml.fetchSnapshot(
+            FakeDeviceProxy("p09/motor/exp.00"), ["Black"])
+        self.assertEqual(
+            snapshot["properties"], [["Host", "haso000"], ["Port", "10000"]])
+        self.assertEqual(
+            [at["name"] for at in snapshot["attributes"]],
+            ["Position", "Spectrum", "Image", "Black"])
+        self.assertEqual(snapshot["attributes"][0], {
+            "name": "Position", "data_format": "SCALAR", "data_type": 5,
+            "unit": "mm", "standard_unit": "1", "display_unit": "mm",
+            "description": "No description"})
+        self.assertEqual(snapshot["attributes"][3]["data_format"],
+                         "SPECTRUM")
+        self.assertEqual(snapshot["shapes"], {
+            "Spectrum": [12, 0, "DevLong"], "Image": [20, 10, "DevUShort"]})
+        self.assertEqual(snapshot["commands"], [
+            {"cmd_name": "State", "in_type": "DevVoid",
+             "out_type": "DevState"},
+            {"cmd_name": "Move", "in_type": "DevDouble",
+             "out_type": "DevVoid"}])
+        self.assertEqual(FakeDeviceProxy.calls, [
+            ("DeviceProxy", "p09/motor/exp.00"),
+            ("attribute_query", "Black"),
+            ("read_attributes", ["Spectrum", "Image"])])
+        json.dumps(snapshot)
+
+    # snapshot test
+    # \brief It tests refetching snapshots of changed servers
+    def test_stamp(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        name = "p09/motor/exp.00"
+        snapshots = nxsxml.DeviceSnapshots(self.__file)
+        entry = snapshots.snapshot(name)
+        self.assertEqual(entry["stamp"], ["Motor", "Motor/p09", "1.2.0"])
+        self.assertTrue(snapshots.snapshot(name) is entry)
+        self.assertEqual(self.proxies(), [name])
+
+        # the IDL version does not describe the server build
+        DATABASE[name][2] = "6"
+        self.assertTrue(snapshots.snapshot(name) is entry)
+        self.assertEqual(self.proxies(), [name])
+
+        DATABASE[name][3] = "1.3.0"
+        entry = snapshots.snapshot(name)
+        self.assertEqual(entry["stamp"], ["Motor", "Motor/p09", "1.3.0"])
+        self.assertEqual(self.proxies(), [name, name])
+        self.assertTrue(snapshots.snapshot(name) is entry)
+
+        DATABASE[name][1] = "Motor/p09eh2"
+        entry = snapshots.snapshot(name)
+        self.assertEqual(entry["stamp"], ["Motor", "Motor/p09eh2", "1.3.0"])
+        self.assertEqual(self.proxies(), [name, name, name])
+
+        snapshots.invalidate([name])
+        self.assertEqual(snapshots.devices(), [])
+        entry = snapshots.snapshot(name)
+        self.assertEqual(self.proxies(), [name, name, name, name])
+
+        snapshots.store()
+        offline = nxsxml.DeviceSnapshots(self.__file, offline=True)
+        self.assertEqual(offline.snapshot(name), entry)
+        self.assertEqual(len(self.proxies()), 4)
+        self.assertRaises(
+            Exception, offline.snapshot, "p09/motor/exp.01")
+
+    # properties test
+    # \brief It tests device properties read from the tango database
+    def test_properties(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        name = "p09/motor/exp.00"
+        snapshots = nxsxml.DeviceSnapshots(self.__file)
+        entry = snapshots.snapshot(name)
+        self.assertEqual(
+            entry["properties"], [["Host", "haso000"], ["Port", "10000"]])
+        snapshots.store()
+        self.assertEqual(len(self.dumps), 1)
+
+        DEVICES[name]["properties"]["Port"] = ["10001"]
+        DEVICES[name]["properties"]["Timeout"] = ["3"]
+        entry2 = snapshots.snapshot(name)
+        self.assertEqual(
+            entry2["properties"],
+            [["Host", "haso000"], ["Port", "10001"], ["Timeout", "3"]])
+        self.assertEqual(entry2["attributes"], entry["attributes"])
+        self.assertEqual(self.proxies(), [name])
+        self.assertTrue(snapshots.snapshot(name) is entry2)
+        snapshots.store()
+        self.assertEqual(len(self.dumps), 2)
+        with open(self.__file) as fl:
+            self.assertEqual(
+                json.load(fl)[name]["properties"], entry2["properties"])
+
+    # time-to-live test
+    # \brief It tests refetching snapshots of servers without version
+    def test_ttl(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        name = "p09/motor/exp.00"
+        name1 = "p09/motor/exp.01"
+        DATABASE[name][3] = ""
+        snapshots = nxsxml.DeviceSnapshots(self.__file, ttl=100)
+        entry = snapshots.snapshot(name)
+        entry1 = snapshots.snapshot(name1)
+        self.assertEqual(entry["stamp"], ["Motor", "Motor/p09", ""])
+        self.assertTrue(snapshots.snapshot(name) is entry)
+        self.assertEqual(self.proxies(), [name, name1])
+
+        entry["time"] -= 200
+        entry1["time"] -= 200
+        self.assertTrue(snapshots.snapshot(name1) is entry1)
+        entry2 = snapshots.snapshot(name)
+        self.assertTrue(entry2 is not entry)
+        self.assertEqual(self.proxies(), [name, name1, name])
+        self.assertTrue(snapshots.snapshot(name) is entry2)
+
+        entry2["time"] -= 200
+        snapshots.ttl = None
+        self.assertTrue(snapshots.snapshot(name) is entry2)
+        self.assertEqual(self.proxies(), [name, name1, name])
+
+    # store test
+    # \brief It tests storing snapshots once per batch
+    def test_store(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        names = sorted(DEVICES.keys())
+        snapshots = nxsxml.DeviceSnapshots(self.__file)
+        for name in names:
+            snapshots.snapshot(name)
+        self.assertEqual(self.dumps, [])
+        self.assertTrue(not os.path.exists(self.__file))
+        snapshots.store()
+        self.assertEqual(self.dumps, [names])
+        snapshots.store()
+        for name in names:
+            snapshots.snapshot(name)
+        snapshots.store()
+        self.assertEqual(self.dumps, [names])
+        with open(self.__file) as fl:
+            self.assertEqual(sorted(json.load(fl).keys()), names)
+
+        self.assertEqual(snapshots.refresh(jobs=4), names)
+        self.assertEqual(self.dumps, [names, names])
+        self.assertEqual(len(self.proxies()), 10)
+
+        snapshots.invalidate()
+        self.assertEqual(self.dumps, [names, names])
+        snapshots.store()
+        self.assertEqual(self.dumps, [names, names, []])
+
+    # device group test
+    # \brief It tests storing snapshots of NXSXML_SNAPSHOTS with the file
+    def test_devicegroup(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        names = sorted(DEVICES.keys())
+        os.environ[nxsxml.SNAPSHOT_ENV] = self.__file
+        old_stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            df = nxsxml.XMLFile(os.path.join(self.__dir, "test.xml"))
+            en = nxsxml.NGroup(df, "entry", "NXentry")
+            for i, name in enumerate(names):
+                nxsxml.NDeviceGroup(
+                    en, name, "motor%s" % i, "NXpositioner",
+                    blackAttrs=["Black"])
+            self.assertEqual(self.dumps, [])
+            xml = df.prettyPrint()
+            df.dump()
+        finally:
+            sys.stdout = old_stdout
+        self.assertEqual(self.dumps, [names])
+        self.assertEqual(self.proxies(), names)
+        self.assertEqual(len(nxsxml.snapshotFiles), 1)
+
+        nxsxml.snapshotFiles.clear()
+        sys.stdout = StringIO()
+        try:
+            df = nxsxml.XMLFile(os.path.join(self.__dir, "test2.xml"))
+            en = nxsxml.NGroup(df, "entry", "NXentry")
+            for i, name in enumerate(names):
+                nxsxml.NDeviceGroup(
+                    en, name, "motor%s" % i, "NXpositioner",
+                    blackAttrs=["Black"])
+            df.dump()
+        finally:
+            sys.stdout = old_stdout
+        self.assertEqual(df.prettyPrint(), xml)
+        self.assertEqual(self.proxies(), names)
+        self.assertEqual(self.dumps, [names])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2018 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file ParserTools_test.py
+# unittests for component descriptions
+#
+import unittest
+import sys
+
+from nxstools.nxsparser import ParserTools
+
+
+#: (:obj:`str`) component with groups, fields, attributes and links
+COMPONENT = """
+<definition>
+  <group type="NXentry" name="scan">
+    <group type="NXinstrument">
+      <attribute name="short_name" type="NX_CHAR">instr</attribute>
+      <group type="NXpositioner" name="mot01">
+        <field name="value" type="NX_FLOAT64" units="mm">
+          <doc>motor position</doc>
+          <strategy mode="STEP"/>
+          <datasource type="TANGO" name="mot01">
+            <device member="attribute" name="p09/mot/01"/>
+            <record name="Position"/>
+          </datasource>
+          <attribute name="transformation_type" type="NX_CHAR">
+            translation
+          </attribute>
+          <attribute name="vector" type="NX_FLOAT64">
+            <dimensions rank="1"><dim index="1" value="3"/></dimensions>
+            0 0 1
+          </attribute>
+          <attribute name="depends_on" type="NX_CHAR">
+            <strategy mode="INIT"/>
+            <datasource type="CLIENT" name="dep01">
+              <record name="dep01"/>
+            </datasource>
+          </attribute>
+        </field>
+      </group>
+      <group type="NXdetector" name="pilatus">
+        <field name="data" type="NX_UINT32" transformation_type="rotation">
+          <dimensions rank="2">
+            <dim index="1" value="195"/>
+            <dim index="2" value="487"/>
+          </dimensions>
+          <strategy mode="FINAL" compression="true"/>
+          <datasource type="PYEVAL" name="pdata">
+            <result name="result">ds.result = ds.pimg</result>
+            <datasource type="CLIENT" name="pimg">
+              <record name="pimg"/>
+            </datasource>
+          </datasource>
+        </field>
+        <field name="description" type="NX_CHAR">pilatus 300k</field>
+      </group>
+    </group>
+    <group type="NXdata" name="data">
+      <link name="mot01" target="/scan/instrument/mot01/value"/>
+      <link name="pdata">
+        <strategy mode="FINAL"/>
+        <datasource type="CLIENT" name="plink">
+          <record name="plink"/>
+        </datasource>
+      </link>
+    </group>
+  </group>
+</definition>
+"""
+
+#: (:obj:`list` < :obj:`dict` >) fields described by
+#    parseFields, parseAttributes and parseLinks before parseComponent
+FIELDS = [
+    {
+        'depends_on':
+            "$datasources.{'source_type': 'CLIENT', "
+            "'source_name': 'dep01', 'source': 'dep01'}",
+        'doc': 'motor position',
+        'full_nexus_path':
+            'scan:NXentry/instrument:NXinstrument/mot01:NXpositioner'
+            '/value',
+        'name': 'value',
+        'nexus_path': 'scan/instrument/mot01/value',
+        'nexus_type': 'NX_FLOAT64',
+        'shape': None,
+        'source': 'p09/mot/01/Position',
+        'source_name': 'mot01',
+        'source_type': 'TANGO',
+        'strategy': 'STEP',
+        'trans_offset': None,
+        'trans_type': 'translation',
+        'trans_vector': '0 0 1',
+        'type': 'NX_FLOAT64',
+        'units': 'mm',
+        'value': None,
+    },
+    {
+        'depends_on': None,
+        'doc': None,
+        'full_nexus_path':
+            'scan:NXentry/instrument:NXinstrument/pilatus:NXdetector'
+            '/data',
+        'name': 'data',
+        'nexus_path': 'scan/instrument/pilatus/data',
+        'nexus_type': 'NX_UINT32',
+        'shape': [195, 487],
+        'source': 'ds.pimg',
+        'source_name': 'pdata',
+        'source_type': 'PYEVAL',
+        'strategy': 'FINAL',
+        'trans_offset': None,
+        'trans_type': 'rotation',
+        'trans_vector': None,
+        'transformation_type': 'rotation',
+        'type': 'NX_UINT32',
+        'units': None,
+        'value': None,
+    },
+    {
+        'full_nexus_path':
+            'scan:NXentry/instrument:NXinstrument/pilatus:NXdetector'
+            '/data',
+        'nexus_path': 'scan/instrument/pilatus/data',
+        'source': 'pimg',
+        'source_name': '\\pimg',
+        'source_type': 'CLIENT',
+        'strategy': 'FINAL',
+    },
+    {
+        'depends_on': None,
+        'doc': None,
+        'full_nexus_path':
+            'scan:NXentry/instrument:NXinstrument/pilatus:NXdetector'
+            '/description',
+        'name': 'description',
+        'nexus_path': 'scan/instrument/pilatus/description',
+        'nexus_type': 'NX_CHAR',
+        'shape': None,
+        'strategy': None,
+        'trans_offset': None,
+        'trans_type': None,
+        'trans_vector': None,
+        'type': 'NX_CHAR',
+        'units': None,
+        'value': 'pilatus 300k',
+    },
+]
+
+
+#: (:obj:`list` < :obj:`dict` >) attributes described by
+#    parseFields, parseAttributes and parseLinks before parseComponent
+ATTRIBUTES = [
+    {
+        'depends_on': None,
+        'full_nexus_path': 'scan:NXentry/instrument@short_name',
+        'nexus_path': 'scan/instrument@short_name',
+        'nexus_type': 'NX_CHAR',
+        'shape': None,
+        'strategy': None,
+        'trans_offset': None,
+        'trans_type': None,
+        'trans_vector': None,
+        'units': None,
+        'value': 'instr',
+    },
+    {
+        'depends_on': None,
+        'full_nexus_path':
+            'scan:NXentry/instrument:NXinstrument/mot01:NXpositioner'
+            '/value@transformation_type',
+        'nexus_path': 'scan/instrument/mot01/value@transformation_type',
+        'nexus_type': 'NX_CHAR',
+        'shape': None,
+        'strategy': None,
+        'trans_offset': None,
+        'trans_type': 'translation',
+        'trans_vector': None,
+        'units': None,
+        'value': 'translation',
+    },
+    {
+        'depends_on': None,
+        'full_nexus_path':
+            'scan:NXentry/instrument:NXinstrument/mot01:NXpositioner'
+            '/value@vector',
+        'nexus_path': 'scan/instrument/mot01/value@vector',
+        'nexus_type': 'NX_FLOAT64',
+        'shape': [3],
+        'strategy': None,
+        'trans_offset': None,
+        'trans_type': None,
+        'trans_vector': '0 0 1',
+        'units': None,
+        'value': '0 0 1',
+    },
+    {
+        'depends_on':
+            "$datasources.{'source_type': 'CLIENT', "
+            "'source_name': 'dep01', 'source': 'dep01'}",
+        'full_nexus_path':
+            'scan:NXentry/instrument:NXinstrument/mot01:NXpositioner'
+            '/value@depends_on',
+        'nexus_path': 'scan/instrument/mot01/value@depends_on',
+        'nexus_type': 'NX_CHAR',
+        'shape': None,
+        'source': 'dep01',
+        'source_name': 'dep01',
+        'source_type': 'CLIENT',
+        'strategy': 'INIT',
+        'trans_offset': None,
+        'trans_type': None,
+        'trans_vector': None,
+        'units': None,
+        'value': None,
+    },
+]
+
+
+#: (:obj:`list` < :obj:`dict` >) links described by
+#    parseFields, parseAttributes and parseLinks before parseComponent
+LINKS = [
+    {
+        'nexus_path': '[scan/data/mot01]',
+        'strategy': None,
+        'value': None,
+    },
+    {
+        'nexus_path': '\\-> /scan/instrument/mot01/value',
+        'strategy': None,
+        'value': None,
+    },
+    {
+        'nexus_path': '[scan/data/pdata]',
+        'source': 'plink',
+        'source_name': 'plink',
+        'source_type': 'CLIENT',
+        'strategy': 'FINAL',
+        'value': None,
+    },
+]
+
+
+# test fixture
+class ParserToolsTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # parseComponent test
+    # \brief It tests descriptions of the single-pass parser
+    def test_parsecomponent(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self.assertEqual(
+            ParserTools.parseComponent(COMPONENT),
+            {"fields": FIELDS, "attributes": ATTRIBUTES, "links": LINKS})
+        self.assertEqual(
+            ParserTools.parseComponent(COMPONENT, attributes=False),
+            {"fields": FIELDS, "attributes": [], "links": LINKS})
+
+    # parseComponent datasources test
+    # \brief It tests datasources collected only on request
+    def test_parsecomponent_datasources(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self.assertTrue(
+            "datasources" not in ParserTools.parseComponent(COMPONENT))
+        desc = ParserTools.parseComponent(COMPONENT, datasources=True)
+        self.assertEqual(
+            desc["datasources"], ParserTools.parseDataSources(COMPONENT))
+        self.assertEqual(
+            [ds["source_name"] for ds in desc["datasources"]],
+            ["mot01", "dep01", "pdata", "pimg", "plink"])
+        self.assertEqual(desc["fields"], FIELDS)
+        self.assertEqual(desc["attributes"], ATTRIBUTES)
+        self.assertEqual(desc["links"], LINKS)
+
+    # parse tags test
+    # \brief It tests descriptions of separate tags
+    def test_parsetags(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        self.assertEqual(ParserTools.parseFields(COMPONENT), FIELDS)
+        self.assertEqual(
+            ParserTools.parseAttributes(COMPONENT), ATTRIBUTES)
+        self.assertEqual(ParserTools.parseLinks(COMPONENT), LINKS)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+#   This file is part of nexdatas - Tango Server for NeXus data writer
+#
+#    Copyright (C) 2012-2018 DESY, Jan Kotanski <jkotan@mail.desy.de>
+#
+#    nexdatas is free software: you can redistribute it and/or modify
+#    it under the terms of the GNU General Public License as published by
+#    the Free Software Foundation, either version 3 of the License, or
+#    (at your option) any later version.
+#
+#    nexdatas is distributed in the hope that it will be useful,
+#    but WITHOUT ANY WARRANTY; without even the implied warranty of
+#    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#    GNU General Public License for more details.
+#
+#    You should have received a copy of the GNU General Public License
+#    along with nexdatas.  If not, see <http://www.gnu.org/licenses/>.
+# \package test nexdatas
+# \file RedisUtils_test.py
+# unittests for redis datastore cache
+#
+import unittest
+import sys
+
+from nxstools import redisutils
+
+
+class FakeDataStore(object):
+
+    """ datastore which records its creation """
+
+    #: (:obj:`list`) created datastores
+    created = []
+    #: (:obj:`bool`) if datastore creation fails
+    fail = False
+
+    def __init__(self, url, init_db=False, identity_model_cls=None):
+        # the cache lock is not held during the creation
+        locked = not redisutils.datastorelock.acquire(False)
+        if not locked:
+            redisutils.datastorelock.release()
+        if self.fail:
+            raise Exception("Connection refused")
+        self.url = url
+        self.init_db = init_db
+        self.locked = locked
+        FakeDataStore.created.append(self)
+
+
+class FakeRedisClient(object):
+
+    """ redis client which records its pings """
+
+    #: (:obj:`list` <:obj:`str`>) pinged urls
+    pings = []
+    #: (:obj:`bool`) if the server responds
+    alive = True
+    #: (:obj:`list` <:obj:`bool`>) if the cache lock was held during pings
+    locked = []
+
+    def __init__(self, url):
+        self.url = url
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        return cls(url)
+
+    def ping(self):
+        locked = not redisutils.datastorelock.acquire(False)
+        if not locked:
+            redisutils.datastorelock.release()
+        FakeRedisClient.locked.append(locked)
+        FakeRedisClient.pings.append(self.url)
+        if not self.alive:
+            raise Exception("Connection refused")
+        return True
+
+    def close(self):
+        pass
+
+
+class FakeRedis(object):
+
+    """ redis module """
+
+    Redis = FakeRedisClient
+
+
+# test fixture
+class RedisUtilsTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        self.__old = dict(
+            (name, getattr(redisutils, name, None))
+            for name in ["DataStore", "redis", "DESYIdentityModel",
+                         "HEALTH_CHECK_INTERVAL"])
+        redisutils.DataStore = FakeDataStore
+        redisutils.redis = FakeRedis
+        redisutils.DESYIdentityModel = None
+        FakeDataStore.created = []
+        FakeDataStore.fail = False
+        FakeRedisClient.pings = []
+        FakeRedisClient.alive = True
+        FakeRedisClient.locked = []
+        redisutils.resetDataStores()
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        redisutils.resetDataStores()
+        for name, value in self.__old.items():
+            if value is None:
+                if hasattr(redisutils, name):
+                    delattr(redisutils, name)
+            else:
+                setattr(redisutils, name, value)
+
+    def test_cache(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        url1 = "redis://localhost:6380"
+        url2 = "redis://localhost:6381"
+        ds1 = redisutils.getDataStore(url1)
+        self.assertTrue(isinstance(ds1, FakeDataStore))
+        self.assertEqual(ds1.url, url1)
+        self.assertTrue(ds1.init_db)
+        self.assertTrue(ds1 is redisutils.getDataStore(url1))
+        ds2 = redisutils.getDataStore(url2)
+        self.assertTrue(ds2 is not ds1)
+        self.assertEqual(ds2.url, url2)
+        self.assertTrue(ds2 is redisutils.getDataStore(url2))
+        self.assertEqual(FakeDataStore.created, [ds1, ds2])
+        self.assertEqual(FakeRedisClient.pings, [])
+        self.assertEqual([ds.locked for ds in FakeDataStore.created],
+                         [False, False])
+
+    def test_healthcheck(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        url = "redis://localhost:6380"
+        redisutils.HEALTH_CHECK_INTERVAL = 1000.
+        ds = redisutils.getDataStore(url)
+        for _ in range(5):
+            self.assertTrue(ds is redisutils.getDataStore(url))
+        self.assertEqual(FakeRedisClient.pings, [])
+
+        redisutils.HEALTH_CHECK_INTERVAL = -1.
+        self.assertTrue(ds is redisutils.getDataStore(url))
+        self.assertTrue(ds is redisutils.getDataStore(url))
+        self.assertEqual(FakeRedisClient.pings, [url, url])
+        self.assertEqual(FakeRedisClient.locked, [False, False])
+        self.assertEqual(FakeDataStore.created, [ds])
+
+    def test_reconnect(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        url = "redis://localhost:6380"
+        ds = redisutils.getDataStore(url)
+        redisutils.HEALTH_CHECK_INTERVAL = -1.
+        FakeRedisClient.alive = False
+        ds2 = redisutils.getDataStore(url)
+        self.assertTrue(ds2 is not ds)
+        self.assertTrue(ds2.init_db)
+        self.assertFalse(ds2.locked)
+        self.assertEqual(FakeRedisClient.pings, [url])
+
+        redisutils.HEALTH_CHECK_INTERVAL = 1000.
+        self.assertTrue(ds2 is redisutils.getDataStore(url))
+
+        redisutils.HEALTH_CHECK_INTERVAL = -1.
+        FakeDataStore.fail = True
+        self.assertEqual(redisutils.getDataStore(url), None)
+        self.assertTrue(url not in redisutils.DATASTORES)
+        FakeDataStore.fail = False
+        ds3 = redisutils.getDataStore(url)
+        self.assertTrue(ds3 is not ds2)
+        self.assertEqual(FakeDataStore.created, [ds, ds2, ds3])
+
+    def test_reset(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+        url = "redis://localhost:6380"
+        ds = redisutils.getDataStore(url)
+        self.assertTrue(ds is redisutils.getDataStore(url))
+        redisutils.resetDataStores()
+        self.assertEqual(redisutils.DATASTORES, {})
+        self.assertEqual(redisutils.INITIALIZED_URLS, set())
+        ds2 = redisutils.getDataStore(url)
+        self.assertTrue(ds2 is not ds)
+        self.assertTrue(ds2.init_db)
+        self.assertEqual(FakeDataStore.created, [ds, ds2])
+
+
+if __name__ == '__main__':
+    unittest.main()
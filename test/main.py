@@ -54,6 +54,11 @@ except SystemError as e:
 import unittest
 
 import NXSTools_test
+import RedisUtils_test
+import ParserTools_test
+import NXSConfigCache_test
+import ComponentGraph_test
+import NXSConfigUpload_test
 
 if not H5PY_AVAILABLE and not H5CPP_AVAILABLE:
     raise Exception("Please install h5py or pninexus.h5cpp")
@@ -196,6 +201,9 @@ if PYTANGO_AVAILABLE:
     import NXSCreatePoolDSFS3_test
 
     import NXSCreateSECoPCPFS_test
+    import NXSCreateIncremental_test
+    import NXSCreateOnlineDSJobs_test
+    import NXSXmlSnapshots_test
 
     import NXSData_test
 
@@ -261,6 +269,22 @@ def main():
     # test suit
     suite = unittest.TestSuite()
 
+    suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            RedisUtils_test))
+    suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ParserTools_test))
+    suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            NXSConfigCache_test))
+    suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ComponentGraph_test))
+    suite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            NXSConfigUpload_test))
+
     if H5PY_AVAILABLE:
         suite.addTests(
             unittest.defaultTestLoader.loadTestsFromModule(
@@ -372,6 +396,15 @@ def main():
         suite.addTests(
             unittest.defaultTestLoader.loadTestsFromModule(
                 NXSCreateSECoPCPFS_test))
+        suite.addTests(
+            unittest.defaultTestLoader.loadTestsFromModule(
+                NXSCreateIncremental_test))
+        suite.addTests(
+            unittest.defaultTestLoader.loadTestsFromModule(
+                NXSCreateOnlineDSJobs_test))
+        suite.addTests(
+            unittest.defaultTestLoader.loadTestsFromModule(
+                NXSXmlSnapshots_test))
 
         suite.addTests(
             unittest.defaultTestLoader.loadTestsFromModule(